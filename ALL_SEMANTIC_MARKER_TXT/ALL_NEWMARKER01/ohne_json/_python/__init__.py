@@ -22,13 +22,26 @@ __author__ = "MARSAP CoSD Integration"
 
 # Zentrale Imports für einfachen Zugriff
 from .drift_analyzer import CoSDAnalyzer, DriftAnalysisResult
-from .cost_vector_math import CoSDVector, calculate_drift_velocity
+from .drift_session import CoSDSession
+from .vector_cache import VectorCache
+from .vector_index import CoSDVectorIndex
+from .vector_arena import VectorArena, ArenaCoSDVector
+from .stage_profile import StageProfile, StageMetrics
+from .cost_vector_math import CoSDVector, SparseCoSDVector, calculate_drift_velocity
 from .semantic_marker_interface import CoSDMarkerMatcher, SemanticCluster
 
 __all__ = [
     "CoSDAnalyzer",
     "DriftAnalysisResult", 
+    "CoSDSession",
+    "VectorCache",
+    "CoSDVectorIndex",
+    "VectorArena",
+    "ArenaCoSDVector",
+    "StageProfile",
+    "StageMetrics",
     "CoSDVector",
+    "SparseCoSDVector",
     "calculate_drift_velocity",
     "CoSDMarkerMatcher",
     "SemanticCluster"
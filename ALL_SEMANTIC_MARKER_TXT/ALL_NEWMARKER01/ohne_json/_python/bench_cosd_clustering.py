@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Clustering-Backends für die Emergenz-Detektion
+
+Erzeugt synthetische CoSD-Sequenzen (Themen-Mischungen über einem Token-
+Vokabular) und misst die Backends aus vector_clustering über mehrere
+Sequenzlängen. Bis --legacy-max wird zusätzlich die paarweise Python-Schleife
+gemessen und mit dem Complete-Linkage-Ergebnis verglichen.
+
+Aufruf als Modul aus dem Paket heraus, z.B.:
+    python -m <paket>.bench_cosd_clustering --sizes 500 1000 2000 4000 8000
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+from .cost_vector_math import CoSDVector, SparseCoSDVector, VectorOperations
+from .vector_clustering import create_clustering_backend
+
+
+def legacy_cluster(vectors: List[CoSDVector], distance_threshold: float) -> List[List[int]]:
+    """Paarweise Schleife: jeder Kandidat gegen jedes Cluster-Mitglied."""
+    clusters = []
+    assigned = set()
+    for i in range(len(vectors)):
+        if i in assigned:
+            continue
+        cluster = [i]
+        assigned.add(i)
+        for j in range(i + 1, len(vectors)):
+            if j in assigned:
+                continue
+            max_dist = max(
+                1.0 - VectorOperations.cosine_similarity(vectors[j], vectors[idx])
+                for idx in cluster
+            )
+            if max_dist <= distance_threshold:
+                cluster.append(j)
+                assigned.add(j)
+        clusters.append(cluster)
+    return clusters
+
+
+def build_sequence(count: int, vocabulary: int, topics: int, sparse: bool, seed: int) -> List[CoSDVector]:
+    """Erzeugt eine Sequenz mit langsam wechselnden Themen und Rauschen."""
+    rng = np.random.default_rng(seed)
+    topic_tokens = [rng.choice(vocabulary, 12, replace=False) for _ in range(topics)]
+    start = datetime(2024, 1, 1)
+    topic = 0
+
+    vectors = []
+    for i in range(count):
+        if rng.random() < 0.1:
+            topic = int(rng.integers(topics))
+        indices = np.unique(np.concatenate((
+            rng.choice(topic_tokens[topic], 6, replace=False),
+            rng.integers(vocabulary, size=3)
+        )))
+        values = rng.uniform(0.5, 1.0, len(indices))
+        values /= np.linalg.norm(values)
+        vector = SparseCoSDVector(indices, values, vocabulary, start + timedelta(minutes=5 * i))
+        vectors.append(vector if sparse else CoSDVector(vector.dimensions.copy(), vector.timestamp))
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für die CoSD-Clustering-Backends')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000],
+                        help='Sequenzlängen')
+    parser.add_argument('--vocabulary', type=int, default=2000, help='Anzahl Token-Dimensionen')
+    parser.add_argument('--topics', type=int, default=20, help='Anzahl synthetischer Themen')
+    parser.add_argument('--threshold', type=float, default=0.5, help='cluster_distance_threshold')
+    parser.add_argument('--legacy-max', type=int, default=1000,
+                        help='Python-Schleife nur bis zu dieser Länge messen')
+    parser.add_argument('--dense', action='store_true', help='Dichte statt dünnbesetzte Vektoren')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    backends = {
+        'complete': create_clustering_backend('complete', distance_threshold=args.threshold, method='cosine'),
+        'dbscan': create_clustering_backend('dbscan', distance_threshold=args.threshold, method='cosine',
+                                            min_samples=3),
+        'kmeans': create_clustering_backend('kmeans', distance_threshold=args.threshold, method='cosine'),
+    }
+
+    columns = ['legacy'] + list(backends)
+    print(f"{'n':>7} " + " ".join(f"{name + ' (s)':>14}" for name in columns) + f" {'identisch':>10}")
+
+    for size in args.sizes:
+        vectors = build_sequence(size, args.vocabulary, args.topics, not args.dense, args.seed)
+        timings = {}
+        results = {}
+
+        for name, backend in backends.items():
+            start = time.perf_counter()
+            results[name] = backend.cluster(vectors)
+            timings[name] = time.perf_counter() - start
+
+        identical = '-'
+        if size <= args.legacy_max:
+            start = time.perf_counter()
+            legacy = legacy_cluster(vectors, args.threshold)
+            timings['legacy'] = time.perf_counter() - start
+            identical = str(legacy == results['complete'])
+
+        cells = [f"{timings[name]:>14.3f}" if name in timings else f"{'-':>14}" for name in columns]
+        print(f"{size:>7} " + " ".join(cells) + f" {identical:>10}")
+
+
+if __name__ == '__main__':
+    main()
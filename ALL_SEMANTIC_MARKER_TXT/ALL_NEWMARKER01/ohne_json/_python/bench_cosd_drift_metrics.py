@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Drift-Metriken (Home Base, Density, Variability, Rise Rate)
+
+Vergleicht die bisherige Berechnung (vier Durchläufe über die Vektorliste,
+ein Hilfsvektor pro Distanz zum Zentrum) mit calculate_all_drift_metrics
+auf einer gemeinsamen Matrix, jeweils für eine Vektorliste und für eine
+bereits gestapelte (N x D)-Matrix mit Zeitstempel-Array.
+
+Aufruf als Modul aus dem Paket heraus, z.B.:
+    python -m <paket>.bench_cosd_drift_metrics --sizes 1000 10000
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from .cost_vector_math import CoSDVector, SparseCoSDVector, VectorOperations
+from .drift_metrics import calculate_all_drift_metrics
+
+
+def legacy_drift_metrics(vectors: List[CoSDVector]) -> Dict[str, float]:
+    """Bisheriges Verfahren (Kernwerte der vier Metriken)."""
+    all_dimensions = np.array([vec.dimensions for vec in vectors])
+    center_vector = np.mean(all_dimensions, axis=0)
+    distances_to_center = [
+        VectorOperations.euclidean_distance(vec, CoSDVector(dimensions=center_vector, timestamp=vec.timestamp))
+        for vec in vectors
+    ]
+    stability_score = max(0.0, 1.0 - np.mean(distances_to_center) / np.sqrt(len(center_vector)))
+
+    density_timeline = []
+    for i in range(0, len(vectors), max(1, len(vectors) // 10)):
+        window_vectors = vectors[i:min(i + 5, len(vectors))]
+        window_markers = sum(len(vec.marker_weights) for vec in window_vectors)
+        time_span = (window_vectors[-1].timestamp - window_vectors[0].timestamp).total_seconds() / 60
+        density_timeline.append(window_markers / time_span if time_span > 0 else window_markers)
+
+    all_dimensions = np.array([vec.dimensions for vec in vectors])
+    standard_deviation = float(np.mean(np.std(all_dimensions, axis=0)))
+    max_possible_variance = np.var(np.random.uniform(-1, 1, all_dimensions.shape))
+    variance_score = float(np.mean(np.var(all_dimensions, axis=0)) / max_possible_variance)
+
+    rise_rates = []
+    for i in range(1, len(vectors)):
+        magnitude_change = vectors[i].magnitude - vectors[i - 1].magnitude
+        time_delta = (vectors[i].timestamp - vectors[i - 1].timestamp).total_seconds()
+        rise_rates.append(magnitude_change / time_delta if time_delta > 0 else 0.0)
+
+    return {
+        'stability_score': float(stability_score),
+        'marker_density': float(np.mean(density_timeline)),
+        'standard_deviation': standard_deviation,
+        'variance_score': variance_score,
+        'average_rise_rate': float(np.mean(rise_rates))
+    }
+
+
+def summary(metrics: Dict[str, any]) -> Dict[str, float]:
+    """Kernwerte aus dem Ergebnis von calculate_all_drift_metrics."""
+    return {
+        'stability_score': metrics['home_base']['stability_score'],
+        'marker_density': metrics['density']['marker_density'],
+        'standard_deviation': metrics['variability']['standard_deviation'],
+        'variance_score': metrics['variability']['variance_score'],
+        'average_rise_rate': metrics['rise_rate']['average_rise_rate']
+    }
+
+
+def build_sequence(count: int, dimensions: int, sparse: bool, seed: int) -> List[CoSDVector]:
+    """Erzeugt normalisierte Vektoren mit wenigen belegten Dimensionen."""
+    rng = np.random.default_rng(seed)
+    timestamp = datetime(2024, 1, 1)
+    vectors = []
+    for _ in range(count):
+        timestamp += timedelta(seconds=int(rng.choice((0, 5, 30, 60, 300))))
+        indices = np.unique(rng.integers(dimensions, size=int(rng.integers(1, 12))))
+        values = rng.uniform(0.1, 1.0, len(indices))
+        values /= np.linalg.norm(values)
+        marker_weights = {f"marker_{k}": 1.0 for k in range(int(rng.integers(0, 4)))}
+        vector = SparseCoSDVector(indices, values, dimensions, timestamp, marker_weights)
+        vectors.append(vector if sparse else CoSDVector(vector.dimensions.copy(), timestamp, marker_weights))
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für die CoSD-Drift-Metriken')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Sequenzlängen')
+    parser.add_argument('--dimensions', type=int, default=2000, help='Anzahl Token-Dimensionen')
+    parser.add_argument('--sparse', action='store_true', help='Dünnbesetzte statt dichter Vektoren')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{'n':>7} {'legacy (s)':>12} {'liste (s)':>12} {'matrix (s)':>12} {'speedup':>9} {'max. abw.':>10}")
+
+    for size in args.sizes:
+        vectors = build_sequence(size, args.dimensions, args.sparse, args.seed)
+
+        start = time.perf_counter()
+        legacy = legacy_drift_metrics(vectors)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        current = summary(calculate_all_drift_metrics(vectors))
+        list_time = time.perf_counter() - start
+
+        matrix = np.vstack([vec.dimensions for vec in vectors])
+        timestamps = np.array([vec.timestamp for vec in vectors], dtype='datetime64[us]')
+        marker_counts = [len(vec.marker_weights) for vec in vectors]
+        start = time.perf_counter()
+        calculate_all_drift_metrics(matrix, timestamps, marker_counts)
+        matrix_time = time.perf_counter() - start
+
+        # variance_score hängt im alten Verfahren von Zufallszahlen ab
+        deviation = max(
+            abs(legacy[key] - current[key]) / max(abs(legacy[key]), 1.0)
+            for key in legacy if key != 'variance_score'
+        )
+        print(f"{size:>7} {legacy_time:>12.3f} {list_time:>12.3f} {matrix_time:>12.3f} "
+              f"{legacy_time / list_time:>8.1f}x {deviation:>10.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Kompakte Vektor-Arena (float32/float16) gegenüber float64
+
+Legt die Testsequenzen der Drift-Metrik- und Clustering-Benchmarks einmal
+als einzelne float64-Vektoren und einmal in einer VectorArena ab und
+vergleicht Speicherbedarf sowie die numerische Abweichung der Ergebnisse
+(Drift-Metriken, Drift-Geschwindigkeit, Resonanz-Band, Cluster).
+Zusätzlich wird normalize() mit und ohne in_place gemessen.
+
+Aufruf als Modul aus dem Paket heraus, z.B.:
+    python -m <paket>.bench_cosd_vector_arena --size 3000
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from . import bench_cosd_clustering, bench_cosd_drift_metrics
+from .cost_vector_math import (
+    CoSDVector, calculate_drift_velocity, calculate_resonance_band,
+    mean_pairwise_cosine_similarity
+)
+from .drift_metrics import calculate_all_drift_metrics
+from .vector_arena import VectorArena
+from .vector_clustering import create_clustering_backend
+
+
+def results(vectors: List[CoSDVector]) -> Dict[str, np.ndarray]:
+    """Kennzahlen, deren Abweichung verglichen wird."""
+    metrics = bench_cosd_drift_metrics.summary(calculate_all_drift_metrics(vectors))
+    velocity = calculate_drift_velocity(vectors, 3)
+    band = calculate_resonance_band(vectors, 4, 0.7)
+    return {
+        'drift_metrics': np.array(list(metrics.values())),
+        'velocities': np.array(velocity['instantaneous_velocities']),
+        'coupling': band['coupling_strength'],
+        'strong_pairs': band['is_strongly_coupled'],
+        'mean_cosine': np.array([mean_pairwise_cosine_similarity(vectors)])
+    }
+
+
+def deviation(reference: np.ndarray, compact: np.ndarray) -> float:
+    """Größte Abweichung relativ zu max(|Referenz|, 1)."""
+    if not len(reference):
+        return 0.0
+    return float(np.nanmax(np.abs(reference - compact) / np.maximum(np.abs(reference), 1.0)))
+
+
+def cluster_agreement(reference: List[List[int]], compact: List[List[int]]) -> float:
+    """Anteil der Vektoren, deren Cluster in beiden Ergebnissen dieselben Mitglieder hat."""
+    members = {}
+    for cluster in reference:
+        for idx in cluster:
+            members[idx] = frozenset(cluster)
+    same = sum(members.get(idx) == frozenset(cluster) for cluster in compact for idx in cluster)
+    return same / max(len(members), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für die kompakte CoSD-Vektor-Arena')
+    parser.add_argument('--size', type=int, default=3000, help='Sequenzlänge')
+    parser.add_argument('--dimensions', type=int, default=2000, help='Anzahl Token-Dimensionen')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sequences = {
+        'drift_metrics': bench_cosd_drift_metrics.build_sequence(args.size, args.dimensions, False, args.seed),
+        'clustering': bench_cosd_clustering.build_sequence(args.size, args.dimensions, 20, False, args.seed)
+    }
+    # Standard-Backend des Analyzers (k-means++ reagiert schon auf Rundung mit anderen Startzentren)
+    clustering = create_clustering_backend('complete', distance_threshold=0.5, method='cosine')
+
+    print(f"{'sequenz':<14} {'dtype':<8} {'MiB':>8} {'ersparnis':>10} {'metriken':>9} "
+          f"{'geschw.':>9} {'kopplung':>9} {'paare':>7} {'cluster':>8}")
+    for name, vectors in sequences.items():
+        float64_bytes = sum(vec.dimensions.nbytes for vec in vectors)
+        reference = results(vectors)
+        reference_labels = clustering.cluster(vectors)
+        print(f"{name:<14} {'float64':<8} {float64_bytes / 2 ** 20:>8.1f}")
+
+        for dtype in ('float32', 'float16'):
+            arena = VectorArena(args.dimensions, dtype, capacity=len(vectors))
+            compact = arena.extend(vectors)
+            report = arena.memory_report()
+            current = results(compact)
+            agreement = cluster_agreement(reference_labels, clustering.cluster(compact))
+            flipped = int(np.count_nonzero(reference['strong_pairs'] != current['strong_pairs']))
+            print(f"{'':<14} {dtype:<8} {report['used_bytes'] / 2 ** 20:>8.1f} {report['reduction']:>9.0%} "
+                  f"{deviation(reference['drift_metrics'], current['drift_metrics']):>9.1e} "
+                  f"{deviation(reference['velocities'], current['velocities']):>9.1e} "
+                  f"{deviation(reference['coupling'], current['coupling']):>9.1e} "
+                  f"{flipped:>7} {agreement:>8.1%}")
+
+    vectors = sequences['drift_metrics']
+    timings = {}
+    start = time.perf_counter()
+    for vec in vectors:
+        vec.normalize()
+    timings['float64 Kopie'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for vec in vectors:
+        vec.normalize(in_place=True)
+    timings['float64 in place'] = time.perf_counter() - start
+    arena = VectorArena(args.dimensions, 'float32', capacity=len(vectors))
+    compact = arena.extend(vectors)
+    start = time.perf_counter()
+    for vec in compact:
+        vec.normalize(in_place=True)
+    timings['float32 in place'] = time.perf_counter() - start
+    start = time.perf_counter()
+    arena.normalize_rows()
+    timings['float32 normalize_rows'] = time.perf_counter() - start
+    print("\nnormalize(): " + ", ".join(f"{label} {seconds * 1e3:.1f} ms" for label, seconds in timings.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Nächste-Nachbarn-Index für CoSD-Vektoren
+
+Baut einen CoSDVectorIndex über synthetische Gespräche (Themen-Mischungen
+über einem Token-Vokabular) und vergleicht für zurückgehaltene Anfragen
+Recall@k und Latenz mit der exakten Suche über alle Einträge. Zusätzlich
+werden Speichern und das Laden per mmap gemessen.
+
+Aufruf als Modul aus dem Paket heraus, z.B.:
+    python -m <paket>.bench_cosd_vector_index --sizes 10000 100000
+"""
+
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from .bench_cosd_clustering import build_sequence
+from .vector_index import CoSDVectorIndex
+
+
+def recall(approximate: List[Dict], exact: List[Dict]) -> float:
+    """Anteil der Treffer, die mindestens so ähnlich sind wie der k-te exakte (robust bei Gleichstand)."""
+    if not exact:
+        return 1.0
+    threshold = exact[-1]['similarity'] - 1e-9
+    return sum(hit['similarity'] >= threshold for hit in approximate) / len(exact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für den CoSD-Vektor-Index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Anzahl indizierter Vektoren')
+    parser.add_argument('--queries', type=int, default=200, help='Anzahl Anfragen')
+    parser.add_argument('--k', type=int, default=10, help='Treffer pro Anfrage')
+    parser.add_argument('--vocabulary', type=int, default=2000, help='Anzahl Token-Dimensionen')
+    parser.add_argument('--topics', type=int, default=50, help='Anzahl synthetischer Themen')
+    parser.add_argument('--conversation-length', type=int, default=1000, help='Vektoren pro Gespräch')
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 16, 64], help='Durchsuchte Listen')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{'n':>8} {'nprobe':>7} {'exakt (ms)':>11} {'ann (ms)':>9} {'speedup':>8} "
+          f"{'recall@' + str(args.k):>10}")
+
+    for size in args.sizes:
+        vectors = build_sequence(size + args.queries, args.vocabulary, args.topics, True, args.seed)
+        queries = vectors[size:]
+        index = CoSDVectorIndex(args.vocabulary)
+
+        start = time.perf_counter()
+        for offset in range(0, size, args.conversation_length):
+            chunk = vectors[offset:min(offset + args.conversation_length, size)]
+            index.add_many(chunk, f"conversation-{offset // args.conversation_length}")
+        insert_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exact = [index.search(query, args.k, exact=True) for query in queries]
+        exact_time = (time.perf_counter() - start) / len(queries) * 1000
+
+        for nprobe in args.nprobe:
+            index.nprobe = nprobe
+            start = time.perf_counter()
+            approximate = [index.search(query, args.k) for query in queries]
+            ann_time = (time.perf_counter() - start) / len(queries) * 1000
+            mean_recall = np.mean([recall(a, e) for a, e in zip(approximate, exact)])
+            print(f"{size:>8} {nprobe:>7} {exact_time:>11.3f} {ann_time:>9.3f} "
+                  f"{exact_time / ann_time:>7.1f}x {mean_recall:>10.3f}")
+
+        directory = tempfile.mkdtemp(prefix='cosd_index_')
+        try:
+            start = time.perf_counter()
+            index.save(directory)
+            save_time = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = CoSDVectorIndex.load(directory)
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded.search(queries[0], args.k)
+            first_query = (time.perf_counter() - start) * 1000
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{'':>8} Einfügen {insert_time / size * 1e6:.1f} µs/Vektor, Speichern {save_time:.2f} s, "
+              f"Laden (mmap) {load_time * 1000:.1f} ms, erste Anfrage {first_query:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ Distanzmetriken und Resonanz-Algorithmen.
 """
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional, Union
+from typing import Any, List, Literal, Protocol, Tuple, Dict, Optional, Union, cast, overload
 from dataclasses import dataclass, field
 from datetime import datetime
 import logging
@@ -16,6 +16,21 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class DimensionVector(Protocol):
+    """
+    Gemeinsame Schnittstelle für Skalarprodukte.
+    
+    Erfüllt von CoSDVector, SparseCoSDVector und den Zeilensichten einer
+    VectorArena (ArenaCoSDVector), die nicht von CoSDVector erben.
+    """
+    
+    @property
+    def dimensions(self) -> np.ndarray: ...
+    
+    @property
+    def magnitude(self) -> float: ...
+
+
 @dataclass
 class CoSDVector:
     """
@@ -42,12 +57,22 @@ class CoSDVector:
         """Berechnet die Magnitude (Länge) des Vektors."""
         return np.linalg.norm(self.dimensions)
     
-    def normalize(self) -> 'CoSDVector':
-        """Gibt einen normalisierten Vektor zurück (Länge = 1)."""
+    def normalize(self, in_place: bool = False) -> 'CoSDVector':
+        """
+        Gibt einen normalisierten Vektor zurück (Länge = 1).
+        
+        Args:
+            in_place: Skaliert die Dimensionen dieses Vektors, sofern sein
+                Array beschreibbar und gleitkommawertig ist (sonst Kopie)
+        """
         mag = self.magnitude
         if mag == 0:
             return self
-        normalized_dims = self.dimensions / mag
+        dimensions = self.dimensions
+        if in_place and _can_scale_in_place(dimensions):
+            dimensions /= mag
+            return self
+        normalized_dims = dimensions / mag
         return CoSDVector(
             dimensions=normalized_dims,
             timestamp=self.timestamp,
@@ -55,11 +80,143 @@ class CoSDVector:
             metadata=self.metadata.copy()
         )
     
-    def dot_product(self, other: 'CoSDVector') -> float:
+    def dot_product(self, other: DimensionVector) -> float:
         """Berechnet das Skalarprodukt mit einem anderen Vektor."""
+        if isinstance(other, SparseCoSDVector):
+            return other.dot_product(self)
         return np.dot(self.dimensions, other.dimensions)
 
 
+class SparseCoSDVector(CoSDVector):
+    """
+    CoSD-Vektor in Index/Wert-Darstellung.
+    
+    Speichert nur die belegten Dimensionen (aufsteigend sortierte, eindeutige
+    Indizes). Das dichte Array unter `dimensions` wird erst beim Zugriff
+    erzeugt, zwischengespeichert und ist schreibgeschützt; eine Zuweisung an
+    `dimensions` wird wieder in die Index/Wert-Darstellung übernommen.
+    
+    Attributes:
+        indices: Indizes der belegten Dimensionen
+        values: Werte der belegten Dimensionen
+        size: Anzahl aller Dimensionen
+    """
+    
+    def __init__(
+        self,
+        indices: np.ndarray,
+        values: np.ndarray,
+        size: int,
+        timestamp: datetime,
+        marker_weights: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.size = int(size)
+        self.timestamp = timestamp
+        self.marker_weights = marker_weights if marker_weights is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+        self._dense: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_dense(
+        cls,
+        dimensions: np.ndarray,
+        timestamp: datetime,
+        marker_weights: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> 'SparseCoSDVector':
+        """Erzeugt einen dünnbesetzten Vektor aus einem dichten Array."""
+        dimensions = np.asarray(dimensions, dtype=np.float64)
+        indices = np.flatnonzero(dimensions)
+        return cls(indices, dimensions[indices], len(dimensions), timestamp, marker_weights, metadata)
+    
+    @property
+    def dimensions(self) -> np.ndarray:
+        """Dichtes Array des Vektors (wird bei Bedarf erzeugt)."""
+        if self._dense is None:
+            dense = np.zeros(self.size)
+            dense[self.indices] = self.values
+            dense.setflags(write=False)
+            self._dense = dense
+        return self._dense
+    
+    @dimensions.setter
+    def dimensions(self, dimensions: np.ndarray):
+        dimensions = np.asarray(dimensions, dtype=np.float64)
+        self.indices = np.flatnonzero(dimensions)
+        self.values = dimensions[self.indices]
+        self.size = len(dimensions)
+        self._dense = None
+    
+    @property
+    def nnz(self) -> int:
+        """Anzahl der belegten Dimensionen."""
+        return len(self.indices)
+    
+    @property
+    def magnitude(self) -> float:
+        """Berechnet die Magnitude (Länge) des Vektors."""
+        # np.float64 (eine float-Unterklasse) wie bei CoSDVector: 0/0 ergibt nan statt Ausnahme
+        return np.float64(np.linalg.norm(self.values))
+    
+    def normalize(self, in_place: bool = False) -> 'SparseCoSDVector':
+        """
+        Gibt einen normalisierten Vektor zurück (Länge = 1).
+        
+        Args:
+            in_place: Skaliert die Werte dieses Vektors, sofern sein Array
+                beschreibbar ist (gecachte Vektoren sind es nicht)
+        """
+        mag = self.magnitude
+        if mag == 0:
+            return self
+        if in_place and _can_scale_in_place(self.values):
+            self.values /= mag
+            self._dense = None
+            return self
+        return SparseCoSDVector(
+            indices=self.indices,
+            values=self.values / mag,
+            size=self.size,
+            timestamp=self.timestamp,
+            marker_weights=self.marker_weights.copy(),
+            metadata=self.metadata.copy()
+        )
+    
+    def dot_product(self, other: DimensionVector) -> float:
+        """Berechnet das Skalarprodukt mit einem anderen Vektor."""
+        if isinstance(other, SparseCoSDVector):
+            own_pos, other_pos = _sorted_intersection(self.indices, other.indices)
+            return np.dot(self.values[own_pos], other.values[other_pos])
+        return np.dot(self.values, other.dimensions[self.indices])
+
+
+def _can_scale_in_place(array: np.ndarray) -> bool:
+    """True, wenn das Array ohne Kopie skaliert werden darf."""
+    return array.flags.writeable and np.issubdtype(array.dtype, np.floating)
+
+
+def _sorted_intersection(
+    indices1: np.ndarray,
+    indices2: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Findet gemeinsame Einträge zweier sortierter, eindeutiger Index-Arrays.
+    
+    Returns:
+        Tuple (Positionen in indices1, Positionen in indices2)
+    """
+    if len(indices1) == 0 or len(indices2) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    
+    positions = np.minimum(np.searchsorted(indices2, indices1), len(indices2) - 1)
+    found = indices2[positions] == indices1
+    return np.flatnonzero(found), positions[found]
+
+
 class VectorOperations:
     """Sammlung von Vektor-Operationen für CoSD-Berechnungen."""
     
@@ -92,7 +249,7 @@ class VectorOperations:
         Returns:
             float: Euklidische Distanz (>= 0)
         """
-        return np.linalg.norm(vec1.dimensions - vec2.dimensions)
+        return float(np.linalg.norm(VectorOperations._difference(vec1, vec2)))
     
     @staticmethod
     def manhattan_distance(vec1: CoSDVector, vec2: CoSDVector) -> float:
@@ -106,7 +263,33 @@ class VectorOperations:
         Returns:
             float: Manhattan-Distanz (>= 0)
         """
-        return np.sum(np.abs(vec1.dimensions - vec2.dimensions))
+        return float(np.sum(np.abs(VectorOperations._difference(vec1, vec2))))
+    
+    @staticmethod
+    def _difference(vec1: CoSDVector, vec2: CoSDVector) -> np.ndarray:
+        """
+        Berechnet vec1 - vec2 für die Distanzmetriken.
+        
+        Sind beide Vektoren dünnbesetzt, enthält das Ergebnis nur die
+        Differenzen auf der Vereinigung der belegten Indizes (fehlende
+        Einträge sind 0 und tragen zu keiner Norm bei).
+        """
+        if isinstance(vec1, SparseCoSDVector) and isinstance(vec2, SparseCoSDVector):
+            own_pos, other_pos = _sorted_intersection(vec1.indices, vec2.indices)
+            difference = vec1.values.copy()
+            difference[own_pos] -= vec2.values[other_pos]
+            only_vec2 = np.ones(len(vec2.indices), dtype=np.bool_)
+            only_vec2[other_pos] = False
+            return np.concatenate((difference, -vec2.values[only_vec2]))
+        if isinstance(vec1, SparseCoSDVector):
+            difference = -vec2.dimensions
+            difference[vec1.indices] += vec1.values
+            return difference
+        if isinstance(vec2, SparseCoSDVector):
+            difference = vec1.dimensions.copy()
+            difference[vec2.indices] -= vec2.values
+            return difference
+        return vec1.dimensions - vec2.dimensions
 
 
 def calculate_drift_velocity(
@@ -206,6 +389,364 @@ def calculate_resonance_coupling(
     }
 
 
+@overload
+def stack_vectors(vectors: List[CoSDVector], return_columns: Literal[False] = False) -> np.ndarray: ...
+
+
+@overload
+def stack_vectors(
+    vectors: List[CoSDVector], return_columns: Literal[True]
+) -> Tuple[np.ndarray, Optional[np.ndarray]]: ...
+
+
+def stack_vectors(
+    vectors: List[CoSDVector],
+    return_columns: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Stapelt Vektoren zeilenweise zu einer (N x D)-Matrix.
+    
+    Sind alle Vektoren dünnbesetzt, enthält die Matrix nur die tatsächlich
+    belegten Spalten. Skalarprodukte, Normen und Distanzen zwischen den Zeilen
+    bleiben dabei unverändert, die Spalten entsprechen aber nicht mehr den
+    Token-Indizes. Aufeinanderfolgende Zeilen einer VectorArena werden ohne
+    Kopie als schreibgeschützte Sicht im Speichertyp der Arena geliefert.
+    
+    Args:
+        vectors: Liste von CoSDVector-Objekten
+        return_columns: Gibt zusätzlich die Token-Indizes der Spalten zurück
+            (None, wenn die Matrix alle Dimensionen enthält)
+        
+    Returns:
+        Matrix mit einer Zeile pro Vektor (bzw. Tupel aus Matrix und Spalten)
+    """
+    columns = None
+    if not vectors:
+        matrix = np.zeros((0, 0))
+    elif all(isinstance(vec, SparseCoSDVector) for vec in vectors):
+        sparse = cast(List[SparseCoSDVector], vectors)
+        columns, inverse = np.unique(
+            np.concatenate([vec.indices for vec in sparse]),
+            return_inverse=True
+        )
+        rows = np.repeat(np.arange(len(sparse)), [vec.nnz for vec in sparse])
+        matrix = np.zeros((len(sparse), len(columns)))
+        matrix[rows, inverse] = np.concatenate([vec.values for vec in sparse])
+    else:
+        arena_rows = _arena_rows(vectors)
+        if arena_rows is not None:
+            matrix = arena_rows
+        else:
+            matrix = np.vstack([vec.dimensions for vec in vectors])
+    
+    if return_columns:
+        return matrix, columns
+    return matrix
+
+
+def _arena_rows(vectors: List[CoSDVector]) -> Optional[np.ndarray]:
+    """Sicht auf aufeinanderfolgende Zeilen derselben VectorArena (sonst None)."""
+    arena: Any = getattr(vectors[0], 'arena', None)
+    if arena is None:
+        return None
+    start = getattr(vectors[0], 'row')
+    for offset, vec in enumerate(vectors):
+        if getattr(vec, 'arena', None) is not arena or getattr(vec, 'row') != start + offset:
+            return None
+    rows = arena.matrix()[start:start + len(vectors)]
+    rows.flags.writeable = False
+    return rows
+
+
+def mean_pairwise_cosine_similarity(vectors: List[CoSDVector]) -> float:
+    """
+    Mittlere Kosinus-Ähnlichkeit über alle Paare (i < j).
+    
+    Nutzt sum_{i<j} <a_i, a_j> = (|sum a_i|^2 - sum |a_i|^2) / 2 für die
+    normalisierten Vektoren a_i und kommt so ohne (N x N)-Matrix aus.
+    Vektoren ohne Magnitude haben wie in cosine_similarity die Ähnlichkeit 0.
+    
+    Args:
+        vectors: Liste von CoSDVector-Objekten
+        
+    Returns:
+        float: Mittlere Ähnlichkeit (0.0 bei weniger als zwei Vektoren)
+    """
+    count = len(vectors)
+    if count < 2:
+        return 0.0
+    
+    matrix = stack_vectors(vectors)
+    norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64))
+    normalized = np.divide(matrix, norms[:, None], out=np.zeros(matrix.shape), where=norms[:, None] != 0)
+    total = normalized.sum(axis=0)
+    pair_sum = (np.dot(total, total) - np.count_nonzero(norms)) / 2.0
+    return float(pair_sum / (count * (count - 1) / 2.0))
+
+
+def _sparse_band_dot_products(
+    vectors: List[SparseCoSDVector],
+    width: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Skalarprodukte aller Paare (i, i + k), k = 1..width, für dünnbesetzte Vektoren.
+    
+    Alle Einträge werden nach (Spalte, Zeile) sortiert. Einträge derselben
+    Spalte mit Zeilenabstand <= width liegen dann höchstens wenige Positionen
+    auseinander; pro Positionsabstand wird ein vektorisierter Schritt gemacht,
+    bis kein Paar mehr im Band liegt.
+    
+    Returns:
+        Tuple (Bandmatrix der Skalarprodukte (N x width), Magnituden)
+    """
+    count = len(vectors)
+    magnitudes = np.array([np.linalg.norm(vec.values) for vec in vectors])
+    dots = np.zeros(count * width)
+    
+    rows = np.repeat(np.arange(count), [vec.nnz for vec in vectors])
+    columns = np.concatenate([vec.indices for vec in vectors])
+    values = np.concatenate([vec.values for vec in vectors])
+    order = np.lexsort((rows, columns))
+    rows, columns, values = rows[order], columns[order], values[order]
+    
+    for shift in range(1, len(rows)):
+        gap = rows[shift:] - rows[:-shift]
+        in_band = (columns[shift:] == columns[:-shift]) & (gap <= width)
+        if not in_band.any():
+            break
+        dots += np.bincount(
+            rows[:-shift][in_band] * width + gap[in_band] - 1,
+            weights=values[:-shift][in_band] * values[shift:][in_band],
+            minlength=len(dots)
+        )
+    
+    return dots.reshape(count, width), magnitudes
+
+
+def calculate_resonance_band(
+    vectors: List[CoSDVector],
+    lookahead: int = 4,
+    coupling_threshold: float = 0.7
+) -> Dict[str, np.ndarray]:
+    """
+    Berechnet die Resonanz-Kopplung für alle Paare (i, j) mit 0 < j - i <= lookahead.
+    
+    Liefert dieselben Kennzahlen wie calculate_resonance_coupling, aber für
+    die ganze Sequenz auf einmal: Die Vektoren werden zu einer Matrix gestapelt,
+    Skalarprodukte werden pro Abstand als Diagonale berechnet und in einer
+    (N x lookahead)-Bandmatrix abgelegt.
+    
+    Args:
+        vectors: Chronologisch geordnete Liste von Vektoren
+        lookahead: Maximaler Abstand j - i der verglichenen Paare
+        coupling_threshold: Schwellenwert für starke Kopplung
+        
+    Returns:
+        Dict mit gleich langen Arrays (Paare sortiert nach i, dann j):
+        - i, j: Indizes der Paare
+        - similarity: Kosinus-Ähnlichkeit
+        - magnitude_ratio: Verhältnis der kleineren zur größeren Magnitude
+        - phase_alignment, resonance_factor, coupling_strength: wie calculate_resonance_coupling
+        - is_strongly_coupled: Boolean-Maske für starke Kopplung
+    """
+    count = len(vectors)
+    width = max(0, min(lookahead, count - 1))
+    
+    # Bandmatrizen: Zeile i, Spalte k-1 enthält das Paar (i, i + k)
+    if count and all(isinstance(vec, SparseCoSDVector) for vec in vectors):
+        dots, magnitudes = _sparse_band_dot_products(cast(List[SparseCoSDVector], vectors), width)
+    else:
+        matrix = stack_vectors(vectors)
+        magnitudes = np.sqrt(np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64))
+        dots = np.zeros((count, width))
+        for offset in range(1, width + 1):
+            dots[:count - offset, offset - 1] = np.einsum(
+                'ij,ij->i', matrix[:count - offset], matrix[offset:], dtype=np.float64
+            )
+    
+    partner = np.arange(count)[:, None] + np.arange(1, width + 1)[None, :]
+    valid = partner < count
+    rows, columns = np.nonzero(valid)
+    
+    metrics = _coupling_metrics(
+        dots[valid],
+        magnitudes[rows],
+        magnitudes[partner[rows, columns]],
+        coupling_threshold
+    )
+    metrics['i'] = rows
+    metrics['j'] = partner[rows, columns]
+    return metrics
+
+
+def calculate_resonance_to_history(
+    vector: CoSDVector,
+    history: List[CoSDVector],
+    coupling_threshold: float = 0.7
+) -> Dict[str, np.ndarray]:
+    """
+    Berechnet die Resonanz-Kopplung eines neuen Vektors zu den vorherigen.
+    
+    Gegenstück zu calculate_resonance_band für den Streaming-Fall: Aufwand
+    O(len(history)) statt einer Neuberechnung des ganzen Bandes.
+    
+    Args:
+        vector: Neu hinzugekommener Vektor
+        history: Vorherige Vektoren (chronologisch)
+        coupling_threshold: Schwellenwert für starke Kopplung
+        
+    Returns:
+        Dict mit Arrays wie calculate_resonance_band, wobei 'i' die Position
+        in history angibt
+    """
+    dots = np.array([previous.dot_product(vector) for previous in history], dtype=np.float64)
+    magnitudes = np.array([previous.magnitude for previous in history], dtype=np.float64)
+    
+    metrics = _coupling_metrics(
+        dots,
+        magnitudes,
+        np.full(len(history), vector.magnitude, dtype=np.float64),
+        coupling_threshold
+    )
+    metrics['i'] = np.arange(len(history))
+    return metrics
+
+
+class ResonanceChains:
+    """
+    Resonanz-Ketten als Zusammenhangskomponenten des Kopplungsgraphen.
+    
+    Union-Find über den Vektor-Indizes: Kanten werden eingefügt, sobald eine
+    starke Kopplung entsteht (Batch oder Streaming). Pro Komponente werden
+    Mitglieder und Kantenzahl mitgeführt, sodass Länge und Dichte einer Kette
+    ohne erneuten Durchlauf über alle Muster verfügbar sind. Vereinigung nach
+    Größe mit Pfadkompression; Mitgliederlisten wandern von der kleineren in
+    die größere Komponente.
+    """
+    
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+        self.members: Dict[int, List[int]] = {}
+        self.edge_counts: Dict[int, int] = {}
+        self.max_component_size = 0
+    
+    def find(self, node: int) -> int:
+        """Gibt die Wurzel der Komponente eines Knotens zurück."""
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+    
+    def add_edge(self, i: int, j: int) -> int:
+        """
+        Fügt eine Kopplung zwischen zwei Vektoren ein.
+        
+        Args:
+            i: Index des ersten Vektors
+            j: Index des zweiten Vektors
+            
+        Returns:
+            Wurzel der (ggf. vereinigten) Komponente
+        """
+        for node in (i, j):
+            if node not in self.parent:
+                self.parent[node] = node
+                self.members[node] = [node]
+                self.edge_counts[node] = 0
+        
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            self.edge_counts[root_i] += 1
+            return root_i
+        
+        if len(self.members[root_i]) < len(self.members[root_j]):
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        self.members[root_i].extend(self.members.pop(root_j))
+        self.edge_counts[root_i] += self.edge_counts.pop(root_j) + 1
+        self.max_component_size = max(self.max_component_size, len(self.members[root_i]))
+        return root_i
+    
+    def chains(self, min_length: int = 3) -> List[Dict[str, any]]:
+        """
+        Gibt alle Komponenten mit mindestens min_length Vektoren zurück.
+        
+        Args:
+            min_length: Mindestanzahl verbundener Vektoren
+            
+        Returns:
+            Liste von 'resonance_chain'-Mustern, sortiert nach dem ersten Index
+        """
+        chains = []
+        for root, members in self.members.items():
+            length = len(members)
+            if length < min_length:
+                continue
+            chains.append({
+                'type': 'resonance_chain',
+                'indices': sorted(members),
+                'chain_length': length,
+                'density': self.edge_counts[root] / (length * (length - 1) / 2)
+            })
+        chains.sort(key=lambda chain: chain['indices'][0])
+        return chains
+    
+    def to_dict(self) -> Dict[str, any]:
+        """Exportiert die Komponenten als JSON-kompatibles Dict."""
+        return {
+            'components': [
+                {'indices': list(members), 'edges': self.edge_counts[root]}
+                for root, members in self.members.items()
+            ]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, any]) -> 'ResonanceChains':
+        """Stellt die Komponenten aus to_dict() wieder her."""
+        chains = cls()
+        for component in data['components']:
+            members = [int(index) for index in component['indices']]
+            root = members[0]
+            for member in members:
+                chains.parent[member] = root
+            chains.members[root] = members
+            chains.edge_counts[root] = int(component['edges'])
+            chains.max_component_size = max(chains.max_component_size, len(members))
+        return chains
+
+
+def _coupling_metrics(
+    dots: np.ndarray,
+    magnitudes_i: np.ndarray,
+    magnitudes_j: np.ndarray,
+    coupling_threshold: float
+) -> Dict[str, np.ndarray]:
+    """Kopplungsmetriken wie calculate_resonance_coupling für Arrays von Paaren."""
+    norm_products = magnitudes_i * magnitudes_j
+    similarity = np.divide(dots, norm_products, out=np.zeros_like(dots), where=norm_products != 0)
+    
+    angle = np.arccos(np.clip(similarity, -1.0, 1.0))
+    phase_alignment = 1.0 - (angle / np.pi)
+    
+    # 0/0 (beide Vektoren leer) ergibt wie bei calculate_resonance_coupling NaN
+    with np.errstate(invalid='ignore'):
+        magnitude_ratio = np.minimum(magnitudes_i, magnitudes_j) / np.maximum(magnitudes_i, magnitudes_j)
+        resonance_factor = phase_alignment * magnitude_ratio
+        coupling_strength = (similarity + phase_alignment + resonance_factor) / 3.0
+        is_strongly_coupled = coupling_strength >= coupling_threshold
+    
+    return {
+        'similarity': similarity,
+        'magnitude_ratio': magnitude_ratio,
+        'phase_alignment': phase_alignment,
+        'resonance_factor': resonance_factor,
+        'coupling_strength': coupling_strength,
+        'is_strongly_coupled': is_strongly_coupled
+    }
+
+
 def cluster_vectors(
     vectors: List[CoSDVector],
     distance_threshold: float = 0.5,
@@ -214,6 +755,10 @@ def cluster_vectors(
     """
     Clustert Vektoren basierend auf semantischer Ähnlichkeit.
     
+    Sequentielles Complete-Linkage: ein Kandidat wird aufgenommen, wenn seine
+    Distanz zu allen bisherigen Cluster-Mitgliedern höchstens distance_threshold
+    beträgt (siehe vector_clustering für weitere Verfahren).
+    
     Args:
         vectors: Liste von CoSDVector-Objekten
         distance_threshold: Maximale Distanz für Cluster-Zugehörigkeit
@@ -222,43 +767,10 @@ def cluster_vectors(
     Returns:
         Liste von Listen mit Vektor-Indizes pro Cluster
     """
-    if not vectors:
-        return []
-    
-    # Initialisiere Cluster
-    clusters = []
-    assigned = set()
-    
-    # Wähle Distanzfunktion
-    if method == 'euclidean':
-        dist_func = VectorOperations.euclidean_distance
-    else:  # cosine
-        dist_func = lambda v1, v2: 1.0 - VectorOperations.cosine_similarity(v1, v2)
-    
-    # Einfacher hierarchischer Clustering-Algorithmus
-    for i, vec in enumerate(vectors):
-        if i in assigned:
-            continue
-            
-        # Starte neuen Cluster
-        cluster = [i]
-        assigned.add(i)
-        
-        # Füge ähnliche Vektoren hinzu
-        for j in range(i + 1, len(vectors)):
-            if j in assigned:
-                continue
-                
-            # Prüfe Distanz zu allen Cluster-Mitgliedern
-            max_dist = max(dist_func(vec, vectors[idx]) for idx in cluster)
-            
-            if max_dist <= distance_threshold:
-                cluster.append(j)
-                assigned.add(j)
-        
-        clusters.append(cluster)
+    from .vector_clustering import CompleteLinkageClustering
     
-    return clusters
+    backend = CompleteLinkageClustering(distance_threshold, method)
+    return backend.cluster(vectors)
 
 
 def calculate_semantic_drift_path(
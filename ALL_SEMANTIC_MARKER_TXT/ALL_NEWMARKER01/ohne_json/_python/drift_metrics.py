@@ -6,19 +6,26 @@ Dieses Modul implementiert vier neue Drift-Metriken für die erweiterte
 CoSD-Analyse: Home Base, Density, Variability und Rise Rate.
 
 Alle Metriken sind eigenständig implementiert und verwenden eigene
-mathematische Formulierungen ohne externe Abhängigkeiten.
+mathematische Formulierungen ohne externe Abhängigkeiten. Sie arbeiten auf
+einer gemeinsamen (N x D)-Matrix mit Zeitstempel-Array; Zwischenergebnisse
+(zentrierte Quadrate, Magnituden, Zeitdifferenzen) werden nur einmal berechnet.
 """
 
 import numpy as np
-from typing import List, Dict, Optional, Union, Tuple
+from typing import List, Dict, Optional, Union, Tuple, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
 
-from .cost_vector_math import CoSDVector, VectorOperations
+from .cost_vector_math import CoSDVector, stack_vectors
 
 logger = logging.getLogger(__name__)
 
+# Varianz einer Gleichverteilung auf [-1, 1] (Normierung des Variance Scores)
+UNIFORM_VARIANCE = 1.0 / 3.0
+
+_MICROSECOND = timedelta(microseconds=1)
+
 
 @dataclass
 class HomeBaseMetrics:
@@ -95,6 +102,141 @@ class RiseRateMetrics:
     metadata: Dict[str, any]
 
 
+
+
+class _MetricInputs:
+    """
+    Gemeinsame Eingabe aller Drift-Metriken als Arrays.
+    
+    Attributes:
+        matrix: Matrix mit einer Zeile pro Vektor (ggf. nur belegte Spalten;
+            float32 bleibt erhalten, Summen werden in float64 gebildet)
+        columns: Token-Indizes der Matrix-Spalten (None = alle Dimensionen)
+        dimension_count: Anzahl Dimensionen im vollen Raum
+        micros: Zeitstempel in Mikrosekunden relativ zum ersten Vektor
+        marker_counts: Anzahl aktiver Marker pro Vektor
+    """
+    
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        micros: np.ndarray,
+        marker_counts: np.ndarray,
+        columns: Optional[np.ndarray] = None,
+        dimension_count: Optional[int] = None
+    ):
+        self.matrix = matrix
+        self.micros = micros
+        self.marker_counts = marker_counts
+        self.columns = columns
+        self.dimension_count = dimension_count if dimension_count is not None else matrix.shape[1]
+        self._center = None
+        self._squared_deviations = None
+        self._magnitudes = None
+    
+    @classmethod
+    def from_vectors(cls, vectors: List[CoSDVector]) -> '_MetricInputs':
+        """Stapelt eine Liste von CoSDVector-Objekten."""
+        matrix, columns = stack_vectors(vectors, return_columns=True)
+        if columns is not None:
+            dimension_count = vectors[0].size
+        else:
+            dimension_count = matrix.shape[1]
+        return cls(
+            matrix,
+            _timestamps_to_micros([vec.timestamp for vec in vectors]),
+            np.fromiter((len(vec.marker_weights) for vec in vectors), dtype=np.int64, count=len(vectors)),
+            columns,
+            dimension_count
+        )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        matrix: np.ndarray,
+        timestamps: Sequence,
+        marker_counts: Optional[Sequence[int]] = None
+    ) -> '_MetricInputs':
+        """Übernimmt eine (N x D)-Matrix mit Zeitstempeln."""
+        matrix = np.asarray(matrix)
+        if matrix.dtype != np.float32:
+            matrix = matrix.astype(np.float64, copy=False)
+        if matrix.ndim != 2:
+            raise ValueError("Vector matrix must be two-dimensional (N x D)")
+        if len(timestamps) != len(matrix):
+            raise ValueError("Timestamps must match the number of vectors")
+        if marker_counts is None:
+            marker_counts = np.zeros(len(matrix), dtype=np.int64)
+        return cls(matrix, _timestamps_to_micros(timestamps), np.asarray(marker_counts, dtype=np.int64))
+    
+    @property
+    def count(self) -> int:
+        return len(self.matrix)
+    
+    @property
+    def has_implicit_zeros(self) -> bool:
+        """True, wenn Dimensionen fehlen, die in allen Vektoren 0 sind."""
+        return self.matrix.shape[1] < self.dimension_count
+    
+    @property
+    def center(self) -> np.ndarray:
+        """Mittelwert je (gespeicherter) Spalte."""
+        if self._center is None:
+            self._center = np.mean(self.matrix, axis=0, dtype=np.float64)
+        return self._center
+    
+    @property
+    def squared_deviations(self) -> np.ndarray:
+        """Quadrierte Abweichungen vom Zentrum (gemeinsam für Home Base und Variability)."""
+        if self._squared_deviations is None:
+            deviations = self.matrix - self.center
+            np.square(deviations, out=deviations)
+            self._squared_deviations = deviations
+        return self._squared_deviations
+    
+    @property
+    def magnitudes(self) -> np.ndarray:
+        """Magnitude jedes Vektors."""
+        if self._magnitudes is None:
+            self._magnitudes = np.sqrt(np.einsum('ij,ij->i', self.matrix, self.matrix, dtype=np.float64))
+        return self._magnitudes
+    
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """Bringt spaltenweise Werte in den vollen Dimensionsraum."""
+        if self.columns is None:
+            return values
+        full = np.zeros(self.dimension_count)
+        full[self.columns] = values
+        return full
+
+
+def _timestamps_to_micros(timestamps: Sequence) -> np.ndarray:
+    """
+    Wandelt Zeitstempel in Mikrosekunden relativ zum ersten Zeitstempel um.
+    
+    Ganzzahlige Differenzen entsprechen exakt timedelta.total_seconds() * 1e6.
+    """
+    if isinstance(timestamps, np.ndarray) and np.issubdtype(timestamps.dtype, np.datetime64):
+        micros = timestamps.astype('datetime64[us]').astype(np.int64)
+        return micros - micros[0] if len(micros) else micros
+    if not len(timestamps):
+        return np.zeros(0, dtype=np.int64)
+    start = timestamps[0]
+    return np.fromiter(
+        ((timestamp - start) // _MICROSECOND for timestamp in timestamps),
+        dtype=np.int64,
+        count=len(timestamps)
+    )
+
+
+def _trend(values: np.ndarray) -> float:
+    """Steigung der Regressionsgeraden über den Positionen 0..n-1."""
+    if len(values) < 2:
+        return 0.0
+    slope, _ = np.polyfit(np.arange(len(values)), values, 1)
+    return float(slope)
+
+
 def calculate_home_base(vectors: List[CoSDVector]) -> HomeBaseMetrics:
     """
     Berechnet den emotionalen/semantischen Grundzustand (Home Base).
@@ -116,24 +258,20 @@ def calculate_home_base(vectors: List[CoSDVector]) -> HomeBaseMetrics:
     """
     if not vectors:
         raise ValueError("Vector list cannot be empty")
+    return _home_base(_MetricInputs.from_vectors(vectors))
+
+
+def _home_base(inputs: _MetricInputs) -> HomeBaseMetrics:
+    """Home Base aus den gemeinsamen Zwischenergebnissen."""
+    if not inputs.count:
+        raise ValueError("Vector list cannot be empty")
     
-    # Center Vector: Arithmetisches Mittel aller Vektoren
-    all_dimensions = np.array([vec.dimensions for vec in vectors])
-    center_vector = np.mean(all_dimensions, axis=0)
-    
-    # Berechne Distanzen zum Zentrum
-    distances_to_center = []
-    for vec in vectors:
-        center_vec = CoSDVector(
-            dimensions=center_vector,
-            timestamp=vec.timestamp
-        )
-        dist = VectorOperations.euclidean_distance(vec, center_vec)
-        distances_to_center.append(dist)
+    # Distanzen zum Zentrum: Zeilensummen der quadrierten Abweichungen
+    distances_to_center = np.sqrt(inputs.squared_deviations.sum(axis=1))
     
     # Stability Score: Inverse der durchschnittlichen Abweichung
     avg_deviation = np.mean(distances_to_center)
-    max_possible_deviation = np.sqrt(len(center_vector))  # Maximale Distanz in n-dimensionalem Raum
+    max_possible_deviation = np.sqrt(inputs.dimension_count)  # Maximale Distanz in n-dimensionalem Raum
     stability_score = max(0.0, 1.0 - (avg_deviation / max_possible_deviation))
     
     # Deviation Radius: Standardabweichung der Distanzen
@@ -141,19 +279,18 @@ def calculate_home_base(vectors: List[CoSDVector]) -> HomeBaseMetrics:
     
     # Consistency Factor: Anteil der Vektoren nahe dem Zentrum
     threshold = np.percentile(distances_to_center, 75)  # 75% der Vektoren
-    stable_vectors = sum(1 for dist in distances_to_center if dist <= threshold)
-    consistency_factor = stable_vectors / len(vectors)
+    consistency_factor = np.count_nonzero(distances_to_center <= threshold) / inputs.count
     
     return HomeBaseMetrics(
-        center_vector=center_vector,
+        center_vector=inputs.expand(inputs.center),
         stability_score=float(stability_score),
         deviation_radius=float(deviation_radius),
         consistency_factor=float(consistency_factor),
         metadata={
-            'vector_count': len(vectors),
-            'dimension_count': len(center_vector),
+            'vector_count': inputs.count,
+            'dimension_count': inputs.dimension_count,
             'avg_deviation': float(avg_deviation),
-            'max_deviation': float(max(distances_to_center))
+            'max_deviation': float(np.max(distances_to_center))
         }
     )
 
@@ -178,7 +315,13 @@ def calculate_density(vectors: List[CoSDVector], time_window: int = 5) -> Densit
     Returns:
         DensityMetrics mit allen Dichte-Metriken
     """
-    if len(vectors) < 2:
+    return _density(_MetricInputs.from_vectors(vectors), time_window)
+
+
+def _density(inputs: _MetricInputs, time_window: int = 5) -> DensityMetrics:
+    """Density über Präfixsummen der Marker-Anzahlen."""
+    count = inputs.count
+    if count < 2:
         return DensityMetrics(
             marker_density=0.0,
             temporal_clustering=0.0,
@@ -188,30 +331,23 @@ def calculate_density(vectors: List[CoSDVector], time_window: int = 5) -> Densit
             metadata={'error': 'Insufficient vectors for density calculation'}
         )
     
-    # Berechne Marker-Dichte pro Zeitfenster
-    density_timeline = []
-    total_markers = 0
-    
-    for i in range(0, len(vectors), max(1, len(vectors) // 10)):  # 10 Zeitfenster
-        window_end = min(i + time_window, len(vectors))
-        window_vectors = vectors[i:window_end]
-        
-        # Zähle Marker in diesem Zeitfenster
-        window_markers = 0
-        for vec in window_vectors:
-            window_markers += len(vec.marker_weights)
-            total_markers += len(vec.marker_weights)
-        
-        # Dichte = Marker pro Zeiteinheit
-        time_span = (window_vectors[-1].timestamp - window_vectors[0].timestamp).total_seconds() / 60
-        if time_span > 0:
-            density = window_markers / time_span
-        else:
-            density = window_markers
-        density_timeline.append(density)
+    # Marker-Dichte pro Zeitfenster (10 Stützstellen)
+    starts = np.arange(0, count, max(1, count // 10))
+    ends = np.minimum(starts + time_window, count)
+    marker_prefix = np.concatenate(([0], np.cumsum(inputs.marker_counts)))
+    window_markers = marker_prefix[ends] - marker_prefix[starts]
+    total_markers = int(window_markers.sum())
+    
+    # Dichte = Marker pro Minute (Fenster ohne Zeitspanne: Marker-Anzahl)
+    time_spans = (inputs.micros[ends - 1] - inputs.micros[starts]) / 1e6 / 60
+    density_timeline = np.divide(
+        window_markers, time_spans,
+        out=window_markers.astype(np.float64),
+        where=time_spans > 0
+    )
     
     # Marker Density: Durchschnittliche Dichte
-    marker_density = np.mean(density_timeline) if density_timeline else 0.0
+    marker_density = np.mean(density_timeline)
     
     # Temporal Clustering: Wie stark sind Marker zeitlich gruppiert
     if len(density_timeline) > 1:
@@ -221,23 +357,12 @@ def calculate_density(vectors: List[CoSDVector], time_window: int = 5) -> Densit
     else:
         temporal_clustering = 0.0
     
-    # Density Trend: Linearer Trend der Dichte-Entwicklung
-    if len(density_timeline) > 1:
-        x = np.arange(len(density_timeline))
-        slope, _ = np.polyfit(x, density_timeline, 1)
-        density_trend = float(slope)
-    else:
-        density_trend = 0.0
-    
-    # Peak Density: Maximale Dichte
-    peak_density = float(max(density_timeline)) if density_timeline else 0.0
-    
     return DensityMetrics(
         marker_density=float(marker_density),
         temporal_clustering=float(temporal_clustering),
-        density_trend=float(density_trend),
-        peak_density=float(peak_density),
-        density_timeline=density_timeline,
+        density_trend=_trend(density_timeline),
+        peak_density=float(np.max(density_timeline)),
+        density_timeline=density_timeline.tolist(),
         metadata={
             'time_window_minutes': time_window,
             'total_markers': total_markers,
@@ -255,7 +380,8 @@ def calculate_variability(vectors: List[CoSDVector]) -> VariabilityMetrics:
     
     Mathematische Definition:
     - Standard Deviation: Standardabweichung der Vektor-Dimensionen
-    - Variance Score: Normalisierte Varianz über alle Dimensionen
+    - Variance Score: Varianz über alle Dimensionen, normiert auf die
+      Varianz einer Gleichverteilung auf [-1, 1]
     - Fluctuation Range: Min/Max der Schwankungen
     - Stability Index: Inverser Stabilitäts-Score (0 = stabil, 1 = instabil)
     
@@ -267,37 +393,49 @@ def calculate_variability(vectors: List[CoSDVector]) -> VariabilityMetrics:
     """
     if not vectors:
         raise ValueError("Vector list cannot be empty")
+    return _variability(_MetricInputs.from_vectors(vectors))
+
+
+def _variability(inputs: _MetricInputs) -> VariabilityMetrics:
+    """Variability aus den gemeinsamen quadrierten Abweichungen."""
+    if not inputs.count:
+        raise ValueError("Vector list cannot be empty")
+    matrix = inputs.matrix
+    count = inputs.count
     
-    # Extrahiere alle Vektor-Dimensionen
-    all_dimensions = np.array([vec.dimensions for vec in vectors])
+    # Summen je Zeitfenster (5 Zeitfenster); die Gesamtvarianz ergibt sich
+    # aus den Fenstersummen der quadrierten Abweichungen
+    window_size = max(1, count // 5)
+    windows = [slice(start, min(start + window_size, count)) for start in range(0, count, window_size)]
+    window_squares = np.array([inputs.squared_deviations[window].sum(axis=0) for window in windows])
     
-    # Standard Deviation: Über alle Dimensionen
-    std_per_dimension = np.std(all_dimensions, axis=0)
-    standard_deviation = float(np.mean(std_per_dimension))
+    # Standard Deviation: Über alle Dimensionen (nicht gespeicherte Spalten haben Varianz 0)
+    variance_per_dimension = window_squares.sum(axis=0) / count
+    std_per_dimension = np.sqrt(variance_per_dimension)
+    standard_deviation = float(np.sum(std_per_dimension) / inputs.dimension_count)
     
     # Variance Score: Normalisierte Varianz
-    variance_per_dimension = np.var(all_dimensions, axis=0)
-    max_possible_variance = np.var(np.random.uniform(-1, 1, all_dimensions.shape))
-    variance_score = float(np.mean(variance_per_dimension) / max_possible_variance) if max_possible_variance > 0 else 0.0
+    mean_variance = np.sum(variance_per_dimension) / inputs.dimension_count
+    variance_score = float(mean_variance / UNIFORM_VARIANCE)
     
     # Fluctuation Range: Min/Max der Schwankungen
-    min_values = np.min(all_dimensions, axis=0)
-    max_values = np.max(all_dimensions, axis=0)
-    fluctuation_range = (float(np.min(min_values)), float(np.max(max_values)))
+    minimum, maximum = (float(np.min(matrix)), float(np.max(matrix))) if matrix.size else (0.0, 0.0)
+    if inputs.has_implicit_zeros:
+        minimum, maximum = min(minimum, 0.0), max(maximum, 0.0)
+    fluctuation_range = (minimum, maximum)
     
     # Stability Index: Invers zu Variabilität
     stability_index = max(0.0, 1.0 - variance_score)
     
-    # Variability Timeline: Entwicklung der Variabilität über Zeit
+    # Variability Timeline: Varianz je Fenster = mittlere quadrierte Abweichung
+    # vom Gesamtzentrum minus quadrierte Abweichung des Fenstermittels davon
     variability_timeline = []
-    window_size = max(1, len(vectors) // 5)  # 5 Zeitfenster
-    
-    for i in range(0, len(vectors), window_size):
-        window_vectors = vectors[i:i+window_size]
-        if len(window_vectors) > 1:
-            window_dimensions = np.array([vec.dimensions for vec in window_vectors])
-            window_variance = np.mean(np.var(window_dimensions, axis=0))
-            variability_timeline.append(float(window_variance))
+    for window, squares in zip(windows, window_squares):
+        length = window.stop - window.start
+        if length > 1:
+            shift = matrix[window].sum(axis=0, dtype=np.float64) / length - inputs.center
+            window_variance = np.maximum(squares / length - shift ** 2, 0.0)
+            variability_timeline.append(float(np.sum(window_variance) / inputs.dimension_count))
         else:
             variability_timeline.append(0.0)
     
@@ -308,9 +446,9 @@ def calculate_variability(vectors: List[CoSDVector]) -> VariabilityMetrics:
         stability_index=stability_index,
         variability_timeline=variability_timeline,
         metadata={
-            'vector_count': len(vectors),
-            'dimension_count': len(vectors[0].dimensions),
-            'std_per_dimension': std_per_dimension.tolist()
+            'vector_count': inputs.count,
+            'dimension_count': inputs.dimension_count,
+            'std_per_dimension': inputs.expand(std_per_dimension).tolist()
         }
     )
 
@@ -334,7 +472,12 @@ def calculate_rise_rate(vectors: List[CoSDVector]) -> RiseRateMetrics:
     Returns:
         RiseRateMetrics mit allen Anstiegsraten-Metriken
     """
-    if len(vectors) < 2:
+    return _rise_rate(_MetricInputs.from_vectors(vectors))
+
+
+def _rise_rate(inputs: _MetricInputs) -> RiseRateMetrics:
+    """Rise Rate aus Magnituden und Zeitdifferenzen."""
+    if inputs.count < 2:
         return RiseRateMetrics(
             average_rise_rate=0.0,
             peak_rise_rate=0.0,
@@ -344,39 +487,15 @@ def calculate_rise_rate(vectors: List[CoSDVector]) -> RiseRateMetrics:
             metadata={'error': 'Insufficient vectors for rise rate calculation'}
         )
     
-    # Berechne Anstiegsraten zwischen aufeinanderfolgenden Vektoren
-    rise_rates = []
-    rise_timeline = []
-    
-    for i in range(1, len(vectors)):
-        # Magnitude-Änderung
-        magnitude_change = vectors[i].magnitude - vectors[i-1].magnitude
-        
-        # Zeitdifferenz
-        time_delta = (vectors[i].timestamp - vectors[i-1].timestamp).total_seconds()
-        
-        if time_delta > 0:
-            # Rise Rate = Magnitude-Änderung pro Zeiteinheit
-            rise_rate = magnitude_change / time_delta
-            rise_rates.append(rise_rate)
-            rise_timeline.append(float(rise_rate))
-        else:
-            rise_rates.append(0.0)
-            rise_timeline.append(0.0)
-    
-    # Average Rise Rate
-    average_rise_rate = float(np.mean(rise_rates)) if rise_rates else 0.0
-    
-    # Peak Rise Rate
-    peak_rise_rate = float(max(rise_rates)) if rise_rates else 0.0
-    
-    # Rise Trend: Linearer Trend der Anstiegsraten
-    if len(rise_rates) > 1:
-        x = np.arange(len(rise_rates))
-        slope, _ = np.polyfit(x, rise_rates, 1)
-        rise_trend = float(slope)
-    else:
-        rise_trend = 0.0
+    # Rise Rate = Magnitude-Änderung pro Sekunde (0 ohne Zeitdifferenz)
+    magnitudes = inputs.magnitudes
+    magnitude_changes = np.diff(magnitudes)
+    time_deltas = np.diff(inputs.micros) / 1e6
+    rise_rates = np.divide(
+        magnitude_changes, time_deltas,
+        out=np.zeros_like(magnitude_changes),
+        where=time_deltas > 0
+    )
     
     # Acceleration Pattern: Bestimme das Beschleunigungsmuster
     if len(rise_rates) >= 3:
@@ -401,34 +520,51 @@ def calculate_rise_rate(vectors: List[CoSDVector]) -> RiseRateMetrics:
         acceleration_pattern = "insufficient_data"
     
     return RiseRateMetrics(
-        average_rise_rate=average_rise_rate,
-        peak_rise_rate=peak_rise_rate,
+        average_rise_rate=float(np.mean(rise_rates)),
+        peak_rise_rate=float(np.max(rise_rates)),
         acceleration_pattern=acceleration_pattern,
-        rise_trend=rise_trend,
-        rise_timeline=rise_timeline,
+        rise_trend=_trend(rise_rates),
+        rise_timeline=rise_rates.tolist(),
         metadata={
-            'vector_count': len(vectors),
-            'time_span_seconds': (vectors[-1].timestamp - vectors[0].timestamp).total_seconds(),
-            'magnitude_range': (min(vec.magnitude for vec in vectors), max(vec.magnitude for vec in vectors))
+            'vector_count': inputs.count,
+            'time_span_seconds': float(inputs.micros[-1] - inputs.micros[0]) / 1e6,
+            'magnitude_range': (float(np.min(magnitudes)), float(np.max(magnitudes)))
         }
     )
 
 
-def calculate_all_drift_metrics(vectors: List[CoSDVector]) -> Dict[str, any]:
+def calculate_all_drift_metrics(
+    vectors: Union[List[CoSDVector], np.ndarray],
+    timestamps: Optional[Sequence] = None,
+    marker_counts: Optional[Sequence[int]] = None
+) -> Dict[str, any]:
     """
     Berechnet alle vier Drift-Metriken in einem Aufruf.
     
+    Die Vektoren werden einmal zu einer Matrix gestapelt; Zentrum,
+    quadrierte Abweichungen, Magnituden und Zeitdifferenzen teilen sich
+    alle Metriken.
+    
     Args:
-        vectors: Liste von CoSDVector-Objekten
+        vectors: Liste von CoSDVector-Objekten oder (N x D)-Matrix
+        timestamps: Zeitstempel je Zeile (datetime oder datetime64, nur bei Matrix)
+        marker_counts: Anzahl aktiver Marker je Zeile (nur bei Matrix, Standard: 0)
         
     Returns:
         Dict mit allen Metriken: home_base, density, variability, rise_rate
     """
     try:
-        home_base = calculate_home_base(vectors)
-        density = calculate_density(vectors)
-        variability = calculate_variability(vectors)
-        rise_rate = calculate_rise_rate(vectors)
+        if isinstance(vectors, np.ndarray):
+            if timestamps is None:
+                raise ValueError("Timestamps are required for a vector matrix")
+            inputs = _MetricInputs.from_arrays(vectors, timestamps, marker_counts)
+        else:
+            inputs = _MetricInputs.from_vectors(vectors)
+        
+        home_base = _home_base(inputs)
+        density = _density(inputs)
+        variability = _variability(inputs)
+        rise_rate = _rise_rate(inputs)
         
         return {
             'home_base': {
@@ -467,4 +603,4 @@ def calculate_all_drift_metrics(vectors: List[CoSDVector]) -> Dict[str, any]:
             'density': None,
             'variability': None,
             'rise_rate': None
-        } 
\ No newline at end of file
+        }
@@ -14,7 +14,7 @@ from datetime import datetime
 from pathlib import Path
 import logging
 
-from .cost_vector_math import CoSDVector, VectorOperations
+from .cost_vector_math import CoSDVector, SparseCoSDVector, VectorOperations
 
 logger = logging.getLogger(__name__)
 
@@ -74,16 +74,20 @@ class SemanticCluster:
 class MarkerVectorizer:
     """Konvertiert Marker-Definitionen in CoSD-Vektoren."""
     
-    def __init__(self, marker_data_path: Optional[str] = None):
+    def __init__(self, marker_data_path: Optional[str] = None, sparse: bool = False):
         """
         Initialisiert den Vectorizer.
         
         Args:
             marker_data_path: Pfad zur Marker-Datei (yaml)
+            sparse: Erzeugt SparseCoSDVector statt dichter Vektoren
         """
         self.marker_data = {}
         self.token_index = {}
         self.dimension_count = 0
+        self.sparse = sparse
+        # (category, marker_name) -> (indices, values, weight)
+        self.marker_vectors: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, float]] = {}
         
         if marker_data_path:
             self.load_marker_data(marker_data_path)
@@ -99,8 +103,9 @@ class MarkerVectorizer:
             with open(file_path, 'r', encoding='utf-8') as f:
                 self.marker_data = yaml.safe_load(f)
             
-            # Erstelle Token-Index
+            # Erstelle Token-Index und Marker-Vektoren
             self._build_token_index()
+            self._build_marker_vectors()
             logger.info(f"Loaded marker data with {self.dimension_count} unique tokens")
             
         except Exception as e:
@@ -122,17 +127,63 @@ class MarkerVectorizer:
         self.token_index = {token: idx for idx, token in enumerate(sorted(all_tokens))}
         self.dimension_count = len(self.token_index)
     
-    def vectorize_marker(self, marker_category: str, marker_name: str) -> Optional[CoSDVector]:
+    def _build_marker_vectors(self):
+        """Berechnet die dünnbesetzten Vektoren aller Marker einmalig vor."""
+        self.marker_vectors = {}
+        
+        for category, markers in self.marker_data.items():
+            if not isinstance(markers, dict):
+                continue
+            for marker_name, marker_info in markers.items():
+                if not isinstance(marker_info, dict):
+                    continue
+                weight = marker_info.get('weight', 1.0)
+                indices = np.unique(np.array(
+                    [self.token_index[token] for token in marker_info.get('tokens', ())
+                     if token in self.token_index],
+                    dtype=np.int64
+                ))
+                values = np.full(len(indices), weight, dtype=np.float64)
+                self.marker_vectors[(category, marker_name)] = (indices, values, weight)
+    
+    def vectorize_marker(
+        self,
+        marker_category: str,
+        marker_name: str,
+        sparse: Optional[bool] = None
+    ) -> Optional[CoSDVector]:
         """
         Konvertiert einen spezifischen Marker in einen CoSDVector.
         
         Args:
             marker_category: Kategorie des Markers (z.B. 'Architecture_Markers')
             marker_name: Name des Markers (z.B. 'root_signal')
+            sparse: Überschreibt den Modus des Vectorizers
             
         Returns:
             CoSDVector oder None wenn Marker nicht gefunden
         """
+        if sparse is None:
+            sparse = self.sparse
+        
+        entry = self.marker_vectors.get((marker_category, marker_name))
+        if entry is not None:
+            indices, values, weight = entry
+            marker_weights = {marker_name: weight}
+            metadata = {'category': marker_category, 'name': marker_name}
+            if sparse:
+                return SparseCoSDVector(
+                    indices, values, self.dimension_count, datetime.now(), marker_weights, metadata
+                )
+            vector = np.zeros(self.dimension_count)
+            vector[indices] = values
+            return CoSDVector(
+                dimensions=vector,
+                timestamp=datetime.now(),
+                marker_weights=marker_weights,
+                metadata=metadata
+            )
+        
         if marker_category not in self.marker_data:
             return None
             
@@ -162,7 +213,8 @@ class MarkerVectorizer:
     def vectorize_text_with_markers(
         self,
         text: str,
-        active_markers: List[Tuple[str, str]]
+        active_markers: List[Tuple[str, str]],
+        sparse: Optional[bool] = None
     ) -> CoSDVector:
         """
         Erstellt einen Vektor basierend auf Text und aktiven Markern.
@@ -170,20 +222,27 @@ class MarkerVectorizer:
         Args:
             text: Zu analysierender Text
             active_markers: Liste von (category, marker_name) Tupeln
+            sparse: Überschreibt den Modus des Vectorizers
             
         Returns:
             Kombinierter CoSDVector
         """
+        if sparse is None:
+            sparse = self.sparse
+        if sparse:
+            return self._vectorize_text_sparse(text, active_markers)
+        
         # Initialisiere Vektor
         combined_vector = np.zeros(self.dimension_count)
         marker_weights = {}
         
         # Kombiniere Marker-Vektoren
         for category, marker_name in active_markers:
-            marker_vec = self.vectorize_marker(category, marker_name)
-            if marker_vec:
-                combined_vector += marker_vec.dimensions
-                marker_weights[f"{category}.{marker_name}"] = marker_vec.marker_weights.get(marker_name, 1.0)
+            entry = self._marker_entry(category, marker_name)
+            if entry:
+                indices, values, weight = entry
+                combined_vector[indices] += values
+                marker_weights[f"{category}.{marker_name}"] = weight
         
         # Normalisiere wenn nötig
         if np.any(combined_vector):
@@ -195,6 +254,77 @@ class MarkerVectorizer:
             marker_weights=marker_weights,
             metadata={'text_preview': text[:100], 'marker_count': len(active_markers)}
         )
+    
+    def _marker_entry(
+        self,
+        category: str,
+        marker_name: str
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+        """
+        Liefert (indices, values, weight) eines Markers.
+        
+        Marker ohne vorberechneten Vektor (ungewöhnliche Struktur) werden
+        über vectorize_marker() dicht erzeugt und in Index/Wert-Form gebracht.
+        """
+        entry = self.marker_vectors.get((category, marker_name))
+        if entry is not None:
+            return entry
+        
+        marker_vec = self.vectorize_marker(category, marker_name, sparse=False)
+        if not marker_vec:
+            return None
+        dense = marker_vec.dimensions
+        indices = np.flatnonzero(dense)
+        return indices, dense[indices], marker_vec.marker_weights.get(marker_name, 1.0)
+    
+    def _vectorize_text_sparse(
+        self,
+        text: str,
+        active_markers: List[Tuple[str, str]]
+    ) -> SparseCoSDVector:
+        """
+        Kombiniert die vorberechneten Marker-Vektoren ohne dichtes Array.
+        
+        Args:
+            text: Zu analysierender Text
+            active_markers: Liste von (category, marker_name) Tupeln
+            
+        Returns:
+            Normalisierter SparseCoSDVector
+        """
+        index_parts = []
+        value_parts = []
+        marker_weights = {}
+        
+        for category, marker_name in active_markers:
+            entry = self._marker_entry(category, marker_name)
+            if not entry:
+                continue
+            indices, values, weight = entry
+            index_parts.append(indices)
+            value_parts.append(values)
+            marker_weights[f"{category}.{marker_name}"] = weight
+        
+        if index_parts:
+            unique_indices, inverse = np.unique(np.concatenate(index_parts), return_inverse=True)
+            summed = np.bincount(inverse, weights=np.concatenate(value_parts))
+            nonzero = summed != 0
+            indices, values = unique_indices[nonzero], summed[nonzero]
+        else:
+            indices, values = np.empty(0, dtype=np.int64), np.empty(0)
+        
+        # Normalisiere wenn nötig
+        if len(values):
+            values = values / np.linalg.norm(values)
+        
+        return SparseCoSDVector(
+            indices=indices,
+            values=values,
+            size=self.dimension_count,
+            timestamp=datetime.now(),
+            marker_weights=marker_weights,
+            metadata={'text_preview': text[:100], 'marker_count': len(active_markers)}
+        )
 
 
 class CoSDMarkerMatcher:
@@ -202,16 +332,22 @@ class CoSDMarkerMatcher:
     Erweitert den bestehenden MarkerMatcher um CoSD-Funktionalität.
     """
     
-    def __init__(self, base_matcher=None, marker_data_path: Optional[str] = None):
+    def __init__(
+        self,
+        base_matcher=None,
+        marker_data_path: Optional[str] = None,
+        sparse_vectors: bool = False
+    ):
         """
         Initialisiert den CoSD-erweiterten Matcher.
         
         Args:
             base_matcher: Instanz des Original-MarkerMatchers
             marker_data_path: Pfad zur erweiterten Marker-Datei
+            sparse_vectors: Vektoren dünnbesetzt (SparseCoSDVector) erzeugen
         """
         self.base_matcher = base_matcher
-        self.vectorizer = MarkerVectorizer(marker_data_path)
+        self.vectorizer = MarkerVectorizer(marker_data_path, sparse=sparse_vectors)
         self.cluster_cache = {}
         
     def analyze_with_cosd(self, text: str) -> Dict[str, any]:
@@ -354,19 +490,24 @@ class CoSDMarkerMatcher:
         Returns:
             Liste mit Dimension-Info Dicts
         """
-        # Finde Top-N Indizes
-        top_indices = np.argsort(np.abs(vector.dimensions))[-n:][::-1]
+        # Finde Top-N Indizes (dünnbesetzt nur über die belegten Dimensionen)
+        if isinstance(vector, SparseCoSDVector):
+            order = np.argsort(np.abs(vector.values), kind='stable')[-n:][::-1]
+            top_entries = zip(vector.indices[order], vector.values[order])
+        else:
+            top_indices = np.argsort(np.abs(vector.dimensions))[-n:][::-1]
+            top_entries = ((idx, vector.dimensions[idx]) for idx in top_indices)
         
         # Erstelle Reverse-Mapping von Index zu Token
         index_to_token = {idx: token for token, idx in self.vectorizer.token_index.items()}
         
         dominant = []
-        for idx in top_indices:
-            if idx in index_to_token and vector.dimensions[idx] != 0:
+        for idx, value in top_entries:
+            if idx in index_to_token and value != 0:
                 dominant.append({
                     'token': index_to_token[idx],
-                    'value': float(vector.dimensions[idx]),
-                    'absolute_value': float(np.abs(vector.dimensions[idx]))
+                    'value': float(value),
+                    'absolute_value': float(np.abs(value))
                 })
         
         return dominant
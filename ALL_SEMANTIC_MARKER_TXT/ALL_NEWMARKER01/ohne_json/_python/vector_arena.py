@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Vector Arena - Kompakter Speicher für CoSD-Vektorsequenzen
+
+Eine VectorArena hält alle Vektoren einer Sequenz als Zeilen einer einzigen,
+vorab reservierten Matrix in float32 oder float16. Die zurückgegebenen
+ArenaCoSDVector-Objekte sind schlanke Sichten (__slots__) auf ihre Zeile mit
+der Schnittstelle eines CoSDVector (dimensions, magnitude, normalize,
+dot_product, timestamp, marker_weights, metadata). Sie erben nicht von der
+Dataclass CoSDVector, da deren Instanzen immer ein __dict__ mitbringen.
+Skalarprodukte und Magnituden werden in float64 akkumuliert.
+"""
+
+import numpy as np
+from typing import Any, List, Dict, Optional, Union, Iterable
+from datetime import datetime
+import logging
+
+from .cost_vector_math import CoSDVector, SparseCoSDVector, _can_scale_in_place
+
+logger = logging.getLogger(__name__)
+
+# Zulässige Speichertypen der Arena (float64 entspricht dem bisherigen Verhalten)
+VECTOR_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'float16': np.float16
+}
+
+
+class ArenaCoSDVector:
+    """
+    Sicht auf eine Zeile einer VectorArena.
+    
+    `dimensions` liefert bei jedem Zugriff eine beschreibbare Sicht auf die
+    Zeile im Speichertyp der Arena. Wächst die Arena, folgt der Vektor dem
+    neuen Speicher; früher geholte Sichten auf `dimensions` tun das nicht.
+    
+    Attributes:
+        arena: Arena, die die Dimensionen hält
+        row: Zeile in der Arena
+    """
+    
+    __slots__ = ('arena', 'row', 'timestamp', 'marker_weights', 'metadata')
+    
+    def __init__(
+        self,
+        arena: 'VectorArena',
+        row: int,
+        timestamp: datetime,
+        marker_weights: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.arena = arena
+        self.row = row
+        self.timestamp = timestamp
+        self.marker_weights = marker_weights if marker_weights is not None else {}
+        self.metadata = metadata if metadata is not None else {}
+    
+    @property
+    def dimensions(self) -> np.ndarray:
+        """Sicht auf die Zeile in der Arena."""
+        return self.arena._data[self.row]
+    
+    @dimensions.setter
+    def dimensions(self, dimensions: np.ndarray):
+        self.arena._data[self.row] = dimensions
+    
+    @property
+    def magnitude(self) -> float:
+        """Berechnet die Magnitude (Länge) des Vektors."""
+        row = self.dimensions
+        return float(np.sqrt(np.einsum('i,i->', row, row, dtype=np.float64)))
+    
+    def normalize(self, in_place: bool = False) -> Union['ArenaCoSDVector', CoSDVector]:
+        """
+        Gibt einen normalisierten Vektor zurück (Länge = 1).
+        
+        Args:
+            in_place: Skaliert die Zeile in der Arena (sonst ein neuer CoSDVector)
+        """
+        mag = self.magnitude
+        if mag == 0:
+            return self
+        dimensions = self.dimensions
+        if in_place and _can_scale_in_place(dimensions):
+            dimensions /= mag
+            return self
+        return CoSDVector(
+            dimensions=dimensions / mag,
+            timestamp=self.timestamp,
+            marker_weights=self.marker_weights.copy(),
+            metadata=self.metadata.copy()
+        )
+    
+    def dot_product(self, other: Union[CoSDVector, 'ArenaCoSDVector']) -> float:
+        """Berechnet das Skalarprodukt mit einem anderen Vektor."""
+        if isinstance(other, SparseCoSDVector):
+            return other.dot_product(self)
+        return float(np.einsum('i,i->', self.dimensions, other.dimensions, dtype=np.float64))
+    
+    def __repr__(self) -> str:
+        return (f"ArenaCoSDVector(row={self.row}, dtype={self.arena.dtype.name}, "
+                f"timestamp={self.timestamp!r}, marker_weights={self.marker_weights!r})")
+
+
+class VectorArena:
+    """
+    Zusammenhängender Speicher für eine Vektorsequenz.
+    
+    Die Matrix wird mit `capacity` Zeilen angelegt und bei Bedarf auf die
+    doppelte Größe umkopiert. Jede Zeile gehört genau einem ArenaCoSDVector,
+    deshalb kann sie gefahrlos in place normalisiert werden.
+    """
+    
+    def __init__(
+        self,
+        dimension_count: int,
+        dtype: Union[str, type] = 'float32',
+        capacity: int = 256
+    ):
+        """
+        Initialisiert die Arena.
+        
+        Args:
+            dimension_count: Anzahl Dimensionen je Vektor
+            dtype: Speichertyp ('float64', 'float32' oder 'float16')
+            capacity: Anzahl vorab reservierter Zeilen
+        """
+        if isinstance(dtype, str):
+            if dtype not in VECTOR_DTYPES:
+                raise ValueError(f"Unknown vector dtype: {dtype}")
+            dtype = VECTOR_DTYPES[dtype]
+        self.dimension_count = int(dimension_count)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros((max(int(capacity), 1), self.dimension_count), dtype=self.dtype)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @property
+    def capacity(self) -> int:
+        """Anzahl reservierter Zeilen."""
+        return len(self._data)
+    
+    @property
+    def nbytes(self) -> int:
+        """Reservierter Speicher der Matrix in Bytes."""
+        return self._data.nbytes
+    
+    def matrix(self) -> np.ndarray:
+        """(N x D)-Sicht auf alle belegten Zeilen (ohne Kopie)."""
+        return self._data[:self._count]
+    
+    def append(
+        self,
+        vector: Union[CoSDVector, ArenaCoSDVector, np.ndarray],
+        timestamp: Optional[datetime] = None,
+        marker_weights: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> ArenaCoSDVector:
+        """
+        Übernimmt einen Vektor in die nächste freie Zeile.
+        
+        Args:
+            vector: CoSDVector (dicht, dünnbesetzt oder Arena-Sicht) oder Array der Dimensionen
+            timestamp: Zeitstempel (Standard: der des Vektors; bei Arrays Pflicht)
+            marker_weights: Marker-Gewichte (Standard: die des Vektors)
+            metadata: Metadaten (Standard: die des Vektors)
+        
+        Returns:
+            ArenaCoSDVector auf die neue Zeile
+        """
+        if isinstance(vector, (CoSDVector, ArenaCoSDVector)):
+            timestamp = timestamp if timestamp is not None else vector.timestamp
+            # Die Dicts werden geteilt: gecachte Vektoren liefern bereits eigene Kopien
+            marker_weights = marker_weights if marker_weights is not None else vector.marker_weights
+            metadata = metadata if metadata is not None else vector.metadata
+        if timestamp is None:
+            raise ValueError("Timestamp is required when appending a raw array")
+        
+        if self._count == len(self._data):
+            self._grow(2 * len(self._data))
+        row = self._count
+        
+        if isinstance(vector, SparseCoSDVector):
+            self._data[row, vector.indices] = vector.values
+        elif isinstance(vector, (CoSDVector, ArenaCoSDVector)):
+            self._data[row] = vector.dimensions
+        else:
+            self._data[row] = vector
+        self._count += 1
+        return ArenaCoSDVector(self, row, timestamp, marker_weights, metadata)
+    
+    def extend(self, vectors: Iterable[Union[CoSDVector, ArenaCoSDVector]]) -> List[ArenaCoSDVector]:
+        """Übernimmt mehrere Vektoren und gibt ihre Sichten zurück."""
+        return [self.append(vector) for vector in vectors]
+    
+    def normalize_rows(self):
+        """Normalisiert alle belegten Zeilen in place (Nullzeilen bleiben unverändert)."""
+        matrix = self.matrix()
+        norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64))
+        np.divide(matrix, norms[:, None], out=matrix, where=norms[:, None] != 0, casting='unsafe')
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """Speicherbedarf der Arena im Vergleich zu einzelnen float64-Vektoren."""
+        used_bytes = self._count * self.dimension_count * self.dtype.itemsize
+        float64_bytes = self._count * self.dimension_count * 8
+        return {
+            'dtype': self.dtype.name,
+            'vectors': self._count,
+            'capacity': len(self._data),
+            'allocated_bytes': self.nbytes,
+            'used_bytes': used_bytes,
+            'float64_bytes': float64_bytes,
+            'reduction': round(1.0 - used_bytes / float64_bytes, 4) if float64_bytes else 0.0
+        }
+    
+    def _grow(self, capacity: int):
+        """Kopiert die Matrix in einen größeren Speicher."""
+        grown = np.zeros((capacity, self.dimension_count), dtype=self.dtype)
+        grown[:self._count] = self._data[:self._count]
+        self._data = grown
+        logger.debug(f"Vektor-Arena auf {capacity} Zeilen vergrößert")
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Vector Clustering - Austauschbare Clustering-Verfahren für CoSD-Vektoren
+
+Dieses Modul stellt die Clustering-Backends für die Emergenz-Detektion bereit:
+Complete-Linkage (Standard, Verhalten von cluster_vectors), DBSCAN-artige
+Dichte-Cluster und Mini-Batch-k-Means. Alle Distanzen werden über einen
+DistanceIndex auf der gestapelten Vektor-Matrix berechnet.
+"""
+
+import numpy as np
+from typing import List, Dict, Optional, Type
+import logging
+
+from .cost_vector_math import CoSDVector, stack_vectors
+
+logger = logging.getLogger(__name__)
+
+
+class DistanceIndex:
+    """
+    Distanzen zwischen einer festen Menge von CoSD-Vektoren.
+    
+    Bis `condensed_limit` Vektoren wird die kondensierte Distanzmatrix
+    (obere Dreiecksmatrix ohne Diagonale, Layout wie scipy.spatial.distance.pdist)
+    einmalig blockweise vorberechnet. Bei größeren Sequenzen mit `radius` wird
+    stattdessen ein Nachbarschaftsgraph (CSR) aller Paare mit Distanz <= radius
+    aufgebaut; Distanzen darüber werden als inf geliefert. Ohne `radius` werden
+    Zeilen bei Bedarf per Matrix-Vektor-Produkt bestimmt.
+    
+    Kosinus-Distanz ist 1 - Ähnlichkeit, wobei Vektoren ohne Magnitude wie in
+    VectorOperations.cosine_similarity die Ähnlichkeit 0 haben.
+    """
+    
+    def __init__(
+        self,
+        vectors: List[CoSDVector],
+        method: str = 'euclidean',
+        condensed_limit: int = 4000,
+        block_size: int = 512,
+        radius: Optional[float] = None
+    ):
+        """
+        Initialisiert den Index.
+        
+        Args:
+            vectors: Liste von CoSDVector-Objekten
+            method: Distanzmetrik ('euclidean' oder 'cosine')
+            condensed_limit: Maximale Anzahl Vektoren für die vorberechnete Matrix
+            block_size: Zeilen pro Block bei der Vorberechnung
+            radius: Größte Distanz, die der Aufrufer exakt benötigt
+        """
+        self.method = method
+        self.count = len(vectors)
+        self.block_size = block_size
+        
+        matrix = stack_vectors(vectors)
+        if method == 'euclidean':
+            self.matrix = matrix.astype(np.result_type(matrix.dtype, np.float32), copy=False)
+            self.squared_norms = np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64)
+        else:  # cosine
+            self.matrix = _normalize_rows(matrix)
+            self.squared_norms = None
+        
+        self.condensed: Optional[np.ndarray] = None
+        self.neighbors = None
+        if self.count <= condensed_limit:
+            self.condensed = self._build_condensed()
+        elif radius is not None:
+            self.neighbors = self._build_neighbors(radius)
+    
+    def _block(self, rows: slice, start: int) -> np.ndarray:
+        """Distanzen der Zeilen `rows` zu allen Vektoren ab Index `start`."""
+        products = self.matrix[rows] @ self.matrix[start:].T
+        if self.method == 'euclidean':
+            squared = (
+                self.squared_norms[rows][:, None] + self.squared_norms[None, start:] - 2.0 * products
+            )
+            return np.sqrt(np.maximum(squared, 0.0))
+        return 1.0 - products
+    
+    def _row_offset(self, i: int) -> int:
+        """Position des Paares (i, i + 1) in der kondensierten Matrix."""
+        return self.count * i - i * (i + 1) // 2
+    
+    def _build_condensed(self) -> np.ndarray:
+        """Berechnet die kondensierte Distanzmatrix blockweise."""
+        n = self.count
+        condensed = np.empty(n * (n - 1) // 2)
+        for block_start in range(0, n, self.block_size):
+            block_end = min(n, block_start + self.block_size)
+            block = self._block(slice(block_start, block_end), block_start)
+            for i in range(block_start, block_end):
+                offset = self._row_offset(i)
+                condensed[offset:offset + n - i - 1] = block[i - block_start, i - block_start + 1:]
+        return condensed
+    
+    def _build_neighbors(self, radius: float):
+        """Berechnet (indptr, indices, distances) aller Paare mit Distanz <= radius."""
+        counts = []
+        indices = []
+        distances = []
+        for block_start in range(0, self.count, self.block_size):
+            block_end = min(self.count, block_start + self.block_size)
+            block = self._block(slice(block_start, block_end), 0)
+            rows, columns = np.nonzero(block <= radius)
+            counts.append(np.bincount(rows, minlength=block_end - block_start))
+            indices.append(columns)
+            distances.append(block[rows, columns])
+        
+        indptr = np.concatenate(([0], np.cumsum(np.concatenate(counts))))
+        return indptr, np.concatenate(indices), np.concatenate(distances)
+    
+    def _neighbor_row(self, i: int, start: int) -> np.ndarray:
+        """Distanzen von i zu Vektoren ab `start` aus dem Nachbarschaftsgraphen."""
+        indptr, indices, distances = self.neighbors
+        row = np.full(self.count - start, np.inf)
+        columns = indices[indptr[i]:indptr[i + 1]]
+        keep = columns >= start
+        row[columns[keep] - start] = distances[indptr[i]:indptr[i + 1]][keep]
+        return row
+    
+    def upper_row(self, i: int) -> np.ndarray:
+        """Distanzen von Vektor i zu den Vektoren i+1..n-1."""
+        if self.condensed is not None:
+            offset = self._row_offset(i)
+            return self.condensed[offset:offset + self.count - i - 1]
+        if self.neighbors is not None:
+            return self._neighbor_row(i, i + 1)
+        return self._block(slice(i, i + 1), i + 1)[0]
+    
+    def row(self, i: int) -> np.ndarray:
+        """Distanzen von Vektor i zu allen Vektoren (Distanz zu sich selbst: 0)."""
+        if self.condensed is not None:
+            lower = np.arange(i)
+            positions = self.count * lower - lower * (lower + 1) // 2 + i - lower - 1
+            distances = np.concatenate((self.condensed[positions], [0.0], self.upper_row(i)))
+        else:
+            if self.neighbors is not None:
+                distances = self._neighbor_row(i, 0)
+            else:
+                distances = self._block(slice(i, i + 1), 0)[0]
+            distances[i] = 0.0
+        return distances
+
+
+class ClusteringBackend:
+    """Basisklasse für Clustering-Verfahren über CoSD-Vektoren."""
+    
+    def __init__(
+        self,
+        distance_threshold: float = 0.5,
+        method: str = 'euclidean',
+        condensed_limit: int = 4000
+    ):
+        """
+        Args:
+            distance_threshold: Maximale Distanz für Cluster-Zugehörigkeit
+            method: Distanzmetrik ('euclidean' oder 'cosine')
+            condensed_limit: Siehe DistanceIndex
+        """
+        self.distance_threshold = distance_threshold
+        self.method = method
+        self.condensed_limit = condensed_limit
+    
+    def cluster(self, vectors: List[CoSDVector]) -> List[List[int]]:
+        """
+        Clustert Vektoren.
+        
+        Returns:
+            Liste von Listen mit aufsteigenden Vektor-Indizes pro Cluster,
+            sortiert nach dem kleinsten Index. Jeder Vektor liegt in genau
+            einem Cluster (nicht zuordenbare Vektoren als Einzel-Cluster).
+        """
+        if not vectors:
+            return []
+        return self._cluster(vectors)
+    
+    def _cluster(self, vectors: List[CoSDVector]) -> List[List[int]]:
+        raise NotImplementedError
+    
+    def _distance_index(self, vectors: List[CoSDVector]) -> DistanceIndex:
+        # Beide Distanz-Verfahren vergleichen nur gegen distance_threshold
+        return DistanceIndex(
+            vectors, self.method, self.condensed_limit, radius=self.distance_threshold
+        )
+
+
+class CompleteLinkageClustering(ClusteringBackend):
+    """
+    Sequentielles Complete-Linkage wie cluster_vectors.
+    
+    Jeder noch freie Vektor eröffnet einen Cluster; spätere freie Vektoren
+    werden aufgenommen, wenn ihre Distanz zu allen bisherigen Mitgliedern
+    höchstens distance_threshold beträgt. Die maximale Distanz jedes
+    Kandidaten zu den Mitgliedern wird als Array mitgeführt, pro neuem
+    Mitglied genügt damit ein vektorisierter Schritt.
+    """
+    
+    def _cluster(self, vectors: List[CoSDVector]) -> List[List[int]]:
+        index = self._distance_index(vectors)
+        count = len(vectors)
+        assigned = np.zeros(count, dtype=bool)
+        clusters = []
+        
+        for seed in range(count):
+            if assigned[seed]:
+                continue
+            
+            cluster = [seed]
+            assigned[seed] = True
+            # worst[k]: maximale Distanz von Vektor seed + 1 + k zu den Mitgliedern
+            worst = index.upper_row(seed).copy()
+            position = 0
+            
+            while position < len(worst):
+                candidates = (worst[position:] <= self.distance_threshold) & ~assigned[seed + 1 + position:]
+                hit = int(np.argmax(candidates))
+                if not candidates[hit]:
+                    break
+                
+                member = seed + 1 + position + hit
+                cluster.append(member)
+                assigned[member] = True
+                position = member - seed
+                np.maximum(worst[position:], index.upper_row(member), out=worst[position:])
+            
+            clusters.append(cluster)
+        
+        return clusters
+
+
+class DBSCANClustering(ClusteringBackend):
+    """
+    Dichte-basiertes Clustering nach DBSCAN.
+    
+    Nachbarn sind alle Vektoren mit Distanz <= distance_threshold (inklusive
+    des Vektors selbst); Kernpunkte haben mindestens min_samples Nachbarn.
+    Rauschpunkte werden als Einzel-Cluster zurückgegeben.
+    """
+    
+    def __init__(self, distance_threshold: float = 0.5, method: str = 'euclidean',
+                 condensed_limit: int = 4000, min_samples: int = 2):
+        super().__init__(distance_threshold, method, condensed_limit)
+        self.min_samples = min_samples
+    
+    def _cluster(self, vectors: List[CoSDVector]) -> List[List[int]]:
+        index = self._distance_index(vectors)
+        count = len(vectors)
+        labels = np.full(count, -1)
+        visited = np.zeros(count, dtype=bool)
+        cluster_count = 0
+        
+        for point in range(count):
+            if visited[point]:
+                continue
+            visited[point] = True
+            
+            neighbors = np.flatnonzero(index.row(point) <= self.distance_threshold)
+            if len(neighbors) < self.min_samples:
+                continue  # Rauschen, kann später noch Randpunkt werden
+            
+            label = cluster_count
+            cluster_count += 1
+            labels[point] = label
+            queue = list(neighbors)
+            
+            while queue:
+                current = queue.pop()
+                if labels[current] == -1:
+                    labels[current] = label
+                if visited[current]:
+                    continue
+                visited[current] = True
+                
+                current_neighbors = np.flatnonzero(index.row(current) <= self.distance_threshold)
+                if len(current_neighbors) >= self.min_samples:
+                    queue.extend(current_neighbors[~visited[current_neighbors]])
+        
+        return _clusters_from_labels(labels)
+
+
+class MiniBatchKMeansClustering(ClusteringBackend):
+    """
+    Mini-Batch-k-Means (Sculley 2010) für lange Sequenzen.
+    
+    Zentren werden per k-means++ initialisiert und pro Batch auf den
+    laufenden Mittelwert ihrer Mitglieder gezogen. Bei method='cosine'
+    wird auf normalisierten Vektoren gearbeitet (sphärisches k-Means).
+    distance_threshold wird nicht verwendet; ohne n_clusters gilt
+    k = round(sqrt(n / 2)).
+    """
+    
+    def __init__(self, distance_threshold: float = 0.5, method: str = 'euclidean',
+                 condensed_limit: int = 4000, n_clusters: Optional[int] = None,
+                 batch_size: int = 256, max_iter: int = 100, random_state: int = 0):
+        super().__init__(distance_threshold, method, condensed_limit)
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.random_state = random_state
+    
+    def _cluster(self, vectors: List[CoSDVector]) -> List[List[int]]:
+        spherical = self.method != 'euclidean'
+        matrix = stack_vectors(vectors)
+        if spherical:
+            matrix = _normalize_rows(matrix)
+        
+        count = len(matrix)
+        k = self.n_clusters or max(1, int(round(np.sqrt(count / 2))))
+        k = min(k, count)
+        rng = np.random.default_rng(self.random_state)
+        
+        centers = self._init_centers(matrix, k, rng)
+        totals = np.zeros(k)
+        batch_size = min(self.batch_size, count)
+        
+        for _ in range(self.max_iter):
+            batch = matrix[rng.choice(count, batch_size, replace=False)]
+            nearest = self._nearest(batch, centers)
+            batch_counts = np.bincount(nearest, minlength=k)
+            updated = batch_counts > 0
+            
+            sums = np.zeros_like(centers)
+            np.add.at(sums, nearest, batch)
+            new_totals = totals + batch_counts
+            centers[updated] = (
+                centers[updated] * totals[updated, None] + sums[updated]
+            ) / new_totals[updated, None]
+            if spherical:
+                centers = _normalize_rows(centers)
+            totals = new_totals
+        
+        labels = np.concatenate([
+            self._nearest(matrix[start:start + 4096], centers)
+            for start in range(0, count, 4096)
+        ])
+        return _clusters_from_labels(labels)
+    
+    @staticmethod
+    def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Index des nächsten Zentrums (quadrierte euklidische Distanz)."""
+        distances = (centers ** 2).sum(axis=1)[None, :] - 2.0 * points @ centers.T
+        return np.argmin(distances, axis=1)
+    
+    @staticmethod
+    def _init_centers(matrix: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+        """k-means++-Initialisierung."""
+        centers = [matrix[rng.integers(len(matrix))]]
+        closest = ((matrix - centers[0]) ** 2).sum(axis=1)
+        
+        for _ in range(1, k):
+            total = closest.sum()
+            if total <= 0:
+                choice = rng.integers(len(matrix))
+            else:
+                choice = rng.choice(len(matrix), p=closest / total)
+            centers.append(matrix[choice])
+            closest = np.minimum(closest, ((matrix - matrix[choice]) ** 2).sum(axis=1))
+        
+        return np.array(centers, dtype=np.float64)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normalisiert Zeilen auf Länge 1 (Nullzeilen bleiben 0, float16 wird zu float32)."""
+    norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix, dtype=np.float64))[:, None]
+    out = np.zeros(matrix.shape, dtype=np.result_type(matrix.dtype, np.float32))
+    return np.divide(matrix, norms, out=out, where=norms != 0, casting='unsafe')
+
+
+def _clusters_from_labels(labels: np.ndarray) -> List[List[int]]:
+    """Gruppiert Labels zu Clustern; -1 wird zu Einzel-Clustern."""
+    groups: Dict[int, List[int]] = {}
+    for idx, label in enumerate(labels.tolist()):
+        key = label if label >= 0 else -(idx + 1)
+        groups.setdefault(key, []).append(idx)
+    return sorted(groups.values(), key=lambda members: members[0])
+
+
+CLUSTERING_BACKENDS: Dict[str, Type[ClusteringBackend]] = {
+    'complete': CompleteLinkageClustering,
+    'dbscan': DBSCANClustering,
+    'kmeans': MiniBatchKMeansClustering,
+}
+
+
+def create_clustering_backend(name: str = 'complete', **options) -> ClusteringBackend:
+    """
+    Erzeugt ein Clustering-Backend anhand seines Namens.
+    
+    Args:
+        name: 'complete', 'dbscan' oder 'kmeans'
+        **options: Konstruktor-Parameter des Backends
+    
+    Returns:
+        ClusteringBackend-Instanz
+    """
+    if name not in CLUSTERING_BACKENDS:
+        raise ValueError(
+            f"Unknown clustering backend '{name}', expected one of {sorted(CLUSTERING_BACKENDS)}"
+        )
+    return CLUSTERING_BACKENDS[name](**options)
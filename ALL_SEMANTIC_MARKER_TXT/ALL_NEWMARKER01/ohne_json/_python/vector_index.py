@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Vector Index - Persistenter Nächste-Nachbarn-Index für CoSD-Vektoren
+
+Beantwortet "welche früheren Momente sind dieser Nachricht semantisch am
+nächsten" über alle jemals indizierten Vektoren, global oder pro Gespräch.
+
+Verfahren (Kosinus-Ähnlichkeit):
+- Gaußsche Zufallsprojektion der Token-Dimensionen auf projection_dim
+  Dimensionen (aus dem Seed reproduzierbar, wird nicht gespeichert)
+- Inverted File: sphärisches k-Means auf den Projektionen, jede Anfrage
+  durchsucht nur die nprobe nächsten Listen
+- Die besten Kandidaten werden mit den exakten (dünnbesetzt gespeicherten)
+  Vektoren neu bewertet
+
+Einfügen ist inkrementell; gespeichert wird als Segment aus .npy-Dateien,
+das beim Laden per mmap eingeblendet wird. Jedes Speichern schreibt den
+ganzen Index als neues Segment (O(N)), autosave_every sollte daher mit der
+Indexgröße wachsen. Ein Index hat genau einen schreibenden Prozess, beliebig
+viele Prozesse können ihn lesen.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Union
+
+import numpy as np
+
+from .cost_vector_math import CoSDVector, SparseCoSDVector
+
+logger = logging.getLogger(__name__)
+
+# Bei Änderungen am Segment-Layout erhöhen
+INDEX_FORMAT_VERSION = 1
+
+_ARRAYS = (
+    'projected', 'indptr', 'indices', 'values', 'conversation_codes',
+    'positions', 'timestamps', 'list_order', 'list_offsets'
+)
+
+
+class _GrowableArray:
+    """
+    Array mit amortisiert konstantem Anhängen.
+    
+    Startet auf einem (ggf. gemappten, schreibgeschützten) Array und kopiert
+    erst beim ersten Anhängen in einen eigenen Puffer.
+    """
+    
+    def __init__(self, data: np.ndarray):
+        self._data = data
+        self._size = len(data)
+        self._owned = False
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+    
+    def append(self, rows: Union[np.ndarray, List]):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        needed = self._size + len(rows)
+        if not self._owned or needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data), 16)
+            grown = np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+            self._owned = True
+        self._data[self._size:needed] = rows
+        self._size = needed
+
+
+def _empty(dtype, columns: Optional[int] = None) -> _GrowableArray:
+    shape = (0,) if columns is None else (0, columns)
+    return _GrowableArray(np.empty(shape, dtype=dtype))
+
+
+def _to_micros(timestamp: Optional[datetime]) -> int:
+    """Zeitstempel als Mikrosekunden seit 1970 (naive Zeitstempel als UTC)."""
+    if timestamp is None:
+        return np.iinfo(np.int64).min
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(np.datetime64(timestamp, 'us').astype(np.int64))
+
+
+def _spherical_kmeans(data: np.ndarray, clusters: int, iterations: int, rng) -> np.ndarray:
+    """k-Means mit Kosinus-Zuordnung auf normalisierten Zeilen."""
+    centroids = data[rng.choice(len(data), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Leere Cluster neu mit zufälligen Punkten besetzen
+        sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1)
+        centroids = sums / np.maximum(norms, 1e-12)[:, None]
+    return centroids.astype(np.float32)
+
+
+class CoSDVectorIndex:
+    """
+    Approximativer Nächste-Nachbarn-Index über CoSD-Vektoren.
+    
+    Jeder Eintrag trägt Gesprächs-ID, Position im Gespräch und Zeitstempel.
+    Solange weniger als train_threshold Vektoren vorliegen, wird exakt
+    gesucht; danach werden die Listen trainiert und bei Verachtfachung des
+    Bestands neu aufgebaut. Anfragen innerhalb eines Gesprächs mit bis zu
+    exact_limit Einträgen werden ebenfalls exakt beantwortet.
+    """
+    
+    def __init__(
+        self,
+        dimension_count: int,
+        projection_dim: int = 128,
+        nprobe: int = 16,
+        rerank_factor: int = 16,
+        train_threshold: int = 2048,
+        exact_limit: int = 5000,
+        seed: int = 0,
+        path: Optional[Union[str, Path]] = None,
+        autosave_every: Optional[int] = None
+    ):
+        """
+        Initialisiert einen leeren Index.
+        
+        Args:
+            dimension_count: Anzahl Token-Dimensionen der CoSD-Vektoren
+            projection_dim: Dimensionen der Zufallsprojektion
+            nprobe: Anzahl durchsuchter Listen pro Anfrage
+            rerank_factor: Kandidaten pro Treffer für die exakte Neubewertung
+            train_threshold: Ab dieser Größe wird das Inverted File trainiert
+            exact_limit: Gespräche bis zu dieser Größe werden exakt durchsucht
+            seed: Seed für Projektion und k-Means
+            path: Verzeichnis für save() (optional)
+            autosave_every: Speichert nach so vielen neuen Einträgen (jedes
+                Speichern schreibt alle Einträge neu)
+        """
+        self.dimension_count = int(dimension_count)
+        self.projection_dim = int(projection_dim)
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self.train_threshold = train_threshold
+        self.exact_limit = exact_limit
+        self.seed = seed
+        self.path = Path(path) if path else None
+        self.autosave_every = autosave_every
+        
+        rng = np.random.default_rng(seed)
+        self.projection = (
+            rng.standard_normal((self.dimension_count, self.projection_dim), dtype=np.float32)
+            / np.float32(np.sqrt(self.projection_dim))
+        )
+        
+        self._projected = _empty(np.float32, self.projection_dim)
+        self._indptr = _GrowableArray(np.zeros(1, dtype=np.int64))
+        self._indices = _empty(np.int32)
+        self._values = _empty(np.float32)
+        self._conversation_codes = _empty(np.int32)
+        self._positions = _empty(np.int32)
+        self._timestamps = _empty(np.int64)
+        
+        self.conversations: List[str] = []
+        self._conversation_lookup: Dict[str, int] = {}
+        self._conversation_members: Dict[int, _GrowableArray] = {}
+        
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: Dict[int, _GrowableArray] = {}
+        self.trained_size = 0
+        self._unsaved = 0
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._conversation_codes)
+    
+    def add(
+        self,
+        vector: CoSDVector,
+        conversation_id: str = '',
+        position: Optional[int] = None
+    ) -> int:
+        """
+        Fügt einen Vektor hinzu.
+        
+        Args:
+            vector: CoSDVector (dicht oder dünnbesetzt)
+            conversation_id: Gespräch, zu dem der Vektor gehört
+            position: Position im Gespräch (Standard: fortlaufend)
+        
+        Returns:
+            ID des Eintrags
+        """
+        return self.add_many([vector], conversation_id, None if position is None else [position])[0]
+    
+    def add_many(
+        self,
+        vectors: Iterable[CoSDVector],
+        conversation_id: str = '',
+        positions: Optional[List[int]] = None
+    ) -> List[int]:
+        """
+        Fügt mehrere Vektoren eines Gesprächs hinzu.
+        
+        Args:
+            vectors: CoSDVector-Objekte in Gesprächsreihenfolge
+            conversation_id: Gespräch, zu dem die Vektoren gehören
+            positions: Positionen im Gespräch (Standard: fortlaufend)
+        
+        Returns:
+            IDs der Einträge
+        """
+        vectors = list(vectors)
+        if not vectors:
+            return []
+        with self._lock:
+            return self._add_many(vectors, conversation_id, positions)
+    
+    def _add_many(
+        self,
+        vectors: List[CoSDVector],
+        conversation_id: str,
+        positions: Optional[List[int]]
+    ) -> List[int]:
+        code = self._conversation_code(conversation_id)
+        members = self._conversation_members[code]
+        entry_positions: Iterable[int] = positions if positions is not None else range(
+            len(members), len(members) + len(vectors)
+        )
+        
+        start_id = len(self)
+        projected = np.zeros((len(vectors), self.projection_dim), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            indices, values = self._sparse_parts(vector)
+            norm = np.linalg.norm(values)
+            if norm > 0:
+                values = values / norm
+                sketch = values.astype(np.float32) @ self.projection[indices]
+                sketch_norm = np.linalg.norm(sketch)
+                if sketch_norm > 0:
+                    projected[row] = sketch / sketch_norm
+            self._indices.append(indices.astype(np.int32))
+            self._values.append(values.astype(np.float32))
+            self._indptr.append([len(self._indices)])
+        
+        ids = np.arange(start_id, start_id + len(vectors), dtype=np.int64)
+        self._projected.append(projected)
+        self._conversation_codes.append(np.full(len(vectors), code, dtype=np.int32))
+        self._positions.append(np.asarray(list(entry_positions), dtype=np.int32))
+        self._timestamps.append([_to_micros(vector.timestamp) for vector in vectors])
+        members.append(ids)
+        
+        if self.centroids is not None:
+            self._assign(ids, projected)
+        if len(self) >= max(self.train_threshold, 8 * self.trained_size) and len(self) >= 2:
+            self.train()
+        
+        self._unsaved += len(vectors)
+        if self.autosave_every and self.path and self._unsaved >= self.autosave_every:
+            self.save()
+        return ids.tolist()
+    
+    def train(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: int = 50000):
+        """
+        Trainiert die Listen-Zentren neu und ordnet alle Einträge zu.
+        
+        Args:
+            nlist: Anzahl Listen (Standard: 4 * sqrt(N))
+            iterations: k-Means-Iterationen
+            sample_size: Maximale Anzahl Trainingspunkte
+        """
+        count = len(self)
+        if count < 2:
+            return
+        nlist = nlist or int(np.clip(4 * np.sqrt(count), 1, 4096))
+        nlist = min(nlist, count)
+        
+        rng = np.random.default_rng(self.seed)
+        projected = self._projected.view
+        sample = projected[rng.choice(count, min(sample_size, count), replace=False)]
+        start = time.perf_counter()
+        self.centroids = _spherical_kmeans(np.ascontiguousarray(sample), nlist, iterations, rng)
+        
+        self._lists = {}
+        ids = np.arange(count, dtype=np.int64)
+        for block in range(0, count, 65536):
+            self._assign(ids[block:block + 65536], projected[block:block + 65536])
+        self.trained_size = count
+        logger.info(f"Vektor-Index mit {nlist} Listen über {count} Einträge trainiert "
+                    f"({time.perf_counter() - start:.2f} s)")
+    
+    def search(
+        self,
+        vector: CoSDVector,
+        k: int = 10,
+        conversation_id: Optional[str] = None,
+        exact: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Sucht die ähnlichsten indizierten Momente.
+        
+        Args:
+            vector: Anfrage-Vektor
+            k: Anzahl Treffer
+            conversation_id: Nur innerhalb dieses Gesprächs suchen
+            exact: Alle (gefilterten) Einträge exakt vergleichen
+        
+        Returns:
+            Liste von Treffern (id, similarity, conversation_id, position,
+            timestamp), absteigend nach Ähnlichkeit
+        """
+        query = self._query_dense(vector)
+        if query is None or k <= 0:
+            return []
+        with self._lock:
+            return self._search(query, k, conversation_id, exact)
+    
+    def _search(
+        self,
+        query: np.ndarray,
+        k: int,
+        conversation_id: Optional[str],
+        exact: bool
+    ) -> List[Dict[str, Any]]:
+        if not len(self):
+            return []
+        if conversation_id is not None:
+            code = self._conversation_lookup.get(conversation_id)
+            if code is None:
+                return []
+            members = self._conversation_members[code].view
+            if exact or self.centroids is None or len(members) <= self.exact_limit:
+                return self._rank(members, query, k)
+            return self._rank(self._candidates(query, k, code), query, k)
+        
+        if exact or self.centroids is None:
+            return self._rank(np.arange(len(self), dtype=np.int64), query, k)
+        return self._rank(self._candidates(query, k), query, k)
+    
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        Schreibt den Index als neues Segment und schaltet atomar darauf um.
+        
+        Das Segment enthält immer alle Einträge; die Kosten wachsen also mit
+        der Indexgröße, nicht mit der Zahl der neuen Einträge.
+        
+        Layout: <path>/CURRENT enthält den Namen des aktuellen Segments,
+        jedes Segment ist ein Verzeichnis mit meta.json und .npy-Dateien.
+        
+        Args:
+            path: Zielverzeichnis (Standard: self.path)
+        
+        Returns:
+            Pfad des geschriebenen Segments
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No index path configured")
+        with self._lock:
+            return self._save(path)
+    
+    def _save(self, path: Path) -> Path:
+        path.mkdir(parents=True, exist_ok=True)
+        
+        segment = path / f"segment-{time.time_ns()}-{os.getpid()}"
+        segment.mkdir()
+        for name, array in self._export_arrays().items():
+            np.save(segment / f"{name}.npy", np.ascontiguousarray(array))
+        if self.centroids is not None:
+            np.save(segment / 'centroids.npy', self.centroids)
+        (segment / 'meta.json').write_text(json.dumps({
+            'version': INDEX_FORMAT_VERSION,
+            'dimension_count': self.dimension_count,
+            'projection_dim': self.projection_dim,
+            'seed': self.seed,
+            'nprobe': self.nprobe,
+            'rerank_factor': self.rerank_factor,
+            'train_threshold': self.train_threshold,
+            'exact_limit': self.exact_limit,
+            'trained_size': self.trained_size,
+            'conversations': self.conversations
+        }), encoding='utf-8')
+        
+        current_tmp = path / f".CURRENT.{os.getpid()}.tmp"
+        current_tmp.write_text(segment.name, encoding='utf-8')
+        os.replace(current_tmp, path / 'CURRENT')
+        
+        # Alte Segmente entfernen (gemappte Dateien bleiben für Leser gültig)
+        for old in path.glob('segment-*'):
+            if old != segment:
+                shutil.rmtree(old, ignore_errors=True)
+        
+        self.path = path
+        self._unsaved = 0
+        return segment
+    
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True, **options) -> 'CoSDVectorIndex':
+        """
+        Lädt das aktuelle Segment eines Index-Verzeichnisses.
+        
+        Args:
+            path: Index-Verzeichnis
+            mmap: Arrays per mmap einblenden statt einzulesen
+            **options: Überschreibt Laufzeit-Parameter (nprobe, autosave_every, ...)
+        
+        Returns:
+            CoSDVectorIndex
+        """
+        path = Path(path)
+        segment = path / (path / 'CURRENT').read_text(encoding='utf-8').strip()
+        meta = json.loads((segment / 'meta.json').read_text(encoding='utf-8'))
+        if meta.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index version: {meta.get('version')}")
+        
+        settings = {
+            key: meta[key] for key in (
+                'projection_dim', 'seed', 'nprobe', 'rerank_factor', 'train_threshold', 'exact_limit'
+            )
+        }
+        settings.update(options)
+        index = cls(meta['dimension_count'], path=path, **settings)
+        
+        mode: Optional[Literal['r']] = 'r' if mmap else None
+        arrays = {name: np.load(segment / f"{name}.npy", mmap_mode=mode) for name in _ARRAYS}
+        index._projected = _GrowableArray(arrays['projected'])
+        index._indptr = _GrowableArray(arrays['indptr'])
+        index._indices = _GrowableArray(arrays['indices'])
+        index._values = _GrowableArray(arrays['values'])
+        index._conversation_codes = _GrowableArray(arrays['conversation_codes'])
+        index._positions = _GrowableArray(arrays['positions'])
+        index._timestamps = _GrowableArray(arrays['timestamps'])
+        
+        index.conversations = list(meta['conversations'])
+        index._conversation_lookup = {name: code for code, name in enumerate(index.conversations)}
+        codes = np.asarray(arrays['conversation_codes'])
+        order = np.argsort(codes, kind='stable')
+        offsets = np.searchsorted(codes[order], np.arange(len(index.conversations) + 1))
+        index._conversation_members = {
+            code: _GrowableArray(order[offsets[code]:offsets[code + 1]].astype(np.int64))
+            for code in range(len(index.conversations))
+        }
+        
+        if (segment / 'centroids.npy').exists():
+            index.centroids = np.load(segment / 'centroids.npy')
+            list_order, list_offsets = arrays['list_order'], arrays['list_offsets']
+            index._lists = {
+                number: _GrowableArray(list_order[list_offsets[number]:list_offsets[number + 1]])
+                for number in range(len(index.centroids))
+                if list_offsets[number + 1] > list_offsets[number]
+            }
+        index.trained_size = meta['trained_size']
+        return index
+    
+    @classmethod
+    def open(cls, path: Union[str, Path], dimension_count: int, **options) -> 'CoSDVectorIndex':
+        """
+        Lädt einen vorhandenen Index oder legt einen neuen an.
+        
+        Raises:
+            ValueError: Wenn der vorhandene Index eine andere Dimensionszahl hat
+        """
+        path = Path(path)
+        if (path / 'CURRENT').exists():
+            index = cls.load(path, **options)
+            if index.dimension_count != dimension_count:
+                raise ValueError(
+                    f"Vector index {path} has {index.dimension_count} dimensions, "
+                    f"expected {dimension_count}"
+                )
+            return index
+        options.pop('mmap', None)
+        return cls(dimension_count, path=path, **options)
+    
+    def _conversation_code(self, conversation_id: str) -> int:
+        code = self._conversation_lookup.get(conversation_id)
+        if code is None:
+            code = len(self.conversations)
+            self.conversations.append(conversation_id)
+            self._conversation_lookup[conversation_id] = code
+            self._conversation_members[code] = _empty(np.int64)
+        return code
+    
+    def _sparse_parts(self, vector: CoSDVector):
+        if isinstance(vector, SparseCoSDVector):
+            indices, values = vector.indices, vector.values
+        else:
+            indices = np.flatnonzero(vector.dimensions)
+            values = np.asarray(vector.dimensions)[indices]
+        if len(indices) and indices[-1] >= self.dimension_count:
+            raise ValueError(
+                f"Vector has more dimensions than the index ({self.dimension_count})"
+            )
+        return indices, np.asarray(values, dtype=np.float64)
+    
+    def _query_dense(self, vector: CoSDVector) -> Optional[np.ndarray]:
+        indices, values = self._sparse_parts(vector)
+        norm = np.linalg.norm(values)
+        if norm == 0:
+            return None
+        query = np.zeros(self.dimension_count)
+        query[indices] = values / norm
+        return query
+    
+    def _assign(self, ids: np.ndarray, projected: np.ndarray):
+        assert self.centroids is not None  # nur nach train()/load() aufgerufen
+        labels = np.argmax(projected @ self.centroids.T, axis=1)
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group):
+                number = int(labels[group[0]])
+                if number not in self._lists:
+                    self._lists[number] = _empty(np.int64)
+                self._lists[number].append(ids[group])
+    
+    def _candidates(self, query: np.ndarray, k: int, code: Optional[int] = None) -> np.ndarray:
+        """Einträge der nprobe nächsten Listen, nach Projektion vorsortiert."""
+        assert self.centroids is not None  # _search() prüft auf trainierte Listen
+        sketch = (query.astype(np.float32) @ self.projection)
+        sketch /= max(np.linalg.norm(sketch), 1e-12)
+        
+        probes = min(self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ sketch
+        nearest = np.argpartition(-centroid_scores, probes - 1)[:probes]
+        parts = [self._lists[int(number)].view for number in nearest if int(number) in self._lists]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(parts)
+        if code is not None:
+            candidates = candidates[self._conversation_codes.view[candidates] == code]
+        
+        keep = max(k * self.rerank_factor, k)
+        if len(candidates) > keep:
+            scores = self._projected.view[candidates] @ sketch
+            candidates = candidates[np.argpartition(-scores, keep - 1)[:keep]]
+        return candidates
+    
+    def _rank(self, ids: np.ndarray, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        """Exakte Kosinus-Ähnlichkeit über die dünnbesetzt gespeicherten Vektoren."""
+        if not len(ids):
+            return []
+        ids = np.asarray(ids, dtype=np.int64)
+        indptr = self._indptr.view
+        starts = indptr[ids]
+        lengths = indptr[ids + 1] - starts
+        total = int(lengths.sum())
+        
+        similarities: np.ndarray = np.zeros(len(ids))
+        if total:
+            first = np.cumsum(lengths) - lengths
+            offsets = np.repeat(starts - first, lengths) + np.arange(total)
+            products = self._values.view[offsets] * query[self._indices.view[offsets]]
+            similarities = np.bincount(np.repeat(np.arange(len(ids)), lengths), weights=products,
+                                       minlength=len(ids))
+        
+        top = min(k, len(ids))
+        best = np.argpartition(-similarities, top - 1)[:top]
+        best = best[np.lexsort((ids[best], -similarities[best]))]
+        
+        codes = self._conversation_codes.view
+        positions = self._positions.view
+        timestamps = self._timestamps.view
+        results = []
+        for row in best:
+            entry_id = int(ids[row])
+            micros = int(timestamps[entry_id])
+            results.append({
+                'id': entry_id,
+                'similarity': float(similarities[row]),
+                'conversation_id': self.conversations[codes[entry_id]],
+                'position': int(positions[entry_id]),
+                'timestamp': None if micros == np.iinfo(np.int64).min else
+                np.datetime64(micros, 'us').astype(datetime).isoformat()
+            })
+        return results
+    
+    def _export_arrays(self) -> Dict[str, np.ndarray]:
+        if self._lists:
+            assert self.centroids is not None  # Listen gibt es nur mit Zentren
+            numbers = range(len(self.centroids))
+            parts = [self._lists[number].view if number in self._lists else np.empty(0, dtype=np.int64)
+                     for number in numbers]
+            list_offsets = np.concatenate(([0], np.cumsum([len(part) for part in parts]))).astype(np.int64)
+            list_order = np.concatenate(parts).astype(np.int64)
+        else:
+            list_offsets = np.zeros(1, dtype=np.int64)
+            list_order = np.empty(0, dtype=np.int64)
+        return {
+            'projected': self._projected.view,
+            'indptr': self._indptr.view,
+            'indices': self._indices.view,
+            'values': self._values.view,
+            'conversation_codes': self._conversation_codes.view,
+            'positions': self._positions.view,
+            'timestamps': self._timestamps.view,
+            'list_order': list_order,
+            'list_offsets': list_offsets
+        }
@@ -156,6 +156,11 @@ class AggregationConfig(BaseModel):
         default=3,
         description="Fenster für Glättung"
     )
+    
+    correlation_max_lag: int = Field(
+        default=0,
+        description="Maximale Verschiebung in Perioden für Kreuzkorrelationen (0 = aus)"
+    )
 
 
 class HeatmapData(BaseModel):
@@ -218,6 +223,11 @@ class ComparisonData(BaseModel):
         None,
         description="Korrelationsmatrix zwischen Serien"
     )
+    
+    lagged_correlations: Optional[Dict[int, List[List[float]]]] = Field(
+        None,
+        description="Kreuzkorrelationen pro Verschiebung (Serie i zu t, Serie j zu t + lag)"
+    )
 
 
 class AggregationResult(BaseModel):
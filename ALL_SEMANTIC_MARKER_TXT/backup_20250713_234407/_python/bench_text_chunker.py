@@ -0,0 +1,143 @@
+"""Benchmark für die Chunk-Assemblierung des TextChunkers.
+
+Erzeugt einen synthetischen WhatsApp-Export (Standard: 1 Mio. Messages) und
+segmentiert ihn per chunk_stream() einmal mit dem bisherigen Verfahren
+(Größe pro Message neu summiert, alle Zeitstempel-Formate per strptime) und
+einmal mit laufenden Zählern und gelerntem Zeitstempel-Format.
+
+Aufruf als Modul aus dem Paket heraus, z.B.:
+    python -m <paket>.bench_text_chunker --messages 1000000
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .chunk_models import ChunkingConfig, TextChunk
+from .text_chunker import TextChunker
+
+
+class LegacyTextChunker(TextChunker):
+    """Bisheriges Verfahren als Vergleichsbasis."""
+
+    def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        for fmt in self.TIMESTAMP_FORMATS:
+            try:
+                return datetime.strptime(timestamp_str.strip(), fmt)
+            except ValueError:
+                continue
+        return None
+
+    def _group_messages(self, messages: Iterable[Dict[str, Any]]) -> Iterator[TextChunk]:
+        current_chunk_messages: List[Dict[str, Any]] = []
+        current_speaker = None
+        last_timestamp = None
+
+        for msg in messages:
+            need_new_chunk = False
+            if self.config.chunk_by_speaker and msg['speaker'] != current_speaker:
+                need_new_chunk = True
+            if (self.config.chunk_by_time and
+                last_timestamp and msg['timestamp'] and
+                (msg['timestamp'] - last_timestamp).total_seconds() > self.config.time_gap_minutes * 60):
+                need_new_chunk = True
+            current_size = sum(len(m['text']) for m in current_chunk_messages)
+            if current_size + len(msg['text']) > self.config.max_chunk_size:
+                need_new_chunk = True
+
+            if need_new_chunk and current_chunk_messages:
+                yield self._create_chunk_from_messages(current_chunk_messages)
+                current_chunk_messages = []
+
+            current_chunk_messages.append(msg)
+            current_speaker = msg['speaker']
+            last_timestamp = msg['timestamp']
+
+        if current_chunk_messages:
+            yield self._create_chunk_from_messages(current_chunk_messages)
+
+
+def write_export(path: str, messages: int, seed: int):
+    """Schreibt einen WhatsApp-Export mit gelegentlichen Folgezeilen und Sprecherserien."""
+    rng = random.Random(seed)
+    speakers = ["Anna", "Ben"]
+    words = "ich du wir ja nein okay bin raus gute nacht immer wegen dir hast eingebildet".split()
+    timestamp = datetime(2023, 1, 1, 8, 0)
+    speaker = speakers[0]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(messages):
+            timestamp += timedelta(minutes=rng.choice((0, 1, 1, 2, 5, 45)))
+            if rng.random() < 0.3:
+                speaker = rng.choice(speakers)
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(2, 25)))
+            f.write(f"{timestamp:%d.%m.%y, %H:%M} - {speaker}: {text}\n")
+            if rng.random() < 0.05:
+                f.write(" ".join(rng.choice(words) for _ in range(rng.randint(2, 10))) + "\n")
+
+
+def run(chunker: TextChunker, path: str) -> Tuple[float, int, str]:
+    """Segmentiert den Export und gibt (Sekunden, Chunks, Digest) zurück."""
+    digest = hashlib.sha256()
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunker.chunk_file(path, format_hint="whatsapp"):
+        digest.update(f"{chunk.start_pos}:{chunk.end_pos}:{chunk.timestamp}:{chunk.text}\n".encode('utf-8'))
+        count += 1
+    return time.perf_counter() - start, count, digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für die Chunk-Assemblierung')
+    parser.add_argument('--messages', type=int, default=1_000_000, help='Anzahl synthetischer Messages')
+    parser.add_argument('--max-chunk-size', type=int, default=1000, help='ChunkingConfig.max_chunk_size')
+    parser.add_argument('--no-speaker-split', action='store_true',
+                        help='chunk_by_speaker deaktivieren (längere Chunks)')
+    parser.add_argument('--skip-legacy', action='store_true', help='Nur das neue Verfahren messen')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    config = ChunkingConfig(
+        max_chunk_size=args.max_chunk_size,
+        chunk_by_speaker=not args.no_speaker_split
+    )
+
+    fd, path = tempfile.mkstemp(suffix='.txt', prefix='whatsapp_export_')
+    os.close(fd)
+    try:
+        write_export(path, args.messages, args.seed)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"Export: {args.messages} Messages, {size_mb:.1f} MiB")
+
+        variants = [('neu', TextChunker)]
+        if not args.skip_legacy:
+            variants.insert(0, ('legacy', LegacyTextChunker))
+
+        results = {}
+        print(f"{'Variante':<10} {'Chunks':>10} {'Zeit (s)':>10} {'Messages/s':>12}")
+        for name, chunker_class in variants:
+            seconds, count, digest = run(chunker_class(config), path)
+            results[name] = (seconds, digest)
+            print(f"{name:<10} {count:>10} {seconds:>10.2f} {args.messages / seconds:>12.0f}")
+
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"Peak RSS: {peak_mb:.1f} MiB")
+
+        if 'legacy' in results:
+            legacy_time, legacy_digest = results['legacy']
+            new_time, new_digest = results['neu']
+            print(f"Speedup: {legacy_time / new_time:.2f}x, identische Chunks: {legacy_digest == new_digest}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
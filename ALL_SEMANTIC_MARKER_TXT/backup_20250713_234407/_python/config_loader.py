@@ -1,14 +1,16 @@
 """Konfigurationslader für Marker-Definitionen aus verschiedenen Formaten."""
 
+import hashlib
 import json
 import yaml
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Union, Optional
+from typing import List, Dict, Any, Union, Optional, Tuple
 import logging
 from dataclasses import dataclass
 
 from ..matcher.marker_models import MarkerDefinition, MarkerPattern, MarkerCategory, MarkerSeverity
+from .marker_snapshot import SnapshotStore, source_digest
 
 
 logger = logging.getLogger(__name__)
@@ -23,10 +25,13 @@ class MarkerConfig:
     cache_enabled: bool = True
     fuzzy_matching_default: bool = True
     default_context_words: int = 10
+    snapshot_path: Optional[Path] = None  # Standard: <erstes Marker-Verzeichnis>/.markers.snapshot
     
     def __post_init__(self):
         if self.marker_directories is None:
             self.marker_directories = [Path("markers")]
+        if self.snapshot_path is None:
+            self.snapshot_path = self.marker_directories[0] / ".markers.snapshot"
 
 
 class MarkerLoader:
@@ -35,44 +40,89 @@ class MarkerLoader:
     def __init__(self, config: Optional[MarkerConfig] = None):
         self.config = config or MarkerConfig()
         self._markers: Dict[str, MarkerDefinition] = {}
-        self._file_cache: Dict[str, float] = {}  # Datei -> Zeitstempel
+        self._file_cache: Dict[str, Tuple[int, str]] = {}  # Datei -> (mtime_ns, SHA-256)
+        self._file_markers: Dict[str, List[MarkerDefinition]] = {}  # Datei -> geparste Marker
         
     def load_all_markers(self) -> Dict[str, MarkerDefinition]:
-        """Lädt alle Marker aus den konfigurierten Verzeichnissen."""
-        self._markers.clear()
+        """Lädt alle Marker aus den konfigurierten Verzeichnissen.
+        
+        Bei aktiviertem Cache wird der Binär-Snapshot verwendet, solange sich
+        keine Quelldatei geändert hat. Der Snapshot enthält die Marker je
+        Quelldatei, damit reload_if_changed() danach nur geänderte Dateien
+        neu parsen muss.
+        """
+        store = self._snapshot_store()
+        if store is None:
+            return self._load_from_sources()
         
+        files = self._source_files()
+        digest = source_digest(files)
+        payload = store.load(digest)
+        if isinstance(payload, dict) and isinstance(payload.get('files'), dict):
+            self._file_markers = payload['files']
+            self._file_cache = {f.as_posix(): self._file_state(f) for f in files}
+            self._rebuild_markers(files)
+            logger.info(f"Gesamt {len(self._markers)} Marker aus Snapshot geladen")
+            return self._markers
+        
+        self._load_from_sources()
+        store.save(digest, {'files': self._file_markers})
+        return self._markers
+    
+    def _snapshot_store(self) -> Optional[SnapshotStore]:
+        """Snapshot-Ablage; None bei deaktiviertem Cache oder ohne snapshot_path."""
+        if not self.config.cache_enabled or self.config.snapshot_path is None:
+            return None
+        return SnapshotStore(self.config.snapshot_path)
+    
+    def _source_files(self) -> List[Path]:
+        """Listet alle Marker-Quelldateien der konfigurierten Verzeichnisse (in Lade-Reihenfolge)."""
+        files = []
+        for directory in self.config.marker_directories:
+            if directory.exists():
+                for suffix in ("yaml", "json", "txt"):
+                    files.extend(sorted(directory.glob(f"*.{suffix}")))
+        return files
+    
+    def _load_from_sources(self) -> Dict[str, MarkerDefinition]:
+        """Parst alle Marker-Dateien neu."""
         for directory in self.config.marker_directories:
             if not directory.exists():
                 logger.warning(f"Marker-Verzeichnis existiert nicht: {directory}")
-                continue
-                
-            # YAML-Dateien
-            for yaml_file in directory.glob("*.yaml"):
-                try:
-                    markers = self.load_yaml_markers(yaml_file)
-                    self._merge_markers(markers)
-                except Exception as e:
-                    logger.error(f"Fehler beim Laden von {yaml_file}: {e}")
-            
-            # JSON-Dateien
-            for json_file in directory.glob("*.json"):
-                try:
-                    markers = self.load_json_markers(json_file)
-                    self._merge_markers(markers)
-                except Exception as e:
-                    logger.error(f"Fehler beim Laden von {json_file}: {e}")
-            
-            # TXT-Dateien (einfaches Format)
-            for txt_file in directory.glob("*.txt"):
-                try:
-                    markers = self.load_txt_markers(txt_file)
-                    self._merge_markers(markers)
-                except Exception as e:
-                    logger.error(f"Fehler beim Laden von {txt_file}: {e}")
+        
+        files = self._source_files()
+        self._file_markers = {}
+        self._file_cache = {}
+        for path in files:
+            self._load_file(path)
+        self._rebuild_markers(files)
         
         logger.info(f"Gesamt {len(self._markers)} Marker geladen")
         return self._markers
     
+    def _load_file(self, path: Path):
+        """Parst eine Quelldatei und merkt sich ihre Marker und ihren Stand (mtime, Hash)."""
+        key = path.as_posix()
+        loaders = {'.yaml': self.load_yaml_markers, '.json': self.load_json_markers, '.txt': self.load_txt_markers}
+        try:
+            self._file_cache[key] = self._file_state(path)
+            self._file_markers[key] = loaders[path.suffix](path)
+        except Exception as e:
+            logger.error(f"Fehler beim Laden von {path}: {e}")
+            self._file_markers[key] = []
+    
+    def _rebuild_markers(self, files: List[Path]):
+        """Setzt das Marker-Set aus den geparsten Dateien zusammen (spätere Dateien überschreiben)."""
+        self._markers.clear()
+        for path in files:
+            self._merge_markers(self._file_markers.get(path.as_posix(), []))
+    
+    @staticmethod
+    def _file_state(path: Path) -> Tuple[int, str]:
+        """Stand einer Quelldatei: (mtime_ns, SHA-256 des Inhalts)."""
+        mtime = path.stat().st_mtime_ns
+        return mtime, hashlib.sha256(path.read_bytes()).hexdigest()
+    
     def load_yaml_markers(self, filepath: Path) -> List[MarkerDefinition]:
         """Lädt Marker aus einer YAML-Datei."""
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -276,24 +326,44 @@ class MarkerLoader:
         return [m for m in self._markers.values() if m.active]
     
     def reload_if_changed(self) -> bool:
-        """Lädt Marker neu, wenn sich Dateien geändert haben."""
+        """Lädt geänderte, neue und entfernte Marker-Dateien neu.
+        
+        Eine Datei gilt als geändert, wenn sich ihre mtime und ihr Inhalt
+        (SHA-256) geändert haben; nur solche Dateien werden neu geparst.
+        """
         if not self.config.auto_reload:
             return False
         
-        changed = False
-        for directory in self.config.marker_directories:
-            if not directory.exists():
+        files = self._source_files()
+        current = {path.as_posix() for path in files}
+        changed = []
+        for path in files:
+            key = path.as_posix()
+            known = self._file_cache.get(key)
+            try:
+                if known is not None and known[0] == path.stat().st_mtime_ns:
+                    continue
+                state = self._file_state(path)
+            except OSError:
                 continue
-            
-            for file in directory.glob("*.{yaml,json,txt}"):
-                mtime = file.stat().st_mtime
-                if file.as_posix() not in self._file_cache or \
-                   self._file_cache[file.as_posix()] < mtime:
-                    changed = True
-                    break
+            if known is None or known[1] != state[1]:
+                changed.append(path)
+            else:
+                self._file_cache[key] = state  # nur angefasst
+        removed = [key for key in self._file_markers if key not in current]
         
-        if changed:
-            logger.info("Änderungen erkannt, lade Marker neu")
-            self.load_all_markers()
-            
-        return changed
\ No newline at end of file
+        if not changed and not removed:
+            return False
+        
+        logger.info(f"Änderungen erkannt: {len(changed)} Datei(en) neu geparst, {len(removed)} entfernt")
+        for key in removed:
+            self._file_markers.pop(key, None)
+            self._file_cache.pop(key, None)
+        for path in changed:
+            self._load_file(path)
+        self._rebuild_markers(files)
+        
+        store = self._snapshot_store()
+        if store is not None:
+            store.save(source_digest(files), {'files': self._file_markers})
+        return True
\ No newline at end of file
@@ -4,21 +4,31 @@ Marker API - REST-API für den Marker-basierten Textanalyse-Service
 Bietet Endpoints für Einzeltext- und Batch-Analyse
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from collections import OrderedDict
+from itertools import islice
+import atexit
+import cProfile
+import io
 import json
 import os
+import pstats
 import sys
+import threading
 
 # Importiere den Marker Matcher
+from marker_catalog import MARKER_LIST_FIELDS, MarkerCatalog
 from marker_matcher import MarkerMatcher, AnalysisResult
+from marker_reload import MarkerReloader
+from result_cache import ResultCache
 
 # Importiere CoSD Module
 try:
-    from cosd import CoSDAnalyzer
+    from cosd import CoSDAnalyzer, CoSDVectorIndex, StageMetrics, VectorCache
     COSD_AVAILABLE = True
 except ImportError:
     COSD_AVAILABLE = False
@@ -33,17 +43,61 @@ CORS(app)  # Enable CORS für Frontend-Integration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Globale Matcher-Instanz
+# Globale Matcher-Instanz (wird beim Hot-Reload atomar ersetzt)
 matcher = None
 cosd_analyzer = None
+reloader = None
+# Vorberechnete /markers-, /stats- und /marker/<name>-Antworten des aktuellen Marker-Satzes
+catalog = None
+
+# Hot-Reload: Prüfintervall der Marker-Datei in Sekunden (0 schaltet die Überwachung ab)
+MARKER_RELOAD_INTERVAL = float(os.environ.get('MARKER_RELOAD_INTERVAL', 5))
+
+# Parallele Batch-Analyse (Worker-Prozesse erben den kompilierten Marker-Satz)
+BATCH_WORKERS = int(os.environ.get('MARKER_BATCH_WORKERS', os.cpu_count() or 1))
+BATCH_CHUNK_SIZE = int(os.environ.get('MARKER_BATCH_CHUNK_SIZE', 32))
+
+# Ergebnis-Cache für /analyze und /analyze_batch (0 schaltet ihn ab; optional als SQLite-Datei,
+# von allen Workern geteilt). Schlüssel enthalten die Marker-Satz-Version.
+RESULT_CACHE_SIZE = int(os.environ.get('MARKER_RESULT_CACHE_SIZE', 10000))
+RESULT_CACHE_PATH = os.environ.get('MARKER_RESULT_CACHE_PATH')
+result_cache = ResultCache(RESULT_CACHE_SIZE, disk_path=RESULT_CACHE_PATH) if RESULT_CACHE_SIZE > 0 else None
+
+# Offene CoSD-Streaming-Sessions (bei Überlauf wird die am längsten ungenutzte verworfen).
+# Je Session ein eigenes Lock für append/snapshot/Export; cosd_sessions_lock schützt nur das Register.
+COSD_MAX_SESSIONS = int(os.environ.get('COSD_MAX_SESSIONS', 1000))
+cosd_sessions: 'OrderedDict[str, Tuple[Any, threading.Lock]]' = OrderedDict()
+cosd_sessions_lock = threading.Lock()
+
+# Vektor-Cache des CoSD-Analyzers (optional als SQLite-Datei, von allen Workern geteilt)
+COSD_VECTOR_CACHE_SIZE = int(os.environ.get('COSD_VECTOR_CACHE_SIZE', 10000))
+COSD_VECTOR_CACHE_PATH = os.environ.get('COSD_VECTOR_CACHE_PATH')
+
+# History-Index für ähnliche frühere Momente (Verzeichnis; ein schreibender Worker)
+COSD_HISTORY_INDEX_PATH = os.environ.get('COSD_HISTORY_INDEX_PATH')
+COSD_HISTORY_INDEX_AUTOSAVE = int(os.environ.get('COSD_HISTORY_INDEX_AUTOSAVE', 1000))
+
+# Laufzeiten je Pipeline-Phase; /metrics (Prometheus-Textformat) nur auf Wunsch
+COSD_METRICS_ENDPOINT = os.environ.get('COSD_METRICS_ENDPOINT', '0') == '1'
+cosd_metrics = StageMetrics() if COSD_AVAILABLE else None
+
+# cProfile für einzelne Anfragen (?profile=1), nur wenn ausdrücklich erlaubt
+COSD_PROFILING = os.environ.get('COSD_PROFILING', '0') == '1'
+COSD_PROFILE_DIR = os.environ.get('COSD_PROFILE_DIR')
+COSD_PROFILE_TOP = int(os.environ.get('COSD_PROFILE_TOP', 30))
+profiling_lock = threading.Lock()
 
 
 def initialize_matcher():
     """Initialisiert den Marker Matcher"""
-    global matcher, cosd_analyzer
+    global matcher, cosd_analyzer, reloader, catalog
     try:
-        matcher = MarkerMatcher()
+        matcher = MarkerMatcher(pool_workers=BATCH_WORKERS)
         logger.info("Marker Matcher erfolgreich initialisiert")
+        _invalidate_result_cache(matcher)
+        catalog = MarkerCatalog(matcher, dumps=_catalog_dumps)
+        reloader = MarkerReloader(matcher, interval=MARKER_RELOAD_INTERVAL, on_swap=_swap_matcher)
+        reloader.start()
         
         # Initialisiere CoSD wenn verfügbar
         if COSD_AVAILABLE:
@@ -57,6 +111,17 @@ def initialize_matcher():
                     marker_data_path=str(marker_path) if marker_path else None,
                     base_matcher=matcher
                 )
+                cosd_analyzer.vector_cache = VectorCache(
+                    max_entries=COSD_VECTOR_CACHE_SIZE,
+                    disk_path=COSD_VECTOR_CACHE_PATH
+                )
+                if COSD_HISTORY_INDEX_PATH:
+                    cosd_analyzer.history_index = CoSDVectorIndex.open(
+                        COSD_HISTORY_INDEX_PATH,
+                        cosd_analyzer.vectorizer.dimension_count,
+                        autosave_every=COSD_HISTORY_INDEX_AUTOSAVE
+                    )
+                    atexit.register(cosd_analyzer.history_index.save)
                 logger.info("CoSD Analyzer erfolgreich initialisiert")
             except Exception as e:
                 logger.warning(f"CoSD konnte nicht initialisiert werden: {e}")
@@ -67,13 +132,57 @@ def initialize_matcher():
         raise
 
 
+def _swap_matcher(new_matcher: MarkerMatcher):
+    """Setzt nach einem Reload den neuen Matcher ein (auch als Basis für CoSD)"""
+    global matcher, catalog
+    # Katalog vorab im Reload-Thread berechnen, damit keine Anfrage darauf wartet
+    catalog = MarkerCatalog(new_matcher, dumps=_catalog_dumps)
+    _invalidate_result_cache(new_matcher)
+    matcher = new_matcher
+    if cosd_analyzer:
+        cosd_analyzer.cosd_matcher.base_matcher = new_matcher
+        cosd_analyzer.vector_cache_namespace = cosd_analyzer._vector_cache_namespace()
+
+
+def _invalidate_result_cache(current: MarkerMatcher):
+    """Verwirft gecachte Ergebnisse anderer Marker-Satz-Versionen (einmal pro Laden)"""
+    if result_cache is not None and current.marker_set_version is not None:
+        result_cache.invalidate(current.marker_set_version)
+
+
+def _catalog_dumps(payload: Any) -> bytes:
+    """Serialisiert Katalog-Antworten wie jsonify (sortiert, kompakt)"""
+    return app.json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _current_catalog() -> MarkerCatalog:
+    """Katalog des aktuellen Matchers (wird nur bei Bedarf neu angelegt)"""
+    global catalog
+    current = catalog
+    if current is None or current.matcher is not matcher:
+        current = catalog = MarkerCatalog(matcher, dumps=_catalog_dumps)
+    return current
+
+
+def _cached_json(body: bytes, etag: str) -> Response:
+    """Liefert fertige JSON-Bytes mit ETag; bei passendem If-None-Match 304"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    # make_conditional passt die Antwort an Ort und Stelle an (304 ohne Body)
+    response.make_conditional(request)
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health Check Endpoint"""
+    current = matcher
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'markers_loaded': len(matcher.markers) if matcher else 0
+        'markers_loaded': len(current.markers) if current else 0,
+        'marker_set_version': current.marker_set_version if current else None
     })
 
 
@@ -94,14 +203,17 @@ def analyze_text():
         # Optional: Konfiguration
         config = data.get('config', {})
         
-        # Analysiere Text
-        result = matcher.analyze_text(text)
-        
-        # Konvertiere zu JSON-kompatiblem Format
-        response = result.to_dict()
+        # Analysiere Text (bzw. übernimm das Ergebnis aus dem Cache)
+        current = matcher
+        response = result_cache.get(text, current.marker_set_version) if result_cache is not None else None
+        cache_status = 'HIT' if response is not None else 'MISS'
+        if response is None:
+            response = current.analyze_text(text).to_dict()
+            if result_cache is not None:
+                result_cache.put(text, current.marker_set_version, response)
         response['status'] = 'success'
         
-        return jsonify(response)
+        return jsonify(response), 200, {'X-Cache': cache_status}
         
     except Exception as e:
         logger.error(f"Fehler bei der Analyse: {e}")
@@ -111,9 +223,19 @@ def analyze_text():
         }), 500
 
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
 @app.route('/analyze_batch', methods=['POST'])
 def analyze_batch():
-    """Analysiert mehrere Texte gleichzeitig"""
+    """Analysiert mehrere Texte gleichzeitig
+    
+    Mit Content-Type oder Accept application/x-ndjson wird das Ergebnis als
+    NDJSON gestreamt (siehe _stream_batch).
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        return _stream_batch(_read_ndjson_texts(request.stream), request.args)
+    
     try:
         data = request.get_json()
         
@@ -131,20 +253,21 @@ def analyze_batch():
                 'status': 'error'
             }), 400
         
-        # Analysiere alle Texte
-        results = []
-        for i, text in enumerate(texts):
-            try:
-                result = matcher.analyze_text(text)
-                result_dict = result.to_dict()
-                result_dict['index'] = i
-                results.append(result_dict)
-            except Exception as e:
-                results.append({
-                    'index': i,
-                    'error': str(e),
-                    'status': 'error'
-                })
+        # Optional: Batch-Konfiguration (Worker können nur reduziert werden)
+        config = data.get('config', {})
+        if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+            return _stream_batch(((text, None) for text in texts), config)
+        try:
+            workers, chunk_size = _batch_options(config)
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        # Analysiere alle Texte (Reihenfolge bleibt erhalten, Cache-Treffer werden übersprungen)
+        with reloader.lease() as current:
+            results = list(_analyze_items(current, ((text, None) for text in texts), workers, chunk_size))
         
         return jsonify({
             'status': 'success',
@@ -160,30 +283,169 @@ def analyze_batch():
         }), 500
 
 
+def _batch_options(config) -> Tuple[int, int]:
+    """Liest workers und chunk_size aus der Batch-Konfiguration
+    
+    workers wird auf BATCH_WORKERS begrenzt; es legt nur fest, wie viele
+    Blöcke die Anfrage gleichzeitig an den (festen) Prozess-Pool gibt.
+    
+    Raises:
+        ValueError: Konfiguration ist kein Objekt oder enthält keine positiven Zahlen
+    """
+    if not isinstance(config, dict):
+        raise ValueError('config muss ein Objekt sein')
+    try:
+        workers = int(config.get('workers', BATCH_WORKERS))
+        chunk_size = int(config.get('chunk_size', BATCH_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('workers und chunk_size müssen Zahlen sein')
+    if workers < 1 or chunk_size < 1:
+        raise ValueError('workers und chunk_size müssen mindestens 1 sein')
+    return min(workers, BATCH_WORKERS), chunk_size
+
+
+def _read_ndjson_texts(stream):
+    """Liest Texte zeilenweise aus einem NDJSON-Body (auch chunked übertragen)
+    
+    Jede Zeile ist ein JSON-String oder ein Objekt mit 'text'; Leerzeilen werden
+    übersprungen. Liefert (text, None) bzw. (None, Fehlermeldung) pro Eintrag.
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield None, f'Zeile {line_number}: kein gültiges JSON'
+            continue
+        if isinstance(item, dict):
+            item = item.get('text')
+        if not isinstance(item, str):
+            yield None, f'Zeile {line_number}: kein Text gefunden'
+            continue
+        yield item, None
+
+
+def _stream_batch(items, config):
+    """Analysiert (text, fehler)-Paare und streamt ein JSON-Objekt pro Zeile
+    
+    Jedes Ergebnis wird geschrieben, sobald es vorliegt (Format wie in
+    /analyze_batch, mit 'index'); die letzte Zeile enthält 'total_analyzed'.
+    Eingabe und Ausgabe werden nicht gesammelt, der Speicherbedarf hängt
+    nicht von der Batch-Größe ab.
+    """
+    try:
+        workers, chunk_size = _batch_options(config)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 400
+    
+    def generate():
+        index = 0
+        try:
+            # Blockweise, damit Cache-Treffer nicht beliebig weit vorauslesen;
+            # ein Reload während des Streams wirkt erst für die nächste Anfrage
+            with reloader.lease() as current:
+                for line in _analyze_items(current, items, workers, chunk_size,
+                                           block_size=2 * workers * chunk_size):
+                    yield _ndjson_line(line)
+                    index += 1
+            yield _ndjson_line({'status': 'success', 'total_analyzed': index})
+        except Exception as e:
+            logger.error(f"Fehler bei der gestreamten Batch-Analyse: {e}")
+            yield _ndjson_line({'error': str(e), 'status': 'error', 'total_analyzed': index})
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def _analyze_items(current: MarkerMatcher, items, workers: int, chunk_size: int,
+                   block_size: Optional[int] = None):
+    """Analysiert (text, fehler)-Paare und liefert die Ergebnis-Dicts in Eingabereihenfolge
+    
+    Einträge mit Fehler werden nicht analysiert, sondern als Fehler an ihrer
+    Position gemeldet. Treffer im Ergebnis-Cache gehen nicht an den Matcher.
+    Mit block_size wird die Eingabe in Blöcken dieser Größe gelesen.
+    """
+    version = current.marker_set_version
+    index = 0
+    for block in _blocks(items, block_size):
+        # None markiert Texte, die noch analysiert werden müssen
+        lines: List[Optional[Dict[str, Any]]] = []
+        misses = []
+        for text, error in block:
+            if error is not None:
+                lines.append({'error': error, 'status': 'error'})
+                continue
+            cached = result_cache.get(text, version) if result_cache is not None else None
+            lines.append(cached)
+            if cached is None:
+                misses.append(text)
+        
+        computed = current.iter_batch(misses, workers=workers, chunk_size=chunk_size, return_exceptions=True)
+        for line in lines:
+            if line is None:
+                result = next(computed)
+                if isinstance(result, Exception):
+                    line = {'error': str(result), 'status': 'error'}
+                else:
+                    line = result.to_dict()
+                    if result_cache is not None:
+                        result_cache.put(result.text, version, line)
+            line['index'] = index
+            index += 1
+            yield line
+
+
+def _blocks(items, block_size: Optional[int]):
+    """Zerlegt items in Listen der Länge block_size (ohne block_size: ein Block)"""
+    if block_size is None:
+        yield list(items)
+        return
+    iterator = iter(items)
+    while True:
+        block = list(islice(iterator, max(1, block_size)))
+        if not block:
+            return
+        yield block
+
+
+def _ndjson_line(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False) + '\n'
+
+
 @app.route('/markers', methods=['GET'])
 def get_markers():
-    """Gibt alle verfügbaren Marker zurück"""
+    """Gibt alle verfügbaren Marker zurück (optional seitenweise und mit Feldauswahl)"""
     try:
-        markers_list = []
-        
-        for marker_name, marker_data in matcher.markers.items():
-            markers_list.append({
-                'name': marker_name,
-                'beschreibung': marker_data.get('beschreibung', ''),
-                'kategorie': marker_data.get('kategorie', 'UNCATEGORIZED'),
-                'tags': marker_data.get('tags', []),
-                'risk_score': marker_data.get('risk_score', 1),
-                'beispiele_count': len(marker_data.get('beispiele', []))
-            })
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args['limit']) if 'limit' in request.args else None
+        except ValueError:
+            return jsonify({
+                'error': 'offset und limit müssen Zahlen sein',
+                'status': 'error'
+            }), 400
+        if offset < 0 or (limit is not None and limit < 0):
+            return jsonify({
+                'error': 'offset und limit dürfen nicht negativ sein',
+                'status': 'error'
+            }), 400
         
-        # Sortiere nach Namen
-        markers_list.sort(key=lambda x: x['name'])
+        fields = None
+        if 'fields' in request.args:
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in MARKER_LIST_FIELDS]
+            if unknown:
+                return jsonify({
+                    'error': f"Unbekannte Felder: {', '.join(unknown)} (erlaubt: {', '.join(MARKER_LIST_FIELDS)})",
+                    'status': 'error'
+                }), 400
         
-        return jsonify({
-            'status': 'success',
-            'markers': markers_list,
-            'total': len(markers_list)
-        })
+        body, etag = _current_catalog().markers_page(offset, limit, fields)
+        return _cached_json(body, etag)
         
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Marker: {e}")
@@ -198,19 +460,15 @@ def get_marker_details(marker_name):
     """Gibt Details zu einem spezifischen Marker zurück"""
     try:
         marker_name = marker_name.upper()
+        detail = _current_catalog().marker_detail(marker_name)
         
-        if marker_name not in matcher.markers:
+        if detail is None:
             return jsonify({
                 'error': f'Marker {marker_name} nicht gefunden',
                 'status': 'error'
             }), 404
         
-        marker_data = matcher.markers[marker_name]
-        
-        return jsonify({
-            'status': 'success',
-            'marker': marker_data
-        })
+        return _cached_json(*detail)
         
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Marker-Details: {e}")
@@ -224,33 +482,11 @@ def get_marker_details(marker_name):
 def get_statistics():
     """Gibt Statistiken über das Marker-System zurück"""
     try:
-        # Sammle Statistiken
-        categories = {}
-        total_examples = 0
-        markers_with_detectors = 0
-        
-        for marker_data in matcher.markers.values():
-            # Kategorien zählen
-            cat = marker_data.get('kategorie', 'UNCATEGORIZED')
-            categories[cat] = categories.get(cat, 0) + 1
-            
-            # Beispiele zählen
-            total_examples += len(marker_data.get('beispiele', []))
-            
-            # Detektoren zählen
-            if marker_data.get('semantics_detector'):
-                markers_with_detectors += 1
-        
-        return jsonify({
-            'status': 'success',
-            'statistics': {
-                'total_markers': len(matcher.markers),
-                'total_examples': total_examples,
-                'average_examples_per_marker': round(total_examples / len(matcher.markers), 2) if matcher.markers else 0,
-                'categories': categories,
-                'markers_with_semantic_detectors': markers_with_detectors
-            }
+        body, etag = _current_catalog().statistics_response({
+            'result_cache': result_cache.stats() if result_cache is not None else None,
+            'reload': reloader.stats() if reloader is not None else None
         })
+        return _cached_json(body, etag)
         
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Statistiken: {e}")
@@ -260,6 +496,15 @@ def get_statistics():
         }), 500
 
 
+@app.route('/reload', methods=['POST'])
+def reload_markers():
+    """Lädt den Marker-Satz sofort neu (laufende Anfragen beenden ihre Analyse auf dem alten Satz)"""
+    report = reloader.reload(['manuell'])
+    if report['status'] != 'success':
+        return jsonify(report), 500
+    return jsonify(report)
+
+
 @app.route('/api/cosd/analyze', methods=['POST'])
 def analyze_cosd():
     """Analysiert semantische Drift mit CoSD"""
@@ -295,18 +540,108 @@ def analyze_cosd():
         if 'drift_velocity_window' in config:
             cosd_analyzer.config['drift_velocity_window'] = config['drift_velocity_window']
         
-        # Führe CoSD-Analyse durch
-        result = cosd_analyzer.analyze_drift(texts)
+        # Führe CoSD-Analyse durch (mit conversation_id auch in den History-Index)
+        profile_request = request.args.get('profile') == '1' or data.get('profile') is True
+        if profile_request and not COSD_PROFILING:
+            return jsonify({
+                'error': 'Profiling ist deaktiviert (COSD_PROFILING=1 setzen)',
+                'status': 'error'
+            }), 403
+        
+        cprofile = None
+        if profile_request:
+            result, cprofile = _run_profiled(
+                cosd_analyzer.analyze_drift, texts, conversation_id=data.get('conversation_id')
+            )
+        else:
+            result = cosd_analyzer.analyze_drift(texts, conversation_id=data.get('conversation_id'))
+        cosd_metrics.record(result.profile)
         
         # Konvertiere zu JSON-kompatiblem Format
         response = result.to_dict()
         response['status'] = 'success'
         response['text_count'] = len(texts)
+        if cprofile is not None:
+            response['cprofile'] = cprofile
         
         return jsonify(response)
         
     except Exception as e:
         logger.error(f"Fehler bei der CoSD-Analyse: {e}")
+        cosd_metrics.record(error=True)
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+
+def _run_profiled(func, *args, **kwargs):
+    """Führt func unter cProfile aus und gibt (Ergebnis, Profil-Auszug) zurück"""
+    with profiling_lock:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+    
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(COSD_PROFILE_TOP)
+    cprofile = {'top_cumulative': stream.getvalue()}
+    
+    if COSD_PROFILE_DIR:
+        os.makedirs(COSD_PROFILE_DIR, exist_ok=True)
+        path = os.path.join(COSD_PROFILE_DIR, f"cosd-{datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+        profiler.dump_stats(path)
+        cprofile['dump_path'] = path
+    return result, cprofile
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Laufzeiten und Zähler der CoSD-Pipeline im Prometheus-Textformat"""
+    if not COSD_METRICS_ENDPOINT or cosd_metrics is None:
+        return jsonify({
+            'error': 'Metrics-Endpoint ist deaktiviert (COSD_METRICS_ENDPOINT=1 setzen)',
+            'status': 'error'
+        }), 404
+    
+    body = cosd_metrics.to_prometheus()
+    if cosd_analyzer:
+        cache = cosd_analyzer.vector_cache.stats()
+        body += "# HELP cosd_vector_cache_lookups_total Zugriffe auf den CoSD-Vektor-Cache\n"
+        body += "# TYPE cosd_vector_cache_lookups_total counter\n"
+        for outcome in ('hits', 'disk_hits', 'misses'):
+            body += f'cosd_vector_cache_lookups_total{{outcome="{outcome}"}} {cache[outcome]}\n'
+        body += "# HELP cosd_vector_cache_entries Einträge im Speicher-Tier des Vektor-Caches\n"
+        body += "# TYPE cosd_vector_cache_entries gauge\n"
+        body += f"cosd_vector_cache_entries {cache['entries']}\n"
+    
+    return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/cosd/similar', methods=['POST'])
+def similar_cosd_moments():
+    """Sucht die semantisch ähnlichsten früheren Momente im History-Index"""
+    if not cosd_analyzer or cosd_analyzer.history_index is None:
+        return jsonify({
+            'error': 'CoSD-History-Index nicht verfügbar',
+            'status': 'error'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('text'), str):
+        return jsonify({
+            'error': 'Kein Text für die Suche gefunden',
+            'status': 'error'
+        }), 400
+    
+    try:
+        k = int(data.get('k', 5))
+        matches = cosd_analyzer.find_similar_moments(data['text'], k, data.get('conversation_id'))
+        return jsonify({
+            'matches': matches,
+            'indexed_vectors': len(cosd_analyzer.history_index),
+            'status': 'success'
+        })
+    except Exception as e:
+        logger.error(f"Fehler bei der Ähnlichkeitssuche: {e}")
         return jsonify({
             'error': str(e),
             'status': 'error'
@@ -320,10 +655,146 @@ def cosd_status():
         'available': cosd_analyzer is not None,
         'version': '1.0.0' if cosd_analyzer else None,
         'config': cosd_analyzer.config if cosd_analyzer else None,
+        'vector_cache': cosd_analyzer.vector_cache.stats() if cosd_analyzer else None,
+        'history_index_size': len(cosd_analyzer.history_index) if cosd_analyzer and cosd_analyzer.history_index is not None else None,
         'status': 'active' if cosd_analyzer else 'unavailable'
     })
 
 
+def _get_cosd_session(session_id: str):
+    """Gibt (Session, Session-Lock) zurück und markiert die Session als zuletzt genutzt"""
+    with cosd_sessions_lock:
+        entry = cosd_sessions.get(session_id)
+        if entry is not None:
+            cosd_sessions.move_to_end(session_id)
+        return entry
+
+
+@app.route('/api/cosd/session', methods=['POST'])
+def open_cosd_session():
+    """Öffnet eine Streaming-Session oder setzt einen exportierten Zustand fort"""
+    if not cosd_analyzer:
+        return jsonify({
+            'error': 'CoSD-Modul nicht verfügbar',
+            'status': 'error'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        session = cosd_analyzer.open_session(
+            session_id=data.get('session_id'),
+            state=data.get('state')
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'error': f'Ungültiger Session-Zustand: {e}',
+            'status': 'error'
+        }), 400
+    
+    with cosd_sessions_lock:
+        cosd_sessions[session.session_id] = (session, threading.Lock())
+        cosd_sessions.move_to_end(session.session_id)
+        while len(cosd_sessions) > COSD_MAX_SESSIONS:
+            cosd_sessions.popitem(last=False)
+    
+    return jsonify({
+        'session_id': session.session_id,
+        'message_count': session.count,
+        'status': 'success'
+    }), 201
+
+
+@app.route('/api/cosd/session/<session_id>/append', methods=['POST'])
+def append_cosd_session(session_id):
+    """Nimmt eine neue Nachricht in eine Session auf"""
+    entry = _get_cosd_session(session_id)
+    if entry is None:
+        return jsonify({
+            'error': f'Session {session_id} nicht gefunden',
+            'status': 'error'
+        }), 404
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('text'), str):
+        return jsonify({
+            'error': 'Kein Text zum Anhängen gefunden',
+            'status': 'error'
+        }), 400
+    
+    try:
+        timestamp = datetime.fromisoformat(data['timestamp']) if data.get('timestamp') else None
+    except (TypeError, ValueError):
+        return jsonify({
+            'error': 'Ungültiger Zeitstempel (ISO 8601 erwartet)',
+            'status': 'error'
+        }), 400
+    
+    session, session_lock = entry
+    try:
+        with session_lock:
+            result = session.append(data['text'], timestamp)
+            if data.get('snapshot'):
+                result['snapshot'] = session.snapshot()
+        result['status'] = 'success'
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Fehler beim Anhängen an Session {session_id}: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+
+@app.route('/api/cosd/session/<session_id>', methods=['GET'])
+def get_cosd_session(session_id):
+    """Gibt den aktuellen Analyse-Stand einer Session zurück"""
+    entry = _get_cosd_session(session_id)
+    if entry is None:
+        return jsonify({
+            'error': f'Session {session_id} nicht gefunden',
+            'status': 'error'
+        }), 404
+    
+    session, session_lock = entry
+    with session_lock:
+        response = session.snapshot()
+    response['status'] = 'success'
+    return jsonify(response)
+
+
+@app.route('/api/cosd/session/<session_id>/state', methods=['GET'])
+def export_cosd_session(session_id):
+    """Exportiert den Session-Zustand zum späteren Fortsetzen"""
+    entry = _get_cosd_session(session_id)
+    if entry is None:
+        return jsonify({
+            'error': f'Session {session_id} nicht gefunden',
+            'status': 'error'
+        }), 404
+    
+    session, session_lock = entry
+    with session_lock:
+        state = session.to_dict()
+    return jsonify({
+        'state': state,
+        'status': 'success'
+    })
+
+
+@app.route('/api/cosd/session/<session_id>', methods=['DELETE'])
+def close_cosd_session(session_id):
+    """Schließt eine Session"""
+    with cosd_sessions_lock:
+        entry = cosd_sessions.pop(session_id, None)
+    if entry is None:
+        return jsonify({
+            'error': f'Session {session_id} nicht gefunden',
+            'status': 'error'
+        }), 404
+    
+    return jsonify({'session_id': session_id, 'status': 'success'})
+
+
 # Beispiel-HTML für die API-Dokumentation
 @app.route('/', methods=['GET'])
 def index():
@@ -362,12 +833,20 @@ def index():
         <div class="endpoint">
             <span class="method post">POST</span> <code>/analyze_batch</code>
             <p>Analysiert mehrere Texte gleichzeitig</p>
-            <pre>Body: { "texts": ["Text 1", "Text 2", ...] }</pre>
+            <pre>Body: { "texts": ["Text 1", "Text 2", ...], "config": { "workers": 4, "chunk_size": 32 } }</pre>
+            <p>Streaming: mit <code>Content-Type: application/x-ndjson</code> (eine Zeile pro Text, auch chunked;
+            Konfiguration per <code>?workers=4&amp;chunk_size=32</code>) oder <code>Accept: application/x-ndjson</code>
+            kommt ein Ergebnis pro Zeile, sobald es vorliegt; die letzte Zeile enthält <code>total_analyzed</code>.</p>
+            <pre>Body (NDJSON): "Text 1"
+{"text": "Text 2"}</pre>
         </div>
         
         <div class="endpoint">
             <span class="method get">GET</span> <code>/markers</code>
-            <p>Listet alle verfügbaren Marker auf</p>
+            <p>Listet alle verfügbaren Marker auf; optional seitenweise und mit Feldauswahl</p>
+            <pre>/markers?offset=0&amp;limit=20&amp;fields=name,kategorie,risk_score</pre>
+            <p><code>/markers</code>, <code>/marker/{marker_name}</code> und <code>/stats</code> werden pro Marker-Satz
+            vorberechnet und mit ETag ausgeliefert (<code>If-None-Match</code> ergibt 304)</p>
         </div>
         
         <div class="endpoint">
@@ -377,7 +856,16 @@ def index():
         
         <div class="endpoint">
             <span class="method get">GET</span> <code>/stats</code>
-            <p>Zeigt Statistiken über das Marker-System</p>
+            <p>Zeigt Statistiken über das Marker-System inkl. Trefferquote des Ergebnis-Caches
+            (<code>MARKER_RESULT_CACHE_SIZE</code>, optional geteilt über <code>MARKER_RESULT_CACHE_PATH</code>)
+            und des letzten Marker-Reloads</p>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method post">POST</span> <code>/reload</code>
+            <p>Lädt den Marker-Satz sofort neu und meldet Dauer sowie neue, geänderte und entfernte Marker.
+            Die Marker-Datei wird außerdem alle <code>MARKER_RELOAD_INTERVAL</code> Sekunden auf Änderungen
+            geprüft (0 = aus); laufende Anfragen beenden ihre Analyse auf dem bisherigen Satz.</p>
         </div>
         
         <h2>CoSD-Endpoints (Co-emergent Semantic Drift):</h2>
@@ -386,11 +874,39 @@ def index():
             <span class="method post">POST</span> <code>/api/cosd/analyze</code>
             <p>Analysiert semantische Drift in einer Textsequenz</p>
             <pre>Body: { "texts": ["Text 1", "Text 2", ...], "config": {...} }</pre>
+            <p>Die Antwort enthält unter <code>profile</code> Laufzeiten je Phase und Zähler; mit <code>?profile=1</code> (COSD_PROFILING=1) zusätzlich einen cProfile-Auszug</p>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method get">GET</span> <code>/metrics</code>
+            <p>Phasen-Laufzeiten und Zähler der CoSD-Pipeline im Prometheus-Textformat (COSD_METRICS_ENDPOINT=1)</p>
         </div>
         
         <div class="endpoint">
             <span class="method get">GET</span> <code>/api/cosd/status</code>
-            <p>Zeigt Status und Konfiguration des CoSD-Moduls</p>
+            <p>Zeigt Status, Konfiguration und Vektor-Cache-Zähler des CoSD-Moduls</p>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method post">POST</span> <code>/api/cosd/similar</code>
+            <p>Sucht die ähnlichsten früheren Momente (text, k, optional conversation_id; benötigt COSD_HISTORY_INDEX_PATH)</p>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method post">POST</span> <code>/api/cosd/session</code>
+            <p>Öffnet eine Streaming-Session (optional mit exportiertem Zustand)</p>
+            <pre>Body: { "session_id": "...", "state": {...} }</pre>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method post">POST</span> <code>/api/cosd/session/{session_id}/append</code>
+            <p>Hängt eine Nachricht an und aktualisiert die Drift-Metriken inkrementell</p>
+            <pre>Body: { "text": "Neue Nachricht", "timestamp": "2025-01-01T12:00:00", "snapshot": false }</pre>
+        </div>
+        
+        <div class="endpoint">
+            <span class="method get">GET</span> <code>/api/cosd/session/{session_id}</code>
+            <p>Aktueller Analyse-Stand der Session; <code>/state</code> exportiert den Zustand, DELETE schließt sie</p>
         </div>
         
         <h2>Risk-Level Farbcodierung:</h2>
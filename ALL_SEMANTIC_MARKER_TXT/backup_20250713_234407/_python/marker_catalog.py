@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Marker Catalog - Vorberechnete Katalog-Antworten der Marker API
+/markers, /stats und /marker/<name> werden einmal pro Marker-Satz berechnet
+und als fertig serialisierte JSON-Bytes mit ETag vorgehalten
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Felder eines Eintrags in /markers (auswählbar per ?fields=...)
+MARKER_LIST_FIELDS = ('name', 'beschreibung', 'kategorie', 'tags', 'risk_score', 'beispiele_count')
+
+# Serialisierte /markers-Varianten (Seite, Felder) pro Marker-Satz
+MAX_LIST_VARIANTS = 64
+
+
+def compact_dumps(payload: Any) -> bytes:
+    """Serialisiert wie jsonify außerhalb des Debug-Modus (sortiert, kompakt)"""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def etag_for(body: bytes) -> str:
+    """Starker ETag aus dem Inhalt"""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class MarkerCatalog:
+    """Katalog-Sichten eines Marker-Satzes
+
+    Liste, Statistik und Detail-Antworten hängen nur vom Marker-Satz ab und
+    werden deshalb für jeden Matcher genau einmal berechnet; beim Reload wird
+    ein neuer Katalog angelegt. Details und abweichende /markers-Varianten
+    entstehen beim ersten Zugriff und werden danach wiederverwendet.
+    """
+
+    def __init__(self, matcher, dumps: Callable[[Any], bytes] = compact_dumps):
+        self.matcher = matcher
+        self.marker_set_version = matcher.marker_set_version
+        self.dumps = dumps
+        self._lock = threading.Lock()
+        self._details: Dict[str, Tuple[bytes, str]] = {}
+        self._variants: 'OrderedDict[Tuple, Tuple[bytes, str]]' = OrderedDict()
+
+        self.marker_list = self._build_marker_list()
+        self.statistics = self._build_statistics()
+        self.markers_body = self.dumps({
+            'status': 'success',
+            'markers': self.marker_list,
+            'total': len(self.marker_list)
+        })
+        self.markers_etag = etag_for(self.markers_body)
+        self.statistics_body = self.dumps(self.statistics)
+
+    def markers_page(self, offset: int = 0, limit: Optional[int] = None,
+                     fields: Optional[Sequence[str]] = None) -> Tuple[bytes, str]:
+        """/markers-Antwort für einen Ausschnitt und/oder eine Feldauswahl
+
+        Ohne Parameter wird die vorberechnete Gesamtliste geliefert.
+        """
+        if offset == 0 and limit is None and fields is None:
+            return self.markers_body, self.markers_etag
+
+        key = (offset, limit, tuple(fields) if fields is not None else None)
+        with self._lock:
+            cached = self._variants.get(key)
+            if cached is not None:
+                self._variants.move_to_end(key)
+                return cached
+
+        page = self.marker_list[offset:offset + limit if limit is not None else None]
+        if fields is not None:
+            page = [{field: entry[field] for field in fields} for entry in page]
+        payload = {
+            'status': 'success',
+            'markers': page,
+            'total': len(self.marker_list),
+            'offset': offset,
+            'limit': limit
+        }
+        body = self.dumps(payload)
+        variant = (body, etag_for(body))
+        with self._lock:
+            self._variants[key] = variant
+            while len(self._variants) > MAX_LIST_VARIANTS:
+                self._variants.popitem(last=False)
+        return variant
+
+    def statistics_response(self, runtime: Dict[str, Any]) -> Tuple[bytes, str]:
+        """/stats-Antwort: vorberechnete Statistik plus Laufzeitwerte (Caches, Reload)
+
+        Nur runtime wird pro Anfrage serialisiert; die Statistik wird als
+        fertige Bytes eingesetzt. Die Schlüssel bleiben sortiert wie bei jsonify.
+        """
+        parts = {key: self.dumps(value) for key, value in runtime.items()}
+        parts['statistics'] = self.statistics_body
+        parts['status'] = self.dumps('success')
+        body = b'{' + b','.join(self.dumps(key) + b':' + parts[key] for key in sorted(parts)) + b'}'
+        return body, etag_for(body)
+
+    def marker_detail(self, marker_name: str) -> Optional[Tuple[bytes, str]]:
+        """/marker/<name>-Antwort oder None, falls der Marker fehlt"""
+        cached = self._details.get(marker_name)
+        if cached is not None:
+            return cached
+        marker_data = self.matcher.markers.get(marker_name)
+        if marker_data is None:
+            return None
+        body = self.dumps({'status': 'success', 'marker': marker_data})
+        detail = (body, etag_for(body))
+        self._details[marker_name] = detail
+        return detail
+
+    def _build_marker_list(self) -> List[Dict[str, Any]]:
+        markers_list = [
+            {
+                'name': marker_name,
+                'beschreibung': marker_data.get('beschreibung', ''),
+                'kategorie': marker_data.get('kategorie', 'UNCATEGORIZED'),
+                'tags': marker_data.get('tags', []),
+                'risk_score': marker_data.get('risk_score', 1),
+                'beispiele_count': len(marker_data.get('beispiele', []))
+            }
+            for marker_name, marker_data in self.matcher.markers.items()
+        ]
+        markers_list.sort(key=lambda x: x['name'])
+        return markers_list
+
+    def _build_statistics(self) -> Dict[str, Any]:
+        markers = self.matcher.markers
+        categories: Dict[str, int] = {}
+        total_examples = 0
+        markers_with_detectors = 0
+
+        for marker_data in markers.values():
+            cat = marker_data.get('kategorie', 'UNCATEGORIZED')
+            categories[cat] = categories.get(cat, 0) + 1
+            total_examples += len(marker_data.get('beispiele', []))
+            if marker_data.get('semantics_detector'):
+                markers_with_detectors += 1
+
+        return {
+            'total_markers': len(markers),
+            'total_examples': total_examples,
+            'average_examples_per_marker': round(total_examples / len(markers), 2) if markers else 0,
+            'categories': categories,
+            'markers_with_semantic_detectors': markers_with_detectors,
+            'semantic_patterns_compiled': len(self.matcher.semantic_patterns),
+            'semantic_pattern_errors': len(self.matcher.semantic_patterns.errors),
+            'marker_set_version': self.marker_set_version
+        }
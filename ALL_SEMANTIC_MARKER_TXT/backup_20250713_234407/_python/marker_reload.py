@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Marker Reload - Hot-Reload des Marker-Satzes ohne Neustart
+Überwacht die Marker-Datei des Matchers (mtime + Content-Hash), baut bei
+Änderungen im Hintergrund einen neuen Matcher und tauscht ihn atomar aus
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from marker_matcher import MarkerMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 über den Dateiinhalt"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MarkerReloader:
+    """Hält den aktuellen Matcher und ersetzt ihn, sobald sich Quellen ändern
+
+    Anfragen holen sich den Matcher per lease() und arbeiten bis zum Ende mit
+    diesem Objekt, auch wenn währenddessen ein neuer Matcher eingesetzt wird.
+    Der Prozess-Pool eines abgelösten Matchers wird erst geschlossen, wenn
+    keine Anfrage ihn mehr hält.
+
+    Eine Datei gilt nur dann als geändert, wenn sich mtime oder Größe und
+    zusätzlich der Content-Hash geändert haben; bloßes Anfassen löst keinen
+    Reload aus. Geladen wird erst, wenn die Änderung über ein Prüfintervall
+    stabil geblieben ist, damit halb geschriebene Dateien nicht geladen werden.
+    """
+
+    def __init__(self, matcher: MarkerMatcher, interval: float = 0.0,
+                 on_swap: Optional[Callable[[MarkerMatcher], None]] = None):
+        self.interval = interval
+        self.on_swap = on_swap
+        self.path = Path(matcher.marker_file)
+
+        self._matcher = matcher
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, MarkerMatcher] = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._files: Dict[str, Tuple[int, int, str]] = self._scan({})
+        self._pending: Optional[Dict[str, Tuple[int, int, str]]] = None
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_reload: Optional[Dict[str, Any]] = None
+
+    @property
+    def matcher(self) -> MarkerMatcher:
+        """Aktueller Matcher (für kurze, einmalige Zugriffe)"""
+        return self._matcher
+
+    @contextmanager
+    def lease(self) -> Iterator[MarkerMatcher]:
+        """Hält den aktuellen Matcher für die Dauer einer Anfrage"""
+        with self._lock:
+            current = self._matcher
+            self._leases[id(current)] = self._leases.get(id(current), 0) + 1
+        try:
+            yield current
+        finally:
+            with self._lock:
+                remaining = self._leases[id(current)] - 1
+                if remaining:
+                    self._leases[id(current)] = remaining
+                else:
+                    del self._leases[id(current)]
+                retired = self._retired.pop(id(current), None) if not remaining else None
+            if retired is not None:
+                retired.close_pool()
+
+    def start(self):
+        """Startet die Überwachung im Hintergrund (nur bei interval > 0)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name='marker-reload', daemon=True)
+        self._thread.start()
+        logger.info(f"Marker-Hot-Reload aktiv: {self.path} (alle {self.interval:g} s)")
+
+    def stop(self):
+        """Beendet die Überwachung"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """Lädt neu, falls sich Quellen geändert haben; gibt dann den Reload-Bericht zurück"""
+        current = self._scan(self._files)
+        changed = sorted(
+            path for path in set(current) | set(self._files)
+            if current.get(path, (0, 0, None))[2] != self._files.get(path, (0, 0, None))[2]
+        )
+        if not changed:
+            # Nur angefasst: neue mtime merken, damit nicht jedes Mal neu gehasht wird
+            self._files = current
+            self._pending = None
+            return None
+        if current != self._pending:
+            # Erst beim nächsten Durchlauf laden, falls die Datei noch geschrieben wird
+            self._pending = current
+            return None
+        self._pending = None
+        logger.info(f"Änderungen an Marker-Quellen erkannt: {', '.join(changed)}")
+        return self.reload(changed)
+
+    def reload(self, changed_files: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Baut einen neuen Matcher und setzt ihn atomar ein
+
+        Schlägt der Aufbau fehl, bleibt der bisherige Matcher aktiv und der
+        Fehler steht im Bericht.
+        """
+        with self._reload_lock:
+            files = self._scan(self._files)
+            previous = self._matcher
+            start = time.perf_counter()
+            report: Dict[str, Any] = {
+                'timestamp': datetime.now().isoformat(),
+                'changed_files': changed_files or [],
+                'previous_version': previous.marker_set_version
+            }
+            try:
+                new_matcher = previous.reload()
+            except Exception as e:
+                self.failed_reloads += 1
+                report.update({
+                    'status': 'error',
+                    'error': str(e),
+                    'duration_ms': round((time.perf_counter() - start) * 1000.0, 1)
+                })
+                self.last_reload = report
+                logger.error(f"Marker-Reload fehlgeschlagen, bisheriger Satz bleibt aktiv: {e}")
+                return report
+
+            # Noch verliehene Matcher schließt erst die letzte Rückgabe
+            to_close: Optional[MarkerMatcher] = previous
+            with self._lock:
+                self._matcher = new_matcher
+                self._files = files
+                if self._leases.get(id(previous)):
+                    self._retired[id(previous)] = previous
+                    to_close = None
+            if to_close is not None:
+                to_close.close_pool()
+            if self.on_swap is not None:
+                self.on_swap(new_matcher)
+
+            self.reloads += 1
+            report.update(new_matcher.reload_report or {})
+            report.update({
+                'status': 'success',
+                'marker_set_version': new_matcher.marker_set_version,
+                'markers_loaded': len(new_matcher.markers),
+                'duration_ms': round((time.perf_counter() - start) * 1000.0, 1)
+            })
+            self.last_reload = report
+            logger.info(
+                f"Marker neu geladen in {report['duration_ms']} ms: Version {report['previous_version']} -> "
+                f"{report['marker_set_version']}, {len(report.get('added', []))} neu, "
+                f"{len(report.get('changed', []))} geändert, {len(report.get('removed', []))} entfernt"
+            )
+            return report
+
+    def stats(self) -> Dict[str, Any]:
+        """Stand der Überwachung und letzter Reload"""
+        return {
+            'watching': self._thread is not None,
+            'interval': self.interval,
+            'path': str(self.path),
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_reload': self.last_reload
+        }
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Fehler bei der Überwachung der Marker-Quellen: {e}")
+
+    def _scan(self, known: Dict[str, Tuple[int, int, str]]) -> Dict[str, Tuple[int, int, str]]:
+        """Ermittelt (mtime_ns, Größe, Hash) aller überwachten Dateien
+
+        Der Hash wird nur neu berechnet, wenn sich mtime oder Größe geändert haben.
+        """
+        files = {}
+        for path in self._source_files():
+            key = path.as_posix()
+            try:
+                stat = path.stat()
+                previous = known.get(key)
+                if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                    files[key] = previous
+                else:
+                    files[key] = (stat.st_mtime_ns, stat.st_size, file_digest(path))
+            except OSError:
+                continue
+        return files
+
+    def _source_files(self) -> List[Path]:
+        return [self.path] if self.path.exists() else []
@@ -2,7 +2,7 @@
 
 import logging
 import time
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Any, Sequence, Union
 from collections import defaultdict
 from datetime import datetime
 import numpy as np
@@ -17,6 +17,158 @@ from ..chunker.chunk_models import TextChunk
 logger = logging.getLogger(__name__)
 
 
+class MatchMatrix:
+    """Sparse Chunk × (Kategorie, Severity)-Matrix aller Marker-Matches.
+    
+    Die Matrix liegt im COO-Format vor: pro Match eine Zeile (Chunk), ein
+    Feature (Kategorie × Severity) sowie Marker-Gewicht und Konfidenz. Ein
+    Scoring-Modell ist eine Spalte der Feature-Gewichtsmatrix
+    (Kategorie-Gewicht × Severity-Multiplikator). Die Beiträge aller Matches
+    zu allen Modellen entstehen in einem Schritt; summiert wird pro Modell mit
+    np.bincount über die Zeilen. Die Einträge werden nicht zusammengefasst,
+    damit die Summen in derselben Reihenfolge wie im Loop-Modus gebildet
+    werden und identische Werte liefern.
+    """
+    
+    CATEGORIES = list(MarkerCategory)
+    SEVERITIES = list(MarkerSeverity)
+    
+    def __init__(self, chunks: Sequence[TextChunk], matches: Sequence[MarkerMatch]):
+        # Zeilen = eindeutige Chunk-IDs in Reihenfolge ihres ersten Auftretens
+        self.row_of: Dict[str, int] = {}
+        for chunk in chunks:
+            self.row_of.setdefault(chunk.id, len(self.row_of))
+        
+        category_index = {c: i for i, c in enumerate(self.CATEGORIES)}
+        severity_index = {s: i for i, s in enumerate(self.SEVERITIES)}
+        severity_count = len(self.SEVERITIES)
+        
+        self.matches = [m for m in matches if m.chunk_id in self.row_of]
+        
+        rows, categories, features, marker_weights, confidences = [], [], [], [], []
+        for match in self.matches:
+            category = category_index[match.category]
+            rows.append(self.row_of[match.chunk_id])
+            categories.append(category)
+            features.append(category * severity_count + severity_index[match.severity])
+            marker_weights.append(match.metadata.get('weight', 1.0))
+            confidences.append(match.confidence)
+        
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.categories = np.asarray(categories, dtype=np.intp)
+        self.features = np.asarray(features, dtype=np.intp)
+        self.marker_weights = np.asarray(marker_weights, dtype=float)
+        self.confidences = np.asarray(confidences, dtype=float)
+        
+        row_count = len(self.row_of)
+        self.match_counts = np.bincount(self.rows, minlength=row_count)
+        self.confidence_sums = np.bincount(self.rows, weights=self.confidences, minlength=row_count)
+        
+        # Einträge pro Zeile in Match-Reihenfolge (für Contributions)
+        self._row_order = np.argsort(self.rows, kind='stable')
+        self._row_offsets = np.concatenate(([0], np.cumsum(self.match_counts)))
+        
+        self._marker_names: Optional[List[str]] = None
+        self._marker_codes: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.matches)
+    
+    @property
+    def row_count(self) -> int:
+        return len(self.row_of)
+    
+    def model_weights(self, models: Sequence[ScoringModel]) -> Tuple[np.ndarray, np.ndarray]:
+        """Gibt Feature-Gewichte (Features × Modelle) und Relevanz (Kategorien × Modelle) zurück."""
+        weights = np.zeros((len(self.CATEGORIES), len(self.SEVERITIES), len(models)))
+        relevant = np.zeros((len(self.CATEGORIES), len(models)), dtype=bool)
+        
+        for k, model in enumerate(models):
+            for c, category in enumerate(self.CATEGORIES):
+                if category not in model.category_weights:
+                    continue
+                relevant[c, k] = True
+                for s, severity in enumerate(self.SEVERITIES):
+                    weights[c, s, k] = (
+                        model.category_weights[category] *
+                        model.severity_multipliers.get(severity, 1.0)
+                    )
+        
+        return weights.reshape(-1, len(models)), relevant
+    
+    def contributions(self, feature_weights: np.ndarray) -> np.ndarray:
+        """Beitrag jedes Matches zu jedem Modell (Matches × Modelle)."""
+        return (
+            feature_weights[self.features] *
+            self.marker_weights[:, None] *
+            self.confidences[:, None]
+        )
+    
+    def row_sums(self, values: np.ndarray) -> np.ndarray:
+        """Summiert Werte pro Match (Matches × Modelle) zu Zeilen × Modelle."""
+        return np.stack(
+            [np.bincount(self.rows, weights=values[:, k], minlength=self.row_count)
+             for k in range(values.shape[1])],
+            axis=1
+        ).reshape(self.row_count, values.shape[1])
+    
+    def row_entries(self, row: int) -> np.ndarray:
+        """Indizes der Matches einer Zeile in Match-Reihenfolge."""
+        return self._row_order[self._row_offsets[row]:self._row_offsets[row + 1]]
+    
+    def top_markers(
+        self,
+        relevant: np.ndarray,
+        row_sequence: Union[Sequence[int], np.ndarray],
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Häufigste beitragende Marker über eine Folge von Zeilen.
+        
+        Entspricht dem Zählen der contributing_markers aller Chunk-Scores in
+        dieser Reihenfolge; bei Gleichstand gewinnt der zuerst gesehene Marker.
+        
+        Args:
+            relevant: Relevanz-Spalte eines Modells (pro Kategorie)
+            row_sequence: Zeilen in Iterationsreihenfolge (Wiederholungen zählen mehrfach)
+            limit: Anzahl zurückgegebener Marker
+        """
+        if not len(self.matches) or not len(row_sequence):
+            return []
+        
+        if self._marker_names is None or self._marker_codes is None:
+            names = [m.marker_name for m in self.matches]
+            unique_names, codes = np.unique(np.asarray(names, dtype=object), return_inverse=True)
+            self._marker_names = list(unique_names)
+            self._marker_codes = codes
+        marker_names = self._marker_names
+        
+        rows = np.asarray(row_sequence, dtype=np.intp)
+        multiplicity = np.bincount(rows, minlength=self.row_count)
+        first_seen = np.full(self.row_count, len(rows), dtype=np.int64)
+        np.minimum.at(first_seen, rows, np.arange(len(rows)))
+        
+        entries = np.flatnonzero(relevant[self.categories] & (multiplicity[self.rows] > 0))
+        if not len(entries):
+            return []
+        
+        codes = self._marker_codes[entries]
+        counts = np.bincount(codes, weights=multiplicity[self.rows[entries]],
+                             minlength=len(marker_names))
+        
+        # Erste Nennung: Position der Zeile in der Folge, dann Match-Reihenfolge
+        order_keys = first_seen[self.rows[entries]] * len(self.matches) + entries
+        first_keys = np.full(len(marker_names), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_keys, codes, order_keys)
+        
+        present = np.flatnonzero(counts > 0)
+        ranking = present[np.lexsort((first_keys[present], -counts[present]))][:limit]
+        
+        return [
+            {'name': marker_names[code], 'count': int(counts[code])}
+            for code in ranking
+        ]
+
+
 class ScoringEngine:
     """Engine zur Berechnung von Scores basierend auf Marker-Matches."""
     
@@ -111,7 +263,9 @@ class ScoringEngine:
         self,
         chunks: List[TextChunk],
         matches: List[MarkerMatch],
-        models: Optional[List[str]] = None
+        models: Optional[List[str]] = None,
+        vectorized: bool = False,
+        include_contributions: bool = False
     ) -> ScoringResult:
         """Berechnet Scores für gegebene Chunks und Matches.
         
@@ -119,6 +273,10 @@ class ScoringEngine:
             chunks: Liste von Text-Chunks
             matches: Liste von Marker-Matches
             models: Spezifische Modelle zur Verwendung (None = alle)
+            vectorized: Alle Modelle gemeinsam über eine MatchMatrix berechnen
+                (Beiträge pro Match, Zeilensummen per np.bincount je Modell)
+            include_contributions: Im vektorisierten Modus contributing_markers
+                pro Chunk-Score aufbauen (der Loop-Modus baut sie immer auf)
             
         Returns:
             ScoringResult mit allen berechneten Scores
@@ -129,31 +287,45 @@ class ScoringEngine:
         # Wähle Modelle
         active_models = self._get_active_models(models)
         
-        # Gruppiere Matches nach Chunk
-        matches_by_chunk = self._group_matches_by_chunk(matches)
+        matrix = None
+        top_markers = None
         
-        # Berechne Scores pro Chunk
-        for chunk in chunks:
-            chunk_matches = matches_by_chunk.get(chunk.id, [])
+        if vectorized:
+            matrix = MatchMatrix(chunks, matches)
+            result.chunk_scores, top_markers = self._calculate_chunk_scores_vectorized(
+                chunks,
+                matrix,
+                active_models,
+                include_contributions=include_contributions
+            )
+        else:
+            # Gruppiere Matches nach Chunk
+            matches_by_chunk = self._group_matches_by_chunk(matches)
             
-            for model in active_models:
-                chunk_score = self._calculate_chunk_score(
-                    chunk,
-                    chunk_matches,
-                    model
-                )
-                result.chunk_scores.append(chunk_score)
+            # Berechne Scores pro Chunk
+            for chunk in chunks:
+                chunk_matches = matches_by_chunk.get(chunk.id, [])
+                
+                for model in active_models:
+                    chunk_score = self._calculate_chunk_score(
+                        chunk,
+                        chunk_matches,
+                        model
+                    )
+                    result.chunk_scores.append(chunk_score)
         
         # Aggregiere Scores
         result.aggregated_scores = self._aggregate_scores(
             result.chunk_scores,
-            active_models
+            active_models,
+            top_markers=top_markers
         )
         
         # Berechne Speaker-Scores
         result.speaker_scores = self._calculate_speaker_scores(
             chunks,
-            result.chunk_scores
+            result.chunk_scores,
+            matrix=matrix
         )
         
         # Erstelle Timeline
@@ -223,6 +395,118 @@ class ScoringEngine:
             }
         )
     
+    def _calculate_chunk_scores_vectorized(
+        self,
+        chunks: List[TextChunk],
+        matrix: MatchMatrix,
+        models: List[ScoringModel],
+        include_contributions: bool = False
+    ) -> Tuple[List[ChunkScore], Dict[str, List[Dict[str, Any]]]]:
+        """Berechnet alle Chunk-Scores aller Modelle über die MatchMatrix.
+        
+        Die Beiträge aller Matches entstehen als Matches × Modelle-Array, die
+        Zeilensummen je Modell per np.bincount (MatchMatrix.row_sums).
+        
+        Liefert dieselben Werte wie _calculate_chunk_score() und zusätzlich
+        die Top-Marker pro Modell, die sonst aus den contributing_markers
+        gezählt werden.
+        """
+        if not chunks or not models:
+            return [], {}
+        
+        feature_weights, relevant = matrix.model_weights(models)
+        contributions = matrix.contributions(feature_weights)
+        relevant_per_match = relevant[matrix.categories].astype(float)
+        
+        raw_scores = matrix.row_sums(contributions)
+        relevant_counts = matrix.row_sums(relevant_per_match)
+        
+        # Konfidenz wie in _calculate_confidence()
+        match_counts = matrix.match_counts[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_confidence = matrix.confidence_sums[:, None] / match_counts
+        count_factor = np.minimum(1.0, relevant_counts / 10)
+        confidences = np.where(match_counts > 0, avg_confidence * 0.7 + count_factor * 0.3, 0.5)
+        
+        # Pro Chunk-Position (Chunk-IDs dürfen mehrfach vorkommen)
+        rows = np.fromiter((matrix.row_of[c.id] for c in chunks), dtype=np.intp, count=len(chunks))
+        word_counts = np.fromiter((c.word_count for c in chunks), dtype=float, count=len(chunks))
+        raw_by_chunk = raw_scores[rows]
+        normalized_by_chunk = np.stack(
+            [self._normalize_scores(raw_by_chunk[:, k], model, word_counts)
+             for k, model in enumerate(models)],
+            axis=1
+        )
+        confidence_by_chunk = confidences[rows]
+        
+        chunk_scores = []
+        for position, chunk in enumerate(chunks):
+            row = rows[position]
+            entries = matrix.row_entries(row) if include_contributions else ()
+            metadata_base = {
+                'word_count': chunk.word_count,
+                'marker_count': int(matrix.match_counts[row])
+            }
+            
+            for k, model in enumerate(models):
+                contributing_markers = []
+                for entry in entries:
+                    if not relevant_per_match[entry, k]:
+                        continue
+                    match = matrix.matches[entry]
+                    contributing_markers.append({
+                        'marker_id': match.marker_id,
+                        'marker_name': match.marker_name,
+                        'category': match.category.value,
+                        'severity': match.severity.value,
+                        'contribution': float(contributions[entry, k]),
+                        'confidence': match.confidence
+                    })
+                
+                chunk_scores.append(ChunkScore(
+                    chunk_id=chunk.id,
+                    model_id=model.id,
+                    score_type=model.type,
+                    raw_score=float(raw_by_chunk[position, k]),
+                    normalized_score=float(normalized_by_chunk[position, k]),
+                    contributing_markers=contributing_markers,
+                    confidence=float(confidence_by_chunk[position, k]),
+                    timestamp=chunk.timestamp,
+                    metadata=dict(metadata_base)
+                ))
+        
+        top_markers = {
+            model.id: matrix.top_markers(relevant[:, k], rows)
+            for k, model in enumerate(models)
+        }
+        
+        return chunk_scores, top_markers
+    
+    def _normalize_scores(
+        self,
+        raw_scores: np.ndarray,
+        model: ScoringModel,
+        word_counts: np.ndarray
+    ) -> np.ndarray:
+        """Vektorisierte Variante von _normalize_score()."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normalized = np.where(
+                word_counts > 0,
+                (raw_scores / word_counts) * model.normalization_factor,
+                0.0
+            )
+        
+        if model.inverse_scale:
+            score = np.where(
+                normalized < 0,
+                model.scale_max + (normalized / 10),
+                model.scale_max - (normalized * 2)
+            )
+        else:
+            score = model.scale_min + (normalized * 2)
+        
+        return np.maximum(model.scale_min, np.minimum(model.scale_max, score))
+    
     def _normalize_score(
         self,
         raw_score: float,
@@ -276,9 +560,17 @@ class ScoringEngine:
     def _aggregate_scores(
         self,
         chunk_scores: List[ChunkScore],
-        models: List[ScoringModel]
+        models: List[ScoringModel],
+        top_markers: Optional[Dict[str, List[Dict[str, Any]]]] = None
     ) -> Dict[str, AggregatedScore]:
-        """Aggregiert Chunk-Scores zu Gesamt-Scores."""
+        """Aggregiert Chunk-Scores zu Gesamt-Scores.
+        
+        Args:
+            chunk_scores: Zu aggregierende Chunk-Scores
+            models: Modelle, für die aggregiert wird
+            top_markers: Vorberechnete Top-Marker pro Modell-ID; sonst werden
+                sie aus den contributing_markers gezählt
+        """
         aggregated = {}
         
         for model in models:
@@ -299,22 +591,10 @@ class ScoringEngine:
             distribution = self._calculate_distribution(scores)
             
             # Top Marker
-            all_markers = []
-            for cs in model_scores:
-                all_markers.extend(cs.contributing_markers)
-            
-            marker_counts = defaultdict(int)
-            for marker in all_markers:
-                marker_counts[marker['marker_name']] += 1
-            
-            top_markers = [
-                {'name': name, 'count': count}
-                for name, count in sorted(
-                    marker_counts.items(),
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:5]
-            ]
+            if top_markers is not None:
+                model_top_markers = top_markers.get(model.id, [])
+            else:
+                model_top_markers = self._count_top_markers(model_scores)
             
             aggregated[model.type.value] = AggregatedScore(
                 model_id=model.id,
@@ -326,11 +606,30 @@ class ScoringEngine:
                 trend_strength=trend_strength,
                 chunk_count=len(model_scores),
                 distribution=distribution,
-                top_markers=top_markers
+                top_markers=model_top_markers
             )
         
         return aggregated
     
+    def _count_top_markers(self, model_scores: List[ChunkScore]) -> List[Dict[str, Any]]:
+        """Zählt die häufigsten Marker aus den contributing_markers."""
+        all_markers = []
+        for cs in model_scores:
+            all_markers.extend(cs.contributing_markers)
+        
+        marker_counts = defaultdict(int)
+        for marker in all_markers:
+            marker_counts[marker['marker_name']] += 1
+        
+        return [
+            {'name': name, 'count': count}
+            for name, count in sorted(
+                marker_counts.items(),
+                key=lambda x: x[1],
+                reverse=True
+            )[:5]
+        ]
+    
     def _calculate_trend(
         self,
         scores: List[float]
@@ -386,17 +685,32 @@ class ScoringEngine:
     def _calculate_speaker_scores(
         self,
         chunks: List[TextChunk],
-        chunk_scores: List[ChunkScore]
+        chunk_scores: List[ChunkScore],
+        matrix: Optional[MatchMatrix] = None
     ) -> Dict[str, Dict[str, AggregatedScore]]:
         """Berechnet Scores pro Sprecher."""
         speaker_scores = defaultdict(lambda: defaultdict(list))
+        speaker_rows = defaultdict(list)
+        
+        scores_by_chunk = defaultdict(list)
+        for score in chunk_scores:
+            scores_by_chunk[score.chunk_id].append(score)
+        
+        # Wie oft jede Chunk-ID vorkommt (jede Position trägt eigene Scores bei)
+        id_counts = defaultdict(int)
+        for chunk in chunks:
+            id_counts[chunk.id] += 1
         
         # Sammle Scores pro Sprecher
         for chunk, scores in zip(chunks, chunk_scores):
             if chunk.speaker:
                 speaker_name = chunk.speaker.name
-                for score in [s for s in chunk_scores if s.chunk_id == chunk.id]:
+                for score in scores_by_chunk.get(chunk.id, []):
                     speaker_scores[speaker_name][score.model_id].append(score)
+                if matrix is not None:
+                    speaker_rows[speaker_name].extend(
+                        [matrix.row_of[chunk.id]] * id_counts[chunk.id]
+                    )
         
         # Aggregiere pro Sprecher
         result = {}
@@ -404,9 +718,18 @@ class ScoringEngine:
             result[speaker] = {}
             for model_id, scores in model_scores.items():
                 model = self.models[model_id]
+                
+                top_markers = None
+                if matrix is not None:
+                    _, relevant = matrix.model_weights([model])
+                    top_markers = {
+                        model_id: matrix.top_markers(relevant[:, 0], speaker_rows[speaker])
+                    }
+                
                 result[speaker][model.type.value] = self._aggregate_scores(
                     scores,
-                    [model]
+                    [model],
+                    top_markers=top_markers
                 )[model.type.value]
         
         return result
@@ -17,6 +17,186 @@ from ..matcher.marker_models import MarkerMatch, MarkerCategory
 
 logger = logging.getLogger(__name__)
 
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class WindowIndex:
+    """Spaltenorientierte Zuordnung von Zeitstempeln zu Aggregationsfenstern.
+    
+    Fenstergrenzen und Zeitstempel werden als Integer-Offsets (Mikrosekunden
+    ab Beginn des ersten Fensters) gehalten. Jeder Zeitstempel wird einmal
+    per searchsorted bzw. bei fester Fensterlänge per Ganzzahldivision seinem
+    Fenster zugeordnet, statt für jedes Fenster alle Daten erneut zu filtern.
+    """
+    
+    def __init__(
+        self,
+        windows: List[Tuple[datetime, datetime]],
+        step: Optional[timedelta] = None
+    ):
+        self.windows = windows
+        # Ohne Fenster bleiben starts/ends leer und assign() liefert nur -1
+        self.origin: datetime = windows[0][0] if windows else datetime.min
+        self.starts = np.array(
+            [(start - self.origin) // _MICROSECOND for start, _ in windows], dtype=np.int64
+        )
+        self.ends = np.array(
+            [(end - self.origin) // _MICROSECOND for _, end in windows], dtype=np.int64
+        )
+        self.step = step // _MICROSECOND if step else None
+    
+    def __len__(self) -> int:
+        return len(self.windows)
+    
+    def assign(self, timestamps: List[datetime]) -> np.ndarray:
+        """Gibt pro Zeitstempel den Fensterindex zurück (-1 = in keinem Fenster)."""
+        if not self.windows:
+            return np.full(len(timestamps), -1, dtype=np.intp)
+        
+        offsets = np.array(
+            [(ts - self.origin) // _MICROSECOND for ts in timestamps], dtype=np.int64
+        )
+        
+        if self.step:
+            buckets = offsets // self.step
+        else:
+            buckets = np.searchsorted(self.starts, offsets, side='right') - 1
+        
+        # Fenster sind halboffen [start, end); alles ab dem letzten Ende fällt raus
+        clipped = np.clip(buckets, 0, len(self.windows) - 1)
+        valid = (
+            (buckets >= 0) & (buckets < len(self.windows)) &
+            (offsets >= self.starts[clipped]) & (offsets < self.ends[clipped])
+        )
+        return np.where(valid, buckets, -1).astype(np.intp)
+
+
+def grouped_statistics(
+    buckets: np.ndarray,
+    values: np.ndarray,
+    group_count: int
+) -> Dict[str, np.ndarray]:
+    """Berechnet count/mean/min/max/std/median pro Gruppe in einem Durchlauf.
+    
+    Args:
+        buckets: Gruppenindex pro Wert (-1 = ignorieren)
+        values: Werte
+        group_count: Anzahl Gruppen
+        
+    Returns:
+        Dict mit je einem Array der Länge group_count (leere Gruppen = 0)
+    """
+    mask = buckets >= 0
+    buckets = buckets[mask]
+    values = np.asarray(values, dtype=float)[mask]
+    
+    counts = np.bincount(buckets, minlength=group_count)
+    nonzero = counts > 0
+    safe_counts = np.maximum(counts, 1)
+    
+    sums = np.bincount(buckets, weights=values, minlength=group_count)
+    mean = sums / safe_counts
+    variance = np.bincount(
+        buckets, weights=(values - mean[buckets]) ** 2, minlength=group_count
+    ) / safe_counts
+    
+    # Nach Gruppe und Wert sortiert liegen Min, Max und Median an festen Positionen
+    ordered = values[np.lexsort((values, buckets))]
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    first = np.minimum(offsets, max(len(ordered) - 1, 0))
+    last = np.minimum(offsets + counts - 1, max(len(ordered) - 1, 0))
+    lower_mid = np.minimum(offsets + (counts - 1) // 2, max(len(ordered) - 1, 0))
+    upper_mid = np.minimum(offsets + counts // 2, max(len(ordered) - 1, 0))
+    
+    if len(ordered):
+        minimum = np.where(nonzero, ordered[first], 0.0)
+        maximum = np.where(nonzero, ordered[last], 0.0)
+        median = np.where(nonzero, (ordered[lower_mid] + ordered[upper_mid]) / 2, 0.0)
+    else:
+        minimum = maximum = median = np.zeros(group_count)
+    
+    return {
+        "count": counts,
+        "sum": sums,
+        "mean": np.where(nonzero, mean, 0.0),
+        "min": minimum,
+        "max": maximum,
+        "std": np.where(nonzero, np.sqrt(variance), 0.0),
+        "median": median
+    }
+
+
+def masked_correlation(
+    x: np.ndarray,
+    x_mask: np.ndarray,
+    y: Optional[np.ndarray] = None,
+    y_mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Pearson-Korrelation aller Spaltenpaare über gemeinsam vorhandene Zeilen.
+    
+    Fehlende Werte (Maske False) werden paarweise ausgeblendet; alle Paare
+    entstehen in wenigen Matrixprodukten statt einer Schleife über Paare.
+    Paare mit weniger als zwei gemeinsamen Werten oder ohne Varianz ergeben 0.
+    
+    Args:
+        x: Werte (Zeitpunkte × Serien)
+        x_mask: True, wo ein Wert vorhanden ist
+        y, y_mask: Optionale zweite Matrix gleicher Zeilenzahl (Standard: x)
+        
+    Returns:
+        Korrelationsmatrix (Serien von x × Serien von y)
+    """
+    if y is None:
+        y, y_mask = x, x_mask
+    assert y_mask is not None, "y und y_mask nur gemeinsam angeben"
+    
+    def centered(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        # Zentrieren verbessert die Genauigkeit der Summenformeln
+        counts = np.maximum(mask.sum(axis=0), 1)
+        means = np.where(mask, values, 0.0).sum(axis=0) / counts
+        return np.where(mask, values - means, 0.0)
+    
+    mx = x_mask.astype(float)
+    my = y_mask.astype(float)
+    xc = centered(x, x_mask)
+    yc = centered(y, y_mask)
+    
+    n = mx.T @ my
+    sum_x = xc.T @ my
+    sum_y = mx.T @ yc
+    sum_xx = (xc ** 2).T @ my
+    sum_yy = mx.T @ (yc ** 2)
+    sum_xy = xc.T @ yc
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    
+    valid = (n >= 2) & (var_x > 1e-12 * np.maximum(sum_xx, 1.0)) & (var_y > 1e-12 * np.maximum(sum_yy, 1.0))
+    return np.clip(np.where(valid & np.isfinite(corr), corr, 0.0), -1.0, 1.0)
+
+
+def lagged_correlations(
+    values: np.ndarray,
+    mask: np.ndarray,
+    max_lag: int
+) -> Dict[int, np.ndarray]:
+    """Kreuzkorrelationen für Verschiebungen von -max_lag bis max_lag Perioden.
+    
+    Eintrag [i, j] der Matrix zu lag k ist die Korrelation von Serie i zum
+    Zeitpunkt t mit Serie j zum Zeitpunkt t + k. Lag 0 ist die normale
+    Korrelationsmatrix. Die Zeilen müssen ein lückenloses Fensterraster
+    bilden (fehlende Fenster maskiert), damit k Zeilen k Perioden sind.
+    """
+    lagged = {0: masked_correlation(values, mask)}
+    for lag in range(1, min(max_lag, len(values) - 1) + 1):
+        forward = masked_correlation(values[:-lag], mask[:-lag], values[lag:], mask[lag:])
+        lagged[lag] = forward
+        lagged[-lag] = forward.T
+    return lagged
+
 
 class TimeSeriesAggregator:
     """Aggregiert Scores und Marker-Daten über verschiedene Zeitfenster."""
@@ -99,30 +279,29 @@ class TimeSeriesAggregator:
             if not scores:
                 continue
             
-            # Sortiere nach Zeit
-            sorted_scores = sorted(scores, key=lambda s: s.timestamp)
+            # Spalten: Zeitstempel, Werte, Konfidenzen
+            timestamps = [s.timestamp for s in scores]
+            values = np.array([s.normalized_score for s in scores], dtype=float)
+            confidences = np.array([s.confidence for s in scores], dtype=float)
             
-            # Bestimme Zeitbereich
-            start_time = sorted_scores[0].timestamp
-            end_time = sorted_scores[-1].timestamp
-            
-            # Erstelle Zeitfenster
-            time_windows = self._create_time_windows(start_time, end_time, period)
+            # Erstelle Zeitfenster über den Zeitbereich
+            time_windows = self._create_time_windows(min(timestamps), max(timestamps), period)
+            window_index = WindowIndex(time_windows, self._fixed_period_length(period))
+            buckets = window_index.assign(timestamps)
             
             # Aggregiere in Zeitfenster
+            stats = grouped_statistics(buckets, values, len(time_windows))
+            confidence_avg = grouped_statistics(buckets, confidences, len(time_windows))["mean"]
+            
             data_points = []
-            for window_start, window_end in time_windows:
-                window_scores = [
-                    s for s in sorted_scores
-                    if window_start <= s.timestamp < window_end
-                ]
-                
-                if window_scores or self.config.include_zero_periods:
+            for i, (window_start, window_end) in enumerate(time_windows):
+                if stats["count"][i] or self.config.include_zero_periods:
                     point = self._create_score_point(
-                        window_scores,
+                        stats,
+                        confidence_avg,
+                        i,
                         window_start,
-                        window_end,
-                        score_type
+                        window_end
                     )
                     data_points.append(point)
             
@@ -157,46 +336,36 @@ class TimeSeriesAggregator:
         if not timed_matches:
             return series_dict
         
-        # Sortiere nach Zeit
-        sorted_matches = sorted(timed_matches, key=lambda m: m.timestamp)
-        
-        # Zeitbereich
-        start_time = sorted_matches[0].timestamp
-        end_time = sorted_matches[-1].timestamp
-        
-        # Zeitfenster
-        time_windows = self._create_time_windows(start_time, end_time, period)
+        # Zeitfenster und Zähl-Matrix (Fenster × Kategorie)
+        time_windows, counts, first_seen = self._count_categories_per_window(timed_matches, period)
+        categories = list(MarkerCategory)
         
         # Aggregiere Marker-Counts gesamt
         total_points = []
         category_series = defaultdict(list)
         
-        for window_start, window_end in time_windows:
-            window_matches = [
-                m for m in sorted_matches
-                if window_start <= m.timestamp < window_end
-            ]
+        for i, (window_start, window_end) in enumerate(time_windows):
+            window_total = int(counts[i].sum())
             
             # Gesamt-Counts
             total_point = TimeSeriesPoint(
                 timestamp=window_start,
                 period_start=window_start,
                 period_end=window_end,
-                values={"marker_count": len(window_matches)},
-                counts={"total": len(window_matches)}
+                values={"marker_count": window_total},
+                counts={"total": window_total}
             )
             
-            # Counts nach Kategorie
-            category_counts = defaultdict(int)
-            for match in window_matches:
-                category_counts[match.category.value] += 1
+            # Counts nach Kategorie (in Reihenfolge des ersten Auftretens im Fenster)
+            present = np.flatnonzero(counts[i])
+            for c in present[np.argsort(first_seen[i, present], kind='stable')]:
+                total_point.counts[categories[c].value] = int(counts[i, c])
             
-            total_point.counts.update(category_counts)
             total_points.append(total_point)
             
             # Separate Serien pro Kategorie
-            for category in MarkerCategory:
-                cat_count = category_counts.get(category.value, 0)
+            for c, category in enumerate(categories):
+                cat_count = int(counts[i, c])
                 cat_point = TimeSeriesPoint(
                     timestamp=window_start,
                     period_start=window_start,
@@ -229,6 +398,55 @@ class TimeSeriesAggregator:
         
         return series_dict
     
+    def _count_categories_per_window(
+        self,
+        matches: List[MarkerMatch],
+        period: AggregationPeriod
+    ) -> Tuple[List[Tuple[datetime, datetime]], np.ndarray, np.ndarray]:
+        """Zählt Matches pro Zeitfenster und Kategorie.
+        
+        Returns:
+            (Zeitfenster, Counts [Fenster × Kategorie], Index des ersten
+            Matches [Fenster × Kategorie] in zeitlicher Reihenfolge)
+        """
+        categories = list(MarkerCategory)
+        category_index = {category: i for i, category in enumerate(categories)}
+        
+        timestamps = [m.timestamp for m in matches]
+        time_windows = self._create_time_windows(min(timestamps), max(timestamps), period)
+        window_index = WindowIndex(time_windows, self._fixed_period_length(period))
+        buckets = window_index.assign(timestamps)
+        
+        category_ids = np.array([category_index[m.category] for m in matches], dtype=np.intp)
+        cells = buckets * len(categories) + category_ids
+        valid = buckets >= 0
+        
+        counts = np.bincount(
+            cells[valid], minlength=len(time_windows) * len(categories)
+        ).reshape(len(time_windows), len(categories))
+        
+        # Zeitliche Reihenfolge (stabil wie sorted() über die Zeitstempel)
+        offsets = np.array([(ts - timestamps[0]) // _MICROSECOND for ts in timestamps], dtype=np.int64)
+        rank = np.empty(len(matches), dtype=np.int64)
+        rank[np.argsort(offsets, kind='stable')] = np.arange(len(matches))
+        first_seen = np.full(len(time_windows) * len(categories), len(matches), dtype=np.int64)
+        np.minimum.at(first_seen, cells[valid], rank[valid])
+        
+        return time_windows, counts, first_seen.reshape(len(time_windows), len(categories))
+    
+    def _fixed_period_length(self, period: AggregationPeriod) -> Optional[timedelta]:
+        """Feste Fensterlänge einer Periode (None bei Kalender-Perioden)."""
+        if period == AggregationPeriod.HOURLY:
+            return timedelta(hours=1)
+        elif period == AggregationPeriod.WEEKLY:
+            return timedelta(weeks=1)
+        elif period == AggregationPeriod.CUSTOM:
+            return timedelta(hours=self.config.custom_period_hours or 24)
+        elif period in (AggregationPeriod.MONTHLY, AggregationPeriod.QUARTERLY,
+                        AggregationPeriod.YEARLY):
+            return None
+        return timedelta(days=1)
+    
     def _create_time_windows(
         self,
         start: datetime,
@@ -274,30 +492,31 @@ class TimeSeriesAggregator:
     
     def _create_score_point(
         self,
-        scores: List[ChunkScore],
+        stats: Dict[str, np.ndarray],
+        confidence_avg: np.ndarray,
+        index: int,
         start: datetime,
-        end: datetime,
-        score_type: str
+        end: datetime
     ) -> TimeSeriesPoint:
-        """Erstellt einen aggregierten Score-Punkt."""
+        """Erstellt einen aggregierten Score-Punkt aus den Fenster-Statistiken."""
         point = TimeSeriesPoint(
             timestamp=start,
             period_start=start,
             period_end=end
         )
         
-        if scores:
-            values = [s.normalized_score for s in scores]
+        count = int(stats["count"][index])
+        if count:
             point.values = {
-                "mean": np.mean(values),
-                "min": min(values),
-                "max": max(values),
-                "std": np.std(values) if len(values) > 1 else 0,
-                "median": np.median(values)
+                "mean": float(stats["mean"][index]),
+                "min": float(stats["min"][index]),
+                "max": float(stats["max"][index]),
+                "std": float(stats["std"][index]) if count > 1 else 0,
+                "median": float(stats["median"][index])
             }
             point.counts = {
-                "chunk_count": len(scores),
-                "confidence_avg": np.mean([s.confidence for s in scores])
+                "chunk_count": count,
+                "confidence_avg": float(confidence_avg[index])
             }
         else:
             # Keine Daten für diesen Zeitraum
@@ -377,33 +596,13 @@ class TimeSeriesAggregator:
         if not timed_matches:
             return None
         
-        # Zeitfenster
-        start = min(m.timestamp for m in timed_matches)
-        end = max(m.timestamp for m in timed_matches)
-        windows = self._create_time_windows(start, end, period)
-        
-        # Matrix aufbauen
+        # Zeitfenster und Zähl-Matrix (Fenster × Kategorie)
+        windows, counts, _ = self._count_categories_per_window(timed_matches, period)
         categories = list(MarkerCategory)
-        matrix = []
-        x_labels = []
-        
-        for window_start, window_end in windows:
-            window_matches = [
-                m for m in timed_matches
-                if window_start <= m.timestamp < window_end
-            ]
-            
-            # Zähle pro Kategorie
-            row = []
-            for category in categories:
-                count = sum(1 for m in window_matches if m.category == category)
-                row.append(count)
-            
-            matrix.append(row)
-            x_labels.append(window_start.strftime("%Y-%m-%d %H:%M"))
+        x_labels = [window_start.strftime("%Y-%m-%d %H:%M") for window_start, _ in windows]
         
-        # Transponiere für bessere Darstellung
-        matrix = list(map(list, zip(*matrix)))
+        # Transponiert: eine Zeile pro Kategorie
+        matrix = counts.T.tolist() if windows else []
         
         return HeatmapData(
             title="Marker Categories Over Time",
@@ -473,39 +672,61 @@ class TimeSeriesAggregator:
                 series=score_series
             )
             
-            # Berechne Korrelationen
-            if len(score_series[0].data_points) > 3:
-                correlation_matrix = self._calculate_correlations(score_series)
-                comparison.correlation_matrix = correlation_matrix
+            # Berechne Korrelationen auf gemeinsamer Zeitachse
+            values, mask = self._align_series(score_series)
+            if len(values) > 3:
+                comparison.correlation_matrix = masked_correlation(values, mask).tolist()
+                
+                if self.config.correlation_max_lag > 0:
+                    comparison.lagged_correlations = {
+                        lag: matrix.tolist()
+                        for lag, matrix in sorted(lagged_correlations(
+                            values, mask, self.config.correlation_max_lag
+                        ).items())
+                        if lag != 0
+                    }
             
             comparisons.append(comparison)
         
         return comparisons
     
-    def _calculate_correlations(
+    def _align_series(
         self,
         series_list: List[TimeSeriesData]
-    ) -> List[List[float]]:
-        """Berechnet Korrelationsmatrix zwischen Zeitreihen."""
-        # Extrahiere Werte
-        value_arrays = []
-        for series in series_list:
-            values = [p.values.get("mean", 0) for p in series.data_points]
-            value_arrays.append(values)
-        
-        # Berechne Korrelationen
-        n = len(value_arrays)
-        corr_matrix = [[0.0] * n for _ in range(n)]
-        
-        for i in range(n):
-            for j in range(n):
-                if len(value_arrays[i]) == len(value_arrays[j]):
-                    corr = np.corrcoef(value_arrays[i], value_arrays[j])[0, 1]
-                    corr_matrix[i][j] = float(corr) if not np.isnan(corr) else 0.0
-                else:
-                    corr_matrix[i][j] = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Richtet Zeitreihen auf einer gemeinsamen Zeitachse aus.
+        
+        Die Zeilen bilden das lückenlose Fensterraster der Periode vom
+        frühesten bis zum spätesten Fensterbeginn. Fenster ohne Datenpunkt
+        bleiben NaN und maskiert, sodass eine Verschiebung um k Zeilen immer
+        k Perioden entspricht.
+        
+        Returns:
+            (Werte [Fenster × Serien], Maske vorhandener Werte)
+        """
+        starts = []
+        columns = []
+        values = []
+        for column, series in enumerate(series_list):
+            for point in series.data_points:
+                starts.append(point.period_start)
+                columns.append(column)
+                values.append(point.values.get("mean", 0))
+        
+        if not starts:
+            return np.zeros((0, len(series_list))), np.zeros((0, len(series_list)), dtype=bool)
+        
+        # Raster ab dem frühesten Fensterbeginn; das letzte Fenster enthält den spätesten
+        period = series_list[0].period
+        grid = self._create_time_windows(min(starts), max(starts) + _MICROSECOND, period)
+        rows = WindowIndex(grid, self._fixed_period_length(period)).assign(starts)
+        
+        matrix = np.full((len(grid), len(series_list)), np.nan)
+        mask = np.zeros((len(grid), len(series_list)), dtype=bool)
+        matrix[rows, columns] = values
+        mask[rows, columns] = True
         
-        return corr_matrix
+        return matrix, mask
     
     def _calculate_series_statistics(
         self,
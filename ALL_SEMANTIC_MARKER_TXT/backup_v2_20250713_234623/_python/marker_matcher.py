@@ -6,13 +6,20 @@ Analysiert Texte basierend auf dem Marker Master Export
 
 import yaml
 import json
-import re
-from typing import Dict, List, Any, Optional, Tuple
+import os
+import threading
+from typing import Deque, Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from pathlib import Path
 import logging
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Sized
+from itertools import islice
+import multiprocessing
+
+from marker_index import ExampleAutomaton, FuzzyTokenIndex, SemanticPatternTable
+from marker_snapshot import SnapshotStore
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -71,10 +78,36 @@ class AnalysisResult:
 class MarkerMatcher:
     """Hauptklasse für Marker-basierte Textanalyse"""
     
-    def __init__(self, marker_file: str = "marker_master_export.yaml"):
-        """Initialisiert den Matcher mit Marker-Daten"""
+    # Attribute, die den kompilierten Marker-Satz bilden und im Snapshot landen
+    _SNAPSHOT_FIELDS = ('markers', 'risk_level_descriptions', '_example_automaton',
+                        '_example_table', '_fuzzy_index', 'semantic_patterns')
+    
+    def __init__(self, marker_file: str = "marker_master_export.yaml", use_snapshot: bool = True,
+                 snapshot_path: Optional[str] = None, previous: Optional['MarkerMatcher'] = None,
+                 pool_workers: Optional[int] = None):
+        """Initialisiert den Matcher mit Marker-Daten
+        
+        Der kompilierte Marker-Satz wird als Binär-Snapshot neben der Marker-Datei
+        abgelegt (bzw. unter snapshot_path) und beim nächsten Start geladen,
+        solange sich der Inhalt der Marker-Datei nicht geändert hat.
+        Mit previous (siehe reload()) werden die kompilierten semantic_patterns
+        unveränderter Marker übernommen statt neu kompiliert.
+        pool_workers legt die feste Größe des Prozess-Pools für Batch-Analysen
+        fest (Standard: Anzahl der CPUs).
+        """
+        self.marker_file = marker_file
         self.markers = {}
+        self.marker_set_version: Optional[str] = None
+        self.reload_report: Optional[Dict[str, List[str]]] = None
+        self._previous = previous
         self.semantic_detectors = {}
+        self._example_automaton = ExampleAutomaton()
+        self._example_table: Dict[str, List[Tuple[str, str, int]]] = {}
+        self._fuzzy_index = FuzzyTokenIndex()
+        self.pool_workers = max(1, pool_workers or os.cpu_count() or 1)
+        self._pool: Optional[Any] = None
+        self._pool_lock = threading.Lock()
+        self.semantic_patterns = SemanticPatternTable()
         self.risk_thresholds = {
             'green': (0, 1),
             'yellow': (2, 5),
@@ -83,28 +116,127 @@ class MarkerMatcher:
         }
         
         # Lade Marker-Daten
+        self.snapshot = None
+        if use_snapshot:
+            self.snapshot = SnapshotStore(snapshot_path or f"{marker_file}.snapshot")
         self._load_markers(marker_file)
         
+        if previous is not None:
+            self.reload_report = _marker_diff(previous.markers, self.markers)
+        self._previous = None
+    
+    def reload(self) -> 'MarkerMatcher':
+        """Baut einen neuen Matcher aus der (geänderten) Marker-Datei
+        
+        Der bestehende Matcher bleibt unverändert nutzbar, laufende Analysen
+        können auf ihm zu Ende laufen. reload_report des neuen Matchers nennt
+        die hinzugekommenen, geänderten und entfernten Marker.
+        """
+        return MarkerMatcher(
+            self.marker_file,
+            use_snapshot=self.snapshot is not None,
+            snapshot_path=str(self.snapshot.path) if self.snapshot is not None else None,
+            previous=self,
+            pool_workers=self.pool_workers
+        )
+        
     def _load_markers(self, marker_file: str):
-        """Lädt Marker-Daten aus YAML-Datei"""
+        """Lädt Marker-Daten aus Snapshot oder YAML-Datei"""
         try:
-            with open(marker_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            # Extrahiere Marker
-            for marker in data.get('markers', []):
-                self.markers[marker['marker']] = marker
-                
-            # Extrahiere Risk-Level-Definitionen
-            if 'risk_levels' in data:
-                self.risk_level_descriptions = data['risk_levels']
+            if self.snapshot is None:
+                self._compile_marker_file(marker_file)
+                from_snapshot = False
+            else:
+                state, digest, from_snapshot = self.snapshot.load_or_build(
+                    [marker_file], lambda: self._compile_marker_file(marker_file)
+                )
+                self.__dict__.update(state)
+                self.marker_set_version = digest.hex()[:16]
+                if from_snapshot:
+                    self._report_pattern_errors()
                 
-            logger.info(f"{len(self.markers)} Marker geladen")
+            logger.info(f"{len(self.markers)} Marker geladen" + (" (Snapshot)" if from_snapshot else ""))
             
         except Exception as e:
             logger.error(f"Fehler beim Laden der Marker-Datei: {e}")
             raise
     
+    def _compile_marker_file(self, marker_file: str) -> Dict[str, Any]:
+        """Parst die YAML-Datei, baut alle Indizes und gibt den Snapshot-Zustand zurück"""
+        with open(marker_file, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        
+        # Extrahiere Marker
+        for marker in data.get('markers', []):
+            self.markers[marker['marker']] = marker
+            
+        # Extrahiere Risk-Level-Definitionen
+        if 'risk_levels' in data:
+            self.risk_level_descriptions = data['risk_levels']
+        
+        self._build_example_index()
+        self._build_semantic_patterns()
+        
+        return {name: self.__dict__[name] for name in self._SNAPSHOT_FIELDS if name in self.__dict__}
+    
+    def _build_example_index(self):
+        """Kompiliert alle Beispiele in einen gemeinsamen Aho-Corasick-Automaten
+
+        Die Wörter der Beispiele landen im selben Automaten und speisen den
+        invertierten Token-Index für das Fuzzy-Matching.
+        """
+        automaton = ExampleAutomaton()
+        fuzzy_index = FuzzyTokenIndex()
+        example_table = {}
+        
+        for marker_name, marker_data in self.markers.items():
+            entries = []
+            for beispiel in marker_data.get('beispiele', []) or []:
+                if not beispiel:  # Überspringe leere Beispiele
+                    continue
+                if not isinstance(beispiel, str):
+                    logger.warning(f"Marker {marker_name}: Beispiel ohne Text wird ignoriert ({beispiel!r})")
+                    continue
+                
+                beispiel_normalized = beispiel.lower().strip()
+                pattern_id = automaton.add(beispiel_normalized)
+                fuzzy_index.add_example(pattern_id, beispiel_normalized, automaton)
+                entries.append((beispiel, beispiel_normalized, pattern_id))
+            example_table[marker_name] = entries
+        
+        automaton.compile()
+        self._example_automaton = automaton
+        self._fuzzy_index = fuzzy_index
+        self._example_table = example_table
+        logger.debug(f"Beispiel-Automat mit {len(automaton)} Patterns kompiliert, "
+                     f"{len(fuzzy_index)} Beispiele im Token-Index")
+    
+    def _build_semantic_patterns(self):
+        """Kompiliert und validiert alle semantic_patterns einmalig beim Laden
+        
+        Beim Reload werden die Patterns unveränderter Marker aus dem vorherigen
+        Matcher übernommen; kompiliert werden nur neue und geänderte Marker.
+        """
+        previous = self._previous
+        table = SemanticPatternTable()
+        for marker_name, marker_data in self.markers.items():
+            if 'semantic_patterns' not in marker_data:
+                continue
+            if previous is not None and previous.markers.get(marker_name) == marker_data:
+                table.copy_marker(marker_name, previous.semantic_patterns)
+            else:
+                table.add_marker(marker_name, marker_data['semantic_patterns'])
+        table.compile()
+        
+        self.semantic_patterns = table
+        self._report_pattern_errors()
+        logger.debug(f"{len(table)} semantic_patterns in {table.group_count} Gruppen kompiliert")
+    
+    def _report_pattern_errors(self):
+        """Meldet ungültige semantic_patterns (auch beim Laden aus dem Snapshot)"""
+        for marker_name, pattern, error in self.semantic_patterns.errors:
+            logger.warning(f"Ungültiges semantic_pattern in {marker_name}: {pattern!r} ({error})")
+    
     def analyze_text(self, text: str) -> AnalysisResult:
         """Analysiert einen Text auf Marker"""
         logger.debug(f"Analysiere Text mit {len(text)} Zeichen")
@@ -114,9 +246,18 @@ class MarkerMatcher:
         categories_count = defaultdict(int)
         total_risk_score = 0
         
+        # Ein Durchlauf über den normalisierten Text findet alle Beispiele und Tokens
+        text_lower = text.lower()
+        example_hits = self._example_automaton.first_occurrences(text_lower)
+        fuzzy_hits = self._fuzzy_index.matches(example_hits)
+        
+        # Ein search pro Pattern-Gruppe grenzt die relevanten semantic_patterns ein
+        pattern_groups = self.semantic_patterns.candidates(text)
+        
         # Durchsuche Text nach jedem Marker
         for marker_name, marker_data in self.markers.items():
-            marker_matches = self._find_marker_in_text(text, marker_data)
+            marker_matches = self._find_marker_in_text(text, marker_data, text_lower, example_hits,
+                                                       pattern_groups, fuzzy_hits)
             
             for match in marker_matches:
                 matches.append(match)
@@ -140,22 +281,26 @@ class MarkerMatcher:
             summary=summary
         )
     
-    def _find_marker_in_text(self, text: str, marker_data: Dict[str, Any]) -> List[MarkerMatch]:
+    def _find_marker_in_text(self, text: str, marker_data: Dict[str, Any],
+                             text_lower: Optional[str] = None,
+                             example_hits: Optional[Dict[int, int]] = None,
+                             pattern_groups: Optional[Set[int]] = None,
+                             fuzzy_hits: Optional[Set[int]] = None) -> List[MarkerMatch]:
         """Sucht nach einem spezifischen Marker im Text"""
         matches = []
         
-        # Suche nach Beispielen
-        for beispiel in marker_data.get('beispiele', []):
-            if not beispiel:  # Überspringe leere Beispiele
-                continue
-                
-            # Normalisiere für besseres Matching
-            beispiel_normalized = beispiel.lower().strip()
+        if text_lower is None:
             text_lower = text.lower()
-            
-            # Exakte Suche
-            if beispiel_normalized in text_lower:
-                start = text_lower.find(beispiel_normalized)
+        if example_hits is None:
+            example_hits = self._example_automaton.first_occurrences(text_lower)
+        if fuzzy_hits is None:
+            fuzzy_hits = self._fuzzy_index.matches(example_hits)
+        
+        # Suche nach Beispielen (vorkompiliert in _build_example_index)
+        for beispiel, beispiel_normalized, pattern_id in self._example_table.get(marker_data['marker'], []):
+            # Exakte Suche über die Treffer des Automaten
+            if pattern_id in example_hits:
+                start = example_hits[pattern_id]
                 end = start + len(beispiel_normalized)
                 
                 match = MarkerMatch(
@@ -171,63 +316,46 @@ class MarkerMatcher:
                 )
                 matches.append(match)
             
-            # Fuzzy-Matching für teilweise Übereinstimmungen
-            elif self._fuzzy_match(beispiel_normalized, text_lower):
-                # Vereinfachtes Fuzzy-Matching
-                words = beispiel_normalized.split()
-                if len(words) > 2 and sum(1 for w in words if w in text_lower) >= len(words) * 0.7:
-                    match = MarkerMatch(
-                        marker_name=marker_data['marker'],
-                        marker_beschreibung=marker_data.get('beschreibung', ''),
-                        matched_text=beispiel[:50] + '...',
-                        position=(0, 0),
-                        confidence_score=0.7,
-                        pattern_type='fuzzy',
-                        tags=marker_data.get('tags', []),
-                        risk_score=marker_data.get('risk_score', 1)
-                    )
-                    matches.append(match)
+            # Fuzzy-Matching für teilweise Übereinstimmungen (über den Token-Index)
+            elif pattern_id in fuzzy_hits:
+                match = MarkerMatch(
+                    marker_name=marker_data['marker'],
+                    marker_beschreibung=marker_data.get('beschreibung', ''),
+                    matched_text=beispiel[:50] + '...',
+                    position=(0, 0),
+                    confidence_score=0.7,
+                    pattern_type='fuzzy',
+                    tags=marker_data.get('tags', []),
+                    risk_score=marker_data.get('risk_score', 1)
+                )
+                matches.append(match)
         
         # Semantische Patterns (falls vorhanden)
         if 'semantic_patterns' in marker_data:
-            semantic_matches = self._apply_semantic_patterns(text, marker_data)
+            semantic_matches = self._apply_semantic_patterns(text, marker_data, pattern_groups)
             matches.extend(semantic_matches)
         
         return matches
     
-    def _fuzzy_match(self, pattern: str, text: str) -> bool:
-        """Einfaches Fuzzy-Matching"""
-        # Sehr vereinfachte Version - kann erweitert werden
-        words = pattern.split()
-        return len(words) > 2 and sum(1 for w in words if w in text) >= len(words) * 0.6
-    
-    def _apply_semantic_patterns(self, text: str, marker_data: Dict[str, Any]) -> List[MarkerMatch]:
-        """Wendet semantische Patterns an (falls definiert)"""
+    def _apply_semantic_patterns(self, text: str, marker_data: Dict[str, Any],
+                                 pattern_groups: Optional[Set[int]] = None) -> List[MarkerMatch]:
+        """Wendet die vorkompilierten semantischen Patterns an (falls definiert)"""
         matches = []
-        semantic_data = marker_data.get('semantic_patterns', {})
-        
-        if 'patterns' in semantic_data:
-            for pattern_rule in semantic_data['patterns']:
-                if 'pattern' in pattern_rule:
-                    try:
-                        # Kompiliere Regex-Pattern
-                        regex = re.compile(pattern_rule['pattern'], re.IGNORECASE)
-                        
-                        for match in regex.finditer(text):
-                            marker_match = MarkerMatch(
-                                marker_name=marker_data['marker'],
-                                marker_beschreibung=marker_data.get('beschreibung', ''),
-                                matched_text=match.group(0),
-                                position=(match.start(), match.end()),
-                                confidence_score=0.9,
-                                kontext=self._extract_context(text, match.start(), match.end()),
-                                pattern_type='semantic',
-                                tags=marker_data.get('tags', []),
-                                risk_score=marker_data.get('risk_score', 1)
-                            )
-                            matches.append(marker_match)
-                    except Exception as e:
-                        logger.debug(f"Fehler bei Regex-Pattern: {e}")
+        
+        for pattern in self.semantic_patterns.patterns_for(marker_data['marker'], pattern_groups):
+            for match in pattern.regex.finditer(text):
+                marker_match = MarkerMatch(
+                    marker_name=marker_data['marker'],
+                    marker_beschreibung=marker_data.get('beschreibung', ''),
+                    matched_text=match.group(0),
+                    position=(match.start(), match.end()),
+                    confidence_score=0.9,
+                    kontext=self._extract_context(text, match.start(), match.end()),
+                    pattern_type='semantic',
+                    tags=marker_data.get('tags', []),
+                    risk_score=marker_data.get('risk_score', 1)
+                )
+                matches.append(marker_match)
         
         return matches
     
@@ -291,13 +419,143 @@ class MarkerMatcher:
         
         return summary
     
-    def analyze_batch(self, texts: List[str]) -> List[AnalysisResult]:
-        """Analysiert mehrere Texte"""
-        results = []
-        for text in texts:
-            results.append(self.analyze_text(text))
-        return results
+    def analyze_batch(self, texts: List[str], workers: int = 1, chunk_size: int = 32,
+                      return_exceptions: bool = False) -> List[Union[AnalysisResult, Exception]]:
+        """Analysiert mehrere Texte, optional parallel (siehe iter_batch)"""
+        return list(self.iter_batch(texts, workers, chunk_size, return_exceptions))
+    
+    def iter_batch(self, texts: Iterable[str], workers: int = 1, chunk_size: int = 32,
+                   return_exceptions: bool = False) -> Iterator[Union[AnalysisResult, Exception]]:
+        """Analysiert mehrere Texte und liefert die Ergebnisse in Eingabereihenfolge
+        
+        Bei workers > 1 werden die Texte in Blöcken von chunk_size auf den
+        Prozess-Pool verteilt. Die Worker übernehmen den kompilierten Marker-Satz
+        einmalig beim Start (per fork bzw. einmaligem Pickling), YAML wird nicht
+        erneut geparst. Mit return_exceptions=True wird ein Fehler als
+        Exception-Objekt an der Position des Textes geliefert statt geworfen.
+        
+        Der Pool hat immer pool_workers Prozesse und wird von allen Aufrufen
+        geteilt; workers begrenzt nur, wie viele Blöcke dieser Aufruf
+        gleichzeitig vergibt (höchstens 2 * workers). texts wird nur
+        entsprechend weit im Voraus gelesen, auch Generatoren bleiben damit
+        speicherflach.
+        """
+        chunk_size = max(1, chunk_size)
+        workers = min(workers, self.pool_workers)
+        small_batch = isinstance(texts, Sized) and len(texts) <= chunk_size
+        
+        if workers <= 1 or small_batch:
+            for text in texts:
+                yield _analyze_or_capture(self, text, return_exceptions)
+            return
+        
+        pool = self._get_pool()
+        pending: Deque[Any] = deque()
+        for chunk in _chunked(texts, chunk_size):
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().get()
+            pending.append(pool.apply_async(_analyze_batch_chunk, (chunk, return_exceptions)))
+        while pending:
+            yield from pending.popleft().get()
+    
+    def submit_batch(self, texts: List[str], callback, error_callback):
+        """Analysiert einen Block von Texten im Prozess-Pool, ohne zu blockieren
+        
+        callback erhält pro Text das Ergebnis-Dict (AnalysisResult.to_dict())
+        bzw. {'error': ...}; die Umwandlung erfolgt bereits im Worker.
+        error_callback wird nur bei einem Ausfall des ganzen Blocks aufgerufen.
+        Beide laufen im Ergebnis-Thread des Pools.
+        """
+        pool = self._get_pool()
+        return pool.apply_async(_analyze_batch_dicts, (texts,), callback=callback,
+                                error_callback=error_callback)
+    
+    def _get_pool(self) -> Any:
+        """Gibt den Prozess-Pool zurück und legt ihn beim ersten Aufruf an"""
+        with self._pool_lock:
+            if self._pool is None:
+                # fork vererbt den kompilierten Zustand ohne Kopie; sonst wird er pro Worker einmal gepickelt
+                start_methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+                self._pool = context.Pool(processes=self.pool_workers, initializer=_init_batch_worker,
+                                          initargs=(self,))
+                logger.info(f"Batch-Pool mit {self.pool_workers} Workern gestartet")
+            return self._pool
+    
+    def close_pool(self):
+        """Beendet den Prozess-Pool (z.B. nach einem Marker-Reload)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['snapshot'] = None
+        state['_previous'] = None
+        state['_pool'] = None
+        state['_pool_lock'] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+
+# Marker-Satz des aktuellen Batch-Worker-Prozesses (gesetzt durch _init_batch_worker)
+_batch_matcher: Optional[MarkerMatcher] = None
+
+
+def _init_batch_worker(matcher: MarkerMatcher):
+    """Initialisiert einen Batch-Worker mit dem kompilierten Marker-Satz"""
+    global _batch_matcher
+    _batch_matcher = matcher
+
+
+def _analyze_or_capture(matcher: MarkerMatcher, text: str,
+                        return_exceptions: bool) -> Union[AnalysisResult, Exception]:
+    """Analysiert einen Text; Fehler werden auf Wunsch als Ergebnis zurückgegeben"""
+    try:
+        return matcher.analyze_text(text)
+    except Exception as e:
+        if not return_exceptions:
+            raise
+        return e
+
+
+def _analyze_batch_chunk(texts: List[str], return_exceptions: bool = False) -> List[Union[AnalysisResult, Exception]]:
+    """Analysiert einen Block von Texten im Worker-Prozess"""
+    if _batch_matcher is None:
+        raise RuntimeError("Batch-Worker wurde nicht mit einem Marker-Satz initialisiert")
+    return [_analyze_or_capture(_batch_matcher, text, return_exceptions) for text in texts]
+
+
+def _analyze_batch_dicts(texts: List[str]) -> List[Dict[str, Any]]:
+    """Analysiert einen Block im Worker-Prozess und liefert serialisierbare Dicts"""
+    return [
+        {'error': str(result)} if isinstance(result, Exception) else result.to_dict()
+        for result in _analyze_batch_chunk(texts, return_exceptions=True)
+    ]
+
+
+def _marker_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Vergleicht zwei Marker-Sätze: hinzugekommene, geänderte und entfernte Marker"""
+    return {
+        'added': sorted(name for name in new if name not in old),
+        'changed': sorted(name for name in new if name in old and old[name] != new[name]),
+        'removed': sorted(name for name in old if name not in new)
+    }
+
 
+def _chunked(texts: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Zerlegt eine Textsequenz in Listen der Länge chunk_size"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 def main():
     """Demo-Funktion"""
@@ -3,7 +3,9 @@
 import re
 import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple, Dict, Any
+from itertools import chain, islice
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Iterator, Pattern, Union
 import logging
 from uuid import uuid4
 
@@ -17,19 +19,20 @@ logger = logging.getLogger(__name__)
 class TextChunker:
     """Segmentiert Texte intelligent in analysierbare Chunks."""
     
-    # Regex-Patterns für verschiedene Chat-Formate
+    # Regex-Patterns für verschiedene Chat-Formate (Sprecher nie über Zeilengrenzen,
+    # damit chunk_text() und das zeilenweise chunk_stream() dieselben Messages finden)
     WHATSAPP_PATTERN = re.compile(
-        r'(\d{1,2}[./]\d{1,2}[./]\d{2,4},?\s*\d{1,2}:\d{2}(?:\s*[AP]M)?)\s*-\s*([^:]+):\s*(.*)',
+        r'(\d{1,2}[./]\d{1,2}[./]\d{2,4},?\s*\d{1,2}:\d{2}(?:\s*[AP]M)?)\s*-\s*([^:\n]+):\s*(.*)',
         re.MULTILINE
     )
     
     TELEGRAM_PATTERN = re.compile(
-        r'\[(\d{1,2}\.\d{1,2}\.\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?)\]\s*([^:]+):\s*(.*)',
+        r'\[(\d{1,2}\.\d{1,2}\.\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?)\]\s*([^:\n]+):\s*(.*)',
         re.MULTILINE
     )
     
     GENERIC_PATTERN = re.compile(
-        r'^([^:]+):\s*(.*)',
+        r'^([^:\n]+):\s*(.*)',
         re.MULTILINE
     )
     
@@ -42,9 +45,35 @@ class TextChunker:
         re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}\s+\d{1,2}:\d{2}'),
     ]
     
+    # Zeitstempel-Formate in Prüfreihenfolge
+    TIMESTAMP_FORMATS = [
+        "%d.%m.%Y %H:%M",
+        "%d.%m.%Y %H:%M:%S",
+        "%d/%m/%Y %H:%M",
+        "%m/%d/%Y %H:%M",
+        "%d.%m.%y, %H:%M",
+        "%d/%m/%y, %H:%M",
+        "%Y-%m-%d %H:%M:%S",
+    ]
+    
+    # strptime-Direktiven, die der Schnellpfad selbst auswertet
+    _TIMESTAMP_DIRECTIVES = {
+        'd': r'(\d{1,2})',
+        'm': r'(\d{1,2})',
+        'Y': r'(\d{4})',
+        'y': r'(\d{2})',
+        'H': r'(\d{1,2})',
+        'M': r'(\d{1,2})',
+        'S': r'(\d{1,2})',
+    }
+    
+    # Anzahl Zeilen, anhand derer chunk_stream() das Format erkennt
+    STREAM_DETECT_LINES = 200
+    
     def __init__(self, config: Optional[ChunkingConfig] = None):
         self.config = config or ChunkingConfig()
         self._speaker_map: Dict[str, Speaker] = {}
+        self._reset_timestamp_format()
         
     def chunk_text(
         self, 
@@ -62,6 +91,7 @@ class TextChunker:
         """
         start_time = time.time()
         result = ChunkingResult()
+        self._reset_timestamp_format()
         
         try:
             # Format erkennen
@@ -97,6 +127,76 @@ class TextChunker:
         result.processing_time = time.time() - start_time
         return result
     
+    def chunk_stream(
+        self,
+        stream: Iterable[str],
+        format_hint: Optional[str] = None
+    ) -> Iterator[TextChunk]:
+        """Segmentiert einen Chat-Export zeilenweise aus einem File-Handle.
+        
+        Chunks werden geliefert, sobald ihre Messages abgeschlossen sind. Im
+        Speicher liegen nur die Messages des aktuellen Chunks und ein fertiger
+        Chunk (für die Verlinkung über next_chunk_id), sodass auch sehr große
+        Exporte inkrementell an den Matcher weitergereicht werden können::
+        
+            with open("export.txt", encoding="utf-8") as f:
+                for chunk in chunker.chunk_stream(f):
+                    matcher.analyze_text(chunk.text)
+        
+        Das Format wird anhand der ersten STREAM_DETECT_LINES Zeilen erkannt.
+        Text ohne erkennbares Chat-Format wird in Absätze von höchstens
+        max_chunk_size Zeichen zerlegt (an Zeilengrenzen). Passt bei einem
+        Chat-Format keine einzige Zeile, wird wie in chunk_text() der ganze
+        Text ein Chunk.
+        
+        Args:
+            stream: Text-Stream (z.B. geöffnete Datei), wird zeilenweise gelesen
+            format_hint: Hinweis auf Format (whatsapp, telegram, etc.)
+            
+        Yields:
+            TextChunk-Objekte in Dokumentreihenfolge
+        """
+        self._reset_timestamp_format()
+        lines = iter(stream)
+        head = list(islice(lines, self.STREAM_DETECT_LINES))
+        chat_format = format_hint or self._detect_format(''.join(head))
+        logger.info(f"Erkanntes Format: {chat_format}")
+        
+        lines = chain(head, lines)
+        pattern = self._get_pattern(chat_format)
+        
+        if pattern is None:
+            chunks = self._iter_paragraph_chunks(lines)
+        else:
+            preamble: List[str] = []
+            messages = self._iter_line_messages(
+                lines, pattern, chat_format in ["whatsapp", "telegram"], preamble
+            )
+            chunks = self._group_messages(messages)
+            first = next(chunks, None)
+            if first is None:
+                # Fallback: Als einzelnen Chunk behandeln
+                text = ''.join(preamble)
+                first = self._create_chunk(
+                    text=text,
+                    chunk_type=ChunkType.PARAGRAPH,
+                    start_pos=0,
+                    end_pos=len(text)
+                )
+            chunks = chain([first], chunks)
+        
+        yield from self._link_chunks(chunks)
+    
+    def chunk_file(
+        self,
+        path: Union[str, Path],
+        format_hint: Optional[str] = None,
+        encoding: str = 'utf-8'
+    ) -> Iterator[TextChunk]:
+        """Öffnet einen Chat-Export und segmentiert ihn per chunk_stream()."""
+        with open(path, 'r', encoding=encoding, errors='replace') as f:
+            yield from self.chunk_stream(f, format_hint)
+    
     def _detect_format(self, text: str) -> str:
         """Erkennt das Chat-Format automatisch."""
         # Teste verschiedene Patterns
@@ -117,19 +217,15 @@ class TextChunker:
         """Parst Messages aus dem Text basierend auf Format."""
         messages = []
         
-        if format_type == "whatsapp":
-            pattern = self.WHATSAPP_PATTERN
-        elif format_type == "telegram":
-            pattern = self.TELEGRAM_PATTERN
-        elif format_type == "generic":
-            pattern = self.GENERIC_PATTERN
-        else:
+        pattern = self._get_pattern(format_type)
+        if pattern is None:
             # Plain text - keine Messages
             return []
         
-        last_end = 0
+        # Einmal scannen; das Ende einer Message ist der Start der nächsten
+        matches = list(pattern.finditer(text))
         
-        for match in pattern.finditer(text):
+        for index, match in enumerate(matches):
             if format_type in ["whatsapp", "telegram"]:
                 timestamp_str, speaker, message = match.groups()
                 timestamp = self._parse_timestamp(timestamp_str)
@@ -139,12 +235,10 @@ class TextChunker:
             
             # Multi-line Messages zusammenführen
             start = match.start()
-            end = match.end()
             
             # Finde nächste Message oder Ende
-            next_match = pattern.search(text, end)
-            if next_match:
-                message_end = next_match.start()
+            if index + 1 < len(matches):
+                message_end = matches[index + 1].start()
             else:
                 message_end = len(text)
             
@@ -160,44 +254,240 @@ class TextChunker:
                 'start_pos': start,
                 'end_pos': message_end
             })
-            
-            last_end = message_end
         
         return messages
     
+    def _get_pattern(self, format_type: str) -> Optional[Pattern]:
+        """Gibt das Message-Pattern eines Formats zurück (None für plain)."""
+        if format_type == "whatsapp":
+            return self.WHATSAPP_PATTERN
+        elif format_type == "telegram":
+            return self.TELEGRAM_PATTERN
+        elif format_type == "generic":
+            return self.GENERIC_PATTERN
+        return None
+    
+    def _iter_line_messages(
+        self,
+        lines: Iterable[str],
+        pattern: Pattern,
+        with_timestamp: bool,
+        preamble: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Parst Messages zeilenweise; eine Message ist fertig, sobald die nächste beginnt.
+        
+        Liefert dieselben Message-Dicts wie _parse_messages(): Folgezeilen
+        werden an die Message angehängt, start_pos/end_pos sind
+        Zeichen-Offsets im Stream. Zeilen vor der ersten Message werden in
+        preamble gesammelt (für den Fallback ohne Messages).
+        """
+        current = None
+        tail: List[str] = []
+        pos = 0
+        
+        for line in lines:
+            match = pattern.search(line)
+            
+            if match:
+                if current is not None:
+                    # Text vor dem Treffer gehört noch zur vorherigen Message
+                    tail.append(line[:match.start()])
+                    current['end_pos'] = pos + match.start()
+                    yield self._finish_line_message(current, tail)
+                elif preamble:
+                    preamble.clear()
+                
+                if with_timestamp:
+                    timestamp_str, speaker, message = match.groups()
+                    timestamp = self._parse_timestamp(timestamp_str)
+                else:
+                    speaker, message = match.groups()
+                    timestamp = None
+                
+                current = {
+                    'speaker': speaker.strip(),
+                    'text': message,
+                    'timestamp': timestamp,
+                    'start_pos': pos + match.start(),
+                    'end_pos': None
+                }
+                tail = [line[match.end():]]
+            elif current is not None:
+                tail.append(line)
+            elif preamble is not None:
+                preamble.append(line)
+            
+            pos += len(line)
+        
+        if current is not None:
+            current['end_pos'] = pos
+            yield self._finish_line_message(current, tail)
+    
+    @staticmethod
+    def _finish_line_message(message: Dict[str, Any], tail: List[str]) -> Dict[str, Any]:
+        """Führt Folgezeilen wie in _parse_messages() mit der Message zusammen."""
+        full_message = ''.join(tail).strip()
+        text = message['text']
+        if full_message:
+            text = text + "\n" + full_message
+        message['text'] = text.strip()
+        return message
+    
+    def _iter_paragraph_chunks(self, lines: Iterable[str]) -> Iterator[TextChunk]:
+        """Zerlegt Text ohne Chat-Format in Absätze bis max_chunk_size Zeichen."""
+        buffer: List[str] = []
+        buffer_size = 0
+        start_pos = 0
+        
+        for line in lines:
+            if buffer and buffer_size + len(line) > self.config.max_chunk_size:
+                yield self._create_chunk(
+                    text=''.join(buffer),
+                    chunk_type=ChunkType.PARAGRAPH,
+                    start_pos=start_pos,
+                    end_pos=start_pos + buffer_size
+                )
+                start_pos += buffer_size
+                buffer = []
+                buffer_size = 0
+            
+            buffer.append(line)
+            buffer_size += len(line)
+        
+        if buffer:
+            yield self._create_chunk(
+                text=''.join(buffer),
+                chunk_type=ChunkType.PARAGRAPH,
+                start_pos=start_pos,
+                end_pos=start_pos + buffer_size
+            )
+    
+    def _reset_timestamp_format(self):
+        """Vergisst das gelernte Zeitstempel-Format (neuer Export)."""
+        self._timestamp_format: Optional[str] = None
+        self._timestamp_parsers: List[Tuple[Pattern, List[str]]] = []
+        self._last_timestamp: Tuple[Optional[str], Optional[datetime]] = (None, None)
+    
     def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
-        """Versucht einen Zeitstempel zu parsen."""
-        # Verschiedene Formate probieren
-        formats = [
-            "%d.%m.%Y %H:%M",
-            "%d.%m.%Y %H:%M:%S",
-            "%d/%m/%Y %H:%M",
-            "%m/%d/%Y %H:%M",
-            "%d.%m.%y, %H:%M",
-            "%d/%m/%y, %H:%M",
-            "%Y-%m-%d %H:%M:%S",
-        ]
-        
-        for fmt in formats:
+        """Versucht einen Zeitstempel zu parsen.
+        
+        Ein Export verwendet durchgehend dasselbe Format: das erste erfolgreich
+        geparste Format wird gelernt und danach ohne strptime über eine
+        vorkompilierte Regex ausgewertet. Erst wenn dieser Schnellpfad nicht
+        passt, werden alle TIMESTAMP_FORMATS der Reihe nach probiert.
+        """
+        # Aufeinanderfolgende Messages teilen oft denselben Zeitstempel
+        last_str, last_value = self._last_timestamp
+        if timestamp_str == last_str:
+            return last_value
+        
+        value = self._parse_learned_timestamp(timestamp_str.strip())
+        if value is None:
+            value = self._parse_timestamp_formats(timestamp_str)
+        
+        self._last_timestamp = (timestamp_str, value)
+        return value
+    
+    def _parse_learned_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        """Schnellpfad für das gelernte Format.
+        
+        Gleich aufgebaute Formate, die in TIMESTAMP_FORMATS davor stehen
+        (z.B. %d/%m/%Y vor %m/%d/%Y), werden zuerst probiert; das Ergebnis
+        ist damit dasselbe wie beim Durchprobieren aller Formate.
+        """
+        for regex, fields in self._timestamp_parsers:
+            match = regex.fullmatch(timestamp_str)
+            if not match:
+                continue
+            
+            values = dict(zip(fields, map(int, match.groups())))
+            if 'Y' in values:
+                year = values['Y']
+            else:
+                # Wie strptime: 69-99 -> 1969-1999, 00-68 -> 2000-2068
+                year = values['y'] + (1900 if values['y'] >= 69 else 2000)
+            
             try:
-                return datetime.strptime(timestamp_str.strip(), fmt)
+                return datetime(
+                    year, values['m'], values['d'],
+                    values.get('H', 0), values.get('M', 0), values.get('S', 0)
+                )
             except ValueError:
                 continue
+        return None
+    
+    def _parse_timestamp_formats(self, timestamp_str: str) -> Optional[datetime]:
+        """Probiert alle bekannten Formate und lernt das erste passende."""
+        for fmt in self.TIMESTAMP_FORMATS:
+            try:
+                value = datetime.strptime(timestamp_str.strip(), fmt)
+            except ValueError:
+                continue
+            
+            if fmt != self._timestamp_format:
+                self._learn_timestamp_format(fmt)
+            return value
         
         logger.warning(f"Konnte Zeitstempel nicht parsen: {timestamp_str}")
         return None
     
+    def _learn_timestamp_format(self, fmt: str):
+        """Übersetzt ein strptime-Format in eine Regex für den Schnellpfad."""
+        learned = self._compile_timestamp_format(fmt)
+        if learned is None:
+            return  # Format bleibt auf dem strptime-Pfad
+        
+        parsers = []
+        for earlier in self.TIMESTAMP_FORMATS[:self.TIMESTAMP_FORMATS.index(fmt)]:
+            compiled = self._compile_timestamp_format(earlier)
+            if compiled is not None and compiled[0].pattern == learned[0].pattern:
+                parsers.append(compiled)
+        parsers.append(learned)
+        
+        logger.debug(f"Zeitstempel-Format gelernt: {fmt}")
+        self._timestamp_format = fmt
+        self._timestamp_parsers = parsers
+    
+    def _compile_timestamp_format(self, fmt: str) -> Optional[Tuple[Pattern, List[str]]]:
+        """Regex und Feldreihenfolge eines strptime-Formats (None bei unbekannten Direktiven)."""
+        parts = []
+        fields = []
+        for token in re.split(r'(%.|\s+)', fmt):
+            if not token:
+                continue
+            if token.startswith('%'):
+                directive = self._TIMESTAMP_DIRECTIVES.get(token[1:])
+                if directive is None:
+                    return None
+                parts.append(directive)
+                fields.append(token[1:])
+            elif token.isspace():
+                parts.append(r'\s+')
+            else:
+                parts.append(re.escape(token))
+        return re.compile(''.join(parts)), fields
+    
     def _create_chunks_from_messages(
         self, 
         messages: List[Dict[str, Any]]
     ) -> List[TextChunk]:
         """Erstellt Chunks aus geparsten Messages."""
-        chunks = []
+        return list(self._link_chunks(self._group_messages(messages)))
+    
+    def _group_messages(
+        self, 
+        messages: Iterable[Dict[str, Any]]
+    ) -> Iterator[TextChunk]:
+        """Fasst Messages zu Chunks zusammen und liefert jeden Chunk, sobald er fertig ist."""
         current_chunk_messages = []
+        current_size = 0
         current_speaker = None
         last_timestamp = None
         
-        for i, msg in enumerate(messages):
+        max_chunk_size = self.config.max_chunk_size
+        max_gap_seconds = self.config.time_gap_minutes * 60
+        
+        for msg in messages:
             speaker_name = msg['speaker']
             timestamp = msg['timestamp']
             
@@ -211,37 +501,42 @@ class TextChunker:
             # Bei Zeitsprung
             if (self.config.chunk_by_time and 
                 last_timestamp and timestamp and
-                (timestamp - last_timestamp).total_seconds() > self.config.time_gap_minutes * 60):
+                (timestamp - last_timestamp).total_seconds() > max_gap_seconds):
                 need_new_chunk = True
             
-            # Bei Größenlimit
-            current_size = sum(len(m['text']) for m in current_chunk_messages)
-            if current_size + len(msg['text']) > self.config.max_chunk_size:
+            # Bei Größenlimit (laufende Summe statt Neuberechnung pro Message)
+            message_size = len(msg['text'])
+            if current_size + message_size > max_chunk_size:
                 need_new_chunk = True
             
             # Erstelle neuen Chunk wenn nötig
             if need_new_chunk and current_chunk_messages:
-                chunk = self._create_chunk_from_messages(current_chunk_messages)
-                chunks.append(chunk)
+                yield self._create_chunk_from_messages(current_chunk_messages)
                 current_chunk_messages = []
+                current_size = 0
             
             current_chunk_messages.append(msg)
+            current_size += message_size
             current_speaker = speaker_name
             last_timestamp = timestamp
         
         # Letzten Chunk erstellen
         if current_chunk_messages:
-            chunk = self._create_chunk_from_messages(current_chunk_messages)
-            chunks.append(chunk)
-        
-        # Chunk-IDs verlinken
-        for i in range(len(chunks)):
-            if i > 0:
-                chunks[i].previous_chunk_id = chunks[i-1].id
-            if i < len(chunks) - 1:
-                chunks[i].next_chunk_id = chunks[i+1].id
+            yield self._create_chunk_from_messages(current_chunk_messages)
+    
+    @staticmethod
+    def _link_chunks(chunks: Iterable[TextChunk]) -> Iterator[TextChunk]:
+        """Verlinkt aufeinanderfolgende Chunks; hält dafür genau einen Chunk zurück."""
+        previous = None
+        for chunk in chunks:
+            if previous is not None:
+                previous.next_chunk_id = chunk.id
+                chunk.previous_chunk_id = previous.id
+                yield previous
+            previous = chunk
         
-        return chunks
+        if previous is not None:
+            yield previous
     
     def _create_chunk_from_messages(
         self, 
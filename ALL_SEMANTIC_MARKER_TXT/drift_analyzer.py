@@ -7,16 +7,24 @@ in Textsequenzen und die Erkennung von emergenten Bedeutungsmustern.
 """
 
 import numpy as np
-from typing import List, Dict, Optional, Tuple, Union, Any
+from typing import List, Dict, Optional, Tuple, Union, Any, cast
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
+import hashlib
+import json
 import logging
 
 from .cost_vector_math import (
-    CoSDVector, VectorOperations, calculate_drift_velocity,
-    calculate_resonance_coupling, cluster_vectors, calculate_semantic_drift_path
+    CoSDVector, ResonanceChains, calculate_drift_velocity,
+    calculate_resonance_band, calculate_semantic_drift_path,
+    mean_pairwise_cosine_similarity
 )
+from .vector_clustering import create_clustering_backend
+from .drift_session import CoSDSession
+from .vector_cache import VectorCache, vector_cache_key
+from .vector_index import CoSDVectorIndex
+from .vector_arena import VectorArena
+from .stage_profile import StageProfile
 from .semantic_marker_interface import (
     MarkerVectorizer, SemanticCluster, CoSDMarkerMatcher
 )
@@ -43,6 +51,7 @@ class DriftAnalysisResult:
         risk_assessment: Risikobewertung basierend auf Drift-Mustern
         drift_metrics: Neue erweiterte Drift-Metriken (Home Base, Density, Variability, Rise Rate)
         timestamp: Zeitstempel der Analyse
+        profile: Laufzeiten je Phase (ms) und Zähler der Pipeline
     """
     text_sequence: List[str]
     drift_vectors: List[CoSDVector]
@@ -54,6 +63,7 @@ class DriftAnalysisResult:
     drift_metrics: Dict[str, any] = field(default_factory=dict)
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, any] = field(default_factory=dict)
+    profile: Dict[str, any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, any]:
         """Konvertiert das Ergebnis in ein serialisierbares Dict."""
@@ -74,7 +84,8 @@ class DriftAnalysisResult:
             ],
             'risk_assessment': self.risk_assessment,
             'drift_metrics': self.drift_metrics,
-            'metadata': self.metadata
+            'metadata': self.metadata,
+            'profile': self.profile
         } 
 
 class CoSDAnalyzer:
@@ -100,11 +111,33 @@ class CoSDAnalyzer:
             config: Optionale Konfigurationsparameter
         """
         self.config = config or self._default_config()
-        self.cosd_matcher = CoSDMarkerMatcher(base_matcher, marker_data_path)
+        self.cosd_matcher = CoSDMarkerMatcher(
+            base_matcher,
+            marker_data_path,
+            sparse_vectors=self.config.get('sparse_vectors', False)
+        )
         self.vectorizer = self.cosd_matcher.vectorizer
+        self.clustering = create_clustering_backend(
+            self.config.get('clustering_backend', 'complete'),
+            distance_threshold=self.config['cluster_distance_threshold'],
+            method='cosine',
+            **self.config.get('clustering_options', {})
+        )
         
-        # Cache für Performance
-        self.vector_cache = {}
+        # Cache für Performance (Schlüssel: Text + Marker-Satz)
+        self.vector_cache = VectorCache(
+            max_entries=self.config.get('vector_cache_size', 10000),
+            disk_path=self.config.get('vector_cache_path')
+        )
+        self.vector_cache_namespace = self._vector_cache_namespace()
+        
+        # Optionaler Index über alle analysierten Vektoren (ähnliche frühere Momente)
+        self.history_index = None
+        if self.config.get('history_index_path'):
+            self.history_index = CoSDVectorIndex.open(
+                self.config['history_index_path'],
+                self.vectorizer.dimension_count
+            )
         self.cluster_history = []
         
     def _default_config(self) -> Dict[str, any]:
@@ -112,9 +145,17 @@ class CoSDAnalyzer:
         return {
             'min_text_length': 10,
             'resonance_threshold': 0.7,
+            'resonance_lookahead': 4,  # Paare (i, j) mit j - i <= 4
             'cluster_distance_threshold': 0.5,
+            'clustering_backend': 'complete',  # 'complete', 'dbscan' oder 'kmeans'
+            'clustering_options': {},
             'drift_velocity_window': 3,
             'emergence_detection_sensitivity': 0.8,
+            'sparse_vectors': False,
+            'vector_dtype': 'float64',  # dichte Sequenzen kompakt: 'float32' oder 'float16'
+            'vector_cache_size': 10000,
+            'vector_cache_path': None,  # SQLite-Datei, von mehreren Workern nutzbar
+            'history_index_path': None,  # Verzeichnis des CoSDVectorIndex
             'risk_thresholds': {
                 'low': 0.3,
                 'medium': 0.6,
@@ -125,7 +166,8 @@ class CoSDAnalyzer:
     def analyze_drift(
         self,
         text_sequence: List[str],
-        timestamps: Optional[List[datetime]] = None
+        timestamps: Optional[List[datetime]] = None,
+        conversation_id: Optional[str] = None
     ) -> DriftAnalysisResult:
         """
         Analysiert semantische Drift in einer Textsequenz.
@@ -133,6 +175,8 @@ class CoSDAnalyzer:
         Args:
             text_sequence: Liste von Texten in chronologischer Reihenfolge
             timestamps: Optionale Liste von Zeitstempeln für jeden Text
+            conversation_id: Nimmt die Vektoren unter dieser ID in den
+                History-Index auf (falls konfiguriert)
             
         Returns:
             DriftAnalysisResult mit allen Analyse-Metriken
@@ -148,37 +192,50 @@ class CoSDAnalyzer:
                 for i in range(len(text_sequence))
             ]
         
+        profile = StageProfile()
+        
         # Phase 1: Vektorisierung
         logger.info(f"Starting CoSD analysis for {len(text_sequence)} texts")
-        drift_vectors = self._create_drift_vectors(text_sequence, timestamps)
+        with profile.stage('vectorization'):
+            drift_vectors = self._create_drift_vectors(text_sequence, timestamps, profile)
+        if self.history_index is not None and conversation_id is not None:
+            with profile.stage('history_index'):
+                self.history_index.add_many(drift_vectors, conversation_id)
         
         # Phase 2: Drift-Berechnung
-        drift_velocity = calculate_drift_velocity(
-            drift_vectors,
-            self.config['drift_velocity_window']
-        )
-        drift_path = calculate_semantic_drift_path(drift_vectors)
+        with profile.stage('drift'):
+            drift_velocity = calculate_drift_velocity(
+                drift_vectors,
+                self.config['drift_velocity_window']
+            )
+            drift_path = calculate_semantic_drift_path(drift_vectors)
         
         # Phase 3: Resonanz-Analyse
-        resonance_patterns = self._analyze_resonance_patterns(drift_vectors)
+        with profile.stage('resonance'):
+            resonance_patterns = self._analyze_resonance_patterns(drift_vectors, profile)
         
-        # Phase 4: Emergenz-Detektion
+        # Phase 4: Emergenz-Detektion (Zeiten für 'clustering' und 'emergence_scoring')
         emergent_clusters = self._detect_emergent_clusters(
             drift_vectors,
-            text_sequence
+            text_sequence,
+            profile
         )
         
         # Phase 5: Erweiterte Drift-Metriken
-        drift_metrics = calculate_all_drift_metrics(drift_vectors)
-        
-        # Phase 6: Risikobewertung
-        risk_assessment = self._assess_drift_risk(
-            drift_velocity,
-            drift_path,
-            resonance_patterns,
-            emergent_clusters,
-            drift_metrics
-        )
+        with profile.stage('drift_metrics'):
+            drift_metrics = calculate_all_drift_metrics(drift_vectors)
+        
+        # Phase 6: Risikobewertung (enthält 'recommendations')
+        with profile.stage('risk_assessment'):
+            risk_assessment = self._assess_drift_risk(
+                drift_velocity,
+                drift_path,
+                resonance_patterns,
+                emergent_clusters,
+                drift_metrics,
+                profile
+            )
+        profile.stage_timings['total'] = profile.total_ms
         
         return DriftAnalysisResult(
             text_sequence=text_sequence,
@@ -192,13 +249,58 @@ class CoSDAnalyzer:
             metadata={
                 'analyzer_config': self.config,
                 'total_drift_distance': drift_path['path_length']
-            }
+            },
+            profile=profile.to_dict()
         )
     
+    def open_session(
+        self,
+        session_id: Optional[str] = None,
+        state: Optional[Dict[str, any]] = None,
+        window: Optional[int] = None
+    ) -> CoSDSession:
+        """
+        Öffnet eine Streaming-Session für fortlaufend eintreffende Texte.
+        
+        Args:
+            session_id: Optionale ID der neuen Session
+            state: Exportierter Zustand (CoSDSession.to_dict()) zum Fortsetzen
+            window: Anzahl gehaltener letzter Vektoren
+            
+        Returns:
+            CoSDSession mit append(text, timestamp) und snapshot()
+        """
+        if state is not None:
+            return CoSDSession.from_dict(self, state)
+        return CoSDSession(self, session_id=session_id, window=window)
+    
+    def find_similar_moments(
+        self,
+        text: str,
+        k: int = 5,
+        conversation_id: Optional[str] = None
+    ) -> List[Dict[str, any]]:
+        """
+        Sucht die semantisch ähnlichsten früheren Momente im History-Index.
+        
+        Args:
+            text: Text der aktuellen Nachricht
+            k: Anzahl Treffer
+            conversation_id: Nur innerhalb dieses Gesprächs suchen
+            
+        Returns:
+            Treffer mit id, similarity, conversation_id, position, timestamp
+        """
+        if self.history_index is None:
+            raise RuntimeError("No history index configured")
+        vector = self._vectorize_text(text, datetime.now())
+        return self.history_index.search(vector, k, conversation_id)
+    
     def _create_drift_vectors(
         self,
         text_sequence: List[str],
-        timestamps: List[datetime]
+        timestamps: List[datetime],
+        profile: Optional[StageProfile] = None
     ) -> List[CoSDVector]:
         """
         Erstellt Drift-Vektoren für eine Textsequenz.
@@ -206,168 +308,190 @@ class CoSDAnalyzer:
         Args:
             text_sequence: Liste von Texten
             timestamps: Liste von Zeitstempeln
+            profile: Optionales Profil für die Zähler vectors_built/cache_hits
             
         Returns:
-            Liste von CoSDVector-Objekten
+            Liste von CoSDVector-Objekten (bei kompaktem vector_dtype
+            Sichten auf eine gemeinsame VectorArena)
         """
-        vectors = []
-        
-        for i, (text, timestamp) in enumerate(zip(text_sequence, timestamps)):
-            # Prüfe Cache
-            cache_key = hash(text)
-            if cache_key in self.vector_cache:
-                vector = self.vector_cache[cache_key]
-                # Aktualisiere Timestamp
-                vector.timestamp = timestamp
-            else:
-                # Analysiere Text mit CoSD-Matcher
-                analysis = self.cosd_matcher.analyze_with_cosd(text)
-                
-                # Extrahiere aktive Marker
-                active_markers = []
-                if analysis['base_analysis']:
-                    for match in analysis['base_analysis']['gefundene_marker']:
-                        # Inferiere Kategorie (vereinfacht)
-                        category = self._infer_marker_category(match)
-                        marker_name = match['marker']
-                        active_markers.append((category, marker_name))
-                
-                # Erstelle Vektor
-                vector = self.vectorizer.vectorize_text_with_markers(
-                    text,
-                    active_markers
-                )
-                vector.timestamp = timestamp
-                
-                # Cache für Performance
-                self.vector_cache[cache_key] = vector
+        vector_dtype = self.config.get('vector_dtype', 'float64')
+        if vector_dtype == 'float64' or self.vectorizer.sparse:
+            return [
+                self._vectorize_text(text, timestamp, profile)
+                for text, timestamp in zip(text_sequence, timestamps)
+            ]
+        
+        arena = VectorArena(self.vectorizer.dimension_count, vector_dtype, capacity=len(text_sequence))
+        # Arena-Sichten erben nicht von CoSDVector, bieten aber dessen Schnittstelle
+        return cast(List[CoSDVector], [
+            arena.append(self._vectorize_text(text, timestamp, profile))
+            for text, timestamp in zip(text_sequence, timestamps)
+        ])
+    
+    def _vectorize_text(
+        self,
+        text: str,
+        timestamp: datetime,
+        profile: Optional[StageProfile] = None
+    ) -> CoSDVector:
+        """
+        Erstellt den Drift-Vektor für einen einzelnen Text.
+        
+        Args:
+            text: Zu analysierender Text
+            timestamp: Zeitstempel des Textes
+            profile: Optionales Profil für die Zähler vectors_built/cache_hits
             
-            vectors.append(vector)
+        Returns:
+            CoSDVector des Textes
+        """
+        # Prüfe Cache (liefert eine eigene Hülle mit diesem Zeitstempel)
+        cache_key = vector_cache_key(text, self.vector_cache_namespace)
+        vector = self.vector_cache.get(cache_key, timestamp)
+        if vector is not None:
+            if profile is not None:
+                profile.count('cache_hits')
+            return vector
+        
+        # Analysiere Text mit CoSD-Matcher
+        analysis = self.cosd_matcher.analyze_with_cosd(text)
+        
+        # Extrahiere aktive Marker
+        active_markers = []
+        if analysis['base_analysis']:
+            for match in analysis['base_analysis']['gefundene_marker']:
+                # Inferiere Kategorie (vereinfacht)
+                category = self._infer_marker_category(match)
+                marker_name = match['marker']
+                active_markers.append((category, marker_name))
+        
+        # Erstelle Vektor
+        vector = self.vectorizer.vectorize_text_with_markers(
+            text,
+            active_markers
+        )
+        vector.timestamp = timestamp
+        if profile is not None:
+            profile.count('vectors_built')
         
-        return vectors
+        # Cache für Performance
+        self.vector_cache.put(cache_key, vector)
+        return vector
+    
+    def _vector_cache_namespace(self) -> str:
+        """
+        Kennung für alles, was neben dem Text in einen Vektor eingeht.
+        
+        Umfasst die CoSD-Marker-Daten, die Vektor-Darstellung und die
+        Version des Marker-Satzes des Basis-Matchers (falls bekannt), damit
+        Einträge einer gemeinsamen Disk-Tier nicht über Marker-Sätze hinweg
+        wiederverwendet werden.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.vectorizer.marker_data, sort_keys=True, default=str).encode('utf-8'))
+        base_matcher = self.cosd_matcher.base_matcher
+        base_version = getattr(base_matcher, 'marker_set_version', None) if base_matcher else 'none'
+        return f"{digest.hexdigest()[:16]}:{base_version}:{'sparse' if self.vectorizer.sparse else 'dense'}"
     
     def _analyze_resonance_patterns(
         self,
-        vectors: List[CoSDVector]
+        vectors: List[CoSDVector],
+        profile: Optional[StageProfile] = None
     ) -> List[Dict[str, any]]:
         """
         Analysiert Resonanzmuster zwischen Vektoren.
         
         Args:
             vectors: Liste von CoSDVector-Objekten
+            profile: Optionales Profil für die Zähler pairs_evaluated/resonant_pairs
             
         Returns:
             Liste von Resonanzmustern
         """
         patterns = []
-        threshold = self.config['resonance_threshold']
-        
-        # Analysiere Paare mit zeitlichem Abstand
-        for i in range(len(vectors)):
-            for j in range(i + 1, min(i + 5, len(vectors))):  # Max 5 Schritte voraus
-                coupling = calculate_resonance_coupling(
-                    vectors[i],
-                    vectors[j],
-                    threshold
-                )
-                
-                if coupling['is_strongly_coupled']:
-                    pattern = {
-                        'type': 'strong_resonance',
-                        'indices': [i, j],
-                        'time_delta': (vectors[j].timestamp - vectors[i].timestamp).total_seconds(),
-                        'coupling_strength': coupling['coupling_strength'],
-                        'phase_alignment': coupling['phase_alignment'],
-                        'resonance_factor': coupling['resonance_factor']
-                    }
-                    patterns.append(pattern)
         
-        # Identifiziere Resonanz-Ketten
-        chains = self._identify_resonance_chains(patterns, len(vectors))
-        patterns.extend(chains)
+        # Analysiere alle Paare im Vorausschau-Fenster in einem Durchlauf
+        band = calculate_resonance_band(
+            vectors,
+            self.config.get('resonance_lookahead', 4),
+            self.config['resonance_threshold']
+        )
+        
+        # Resonanz-Ketten werden mit jeder starken Kopplung fortgeschrieben
+        chains = ResonanceChains()
+        
+        for pair in np.flatnonzero(band['is_strongly_coupled']):
+            i, j = int(band['i'][pair]), int(band['j'][pair])
+            chains.add_edge(i, j)
+            patterns.append({
+                'type': 'strong_resonance',
+                'indices': [i, j],
+                'time_delta': (vectors[j].timestamp - vectors[i].timestamp).total_seconds(),
+                'coupling_strength': float(band['coupling_strength'][pair]),
+                'phase_alignment': float(band['phase_alignment'][pair]),
+                'resonance_factor': float(band['resonance_factor'][pair])
+            })
+        
+        # Resonanz-Ketten (mindestens 3 verbundene Punkte)
+        patterns.extend(chains.chains())
+        
+        if profile is not None:
+            profile.count('pairs_evaluated', len(band['i']))
+            profile.count('resonant_pairs', int(np.count_nonzero(band['is_strongly_coupled'])))
         
         return patterns
     
-    def _identify_resonance_chains(
+    def _detect_emergent_clusters(
         self,
-        patterns: List[Dict[str, any]],
-        vector_count: int
-    ) -> List[Dict[str, any]]:
+        vectors: List[CoSDVector],
+        text_sequence: List[str],
+        profile: Optional[StageProfile] = None
+    ) -> List[SemanticCluster]:
         """
-        Identifiziert Ketten von Resonanzmustern.
+        Detektiert emergente semantische Cluster.
         
         Args:
-            patterns: Liste von einzelnen Resonanzmustern
-            vector_count: Anzahl der Vektoren
+            vectors: Liste von CoSDVector-Objekten
+            text_sequence: Originale Textsequenz
+            profile: Optionales Profil für die Phasen clustering/emergence_scoring
             
         Returns:
-            Liste von Resonanzketten
+            Liste von emergenten SemanticCluster-Objekten
         """
-        chains = []
-        
-        # Erstelle Adjazenzliste
-        connections = defaultdict(set)
-        for pattern in patterns:
-            i, j = pattern['indices']
-            connections[i].add(j)
-            connections[j].add(i)
-        
-        # Finde zusammenhängende Komponenten
-        visited = set()
-        for start in range(vector_count):
-            if start in visited or start not in connections:
-                continue
-            
-            # BFS für zusammenhängende Komponente
-            chain = set()
-            queue = [start]
-            
-            while queue:
-                current = queue.pop(0)
-                if current in visited:
-                    continue
-                
-                visited.add(current)
-                chain.add(current)
-                
-                for neighbor in connections[current]:
-                    if neighbor not in visited:
-                        queue.append(neighbor)
-            
-            if len(chain) >= 3:  # Mindestens 3 verbundene Punkte
-                chains.append({
-                    'type': 'resonance_chain',
-                    'indices': sorted(list(chain)),
-                    'chain_length': len(chain),
-                    'density': len([p for p in patterns if all(idx in chain for idx in p['indices'])]) / (len(chain) * (len(chain) - 1) / 2)
-                })
-        
-        return chains
+        profile = profile or StageProfile()
+        emergent_clusters = []
+        
+        # Cluster Vektoren
+        with profile.stage('clustering'):
+            cluster_indices = self.clustering.cluster(vectors)
+        profile.count('clusters_formed', len(cluster_indices))
+        
+        with profile.stage('emergence_scoring'):
+            emergent_clusters = self._score_emergent_clusters(vectors, cluster_indices)
+        profile.count('emergent_clusters', len(emergent_clusters))
+        
+        # Aktualisiere Cluster-Historie
+        self.cluster_history.extend(emergent_clusters)
+        
+        return emergent_clusters
     
-    def _detect_emergent_clusters(
+    def _score_emergent_clusters(
         self,
         vectors: List[CoSDVector],
-        text_sequence: List[str]
+        cluster_indices: List[List[int]]
     ) -> List[SemanticCluster]:
         """
-        Detektiert emergente semantische Cluster.
+        Prüft gebildete Cluster auf Emergenz und berechnet Score und Zentroid.
         
         Args:
             vectors: Liste von CoSDVector-Objekten
-            text_sequence: Originale Textsequenz
+            cluster_indices: Vektor-Indizes je Cluster
             
         Returns:
             Liste von emergenten SemanticCluster-Objekten
         """
         emergent_clusters = []
         
-        # Cluster Vektoren
-        cluster_indices = cluster_vectors(
-            vectors,
-            self.config['cluster_distance_threshold'],
-            method='cosine'
-        )
-        
         # Analysiere jeden Cluster auf Emergenz
         for cluster_idx_list in cluster_indices:
             if len(cluster_idx_list) < 2:
@@ -407,9 +531,6 @@ class CoSDAnalyzer:
                 
                 emergent_clusters.append(cluster)
         
-        # Aktualisiere Cluster-Historie
-        self.cluster_history.extend(emergent_clusters)
-        
         return emergent_clusters
     
     def _check_emergence(
@@ -470,13 +591,7 @@ class CoSDAnalyzer:
         novelty = min(1.0, len(marker_set) / 5.0)
         
         # Kohäsion
-        cluster_vecs = [vectors[i] for i in indices]
-        similarities = []
-        for i in range(len(cluster_vecs)):
-            for j in range(i+1, len(cluster_vecs)):
-                sim = VectorOperations.cosine_similarity(cluster_vecs[i], cluster_vecs[j])
-                similarities.append(sim)
-        cohesion = np.mean(similarities) if similarities else 0.0
+        cohesion = mean_pairwise_cosine_similarity([vectors[i] for i in indices])
         
         # Persistenz
         time_span = (vectors[max(indices)].timestamp - vectors[min(indices)].timestamp).total_seconds()
@@ -493,7 +608,8 @@ class CoSDAnalyzer:
         drift_path: Dict[str, any],
         resonance_patterns: List[Dict[str, any]],
         emergent_clusters: List[SemanticCluster],
-        drift_metrics: Dict[str, any]
+        drift_metrics: Dict[str, any],
+        profile: Optional[StageProfile] = None
     ) -> Dict[str, any]:
         """
         Bewertet das Risiko basierend auf Drift-Mustern.
@@ -503,6 +619,8 @@ class CoSDAnalyzer:
             drift_path: Pfad-Metriken
             resonance_patterns: Erkannte Resonanzmuster
             emergent_clusters: Emergente Cluster
+            drift_metrics: Erweiterte Drift-Metriken
+            profile: Optionales Profil für die Phase recommendations
             
         Returns:
             Dict mit Risikobewertung
@@ -592,12 +710,16 @@ class CoSDAnalyzer:
             risk_level = 'critical'
             risk_color = 'red'
         
+        profile = profile or StageProfile()
+        with profile.stage('recommendations'):
+            recommendations = self._generate_recommendations(risk_level, risk_factors)
+        
         return {
             'risk_level': risk_level,
             'risk_color': risk_color,
             'total_risk_score': float(total_risk),
             'risk_factors': risk_factors,
-            'recommendations': self._generate_recommendations(risk_level, risk_factors)
+            'recommendations': recommendations
         }
     
     def _generate_recommendations(
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Drift Session - Inkrementelle CoSD-Analyse für fortlaufende Gespräche
+
+Statt bei jeder neuen Nachricht die komplette Sequenz erneut zu analysieren,
+hält eine CoSDSession laufende Summen und ein kurzes Fenster der letzten
+Vektoren. Jede Nachricht kostet O(Fenster) Arbeit; der Zustand lässt sich
+als JSON-kompatibles Dict exportieren und später wieder aufnehmen.
+"""
+
+import numpy as np
+from typing import List, Dict, Optional, Any
+from collections import deque
+from datetime import datetime
+import logging
+import uuid
+
+from .cost_vector_math import (
+    CoSDVector, SparseCoSDVector, VectorOperations, ResonanceChains,
+    calculate_resonance_to_history
+)
+from .drift_metrics import UNIFORM_VARIANCE
+
+logger = logging.getLogger(__name__)
+
+# Bei Änderungen am Aufbau von CoSDSession.to_dict() erhöhen
+SESSION_STATE_VERSION = 1
+
+
+class RunningStats:
+    """
+    Laufende Statistik einer Zahlenfolge in O(1) pro Wert.
+    
+    Mittelwert und Varianz nach Welford, Minimum/Maximum, erster/letzter
+    Wert sowie die Summen für die Steigung einer linearen Regression über
+    den Positionen 0..n-1 (entspricht np.polyfit(x, werte, 1)[0]).
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.first = None
+        self.last = None
+        self.sum_xy = 0.0
+    
+    def add(self, value: float):
+        """Nimmt einen Wert auf."""
+        value = float(value)
+        self.sum_xy += self.count * value
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if self.first is None:
+            self.first = value
+        self.last = value
+    
+    @property
+    def variance(self) -> float:
+        """Populations-Varianz (wie np.var)."""
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def slope(self) -> float:
+        """Steigung der Regressionsgeraden über den Positionen."""
+        n = self.count
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2.0
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6.0
+        sum_y = self.mean * n
+        return (n * self.sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RunningStats':
+        stats = cls()
+        vars(stats).update(data)
+        return stats
+
+
+class CoSDSession:
+    """
+    Zustandsbehaftete Streaming-Analyse einer Textsequenz.
+    
+    Laufend aktualisiert werden Drift-Geschwindigkeit, Pfad, Home Base,
+    Density, Variability, Rise Rate und Resonanz. Die Werte entsprechen
+    denen von CoSDAnalyzer.analyze_drift mit folgenden Abweichungen:
+    - Home Base: Stabilität über die RMS-Distanz zum Zentrum (exakt aus
+      laufenden Summen), Streuung und Konsistenz über das Fenster
+    - Density: Dichte nach jeder Nachricht statt an 10 Stützstellen
+    - Variability: Normierung mit der exakten Varianz von U(-1, 1)
+    - Resonanz: nur Paare innerhalb von resonance_lookahead (Ketten werden
+      wie im Batch über Union-Find fortgeschrieben)
+    - keine emergenten Cluster
+    """
+    
+    def __init__(
+        self,
+        analyzer,
+        session_id: Optional[str] = None,
+        window: Optional[int] = None
+    ):
+        """
+        Initialisiert eine leere Session.
+        
+        Args:
+            analyzer: CoSDAnalyzer für Vektorisierung, Konfiguration und Risiko
+            session_id: Optionale ID (Standard: zufällige UUID)
+            window: Anzahl gehaltener letzter Vektoren
+        """
+        self.analyzer = analyzer
+        self.session_id = session_id or uuid.uuid4().hex
+        self.lookahead = analyzer.config.get('resonance_lookahead', 4)
+        self.density_window = 5
+        self.window = max(window or 0, self.lookahead, analyzer.config['drift_velocity_window'], self.density_window)
+        self.dimension_count = analyzer.vectorizer.dimension_count
+        self.created_at = datetime.now()
+        
+        self.count = 0
+        self.recent: deque = deque(maxlen=self.window)
+        self.first_vector: Optional[SparseCoSDVector] = None
+        
+        # Home Base / Variability: Summen pro Dimension
+        self.value_sums = np.zeros(self.dimension_count)
+        self.square_sums = np.zeros(self.dimension_count)
+        self.squared_norm_sum = 0.0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        
+        # Drift-Pfad und Geschwindigkeit
+        self.path_length = 0.0
+        self.moving_distance = 0.0
+        self.stability_zones: List[Dict[str, int]] = []
+        self.velocities = RunningStats()
+        self.recent_velocities: deque = deque(maxlen=self.window)
+        
+        # Density und Rise Rate
+        self.total_markers = 0
+        self.densities = RunningStats()
+        self.rise_rates = RunningStats()
+        self.rise_accelerations = RunningStats()
+        
+        # Resonanz
+        self.strong_resonance_count = 0
+        self.recent_patterns: deque = deque(maxlen=100)
+        self.resonance_chains = ResonanceChains()
+    
+    def append(self, text: str, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Nimmt eine neue Nachricht in die Session auf.
+        
+        Args:
+            text: Text der Nachricht
+            timestamp: Zeitstempel (Standard: jetzt)
+        
+        Returns:
+            Dict mit den Kennzahlen dieser Nachricht
+        """
+        timestamp = timestamp or datetime.now()
+        vector = self._as_sparse(self.analyzer._vectorize_text(text, timestamp), timestamp)
+        return self.append_vector(vector)
+    
+    def append_vector(self, vector: CoSDVector) -> Dict[str, Any]:
+        """
+        Nimmt einen bereits berechneten Vektor in die Session auf.
+        
+        Args:
+            vector: CoSDVector mit gesetztem Zeitstempel
+        
+        Returns:
+            Dict mit den Kennzahlen dieser Nachricht
+        """
+        vector = self._as_sparse(vector, vector.timestamp)
+        index = self.count
+        previous = self.recent[-1] if self.recent else None
+        
+        self._update_home_base(vector)
+        step = self._update_path(vector, previous, index)
+        self._update_rise_rate(vector, previous)
+        patterns = self._update_resonance(vector, index)
+        
+        self.total_markers += len(vector.marker_weights)
+        self.recent.append(vector)
+        if self.analyzer.history_index is not None:
+            self.analyzer.history_index.add(vector, self.session_id, index)
+        self.count += 1
+        if self.first_vector is None:
+            self.first_vector = vector
+        self._update_density()
+        
+        return {
+            'index': index,
+            'timestamp': vector.timestamp.isoformat(),
+            'step_distance': step['distance'],
+            'velocity': step['velocity'],
+            'resonance_patterns': patterns
+        }
+    
+    def _as_sparse(self, vector: CoSDVector, timestamp: datetime) -> SparseCoSDVector:
+        """Eigene Kopie in Index/Wert-Form (gecachte Vektoren bleiben unberührt)."""
+        if isinstance(vector, SparseCoSDVector):
+            return SparseCoSDVector(
+                vector.indices, vector.values, vector.size, timestamp,
+                dict(vector.marker_weights), dict(vector.metadata)
+            )
+        return SparseCoSDVector.from_dense(
+            vector.dimensions, timestamp, dict(vector.marker_weights), dict(vector.metadata)
+        )
+    
+    def _update_home_base(self, vector: SparseCoSDVector):
+        self.value_sums[vector.indices] += vector.values
+        self.square_sums[vector.indices] += vector.values ** 2
+        self.squared_norm_sum += float(np.dot(vector.values, vector.values))
+        
+        # Nicht belegte Dimensionen zählen als 0 (wie im dichten Array)
+        candidates = list(vector.values)
+        if vector.nnz < vector.size:
+            candidates.append(0.0)
+        if candidates:
+            low, high = float(min(candidates)), float(max(candidates))
+            self.min_value = low if self.min_value is None else min(self.min_value, low)
+            self.max_value = high if self.max_value is None else max(self.max_value, high)
+    
+    def _update_path(
+        self,
+        vector: SparseCoSDVector,
+        previous: Optional[SparseCoSDVector],
+        index: int
+    ) -> Dict[str, Optional[float]]:
+        if previous is None:
+            return {'distance': None, 'velocity': None}
+        
+        distance = float(VectorOperations.euclidean_distance(previous, vector))
+        self.path_length += distance
+        
+        # Stabilitätszonen wie calculate_semantic_drift_path
+        if distance < 0.1:
+            if not self.stability_zones or self.stability_zones[-1]['end'] != index - 1:
+                self.stability_zones.append({'start': index - 1, 'end': index})
+            else:
+                self.stability_zones[-1]['end'] = index
+        
+        velocity = None
+        time_delta = (vector.timestamp - previous.timestamp).total_seconds()
+        if time_delta > 0:
+            velocity = distance / time_delta
+            self.velocities.add(velocity)
+            self.recent_velocities.append(velocity)
+            self.moving_distance += distance
+        
+        return {'distance': distance, 'velocity': velocity}
+    
+    def _update_rise_rate(self, vector: SparseCoSDVector, previous: Optional[SparseCoSDVector]):
+        if previous is None:
+            return
+        
+        time_delta = (vector.timestamp - previous.timestamp).total_seconds()
+        rise_rate = 0.0
+        if time_delta > 0:
+            rise_rate = float(vector.magnitude - previous.magnitude) / time_delta
+        
+        if self.rise_rates.count:
+            self.rise_accelerations.add(rise_rate - self.rise_rates.last)
+        self.rise_rates.add(rise_rate)
+    
+    def _update_resonance(self, vector: SparseCoSDVector, index: int) -> List[Dict[str, Any]]:
+        history = list(self.recent)[-self.lookahead:] if self.lookahead > 0 else []
+        if not history:
+            return []
+        
+        coupling = calculate_resonance_to_history(
+            vector, history, self.analyzer.config['resonance_threshold']
+        )
+        offset = index - len(history)
+        
+        patterns = []
+        for pair in np.flatnonzero(coupling['is_strongly_coupled']):
+            earlier = history[pair]
+            self.resonance_chains.add_edge(offset + int(pair), index)
+            patterns.append({
+                'type': 'strong_resonance',
+                'indices': [offset + int(pair), index],
+                'time_delta': (vector.timestamp - earlier.timestamp).total_seconds(),
+                'coupling_strength': float(coupling['coupling_strength'][pair]),
+                'phase_alignment': float(coupling['phase_alignment'][pair]),
+                'resonance_factor': float(coupling['resonance_factor'][pair])
+            })
+        
+        self.strong_resonance_count += len(patterns)
+        self.recent_patterns.extend(patterns)
+        return patterns
+    
+    def _update_density(self):
+        if self.count < 2:
+            return
+        
+        window_vectors = list(self.recent)[-self.density_window:]
+        window_markers = sum(len(vec.marker_weights) for vec in window_vectors)
+        time_span = (window_vectors[-1].timestamp - window_vectors[0].timestamp).total_seconds() / 60
+        self.densities.add(window_markers / time_span if time_span > 0 else window_markers)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Liefert den aktuellen Analyse-Stand der Session.
+        
+        Returns:
+            Dict mit drift_velocity, drift_path, drift_metrics, Resonanz
+            und risk_assessment
+        """
+        drift_velocity = self._velocity_snapshot()
+        drift_path = self._path_snapshot()
+        drift_metrics = self._metrics_snapshot() if self.count else {}
+        chains = self.resonance_chains.chains()
+        resonance_patterns = list(self.recent_patterns)
+        
+        risk_assessment = self.analyzer._assess_drift_risk(
+            drift_velocity, drift_path, resonance_patterns + chains, [], drift_metrics
+        )
+        
+        return {
+            'session_id': self.session_id,
+            'message_count': self.count,
+            'timestamp': datetime.now().isoformat(),
+            'drift_velocity': drift_velocity,
+            'drift_path': drift_path,
+            'drift_metrics': drift_metrics,
+            'resonance': {
+                'strong_resonance_count': self.strong_resonance_count,
+                'recent_patterns': resonance_patterns,
+                'chains': chains
+            },
+            'risk_assessment': risk_assessment
+        }
+    
+    def _velocity_snapshot(self) -> Dict[str, Any]:
+        velocities = self.velocities
+        # Mittelwert von np.diff(velocities) ist (letzte - erste) / (n - 1)
+        acceleration = (
+            (velocities.last - velocities.first) / (velocities.count - 1)
+            if velocities.count >= 2 else 0.0
+        )
+        return {
+            'average_velocity': float(velocities.mean),
+            'instantaneous_velocities': list(self.recent_velocities),
+            'acceleration': float(acceleration),
+            'total_distance': float(self.moving_distance)
+        }
+    
+    def _path_snapshot(self) -> Dict[str, Any]:
+        if self.count < 2:
+            return {'path_length': 0.0, 'curvature': 0.0, 'drift_direction': None, 'stability_zones': []}
+        
+        assert self.first_vector is not None  # ab count >= 2 gesetzt
+        last = self.recent[-1]
+        direct_distance = float(VectorOperations.euclidean_distance(self.first_vector, last))
+        curvature = (self.path_length / direct_distance - 1.0) if direct_distance > 0 else 0.0
+        return {
+            'path_length': float(self.path_length),
+            'curvature': float(curvature),
+            'drift_direction': (last.dimensions - self.first_vector.dimensions).tolist(),
+            'stability_zones': [dict(zone) for zone in self.stability_zones]
+        }
+    
+    def _metrics_snapshot(self) -> Dict[str, Any]:
+        return {
+            'home_base': self._home_base_snapshot(),
+            'density': self._density_snapshot(),
+            'variability': self._variability_snapshot(),
+            'rise_rate': self._rise_rate_snapshot()
+        }
+    
+    def _home_base_snapshot(self) -> Dict[str, Any]:
+        center = self.value_sums / self.count
+        center_norm = float(np.dot(center, center))
+        # sum |x - c|^2 = sum |x|^2 - n |c|^2
+        rms_deviation = float(np.sqrt(max(self.squared_norm_sum / self.count - center_norm, 0.0)))
+        max_possible_deviation = np.sqrt(self.dimension_count) if self.dimension_count else 1.0
+        stability_score = max(0.0, 1.0 - rms_deviation / max_possible_deviation)
+        
+        distances = np.array([
+            np.sqrt(max(
+                float(np.dot(vec.values, vec.values)) - 2.0 * float(np.dot(vec.values, center[vec.indices]))
+                + center_norm,
+                0.0
+            ))
+            for vec in self.recent
+        ])
+        threshold = np.percentile(distances, 75)
+        
+        return {
+            'stability_score': float(stability_score),
+            'deviation_radius': float(np.std(distances)),
+            'consistency_factor': float(np.count_nonzero(distances <= threshold) / len(distances)),
+            'metadata': {
+                'vector_count': self.count,
+                'dimension_count': self.dimension_count,
+                'avg_deviation': rms_deviation,
+                'max_deviation': float(distances.max()),
+                'window': len(distances)
+            }
+        }
+    
+    def _density_snapshot(self) -> Dict[str, Any]:
+        densities = self.densities
+        if not densities.count:
+            return {
+                'marker_density': 0.0,
+                'temporal_clustering': 0.0,
+                'density_trend': 0.0,
+                'peak_density': 0.0,
+                'metadata': {'error': 'Insufficient vectors for density calculation'}
+            }
+        
+        temporal_clustering = 0.0
+        if densities.count > 1:
+            n = densities.count
+            # np.var([0] * (n - 1) + [total_markers])
+            max_possible_variance = self.total_markers ** 2 * (n - 1) / n ** 2
+            if max_possible_variance > 0:
+                temporal_clustering = min(1.0, densities.variance / max_possible_variance)
+        
+        return {
+            'marker_density': float(densities.mean),
+            'temporal_clustering': float(temporal_clustering),
+            'density_trend': float(densities.slope),
+            'peak_density': float(densities.maximum),
+            'metadata': {
+                'time_window_messages': self.density_window,
+                'total_markers': self.total_markers,
+                'timeline_points': densities.count
+            }
+        }
+    
+    def _variability_snapshot(self) -> Dict[str, Any]:
+        mean = self.value_sums / self.count
+        variance_per_dimension = np.maximum(self.square_sums / self.count - mean ** 2, 0.0)
+        mean_variance = float(variance_per_dimension.mean()) if self.dimension_count else 0.0
+        variance_score = mean_variance / UNIFORM_VARIANCE
+        
+        window_variance = 0.0
+        if len(self.recent) > 1:
+            window = np.array([vec.dimensions for vec in self.recent])
+            window_variance = float(np.mean(np.var(window, axis=0)))
+        
+        return {
+            'standard_deviation': float(np.sqrt(variance_per_dimension).mean()) if self.dimension_count else 0.0,
+            'variance_score': variance_score,
+            'fluctuation_range': (self.min_value or 0.0, self.max_value or 0.0),
+            'stability_index': max(0.0, 1.0 - variance_score),
+            'metadata': {
+                'vector_count': self.count,
+                'dimension_count': self.dimension_count,
+                'window_variance': window_variance
+            }
+        }
+    
+    def _rise_rate_snapshot(self) -> Dict[str, Any]:
+        rise_rates = self.rise_rates
+        if not rise_rates.count:
+            return {
+                'average_rise_rate': 0.0,
+                'peak_rise_rate': 0.0,
+                'acceleration_pattern': 'insufficient_data',
+                'rise_trend': 0.0,
+                'metadata': {'error': 'Insufficient vectors for rise rate calculation'}
+            }
+        
+        acceleration_pattern = 'insufficient_data'
+        if rise_rates.count >= 3:
+            avg_acceleration = self.rise_accelerations.mean
+            acc_variance = self.rise_accelerations.variance
+            if abs(avg_acceleration) < 0.1 and acc_variance < 0.1:
+                acceleration_pattern = 'linear'
+            elif avg_acceleration > 0.1:
+                acceleration_pattern = 'exponential'
+            elif avg_acceleration < -0.1:
+                acceleration_pattern = 'decelerating'
+            elif acc_variance > 0.5:
+                acceleration_pattern = 'oscillating'
+            else:
+                acceleration_pattern = 'stable'
+        
+        assert self.first_vector is not None  # Anstiegsraten erst ab count >= 2
+        return {
+            'average_rise_rate': float(rise_rates.mean),
+            'peak_rise_rate': float(rise_rates.maximum),
+            'acceleration_pattern': acceleration_pattern,
+            'rise_trend': float(rise_rates.slope),
+            'metadata': {
+                'vector_count': self.count,
+                'time_span_seconds': (
+                    (self.recent[-1].timestamp - self.first_vector.timestamp).total_seconds()
+                )
+            }
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Exportiert den Session-Zustand als JSON-kompatibles Dict.
+        
+        Returns:
+            Dict, das mit CoSDSession.from_dict() wieder geladen werden kann
+        """
+        return {
+            'version': SESSION_STATE_VERSION,
+            'session_id': self.session_id,
+            'created_at': self.created_at.isoformat(),
+            'window': self.window,
+            'dimension_count': self.dimension_count,
+            'count': self.count,
+            'first_vector': _vector_to_dict(self.first_vector) if self.first_vector else None,
+            'recent': [_vector_to_dict(vec) for vec in self.recent],
+            'value_sums': _array_to_dict(self.value_sums),
+            'square_sums': _array_to_dict(self.square_sums),
+            'squared_norm_sum': self.squared_norm_sum,
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+            'path_length': self.path_length,
+            'moving_distance': self.moving_distance,
+            'stability_zones': [dict(zone) for zone in self.stability_zones],
+            'velocities': self.velocities.to_dict(),
+            'recent_velocities': list(self.recent_velocities),
+            'total_markers': self.total_markers,
+            'densities': self.densities.to_dict(),
+            'rise_rates': self.rise_rates.to_dict(),
+            'rise_accelerations': self.rise_accelerations.to_dict(),
+            'strong_resonance_count': self.strong_resonance_count,
+            'recent_patterns': list(self.recent_patterns),
+            'resonance_chains': self.resonance_chains.to_dict()
+        }
+    
+    @classmethod
+    def from_dict(cls, analyzer, state: Dict[str, Any]) -> 'CoSDSession':
+        """
+        Stellt eine Session aus CoSDSession.to_dict() wieder her.
+        
+        Args:
+            analyzer: CoSDAnalyzer mit demselben Marker-Satz
+            state: Exportierter Zustand
+        
+        Returns:
+            Wiederhergestellte CoSDSession
+        """
+        if state.get('version') != SESSION_STATE_VERSION:
+            raise ValueError(f"Unsupported session state version: {state.get('version')}")
+        if state['dimension_count'] != analyzer.vectorizer.dimension_count:
+            raise ValueError(
+                f"Session state has {state['dimension_count']} dimensions, "
+                f"analyzer has {analyzer.vectorizer.dimension_count}"
+            )
+        
+        session = cls(analyzer, session_id=state['session_id'], window=state['window'])
+        session.created_at = datetime.fromisoformat(state['created_at'])
+        session.count = state['count']
+        session.first_vector = _vector_from_dict(state['first_vector'], session.dimension_count)
+        session.recent.extend(_vector_from_dict(vec, session.dimension_count) for vec in state['recent'])
+        session.value_sums = _array_from_dict(state['value_sums'], session.dimension_count)
+        session.square_sums = _array_from_dict(state['square_sums'], session.dimension_count)
+        session.squared_norm_sum = state['squared_norm_sum']
+        session.min_value = state['min_value']
+        session.max_value = state['max_value']
+        session.path_length = state['path_length']
+        session.moving_distance = state['moving_distance']
+        session.stability_zones = [dict(zone) for zone in state['stability_zones']]
+        session.velocities = RunningStats.from_dict(state['velocities'])
+        session.recent_velocities.extend(state['recent_velocities'])
+        session.total_markers = state['total_markers']
+        session.densities = RunningStats.from_dict(state['densities'])
+        session.rise_rates = RunningStats.from_dict(state['rise_rates'])
+        session.rise_accelerations = RunningStats.from_dict(state['rise_accelerations'])
+        session.strong_resonance_count = state['strong_resonance_count']
+        session.recent_patterns.extend(state['recent_patterns'])
+        session.resonance_chains = ResonanceChains.from_dict(state['resonance_chains'])
+        return session
+
+
+def _array_to_dict(values: np.ndarray) -> Dict[str, List]:
+    """Speichert nur die belegten Einträge eines Arrays."""
+    indices = np.flatnonzero(values)
+    return {'indices': indices.tolist(), 'values': values[indices].tolist()}
+
+
+def _array_from_dict(data: Dict[str, List], size: int) -> np.ndarray:
+    values = np.zeros(size)
+    values[np.asarray(data['indices'], dtype=np.int64)] = data['values']
+    return values
+
+
+def _vector_to_dict(vector: SparseCoSDVector) -> Dict[str, Any]:
+    return {
+        'indices': vector.indices.tolist(),
+        'values': vector.values.tolist(),
+        'timestamp': vector.timestamp.isoformat(),
+        'marker_weights': dict(vector.marker_weights)
+    }
+
+
+def _vector_from_dict(data: Optional[Dict[str, Any]], size: int) -> Optional[SparseCoSDVector]:
+    if data is None:
+        return None
+    return SparseCoSDVector(
+        data['indices'], data['values'], size,
+        datetime.fromisoformat(data['timestamp']),
+        dict(data['marker_weights'])
+    )
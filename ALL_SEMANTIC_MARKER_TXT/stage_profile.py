@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Stage Profile - Laufzeiten und Zähler der CoSD-Pipeline
+
+StageProfile sammelt für eine einzelne Analyse die Dauer jeder Phase
+(Vektorisierung, Resonanz, Clustering, ...) und Zähler wie gebaute Vektoren
+oder ausgewertete Paare. StageMetrics fasst viele Profile prozessweit zusammen
+und gibt sie im Prometheus-Textformat aus.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StageProfile:
+    """
+    Laufzeiten (Millisekunden) und Zähler einer Analyse.
+    
+    Wird eine Phase mehrfach betreten, werden die Zeiten addiert.
+    Verschachtelte Phasen sind in der Zeit der äußeren Phase enthalten.
+    """
+    
+    def __init__(self):
+        self.stage_timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Misst die Dauer des Blocks als Phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            self.stage_timings[name] = self.stage_timings.get(name, 0.0) + elapsed
+    
+    def count(self, name: str, amount: int = 1):
+        """Erhöht den Zähler `name`."""
+        self.counters[name] = self.counters.get(name, 0) + int(amount)
+    
+    @property
+    def total_ms(self) -> float:
+        """Zeit seit dem Anlegen des Profils in Millisekunden."""
+        return (time.perf_counter() - self._started) * 1000.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisierbare Darstellung (Zeiten auf Mikrosekunden gerundet)."""
+        return {
+            'stage_timings_ms': {name: round(value, 3) for name, value in self.stage_timings.items()},
+            'counters': dict(self.counters)
+        }
+
+
+class StageMetrics:
+    """
+    Prozessweite Summen über viele StageProfile (thread-sicher).
+    
+    Pro Phase werden Anzahl, Summe und eine kumulative Histogramm-Verteilung
+    der Dauer geführt, pro Zähler die Summe. Erfolgreiche und fehlgeschlagene
+    Analysen werden getrennt gezählt.
+    """
+    
+    # Histogramm-Grenzen in Sekunden
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, prefix: str = 'cosd'):
+        """
+        Initialisiert die Sammlung.
+        
+        Args:
+            prefix: Präfix der Metrik-Namen
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stage_counts: Dict[str, int] = {}
+        self._stage_sums: Dict[str, float] = {}
+        self._stage_buckets: Dict[str, List[int]] = {}
+        self._counters: Dict[str, int] = {}
+        self._successes = 0
+        self._errors = 0
+    
+    def record(self, profile: Optional[Dict[str, Any]] = None, error: bool = False):
+        """
+        Übernimmt das Profil einer Analyse.
+        
+        Args:
+            profile: StageProfile.to_dict() bzw. DriftAnalysisResult.profile
+                (None, falls die Analyse abgebrochen ist)
+            error: Die Analyse ist fehlgeschlagen
+        """
+        with self._lock:
+            if error:
+                self._errors += 1
+            else:
+                self._successes += 1
+            if profile is None:
+                return
+            for name, milliseconds in profile.get('stage_timings_ms', {}).items():
+                seconds = milliseconds / 1000.0
+                self._stage_counts[name] = self._stage_counts.get(name, 0) + 1
+                self._stage_sums[name] = self._stage_sums.get(name, 0.0) + seconds
+                buckets = self._stage_buckets.setdefault(name, [0] * len(self.BUCKETS))
+                for position, bound in enumerate(self.BUCKETS):
+                    if seconds <= bound:
+                        buckets[position] += 1
+            for name, value in profile.get('counters', {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+    
+    def to_prometheus(self) -> str:
+        """Gibt alle Werte im Prometheus-Textformat (Version 0.0.4) aus."""
+        prefix = self.prefix
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_analyses_total Erfolgreich abgeschlossene CoSD-Analysen",
+                f"# TYPE {prefix}_analyses_total counter",
+                f"{prefix}_analyses_total {self._successes}",
+                f"# HELP {prefix}_analysis_errors_total Fehlgeschlagene CoSD-Analysen",
+                f"# TYPE {prefix}_analysis_errors_total counter",
+                f"{prefix}_analysis_errors_total {self._errors}",
+                f"# HELP {prefix}_stage_duration_seconds Dauer der Pipeline-Phasen",
+                f"# TYPE {prefix}_stage_duration_seconds histogram"
+            ]
+            for name in sorted(self._stage_counts):
+                for bound, value in zip(self.BUCKETS, self._stage_buckets[name]):
+                    lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {value}')
+                lines.append(
+                    f'{prefix}_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {self._stage_counts[name]}'
+                )
+                lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{name}"}} {self._stage_sums[name]:.6f}')
+                lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{name}"}} {self._stage_counts[name]}')
+            
+            lines.append(f"# HELP {prefix}_pipeline_events_total Zähler der Pipeline (Vektoren, Paare, Cluster)")
+            lines.append(f"# TYPE {prefix}_pipeline_events_total counter")
+            for name in sorted(self._counters):
+                lines.append(f'{prefix}_pipeline_events_total{{event="{name}"}} {self._counters[name]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Vector Cache - Inhaltsadressierter, begrenzter Cache für CoSD-Vektoren
+
+Schlüssel sind SHA-256-Digests über einen Namensraum (Marker-Satz und
+Vektor-Darstellung) und den Text und damit prozessübergreifend stabil.
+Gecachte Vektoren sind unveränderlich: gespeichert werden schreibgeschützte
+Arrays, jeder Zugriff liefert eine eigene Hülle mit dem gewünschten
+Zeitstempel. Optional werden Einträge zusätzlich in einer SQLite-Datei
+abgelegt, die sich mehrere API-Worker teilen können.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .cost_vector_math import CoSDVector, SparseCoSDVector
+
+logger = logging.getLogger(__name__)
+
+# Bei Änderungen an der Vektorisierung erhöhen (macht Disk-Einträge ungültig)
+VECTOR_CACHE_VERSION = 1
+
+# Mit disk_max_entries wird die Disk-Tier alle DISK_TRIM_INTERVAL Schreibvorgänge gekürzt
+DISK_TRIM_INTERVAL = 1000
+
+
+def vector_cache_key(text: str, namespace: str = '') -> str:
+    """
+    Berechnet den stabilen Cache-Schlüssel eines Textes.
+    
+    Args:
+        text: Zu vektorisierender Text
+        namespace: Kennung des Marker-Satzes und der Vektor-Darstellung
+    
+    Returns:
+        Hex-Digest (SHA-256)
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{VECTOR_CACHE_VERSION}\0{namespace}\0".encode('utf-8'))
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class _CacheEntry:
+    """Unveränderlicher Inhalt eines gecachten Vektors."""
+    
+    __slots__ = ('sparse', 'indices', 'values', 'size', 'marker_weights', 'metadata', 'nbytes')
+    
+    def __init__(
+        self,
+        sparse: bool,
+        indices: Optional[np.ndarray],
+        values: np.ndarray,
+        size: int,
+        marker_weights: Dict[str, float],
+        metadata: Dict[str, Any]
+    ):
+        self.sparse = sparse
+        self.indices = _read_only(indices) if indices is not None else None
+        self.values = _read_only(values)
+        self.size = size
+        self.marker_weights = dict(marker_weights)
+        self.metadata = dict(metadata)
+        self.nbytes = self.values.nbytes + (self.indices.nbytes if self.indices is not None else 0)
+    
+    @classmethod
+    def from_vector(cls, vector: CoSDVector) -> '_CacheEntry':
+        """Übernimmt einen frisch berechneten Vektor (Arrays werden kopiert)."""
+        if isinstance(vector, SparseCoSDVector):
+            return cls(True, vector.indices.copy(), vector.values.copy(), vector.size,
+                       vector.marker_weights, vector.metadata)
+        return cls(False, None, np.array(vector.dimensions, dtype=np.float64), len(vector.dimensions),
+                   vector.marker_weights, vector.metadata)
+    
+    def to_vector(self, timestamp: datetime) -> CoSDVector:
+        """Erzeugt eine eigene Hülle mit Zeitstempel; die Arrays werden geteilt."""
+        if self.indices is not None:
+            return SparseCoSDVector(self.indices, self.values, self.size, timestamp,
+                                    dict(self.marker_weights), dict(self.metadata))
+        return CoSDVector(self.values, timestamp, dict(self.marker_weights), dict(self.metadata))
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+class VectorCache:
+    """
+    LRU-Cache für CoSD-Vektoren mit optionaler SQLite-Ablage.
+    
+    Der Speicher-Tier ist durch max_entries und optional max_bytes begrenzt.
+    Die Disk-Tier (disk_path) wird mit disk_max_entries alle DISK_TRIM_INTERVAL
+    Schreibvorgänge auf die zuletzt geschriebenen Einträge gekürzt. Mehrere
+    Prozesse können dieselbe Datei nutzen (WAL-Modus, eine Verbindung pro
+    Prozess).
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: Optional[int] = None,
+        disk_path: Optional[str] = None,
+        disk_max_entries: Optional[int] = None
+    ):
+        """
+        Initialisiert den Cache.
+        
+        Args:
+            max_entries: Maximale Anzahl Vektoren im Speicher
+            max_bytes: Optionale Obergrenze für die Array-Größe im Speicher
+            disk_path: Optionale SQLite-Datei als zweite Stufe
+            disk_max_entries: Optionale Obergrenze für Einträge auf Disk
+        """
+        self.max_entries = max(int(max_entries), 0)
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._disk_writes = 0
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str, timestamp: datetime) -> Optional[CoSDVector]:
+        """
+        Liefert den gecachten Vektor mit dem gegebenen Zeitstempel.
+        
+        Args:
+            key: Schlüssel aus vector_cache_key()
+            timestamp: Zeitstempel für die zurückgegebene Hülle
+        
+        Returns:
+            CoSDVector oder None bei einem Miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.to_vector(timestamp)
+        
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, entry)
+        return entry.to_vector(timestamp)
+    
+    def put(self, key: str, vector: CoSDVector):
+        """
+        Legt einen berechneten Vektor ab.
+        
+        Der Vektor selbst wird nicht übernommen; spätere Änderungen des
+        Aufrufers an ihm wirken sich nicht auf den Cache aus.
+        
+        Args:
+            key: Schlüssel aus vector_cache_key()
+            vector: Frisch berechneter Vektor
+        """
+        entry = _CacheEntry.from_vector(vector)
+        with self._lock:
+            self._store(key, entry)
+        self._disk_put(key, entry)
+    
+    def clear(self):
+        """Leert den Speicher-Tier (die Disk-Tier bleibt erhalten)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Gibt Zähler und Füllstand des Caches zurück."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'disk_path': self.disk_path
+        }
+    
+    def _store(self, key: str, entry: _CacheEntry):
+        """Fügt einen Eintrag ein und verdrängt bei Bedarf (Lock gehalten)."""
+        if self.max_entries == 0:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        
+        while self._entries and (
+            len(self._entries) > self.max_entries or
+            (self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+    
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """Öffnet die SQLite-Verbindung (neu nach einem fork)."""
+        if not self.disk_path:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = _connect_disk_tier(
+                self.disk_path,
+                'CREATE TABLE IF NOT EXISTS vectors ('
+                'key TEXT PRIMARY KEY, sparse INTEGER, size INTEGER, '
+                'indices BLOB, vals BLOB, marker_weights TEXT, metadata TEXT)'
+            )
+            self._connection_pid = os.getpid()
+        return self._connection
+    
+    def _disk_get(self, key: str) -> Optional[_CacheEntry]:
+        """Liest einen Eintrag aus der Disk-Tier."""
+        try:
+            with self._lock:
+                connection = self._disk()
+                if connection is None:
+                    return None
+                row = connection.execute(
+                    'SELECT sparse, size, indices, vals, marker_weights, metadata FROM vectors WHERE key = ?',
+                    (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Vektor-Cache {self.disk_path} konnte nicht gelesen werden: {e}")
+            return None
+        
+        if row is None:
+            return None
+        sparse, size, indices, values, marker_weights, metadata = row
+        return _CacheEntry(
+            bool(sparse),
+            np.frombuffer(indices, dtype=np.int64).copy() if sparse else None,
+            np.frombuffer(values, dtype=np.float64).copy(),
+            size,
+            json.loads(marker_weights),
+            json.loads(metadata)
+        )
+    
+    def _disk_put(self, key: str, entry: _CacheEntry):
+        """Schreibt einen Eintrag in die Disk-Tier."""
+        try:
+            with self._lock:
+                connection = self._disk()
+                if connection is None:
+                    return
+                connection.execute(
+                    'INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        key, int(entry.sparse), entry.size,
+                        entry.indices.tobytes() if entry.indices is not None else None,
+                        entry.values.tobytes(),
+                        json.dumps(entry.marker_weights),
+                        json.dumps(entry.metadata, default=str)
+                    )
+                )
+                self._disk_writes += 1
+                if self.disk_max_entries is not None and self._disk_writes % DISK_TRIM_INTERVAL == 0:
+                    _trim_disk_tier(connection, 'vectors', self.disk_max_entries)
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Vektor-Cache {self.disk_path} konnte nicht geschrieben werden: {e}")
+
+
+# Die SQLite-Disk-Tier hat denselben Aufbau wie der Ergebnis-Cache der Marker-API
+# (MARSAPv2/result_cache.py: _connect_disk_tier, _trim_disk_tier). Die Module liegen
+# in getrennten Paketen; Änderungen an Verbindung oder Kürzung in beiden nachziehen.
+
+def _connect_disk_tier(path: str, schema: str) -> sqlite3.Connection:
+    """Öffnet die SQLite-Datei im WAL-Modus (mehrere Prozesse, je eine Verbindung) und legt die Tabelle an."""
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute(schema)
+    connection.commit()
+    return connection
+
+
+def _trim_disk_tier(connection: sqlite3.Connection, table: str, max_entries: int):
+    """Kürzt die Tabelle auf die max_entries zuletzt geschriebenen Zeilen (ohne commit)."""
+    connection.execute(
+        f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY rowid '
+        f'LIMIT max((SELECT COUNT(*) FROM {table}) - ?, 0))',
+        (max_entries,)
+    )
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Lasttest - POST /analyze gegen laufende Server
+Schickt aus mehreren Threads gleichzeitig Anfragen an jede angegebene URL
+(z.B. Flask-Server und ASGI-Modus) und misst p50/p99-Latenz, Durchsatz
+sowie abgelehnte Anfragen (429).
+
+Beispiel:
+    python marker_api.py &                      # Port 5000
+    uvicorn marker_asgi:app --port 5001 &
+    python bench_api_load.py --url http://localhost:5000/analyze \\
+                             --url http://localhost:5001/analyze --concurrency 64
+"""
+
+import argparse
+import json
+import logging
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from bench_fuzzy_index import build_texts
+from marker_matcher import MarkerMatcher
+
+
+def post(url: str, text: str, timeout: float) -> Tuple[int, float]:
+    """Eine Anfrage; liefert Statuscode (0 bei Verbindungsfehler) und Latenz in Sekunden"""
+    body = json.dumps({'text': text}).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(url: str, texts: List[str], concurrency: int, timeout: float):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(lambda text: post(url, text, timeout), texts))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for status, latency in results if status == 200]
+    rejected = sum(1 for status, _ in results if status == 429)
+    failed = len(results) - len(latencies) - rejected
+    print(f"{url:<40} {len(latencies) / elapsed:>9.1f} {percentile(latencies, 0.5) * 1e3:>9.1f} "
+          f"{percentile(latencies, 0.99) * 1e3:>9.1f} {rejected:>6} {failed:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lasttest für POST /analyze')
+    parser.add_argument('--url', action='append', required=True,
+                        help='Analyze-URL (mehrfach angeben zum Vergleich)')
+    parser.add_argument('--markers', default='marker_master_export.yaml',
+                        help='Marker-Datei für die synthetischen Texte')
+    parser.add_argument('--requests', type=int, default=2000, help='Anfragen pro URL')
+    parser.add_argument('--concurrency', type=int, default=32, help='Gleichzeitige Clients')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    texts = build_texts(MarkerMatcher(args.markers), args.requests, args.seed)
+
+    print(f"Anfragen: {args.requests}, gleichzeitig: {args.concurrency}")
+    print(f"{'URL':<40} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'429':>6} {'Fehler':>7}")
+    for url in args.url:
+        post(url, texts[0], args.timeout)  # Aufwärmen (Pool, Caches)
+        run(url, texts, args.concurrency, args.timeout)
+
+
+if __name__ == '__main__':
+    main()
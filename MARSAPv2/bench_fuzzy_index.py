@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Token-Index vs. bisherige Fuzzy-Schleife
+Vergleicht Kandidatenzahlen und Laufzeit auf dem marker_master_export.yaml-Set
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import List, Set, Tuple
+
+from marker_matcher import MarkerMatcher
+
+
+def legacy_fuzzy(matcher: MarkerMatcher, text_lower: str) -> Tuple[Set[int], int]:
+    """Bisherige Schleife: jedes Beispiel jedes Markers wird gegen den Text geprüft"""
+    hits = set()
+    scored = 0
+    for entries in matcher._example_table.values():
+        for _, beispiel_normalized, pattern_id in entries:
+            scored += 1
+            words = beispiel_normalized.split()
+            if len(words) > 2 and sum(1 for w in words if w in text_lower) >= len(words) * 0.7:
+                hits.add(pattern_id)
+    return hits, scored
+
+
+def indexed_fuzzy(matcher: MarkerMatcher, text_lower: str) -> Tuple[Set[int], int]:
+    """Token-Index: nur Beispiele mit genügend gemeinsamen Tokens werden bewertet"""
+    present = matcher._example_automaton.first_occurrences(text_lower)
+    candidates = matcher._fuzzy_index.candidates(present)
+    return matcher._fuzzy_index.score(candidates), len(candidates)
+
+
+def build_texts(matcher: MarkerMatcher, count: int, seed: int) -> List[str]:
+    """Erzeugt Chat-artige Texte aus Beispiel-Fragmenten und Füllwörtern"""
+    rng = random.Random(seed)
+    examples = [b for entries in matcher._example_table.values() for b, _, _ in entries]
+    filler = "hallo na wie geht es dir heute ich hoffe gut bis später okay danke".split()
+
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            if rng.random() < 0.3 and examples:
+                words = rng.choice(examples).split()
+                parts.append(" ".join(words[:rng.randint(1, len(words))]))
+            else:
+                parts.append(" ".join(rng.choice(filler) for _ in range(rng.randint(3, 12))))
+        texts.append(". ".join(parts))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für den Fuzzy-Token-Index')
+    parser.add_argument('--markers', default='marker_master_export.yaml', help='Marker-Datei')
+    parser.add_argument('--texts', type=int, default=500, help='Anzahl synthetischer Texte')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    matcher = MarkerMatcher(args.markers)
+    texts = [t.lower() for t in build_texts(matcher, args.texts, args.seed)]
+
+    results = {}
+    for name, func in (('legacy', legacy_fuzzy), ('index', indexed_fuzzy)):
+        scored = 0
+        hits = []
+        start = time.perf_counter()
+        for text_lower in texts:
+            text_hits, text_scored = func(matcher, text_lower)
+            hits.append(text_hits)
+            scored += text_scored
+        results[name] = (time.perf_counter() - start, scored, hits)
+
+    legacy_time, legacy_scored, legacy_hits = results['legacy']
+    index_time, index_scored, index_hits = results['index']
+
+    print(f"Marker: {len(matcher.markers)}, Beispiele im Index: {len(matcher._fuzzy_index)}, Texte: {len(texts)}")
+    print(f"{'Variante':<10} {'Kandidaten':>12} {'Zeit (s)':>10}")
+    print(f"{'legacy':<10} {legacy_scored:>12} {legacy_time:>10.3f}")
+    print(f"{'index':<10} {index_scored:>12} {index_time:>10.3f}")
+    print(f"Speedup: {legacy_time / index_time:.1f}x, Kandidaten-Reduktion: "
+          f"{1 - index_scored / max(1, legacy_scored):.1%}")
+    print(f"Identische Treffer: {legacy_hits == index_hits}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 
+from marker_snapshot import SnapshotStore
+
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,35 +22,84 @@ logger = logging.getLogger(__name__)
 class MarkerCollector:
     """Sammelt und konsolidiert Marker aus verschiedenen Quellen"""
     
-    def __init__(self, base_path: str = "."):
+    # Zu durchsuchende Ordner
+    SEARCH_DIRS = [
+        "Assist_TXT_marker_py:/ALL_NEWMARKER01",
+        "Assist_TXT_marker_py: 2/ALL_NEWMARKER01",
+        "Assist_TXT_marker_py: 2/MARKERBOOK_YAML_CANVAS",
+        "Assist_TXT_marker_py: 2/tension",
+        "Assist_TXT_marker_py: 2/resonance",
+        "Assist_TXT_marker_py: 3/ALL_NEWMARKER01",
+        "Assist_TXT_marker_py: 3/MARKERBOOK_YAML_CANVAS",
+        "Assist_TXT_marker_py: 3/tension",
+        "Assist_TXT_marker_py: 3/resonance",
+        "Assist_YAML_marker_py: 4",
+        "Assist_YAML_marker_py: 4/MARKERBOOK_YAML_CANVAS",
+        "Assist_YAML_marker_py: 4/tension",
+        "Assist_YAML_marker_py: 4/resonance",
+    ]
+    
+    # Ordner mit Python-Detektoren
+    DETECTOR_DIRS = [
+        "Assist_TXT_marker_py: 2/SEMANTIC_DETECTORS_PYTHO",
+        "Assist_TXT_marker_py: 3/SEMANTIC_DETECTORS_PYTHO"
+    ]
+    
+    def __init__(self, base_path: str = ".", snapshot_path: Optional[str] = None):
         self.base_path = Path(base_path)
         self.markers = {}
         self.semantic_detectors = {}
         self.duplicate_count = 0
+        self.snapshot = SnapshotStore(snapshot_path or self.base_path / ".marker_master.snapshot")
         
-    def collect_all_markers(self) -> Dict[str, Any]:
-        """Hauptmethode: Sammelt alle Marker aus verschiedenen Quellen"""
-        logger.info("Starte Marker-Sammlung...")
+    def collect_all_markers(self, use_snapshot: bool = True) -> Dict[str, Any]:
+        """Hauptmethode: Sammelt alle Marker aus verschiedenen Quellen
+        
+        Solange sich keine Quelldatei geändert hat, wird das Ergebnis aus dem
+        Binär-Snapshot geladen statt alle Dateien erneut zu parsen.
+        """
+        if not use_snapshot:
+            return self._collect_from_sources()
         
-        # Definiere die zu durchsuchenden Ordner
-        search_dirs = [
-            "Assist_TXT_marker_py:/ALL_NEWMARKER01",
-            "Assist_TXT_marker_py: 2/ALL_NEWMARKER01",
-            "Assist_TXT_marker_py: 2/MARKERBOOK_YAML_CANVAS",
-            "Assist_TXT_marker_py: 2/tension",
-            "Assist_TXT_marker_py: 2/resonance",
-            "Assist_TXT_marker_py: 3/ALL_NEWMARKER01",
-            "Assist_TXT_marker_py: 3/MARKERBOOK_YAML_CANVAS",
-            "Assist_TXT_marker_py: 3/tension",
-            "Assist_TXT_marker_py: 3/resonance",
-            "Assist_YAML_marker_py: 4",
-            "Assist_YAML_marker_py: 4/MARKERBOOK_YAML_CANVAS",
-            "Assist_YAML_marker_py: 4/tension",
-            "Assist_YAML_marker_py: 4/resonance",
-        ]
+        state, _, from_snapshot = self.snapshot.load_or_build(self._source_files(), self._collect_state)
+        self.markers = state['markers']
+        self.semantic_detectors = state['semantic_detectors']
+        self.duplicate_count = state['duplicate_count']
+        if from_snapshot:
+            logger.info(f"{len(self.markers)} Marker aus Snapshot geladen.")
+        return self.markers
+    
+    def _collect_state(self) -> Dict[str, Any]:
+        """Sammelt aus den Quellen und gibt den Snapshot-Zustand zurück"""
+        self._collect_from_sources()
+        return {
+            'markers': self.markers,
+            'semantic_detectors': self.semantic_detectors,
+            'duplicate_count': self.duplicate_count
+        }
+    
+    def _source_files(self) -> List[Path]:
+        """Listet alle Dateien, die in die Sammlung einfließen"""
+        files = []
+        for dir_path in self.SEARCH_DIRS:
+            full_path = self.base_path / dir_path
+            if full_path.exists():
+                files.extend(p for p in full_path.iterdir() if p.is_file() and self._is_marker_file(p))
+        for dir_path in self.DETECTOR_DIRS:
+            full_path = self.base_path / dir_path
+            if full_path.exists():
+                files.extend(full_path.glob("*.py"))
+        return files
+    
+    def _collect_from_sources(self) -> Dict[str, Any]:
+        """Parst alle Quellen neu"""
+        logger.info("Starte Marker-Sammlung...")
+        self.markers = {}
+        self.semantic_detectors = {}
+        self.duplicate_count = 0
         
         # Sammle Marker aus jedem Verzeichnis
-        for dir_path in search_dirs:
+        for dir_path in self.SEARCH_DIRS:
             full_path = self.base_path / dir_path
             if full_path.exists():
                 logger.info(f"Durchsuche: {dir_path}")
@@ -246,12 +297,7 @@ class MarkerCollector:
     
     def _collect_semantic_detectors(self):
         """Sammelt alle Python-Detektoren"""
-        detector_dirs = [
-            "Assist_TXT_marker_py: 2/SEMANTIC_DETECTORS_PYTHO",
-            "Assist_TXT_marker_py: 3/SEMANTIC_DETECTORS_PYTHO"
-        ]
-        
-        for dir_path in detector_dirs:
+        for dir_path in self.DETECTOR_DIRS:
             full_path = self.base_path / dir_path
             if full_path.exists():
                 for file_path in full_path.glob("*.py"):
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Marker API - ASGI-Modus mit Micro-Batching
+Nimmt /analyze-Anfragen auf einer Event-Loop entgegen, fasst gleichzeitige
+Anfragen zu kleinen Blöcken zusammen und verteilt sie auf den Prozess-Pool
+des MarkerMatchers. Eine begrenzte Warteschlange sorgt für Gegendruck: ist
+sie voll, wird sofort mit 429 geantwortet.
+
+Start (benötigt einen ASGI-Server, z.B. uvicorn):
+    uvicorn marker_asgi:app --port 5001
+    python marker_asgi.py
+
+Alle übrigen Endpoints bleiben beim Flask-Server (marker_api.py).
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from marker_matcher import MarkerMatcher
+
+logger = logging.getLogger(__name__)
+
+# Worker-Prozesse für die Analyse (teilen sich den kompilierten Marker-Satz)
+ASGI_WORKERS = int(os.environ.get('MARKER_ASGI_WORKERS', os.cpu_count() or 1))
+# Höchstens so viele Texte pro Block; ein Block wartet höchstens MAX_DELAY_MS auf weitere
+ASGI_MAX_BATCH = int(os.environ.get('MARKER_ASGI_MAX_BATCH', 32))
+ASGI_MAX_DELAY_MS = float(os.environ.get('MARKER_ASGI_MAX_DELAY_MS', 2.0))
+# Wartende Anfragen, bevor mit 429 abgelehnt wird
+ASGI_QUEUE_SIZE = int(os.environ.get('MARKER_ASGI_QUEUE_SIZE', 1024))
+# Größter akzeptierter Request-Body in Bytes
+ASGI_MAX_BODY = int(os.environ.get('MARKER_ASGI_MAX_BODY', 1024 * 1024))
+
+
+class QueueFullError(Exception):
+    """Die Warteschlange des MicroBatchers ist voll"""
+
+
+class MicroBatcher:
+    """Fasst gleichzeitige Einzelanalysen zu Blöcken für den Prozess-Pool zusammen
+
+    Ein Sammler-Task nimmt die erste wartende Anfrage und wartet dann bis zu
+    max_delay_ms auf weitere, höchstens max_batch Texte. Pro Worker ist
+    höchstens ein Block unterwegs; alles Weitere bleibt in der begrenzten
+    Warteschlange, deren Überlauf submit() mit QueueFullError quittiert.
+    """
+
+    def __init__(self, matcher: MarkerMatcher, workers: int = ASGI_WORKERS,
+                 max_batch: int = ASGI_MAX_BATCH, max_delay_ms: float = ASGI_MAX_DELAY_MS,
+                 queue_size: int = ASGI_QUEUE_SIZE):
+        self.matcher = matcher
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay_ms) / 1000.0
+        self.queue_size = max(1, queue_size)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def start(self):
+        """Startet den Sammler-Task auf der laufenden Event-Loop"""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = asyncio.create_task(self._collect())
+        logger.info(f"Micro-Batching aktiv: {self.workers} Worker, Blöcke bis {self.max_batch} Texte, "
+                    f"Warteschlange {self.queue_size}")
+
+    async def stop(self):
+        """Beendet den Sammler-Task und den Prozess-Pool"""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        self.matcher.close_pool()
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        """Reiht einen Text ein und wartet auf sein Ergebnis-Dict
+
+        Raises:
+            QueueFullError: Die Warteschlange ist voll (Antwort 429)
+        """
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher wurde nicht gestartet")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError()
+        self.requests += 1
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler und Füllstand des Batchers"""
+        return {
+            'workers': self.workers,
+            'max_batch': self.max_batch,
+            'max_delay_ms': self.max_delay * 1000.0,
+            'queue_size': self.queue_size,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'average_batch_size': round(self.batched_texts / self.batches, 2) if self.batches else 0.0
+        }
+
+    async def _collect(self):
+        """Sammelt Blöcke und gibt sie an den Pool, sobald ein Worker frei ist"""
+        loop = asyncio.get_running_loop()
+        queue, slots = self._queue, self._slots
+        if queue is None or slots is None:
+            raise RuntimeError("MicroBatcher wurde nicht gestartet")
+        while True:
+            await slots.acquire()
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    # Bereits Wartendes ohne weitere Verzögerung mitnehmen
+                    while len(batch) < self.max_batch and not queue.empty():
+                        batch.append(queue.get_nowait())
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._dispatch(loop, slots, batch)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore,
+                  batch: List[Tuple[str, asyncio.Future]]):
+        """Gibt einen Block an den Pool; die Ergebnisse landen über die Loop in den Futures"""
+        self.batches += 1
+        self.batched_texts += len(batch)
+        futures = [future for _, future in batch]
+
+        def resolve(results: List[Dict[str, Any]]):
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+            slots.release()
+
+        def fail(error: BaseException):
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            slots.release()
+
+        try:
+            self.matcher.submit_batch(
+                [text for text, _ in batch],
+                callback=lambda results: loop.call_soon_threadsafe(resolve, results),
+                error_callback=lambda error: loop.call_soon_threadsafe(fail, error)
+            )
+        except Exception as e:
+            fail(e)
+
+
+class MarkerASGIApp:
+    """ASGI-Anwendung für /analyze, /health und /batcher_stats"""
+
+    def __init__(self, matcher_factory: Optional[Callable[[], MarkerMatcher]] = None, **batcher_options):
+        self.matcher_factory = matcher_factory
+        self.batcher_options = batcher_options
+        self.matcher: Optional[MarkerMatcher] = None
+        self.batcher: Optional[MicroBatcher] = None
+
+    async def startup(self):
+        """Lädt den Marker-Satz und startet den MicroBatcher"""
+        if self.matcher_factory is not None:
+            self.matcher = self.matcher_factory()
+        else:
+            self.matcher = MarkerMatcher(pool_workers=ASGI_WORKERS)
+        self.batcher = MicroBatcher(self.matcher, **self.batcher_options)
+        await self.batcher.start()
+        logger.info("Marker Matcher (ASGI) erfolgreich initialisiert")
+
+    async def shutdown(self):
+        """Beendet den MicroBatcher samt Prozess-Pool"""
+        if self.batcher is not None:
+            await self.batcher.stop()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        path, method = scope['path'], scope['method']
+        if path == '/analyze' and method == 'POST':
+            status, payload, headers = await self._analyze(receive)
+        elif path == '/health' and method == 'GET':
+            status, payload, headers = 200, {
+                'status': 'healthy',
+                'timestamp': datetime.now().isoformat(),
+                'markers_loaded': len(self.matcher.markers) if self.matcher else 0
+            }, []
+        elif path == '/batcher_stats' and method == 'GET':
+            status, payload, headers = 200, self.batcher.stats() if self.batcher else {}, []
+        else:
+            status, payload, headers = 404, {'error': 'Nicht gefunden', 'status': 'error'}, []
+        await _send_json(send, status, payload, headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.error(f"Fehler beim Initialisieren des Matchers: {e}")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _analyze(self, receive) -> Tuple[int, Dict[str, Any], List[Tuple[bytes, bytes]]]:
+        """Analysiert einen einzelnen Text (gleiches Antwortformat wie marker_api)"""
+        body = await _read_body(receive)
+        if body is None:
+            return 413, {'error': 'Request-Body zu groß', 'status': 'error'}, []
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or not isinstance(data.get('text'), str):
+            return 400, {'error': 'Kein Text zum Analysieren gefunden', 'status': 'error'}, []
+        if self.batcher is None:
+            return 503, {'error': 'Marker Matcher nicht initialisiert', 'status': 'error'}, []
+
+        try:
+            result = await self.batcher.submit(data['text'])
+        except QueueFullError:
+            return 429, {'error': 'Server ausgelastet, bitte später erneut versuchen',
+                         'status': 'error'}, [(b'retry-after', b'1')]
+        except Exception as e:
+            logger.error(f"Fehler bei der Analyse: {e}")
+            return 500, {'error': str(e), 'status': 'error'}, []
+
+        if 'error' in result:
+            return 500, {'error': result['error'], 'status': 'error'}, []
+        response = dict(result)
+        response['status'] = 'success'
+        return 200, response, []
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    """Liest den Request-Body; None, wenn er ASGI_MAX_BODY überschreitet"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > ASGI_MAX_BODY:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any], headers: List[Tuple[bytes, bytes]]):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode('ascii'))] + headers
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+logging.basicConfig(level=logging.INFO)
+app = MarkerASGIApp()
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Für den ASGI-Modus wird ein ASGI-Server benötigt: pip install uvicorn")
+
+    port = int(os.environ.get('PORT', 5001))
+    uvicorn.run(app, host='0.0.0.0', port=port)
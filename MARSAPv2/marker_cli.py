@@ -71,8 +71,9 @@ class MarkerCLI:
         except Exception as e:
             print(f"{Fore.RED}Fehler beim Lesen der Datei: {e}{Style.RESET_ALL}")
     
-    def analyze_directory(self, dir_path: str, pattern: str = "*.txt", verbose: bool = False):
-        """Analysiert alle Textdateien in einem Verzeichnis"""
+    def analyze_directory(self, dir_path: str, pattern: str = "*.txt", verbose: bool = False,
+                          workers: int = 1, chunk_size: int = 8):
+        """Analysiert alle Textdateien in einem Verzeichnis (optional parallel)"""
         path = Path(dir_path)
         
         if not path.is_dir():
@@ -94,24 +95,34 @@ class MarkerCLI:
             'risk_levels': {'green': 0, 'yellow': 0, 'blinking': 0, 'red': 0}
         }
         
+        # Dateien einlesen, Lesefehler direkt melden
+        readable_files = []
+        texts = []
         for file_path in files:
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                
-                result = self.matcher.analyze_text(text)
-                
-                print(f"\n{Fore.BLUE}Datei: {file_path.name}{Style.RESET_ALL}")
-                self._print_result(result, verbose=False)  # Kompakte Ausgabe für Batch
-                
-                # Statistiken sammeln
-                total_stats['files_analyzed'] += 1
-                total_stats['total_markers'] += len(result.gefundene_marker)
-                total_stats['risk_levels'][result.risk_level] += 1
-                
+                    texts.append(f.read())
+                readable_files.append(file_path)
             except Exception as e:
                 print(f"{Fore.RED}Fehler bei {file_path.name}: {e}{Style.RESET_ALL}")
         
+        # Batch-Analyse über den Prozess-Pool des Matchers (Reihenfolge bleibt erhalten)
+        results = self.matcher.iter_batch(texts, workers=workers, chunk_size=chunk_size, return_exceptions=True)
+        for file_path, result in zip(readable_files, results):
+            if isinstance(result, Exception):
+                print(f"{Fore.RED}Fehler bei {file_path.name}: {result}{Style.RESET_ALL}")
+                continue
+            
+            print(f"\n{Fore.BLUE}Datei: {file_path.name}{Style.RESET_ALL}")
+            self._print_result(result, verbose=False)  # Kompakte Ausgabe für Batch
+            
+            # Statistiken sammeln
+            total_stats['files_analyzed'] += 1
+            total_stats['total_markers'] += len(result.gefundene_marker)
+            total_stats['risk_levels'][result.risk_level] += 1
+        
+        self.matcher.close_pool()
+        
         # Zusammenfassung
         self._print_batch_summary(total_stats)
     
@@ -328,6 +339,9 @@ Beispiele:
   # Verzeichnis analysieren
   python marker_cli.py -d ./chats --pattern "*.txt"
   
+  # Verzeichnis mit 4 Worker-Prozessen analysieren
+  python marker_cli.py -d ./chats --workers 4 --chunk-size 16
+  
   # Alle Marker auflisten
   python marker_cli.py --list-markers
   
@@ -356,6 +370,10 @@ Beispiele:
     parser.add_argument('--export', help='Exportiere Ergebnisse in Datei')
     parser.add_argument('--format', choices=['json', 'yaml'], default='json',
                        help='Export-Format (Standard: json)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                       help='Worker-Prozesse für Verzeichnis-Analyse (Standard: Anzahl CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=8,
+                       help='Dateien pro Worker-Auftrag bei Verzeichnis-Analyse (Standard: 8)')
     
     # CoSD-spezifische Optionen
     parser.add_argument('--cosd-analyze', action='store_true',
@@ -407,7 +425,8 @@ Beispiele:
     elif args.file:
         cli.analyze_file(args.file, args.verbose)
     elif args.directory:
-        cli.analyze_directory(args.directory, args.pattern, args.verbose)
+        cli.analyze_directory(args.directory, args.pattern, args.verbose,
+                              workers=args.workers, chunk_size=args.chunk_size)
     else:
         parser.print_help()
         sys.exit(1)
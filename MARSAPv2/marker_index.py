@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Marker Index - Kompilierte Suchstrukturen für den Marker Matcher
+Werden einmalig beim Laden des Marker-Sets aufgebaut und pro Text nur noch abgefragt
+"""
+
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple
+
+
+class ExampleAutomaton:
+    """Aho-Corasick-Automat über alle normalisierten Marker-Beispiele
+
+    Findet in einem einzigen linearen Durchlauf über den Text jedes Vorkommen
+    jedes Beispiels und liefert exakte Spans (start, end).
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.patterns: List[str] = []
+        self._pattern_ids: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._compiled = False
+
+        for pattern in patterns:
+            self.add(pattern)
+        self.compile()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def add(self, pattern: str) -> int:
+        """Fügt ein Pattern hinzu und gibt dessen ID zurück (Duplikate teilen sich eine ID)"""
+        if pattern in self._pattern_ids:
+            return self._pattern_ids[pattern]
+
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self._pattern_ids[pattern] = pattern_id
+
+        # Leere Patterns haben keinen Zustand im Trie, siehe first_occurrences()
+        if pattern:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        self._compiled = False
+        return pattern_id
+
+    def pattern_id(self, pattern: str) -> int:
+        """Gibt die ID eines bereits hinzugefügten Patterns zurück"""
+        return self._pattern_ids[pattern]
+
+    def compile(self):
+        """Berechnet Fehler-Links und Ausgabemengen per Breitensuche"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                if fail_state == next_state:
+                    fail_state = 0
+
+                self._fail[next_state] = fail_state
+                # Ausgaben der Suffix-Zustände übernehmen (BFS garantiert, dass diese fertig sind)
+                if self._output[fail_state]:
+                    self._output[next_state] = self._output[next_state] + self._output[fail_state]
+
+        self._compiled = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Liefert (pattern_id, start, end) für jedes Vorkommen, sortiert nach Endposition"""
+        if not self._compiled:
+            self.compile()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if output[state]:
+                end = index + 1
+                for pattern_id in output[state]:
+                    yield pattern_id, end - len(patterns[pattern_id]), end
+
+    def find_all(self, text: str) -> Dict[int, List[Tuple[int, int]]]:
+        """Sammelt alle Spans pro Pattern-ID"""
+        spans: Dict[int, List[Tuple[int, int]]] = {}
+        for pattern_id, start, end in self.iter_matches(text):
+            spans.setdefault(pattern_id, []).append((start, end))
+        return spans
+
+    def first_occurrences(self, text: str) -> Dict[int, int]:
+        """Gibt pro gefundenem Pattern die Startposition des ersten Vorkommens zurück
+
+        Entspricht ``text.find(pattern)`` für jedes Pattern - das erste gemeldete
+        Vorkommen hat die kleinste Endposition und damit auch den kleinsten Start.
+        """
+        first: Dict[int, int] = {}
+        for pattern_id, start, _ in self.iter_matches(text):
+            if pattern_id not in first:
+                first[pattern_id] = start
+
+        # Wie bei '' in text: ein leeres Pattern trifft immer an Position 0
+        empty_id = self._pattern_ids.get('')
+        if empty_id is not None:
+            first[empty_id] = 0
+
+        return first
+
+
+class FuzzyTokenIndex:
+    """Invertierter Index von normalisierten Tokens auf die Beispiele, die sie enthalten
+
+    Ein Beispiel gilt als Fuzzy-Treffer, wenn es mehr als zwei Wörter hat und
+    mindestens ``min_ratio`` seiner Wörter im Text vorkommen. Statt jedes
+    Beispiel gegen jeden Text zu prüfen, werden nur Beispiele bewertet, die
+    über die Posting-Listen der im Text gefundenen Tokens mindestens
+    ``min_shared_tokens`` Treffer sammeln.
+
+    Tokens und Beispiele werden über die IDs eines ``ExampleAutomaton``
+    referenziert, damit ein einziger Durchlauf über den Text beides liefert.
+    """
+
+    def __init__(self, min_shared_tokens: int = 3, min_ratio: float = 0.7, min_words: int = 3):
+        self.min_shared_tokens = min_shared_tokens
+        self.min_ratio = min_ratio
+        self.min_words = min_words
+        self.postings: Dict[int, List[Tuple[int, int]]] = {}  # token_id -> [(example_id, anzahl)]
+        self.example_sizes: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.example_sizes)
+
+    def add_example(self, example_id: int, normalized: str, automaton: ExampleAutomaton):
+        """Indiziert die Wörter eines normalisierten Beispiels"""
+        if example_id in self.example_sizes:
+            return
+
+        words = normalized.split()
+        if len(words) < self.min_words:
+            return  # kann nie fuzzy treffen
+
+        self.example_sizes[example_id] = len(words)
+        for word, count in Counter(words).items():
+            token_id = automaton.add(word)
+            self.postings.setdefault(token_id, []).append((example_id, count))
+
+    def candidates(self, present_tokens: Iterable[int]) -> Dict[int, int]:
+        """Zählt pro Beispiel die Wörter, die im Text vorkommen (nur Beispiele >= min_shared_tokens)"""
+        shared: Dict[int, int] = {}
+        postings = self.postings
+        for token_id in present_tokens:
+            for example_id, count in postings.get(token_id, ()):
+                shared[example_id] = shared.get(example_id, 0) + count
+        return {example_id: count for example_id, count in shared.items() if count >= self.min_shared_tokens}
+
+    def score(self, candidates: Dict[int, int]) -> Set[int]:
+        """Bewertet die Kandidaten mit der Fuzzy-Regel"""
+        sizes = self.example_sizes
+        return {
+            example_id
+            for example_id, count in candidates.items()
+            if count >= sizes[example_id] * self.min_ratio
+        }
+
+    def matches(self, present_tokens: Iterable[int]) -> Set[int]:
+        """Gibt die IDs aller Beispiele zurück, die fuzzy im Text vorkommen"""
+        return self.score(self.candidates(present_tokens))
+
+
+# Rückreferenzen und Bedingungen beziehen sich auf Gruppennummern/-namen und
+# würden in einer gemeinsamen Alternation auf die falsche Gruppe zeigen;
+# globale Inline-Flags sind nur am Anfang eines Patterns erlaubt.
+_UNMERGEABLE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(|\\g<|^\(\?[aiLmsux]+\)')
+
+
+@dataclass
+class SemanticPattern:
+    """Ein validiertes, vorkompiliertes semantic_patterns-Pattern"""
+    marker_name: str
+    source: str
+    regex: Pattern
+    group_id: int = -1  # -1 = wird immer einzeln geprüft
+
+
+class SemanticPatternTable:
+    """Vorkompilierte semantic_patterns aller Marker
+
+    Jedes Pattern wird beim Laden einmal kompiliert und validiert. Kombinierbare
+    Patterns werden zusätzlich zu Alternationen gebündelt: ein einziger
+    ``search`` pro Gruppe entscheidet, ob überhaupt eines ihrer Patterns im
+    Text vorkommt. Nur Patterns aus Gruppen mit Treffer werden danach einzeln
+    per ``finditer`` ausgewertet, sodass die Treffer identisch zur
+    Einzelauswertung bleiben.
+    """
+
+    def __init__(self, flags: int = re.IGNORECASE, group_size: int = 32):
+        self.flags = flags
+        self.group_size = group_size
+        self.by_marker: Dict[str, List[SemanticPattern]] = {}
+        self.errors: List[Tuple[str, str, str]] = []  # (marker, pattern, fehler)
+        self._groups: List[Pattern] = []
+
+    def __len__(self) -> int:
+        return sum(len(patterns) for patterns in self.by_marker.values())
+
+    @property
+    def group_count(self) -> int:
+        return len(self._groups)
+
+    def add_marker(self, marker_name: str, semantic_data: Any):
+        """Validiert und kompiliert alle Patterns eines Markers"""
+        if not isinstance(semantic_data, dict):
+            self.errors.append((marker_name, repr(semantic_data)[:80], 'semantic_patterns ist kein Mapping'))
+            return
+
+        for pattern_rule in semantic_data.get('patterns') or []:
+            if not isinstance(pattern_rule, dict):
+                self.errors.append((marker_name, repr(pattern_rule)[:80], 'Regel ist kein Mapping'))
+                continue
+            if 'pattern' not in pattern_rule:
+                continue
+
+            source = pattern_rule['pattern']
+            try:
+                regex = re.compile(source, self.flags)
+            except (re.error, TypeError) as e:
+                self.errors.append((marker_name, str(source), str(e)))
+                continue
+
+            self.by_marker.setdefault(marker_name, []).append(
+                SemanticPattern(marker_name=marker_name, source=source, regex=regex)
+            )
+
+    def copy_marker(self, marker_name: str, previous: 'SemanticPatternTable'):
+        """Übernimmt die bereits kompilierten Patterns und Fehler eines unveränderten Markers
+
+        Die Regex-Objekte werden geteilt, die SemanticPattern-Hüllen kopiert:
+        compile() vergibt die Gruppen neu, ohne die alte Tabelle zu verändern.
+        """
+        patterns = previous.by_marker.get(marker_name)
+        if patterns:
+            self.by_marker[marker_name] = [replace(pattern, group_id=-1) for pattern in patterns]
+        self.errors.extend(error for error in previous.errors if error[0] == marker_name)
+
+    def compile(self):
+        """Bündelt kombinierbare Patterns zu Alternationen"""
+        mergeable = [
+            pattern
+            for patterns in self.by_marker.values()
+            for pattern in patterns
+            if not _UNMERGEABLE.search(pattern.source)
+        ]
+
+        self._groups = []
+        for offset in range(0, len(mergeable), self.group_size):
+            self._add_group(mergeable[offset:offset + self.group_size])
+
+    def _add_group(self, members: List[SemanticPattern]):
+        """Kompiliert eine Alternation; bei Konflikten wird die Gruppe halbiert"""
+        try:
+            group = re.compile('|'.join(f'(?:{p.source})' for p in members), self.flags)
+        except re.error:
+            # z.B. doppelte Gruppennamen - einzelne Patterns bleiben ungebündelt
+            if len(members) > 1:
+                middle = len(members) // 2
+                self._add_group(members[:middle])
+                self._add_group(members[middle:])
+            return
+
+        group_id = len(self._groups)
+        self._groups.append(group)
+        for pattern in members:
+            pattern.group_id = group_id
+
+    def candidates(self, text: str) -> Set[int]:
+        """Gibt die IDs aller Gruppen zurück, die im Text mindestens einmal treffen"""
+        return {group_id for group_id, group in enumerate(self._groups) if group.search(text)}
+
+    def patterns_for(self, marker_name: str, active_groups: Optional[Set[int]] = None) -> List[SemanticPattern]:
+        """Gibt die Patterns eines Markers zurück, die für den Text relevant sein können"""
+        patterns = self.by_marker.get(marker_name, [])
+        if active_groups is None:
+            return patterns
+        return [p for p in patterns if p.group_id < 0 or p.group_id in active_groups]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Marker Snapshot - Versionierter Binär-Snapshot des kompilierten Marker-Satzes
+Vermeidet das erneute Parsen aller YAML/JSON/TXT-Quellen bei jedem Start
+"""
+
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Bei jeder Änderung am Aufbau der kompilierten Indizes erhöhen
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b'MKSNAP'
+
+# magic, format-version, sha256 der Quellen
+_HEADER = struct.Struct('<6sH32s')
+
+
+def source_digest(paths: Iterable[Union[str, Path]]) -> bytes:
+    """Berechnet einen Content-Hash über Pfade und Inhalte aller Quelldateien"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        digest.update(path.as_posix().encode('utf-8'))
+        digest.update(b'\0')
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            digest.update(b'<missing>')
+        digest.update(b'\0')
+    return digest.digest()
+
+
+class SnapshotStore:
+    """Liest und schreibt einen Snapshot für genau einen Quellen-Satz
+
+    Layout: Header (Magic, Version, Quellen-Hash) gefolgt vom Pickle-Payload.
+    Beim Laden wird die Datei per mmap eingeblendet und der Payload direkt aus
+    dem gemappten Speicher deserialisiert. Passt Version oder Hash nicht, wird
+    der Snapshot ignoriert und der Aufrufer baut neu.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def load(self, digest: bytes) -> Optional[Any]:
+        """Lädt den Payload, falls der Snapshot zu den Quellen passt"""
+        try:
+            with open(self.path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if len(mapped) < _HEADER.size:
+                        return None
+
+                    magic, version, snapshot_digest = _HEADER.unpack_from(mapped, 0)
+                    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                        logger.info(f"Snapshot {self.path} hat ein anderes Format, wird neu gebaut")
+                        return None
+                    if snapshot_digest != digest:
+                        logger.info(f"Quellen haben sich geändert, Snapshot {self.path} wird neu gebaut")
+                        return None
+
+                    with memoryview(mapped)[_HEADER.size:] as payload:
+                        return pickle.loads(payload)
+
+        except (FileNotFoundError, ValueError):
+            # ValueError: leere Datei kann nicht gemappt werden
+            return None
+        except Exception as e:
+            logger.warning(f"Snapshot {self.path} konnte nicht gelesen werden: {e}")
+            return None
+
+    def save(self, digest: bytes, payload: Any) -> bool:
+        """Schreibt den Snapshot atomar (temporäre Datei + rename)"""
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, digest))
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            logger.warning(f"Snapshot {self.path} konnte nicht geschrieben werden: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    def load_or_build(self, sources: Iterable[Union[str, Path]],
+                      build: Callable[[], Any]) -> Tuple[Any, bytes, bool]:
+        """Gibt (payload, digest, aus_snapshot) zurück und baut bei Bedarf neu"""
+        digest = source_digest(sources)
+        payload = self.load(digest)
+        if payload is not None:
+            return payload, digest, True
+
+        payload = build()
+        self.save(digest, payload)
+        return payload, digest, False
+
+
+def main():
+    """Build-Schritt: kompiliert das Marker-Set und schreibt den Snapshot"""
+    parser = argparse.ArgumentParser(description='Baut den Binär-Snapshot des Marker-Satzes')
+    parser.add_argument('marker_file', nargs='?', default='marker_master_export.yaml',
+                        help='Marker-Datei (Standard: marker_master_export.yaml)')
+    parser.add_argument('-o', '--output', help='Snapshot-Datei (Standard: <marker_file>.snapshot)')
+    args = parser.parse_args()
+
+    from marker_matcher import MarkerMatcher
+
+    snapshot_path = Path(args.output or f"{args.marker_file}.snapshot")
+    if snapshot_path.exists():
+        snapshot_path.unlink()
+
+    start = time.perf_counter()
+    MarkerMatcher(args.marker_file, snapshot_path=str(snapshot_path))
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = MarkerMatcher(args.marker_file, snapshot_path=str(snapshot_path))
+    load_time = time.perf_counter() - start
+
+    print(f"Snapshot: {snapshot_path} ({snapshot_path.stat().st_size / 1024:.1f} KiB, v{SNAPSHOT_VERSION})")
+    print(f"Marker-Set-Version: {matcher.marker_set_version}")
+    print(f"Kaltstart ohne Snapshot: {build_time * 1000:.1f} ms, mit Snapshot: {load_time * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Result Cache - Analyse-Ergebnisse nach Text-Hash und Marker-Satz-Version
+LRU im Prozess, optional zusätzlich eine SQLite-Datei für mehrere API-Worker
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bei Änderungen am Ergebnisformat (AnalysisResult.to_dict) erhöhen
+RESULT_CACHE_VERSION = 1
+
+# Mit disk_max_entries wird die Disk-Tier alle DISK_TRIM_INTERVAL Schreibvorgänge gekürzt
+DISK_TRIM_INTERVAL = 1000
+
+
+def result_cache_key(text: str, marker_set_version: str) -> str:
+    """Stabiler Schlüssel über Marker-Satz-Version und Text
+
+    Der Text geht unverändert ein: Positionen, matched_text und text_preview
+    beziehen sich auf den Originaltext, jede weitere Normalisierung (Groß-/
+    Kleinschreibung, Leerraum) würde fremde Ergebnisse liefern.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{RESULT_CACHE_VERSION}\0{marker_set_version}\0".encode('utf-8'))
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU-Cache für AnalysisResult.to_dict() mit optionaler SQLite-Ablage
+
+    Die Marker-Satz-Version ist Teil des Schlüssels, fremde Versionen treffen
+    also nie. Nach dem Neuladen der Marker ruft der Aufrufer einmal
+    invalidate() auf: der Speicher-Tier wird geleert und die Disk-Tier von
+    Einträgen anderer Versionen befreit. Zurückgegeben werden flache Kopien
+    mit aktuellem Zeitstempel.
+    """
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None,
+                 disk_max_entries: Optional[int] = None):
+        self.max_entries = max(int(max_entries), 0)
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._disk_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str, marker_set_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Liefert das gecachte Ergebnis-Dict oder None bei einem Miss
+
+        Ohne Marker-Satz-Version (oder für Nicht-Texte) wird nicht gecacht.
+        """
+        if not isinstance(text, str) or marker_set_version is None or self.max_entries == 0:
+            return None
+        key = result_cache_key(text, marker_set_version)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _fresh_copy(result)
+
+        result = self._disk_get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, result)
+        return _fresh_copy(result)
+
+    def put(self, text: str, marker_set_version: Optional[str], result: Dict[str, Any]):
+        """Legt ein frisch berechnetes Ergebnis-Dict ab (es wird flach kopiert)"""
+        if not isinstance(text, str) or marker_set_version is None or self.max_entries == 0:
+            return
+        key = result_cache_key(text, marker_set_version)
+        result = dict(result)
+        with self._lock:
+            # Nachzügler einer Anfrage, die noch mit dem alten Marker-Satz lief
+            if self._version is not None and marker_set_version != self._version:
+                return
+            self._store(key, result)
+        self._disk_put(key, marker_set_version, result)
+
+    def invalidate(self, marker_set_version: str):
+        """Verwirft alle Einträge außer denen der neuen Marker-Satz-Version
+
+        Aufzurufen nach dem (Neu-)Laden der Marker, nicht pro Anfrage.
+        """
+        with self._lock:
+            if marker_set_version == self._version:
+                return
+            if self._version is not None:
+                self.invalidations += 1
+                logger.info(f"Ergebnis-Cache geleert: Marker-Satz {self._version} -> {marker_set_version}")
+            self._entries.clear()
+            self._version = marker_set_version
+            self._disk_invalidate(marker_set_version)
+
+    def clear(self):
+        """Leert den Speicher-Tier (die Disk-Tier bleibt erhalten)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler, Trefferquote und Füllstand"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'marker_set_version': self._version,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'disk_path': self.disk_path
+        }
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        """Fügt einen Eintrag ein und verdrängt bei Bedarf (Lock gehalten)"""
+        self._entries.pop(key, None)
+        self._entries[key] = result
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """Öffnet die SQLite-Verbindung (neu nach einem fork; Lock gehalten)"""
+        if not self.disk_path:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = _connect_disk_tier(
+                self.disk_path,
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, result TEXT)'
+            )
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _disk_invalidate(self, marker_set_version: str):
+        """Entfernt Einträge anderer Marker-Satz-Versionen aus der Disk-Tier (Lock gehalten)"""
+        try:
+            connection = self._disk()
+            if connection is None:
+                return
+            connection.execute('DELETE FROM results WHERE version != ?', (marker_set_version,))
+            connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Ergebnis-Cache {self.disk_path} konnte nicht bereinigt werden: {e}")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Liest einen Eintrag aus der Disk-Tier"""
+        try:
+            with self._lock:
+                connection = self._disk()
+                if connection is None:
+                    return None
+                row = connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Ergebnis-Cache {self.disk_path} konnte nicht gelesen werden: {e}")
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    def _disk_put(self, key: str, marker_set_version: str, result: Dict[str, Any]):
+        """Schreibt einen Eintrag in die Disk-Tier"""
+        try:
+            with self._lock:
+                connection = self._disk()
+                if connection is None:
+                    return
+                connection.execute(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                    (key, marker_set_version, json.dumps(result, ensure_ascii=False))
+                )
+                self._disk_writes += 1
+                if self.disk_max_entries is not None and self._disk_writes % DISK_TRIM_INTERVAL == 0:
+                    _trim_disk_tier(connection, 'results', self.disk_max_entries)
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Ergebnis-Cache {self.disk_path} konnte nicht geschrieben werden: {e}")
+
+
+def _fresh_copy(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flache Kopie mit dem Zeitstempel der aktuellen Anfrage"""
+    copy = dict(result)
+    copy['timestamp'] = datetime.now().isoformat()
+    return copy
+
+
+# Die SQLite-Disk-Tier hat denselben Aufbau wie die von cosd.VectorCache
+# (vector_cache.py: _connect_disk_tier, _trim_disk_tier). Die Module liegen in
+# getrennten Paketen; Änderungen an Verbindung oder Kürzung in beiden nachziehen.
+
+def _connect_disk_tier(path: str, schema: str) -> sqlite3.Connection:
+    """Öffnet die SQLite-Datei im WAL-Modus (mehrere Prozesse, je eine Verbindung) und legt die Tabelle an"""
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute(schema)
+    connection.commit()
+    return connection
+
+
+def _trim_disk_tier(connection: sqlite3.Connection, table: str, max_entries: int):
+    """Kürzt die Tabelle auf die max_entries zuletzt geschriebenen Zeilen (ohne commit)"""
+    connection.execute(
+        f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY rowid '
+        f'LIMIT max((SELECT COUNT(*) FROM {table}) - ?, 0))',
+        (max_entries,)
+    )
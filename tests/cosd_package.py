@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pytest
+import yaml
+
+# Das CoSD-Paket liegt vollständig (mit semantic_marker_interface) nur unter
+# ohne_json/_python und wird als Paket "_python" importiert.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ALL_SEMANTIC_MARKER_TXT" / "ALL_NEWMARKER01" / "ohne_json"))
+
+import _python as cosd  # noqa: E402
+
+# Kategorie, die CoSDAnalyzer._infer_marker_category für neutrale Namen liefert
+CATEGORY = "Architecture_Markers"
+
+
+def write_markers(path: Path, markers: int = 40, tokens: int = 300, seed: int = 0) -> list[str]:
+    """Schreibt eine Marker-Datei mit zufälligen Token-Mengen und gibt die Marker-Namen zurück."""
+    rng = random.Random(seed)
+    vocabulary = [f"t{i}" for i in range(tokens)]
+    names = [f"m{i}" for i in range(markers)]
+    data = {CATEGORY: {
+        name: {"tokens": rng.sample(vocabulary, rng.randint(1, 8)), "weight": rng.uniform(0.5, 2.0)}
+        for name in names
+    }}
+    path.write_text(yaml.safe_dump(data), encoding="utf-8")
+    return names
+
+
+class KeywordMatcher:
+    """Basis-Matcher, der jedes Wort, das ein Marker-Name ist, als Treffer meldet."""
+
+    def __init__(self, names: list[str]):
+        self.names = set(names)
+
+    def analyze_text(self, text: str) -> Any:
+        found = [word for word in text.split() if word in self.names]
+        return SimpleNamespace(
+            gefundene_marker=[SimpleNamespace(marker_name=name, tags=[]) for name in found],
+            to_dict=lambda: {"gefundene_marker": [{"marker": name} for name in found]},
+        )
+
+
+def conversation(names: list[str], messages: int, seed: int = 0) -> tuple[list[str], list[datetime]]:
+    """Nachrichten mit 0-4 Markern und teils identischen Zeitstempeln."""
+    rng = random.Random(seed)
+    texts = [
+        " ".join([rng.choice(names) for _ in range(rng.randint(0, 4))] + [f"u{i}"])
+        for i in range(messages)
+    ]
+    timestamps = [datetime(2024, 1, 1)]
+    for _ in texts[1:]:
+        timestamps.append(timestamps[-1] + timedelta(seconds=rng.choice([0, 30, 60, 300])))
+    return texts, timestamps
+
+
+def analyzer(markers: Path, names: list[str], **config: Any) -> Any:
+    """CoSDAnalyzer mit Standard-Konfiguration, überschrieben durch config."""
+    default = cosd.CoSDAnalyzer(str(markers), base_matcher=KeywordMatcher(names))
+    if not config:
+        return default
+    return cosd.CoSDAnalyzer(str(markers), base_matcher=KeywordMatcher(names), config={**default.config, **config})
+
+
+def plain(value: Any) -> Any:
+    """Vergleichbare Form eines Analyse-Ergebnisses (ohne Erzeugungszeitpunkte und Cluster-IDs)."""
+    if isinstance(value, (cosd.CoSDVector, cosd.ArenaCoSDVector)):
+        return plain(value.dimensions)
+    if isinstance(value, cosd.SemanticCluster):
+        return plain({
+            "markers": sorted(value.marker_names), "centroid": value.centroid, "cohesion": value.cohesion_score,
+            "emergence": value.emergence_timestamp, "metadata": value.metadata,
+        })
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return [plain(item) for item in value.tolist()]
+    if isinstance(value, (np.floating, np.integer)):
+        return value.item()
+    return value
+
+
+def assert_close(actual: Any, expected: Any, path: str = "") -> None:
+    """Vergleicht verschachtelte Ergebnisse; Fließkommazahlen bis auf Rundungsfehler."""
+    actual, expected = plain(actual), plain(expected)
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_close(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (got, item) in enumerate(zip(actual, expected)):
+            assert_close(got, item, f"{path}[{i}]")
+    elif isinstance(expected, float) and not isinstance(actual, bool):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12, nan_ok=True), path
+    else:
+        assert actual == expected, path
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+import sys
+import types
+from typing import Any
+
+# Die Analyse-Pipeline (Chunker, Scoring, Aggregation) liegt flach in _python und
+# importiert sich relativ (..matcher, ..chunker, ..scoring); chunk_models liegt in
+# chunk_analysis. Die Paketstruktur wird hier über __path__ auf diese Verzeichnisse abgebildet.
+SOURCES = Path(__file__).resolve().parents[1] / "ALL_SEMANTIC_MARKER_TXT" / "backup_v2_20250713_234623"
+PACKAGE = "marker_pipeline"
+SUBPACKAGES = {
+    "chunker": [SOURCES / "_python", SOURCES / "chunk_analysis"],
+    "matcher": [SOURCES / "_python"],
+    "scoring": [SOURCES / "_python"],
+    "aggregation": [SOURCES / "_python"],
+}
+
+
+def load(subpackage: str, module: str) -> Any:
+    if PACKAGE not in sys.modules:
+        root = types.ModuleType(PACKAGE)
+        root.__path__ = []
+        sys.modules[PACKAGE] = root
+        for name, paths in SUBPACKAGES.items():
+            package = types.ModuleType(f"{PACKAGE}.{name}")
+            package.__path__ = [str(path) for path in paths]
+            sys.modules[package.__name__] = package
+            setattr(root, name, package)
+    return importlib.import_module(f"{PACKAGE}.{subpackage}.{module}")
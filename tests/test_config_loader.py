@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pipeline_package import load  # noqa: E402
+
+config_loader = load("matcher", "config_loader")
+MarkerConfig, MarkerLoader = config_loader.MarkerConfig, config_loader.MarkerLoader
+
+
+def write_markers(directory: Path, *ids: str) -> None:
+    directory.mkdir(exist_ok=True)
+    lines = ["markers:"] + [f"  - id: {marker_id}\n    keywords: [{marker_id.lower()}]" for marker_id in ids]
+    (directory / "markers.yaml").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_snapshot_is_reused_until_a_source_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_markers(tmp_path / "markers", "ROT", "GRUEN")
+    config = MarkerConfig(marker_directories=[tmp_path / "markers"])
+
+    assert set(MarkerLoader(config).load_all_markers()) == {"ROT", "GRUEN"}
+    assert config.snapshot_path.exists()
+    # Zweiter Loader liest den Snapshot statt der Quellen
+    loader = MarkerLoader(config)
+    with monkeypatch.context() as patch:
+        patch.setattr(MarkerLoader, "_load_from_sources", lambda self: pytest.fail("Quellen neu geparst"))
+        assert set(loader.load_all_markers()) == {"ROT", "GRUEN"}
+
+    write_markers(tmp_path / "markers", "ROT", "BLAU")
+    assert loader.reload_if_changed()
+    assert {marker.id for marker in loader.get_active_markers()} == {"ROT", "BLAU"}
+    assert set(MarkerLoader(config).load_all_markers()) == {"ROT", "BLAU"}
+
+
+def test_loader_without_snapshot_path_parses_sources(tmp_path: Path) -> None:
+    write_markers(tmp_path / "markers", "ROT")
+    config = MarkerConfig(marker_directories=[tmp_path / "markers"])
+    config.snapshot_path = None
+
+    loader = MarkerLoader(config)
+    assert set(loader.load_all_markers()) == {"ROT"}
+    write_markers(tmp_path / "markers", "BLAU")
+    assert loader.reload_if_changed()
+    assert not list((tmp_path / "markers").glob(".markers.snapshot"))
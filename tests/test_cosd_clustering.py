@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import cosd  # noqa: E402
+
+from _python.cost_vector_math import VectorOperations, cluster_vectors  # noqa: E402
+from _python.vector_clustering import create_clustering_backend  # noqa: E402
+
+
+def legacy_cluster_vectors(vectors: list, distance_threshold: float, method: str) -> list[list[int]]:
+    """Ursprüngliche Schleife aus cluster_vectors, mit korrigierter Kandidatenprüfung (vectors[j])."""
+    if method == 'euclidean':
+        dist_func = VectorOperations.euclidean_distance
+    else:
+        dist_func = lambda v1, v2: 1.0 - VectorOperations.cosine_similarity(v1, v2)  # noqa: E731
+    clusters, assigned = [], set()
+    for i in range(len(vectors)):
+        if i in assigned:
+            continue
+        cluster = [i]
+        assigned.add(i)
+        for j in range(i + 1, len(vectors)):
+            if j in assigned:
+                continue
+            if max(dist_func(vectors[j], vectors[idx]) for idx in cluster) <= distance_threshold:
+                cluster.append(j)
+                assigned.add(j)
+        clusters.append(cluster)
+    return clusters
+
+
+def make_vectors(count: int, seed: int, sparse: bool = False) -> list:
+    """Gruppierte Vektoren mit einzelnen Nullvektoren."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(6, 24))
+    rows = centers[rng.integers(6, size=count)] + rng.normal(scale=0.4, size=(count, 24))
+    rows[rng.random(count) < 0.05] = 0.0
+    rows[rng.random((count, 24)) < 0.3] = 0.0
+    vector = cosd.SparseCoSDVector.from_dense if sparse else cosd.CoSDVector
+    return [vector(row, datetime(2024, 1, 1)) for row in rows]
+
+
+def distances(vectors: list, method: str) -> np.ndarray:
+    if method == 'euclidean':
+        return np.array([[VectorOperations.euclidean_distance(a, b) for b in vectors] for a in vectors])
+    return np.array([[1.0 - VectorOperations.cosine_similarity(a, b) for b in vectors] for a in vectors])
+
+
+def assert_partition(clusters: list[list[int]], count: int) -> None:
+    assert sorted(i for cluster in clusters for i in cluster) == list(range(count))
+    assert all(cluster == sorted(cluster) for cluster in clusters)
+    assert [cluster[0] for cluster in clusters] == sorted(cluster[0] for cluster in clusters)
+
+
+@pytest.mark.parametrize("method,threshold", [("euclidean", 3.5), ("cosine", 0.3)])
+@pytest.mark.parametrize("condensed_limit", [4000, 0])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_complete_linkage_matches_corrected_legacy_loop(method, threshold, condensed_limit, sparse) -> None:
+    for seed in range(3):
+        vectors = make_vectors(150, seed, sparse)
+        expected = legacy_cluster_vectors(vectors, threshold, method)
+        assert any(len(cluster) > 2 for cluster in expected)
+
+        backend = create_clustering_backend(
+            'complete', distance_threshold=threshold, method=method, condensed_limit=condensed_limit
+        )
+        assert backend.cluster(vectors) == expected, seed
+        assert cluster_vectors(vectors, threshold, method) == expected
+
+
+@pytest.mark.parametrize("method,threshold", [("euclidean", 3.5), ("cosine", 0.3)])
+@pytest.mark.parametrize("condensed_limit", [4000, 0])
+def test_dbscan_matches_density_reachability(method, threshold, condensed_limit) -> None:
+    vectors = make_vectors(150, 4)
+    neighbors = distances(vectors, method) <= threshold
+    core = neighbors.sum(axis=1) >= 3
+
+    clusters = create_clustering_backend(
+        'dbscan', distance_threshold=threshold, method=method, condensed_limit=condensed_limit, min_samples=3
+    ).cluster(vectors)
+    assert_partition(clusters, len(vectors))
+
+    # Kernpunkte zerfallen in die Zusammenhangskomponenten ihres Nachbarschaftsgraphen
+    components, seen = [], set()
+    for start in np.flatnonzero(core):
+        if start in seen:
+            continue
+        component, queue = set(), [start]
+        while queue:
+            point = queue.pop()
+            if point not in component:
+                component.add(point)
+                queue.extend(np.flatnonzero(neighbors[point] & core))
+        seen |= component
+        components.append(sorted(component))
+    assert sorted(
+        [i for i in cluster if core[i]] for cluster in clusters if core[cluster].any()
+    ) == sorted(components)
+
+    # Randpunkte hängen an einem Kernpunkt ihres Clusters, Rauschen bleibt allein
+    for cluster in clusters:
+        cores = [i for i in cluster if core[i]]
+        if not cores:
+            assert len(cluster) == 1
+        for i in cluster:
+            assert core[i] or not cores or neighbors[i, cores].any()
+
+
+def test_kmeans_is_a_deterministic_partition() -> None:
+    vectors = make_vectors(300, 5)
+    for method in ("euclidean", "cosine"):
+        backend = create_clustering_backend('kmeans', method=method, n_clusters=6, batch_size=64)
+        clusters = backend.cluster(vectors)
+        assert_partition(clusters, len(vectors))
+        assert len(clusters) <= 6
+        assert clusters == create_clustering_backend(
+            'kmeans', method=method, n_clusters=6, batch_size=64
+        ).cluster(vectors)
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        create_clustering_backend('ward')
+    assert create_clustering_backend('complete').cluster([]) == []
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import assert_close, cosd  # noqa: E402
+
+from _python import drift_metrics  # noqa: E402
+
+
+def legacy_drift_metrics(vectors: list) -> dict:
+    """Bisherige Berechnung Vektor für Vektor (Varianz-Normierung mit der exakten Varianz von U(-1, 1))."""
+    matrix = np.array([vec.dimensions for vec in vectors])
+    count = len(vectors)
+
+    center = matrix.mean(axis=0)
+    distances = [float(np.linalg.norm(vec.dimensions - center)) for vec in vectors]
+    threshold = np.percentile(distances, 75)
+    home_base = {
+        'stability_score': max(0.0, 1.0 - np.mean(distances) / np.sqrt(len(center))),
+        'deviation_radius': float(np.std(distances)),
+        'consistency_factor': sum(1 for d in distances if d <= threshold) / count,
+        'metadata': {'vector_count': count, 'dimension_count': len(center),
+                     'avg_deviation': float(np.mean(distances)), 'max_deviation': float(max(distances))}
+    }
+
+    timelines = {'density': [], 'variability': [], 'rise_rate': []}
+    if count < 2:
+        density = {'marker_density': 0.0, 'temporal_clustering': 0.0, 'density_trend': 0.0, 'peak_density': 0.0,
+                   'metadata': {'error': 'Insufficient vectors for density calculation'}}
+    else:
+        timeline, total = [], 0
+        for i in range(0, count, max(1, count // 10)):
+            window = vectors[i:min(i + 5, count)]
+            markers = sum(len(vec.marker_weights) for vec in window)
+            total += markers
+            span = (window[-1].timestamp - window[0].timestamp).total_seconds() / 60
+            timeline.append(markers / span if span > 0 else markers)
+        timelines['density'] = timeline
+        maximum = np.var([0] * (len(timeline) - 1) + [total])
+        density = {
+            'marker_density': float(np.mean(timeline)),
+            'temporal_clustering': float(min(1.0, np.var(timeline) / maximum) if maximum > 0 else 0.0)
+            if len(timeline) > 1 else 0.0,
+            'density_trend': float(np.polyfit(np.arange(len(timeline)), timeline, 1)[0]) if len(timeline) > 1 else 0.0,
+            'peak_density': float(max(timeline)),
+            'metadata': {'time_window_minutes': 5, 'total_markers': total, 'timeline_points': len(timeline)}
+        }
+
+    size = max(1, count // 5)
+    timelines['variability'] = [
+        float(np.mean(np.var(matrix[i:i + size], axis=0))) if len(matrix[i:i + size]) > 1 else 0.0
+        for i in range(0, count, size)
+    ]
+    variance_score = float(np.mean(np.var(matrix, axis=0)) / (1.0 / 3.0))
+    variability = {
+        'standard_deviation': float(np.mean(np.std(matrix, axis=0))),
+        'variance_score': variance_score,
+        'fluctuation_range': (float(matrix.min()), float(matrix.max())),
+        'stability_index': max(0.0, 1.0 - variance_score),
+        'metadata': {'vector_count': count, 'dimension_count': matrix.shape[1],
+                     'std_per_dimension': np.std(matrix, axis=0).tolist()}
+    }
+
+    if count < 2:
+        rise_rate = {'average_rise_rate': 0.0, 'peak_rise_rate': 0.0, 'acceleration_pattern': 'insufficient_data',
+                     'rise_trend': 0.0, 'metadata': {'error': 'Insufficient vectors for rise rate calculation'}}
+    else:
+        rates = []
+        for previous, vec in zip(vectors, vectors[1:]):
+            delta = (vec.timestamp - previous.timestamp).total_seconds()
+            rates.append((vec.magnitude - previous.magnitude) / delta if delta > 0 else 0.0)
+        timelines['rise_rate'] = rates
+        pattern = 'insufficient_data'
+        if len(rates) >= 3:
+            accelerations = np.diff(rates)
+            mean, variance = np.mean(accelerations), np.var(accelerations)
+            if abs(mean) < 0.1 and variance < 0.1:
+                pattern = 'linear'
+            elif mean > 0.1:
+                pattern = 'exponential'
+            elif mean < -0.1:
+                pattern = 'decelerating'
+            elif variance > 0.5:
+                pattern = 'oscillating'
+            else:
+                pattern = 'stable'
+        magnitudes = [vec.magnitude for vec in vectors]
+        rise_rate = {
+            'average_rise_rate': float(np.mean(rates)), 'peak_rise_rate': float(max(rates)),
+            'acceleration_pattern': pattern,
+            'rise_trend': float(np.polyfit(np.arange(len(rates)), rates, 1)[0]) if len(rates) > 1 else 0.0,
+            'metadata': {'vector_count': count,
+                         'time_span_seconds': (vectors[-1].timestamp - vectors[0].timestamp).total_seconds(),
+                         'magnitude_range': (min(magnitudes), max(magnitudes))}
+        }
+
+    return {'home_base': home_base, 'density': density, 'variability': variability, 'rise_rate': rise_rate,
+            'timelines': timelines}
+
+
+def make_vectors(count: int, dimensions: int, seed: int, sparse: bool = False, tz: bool = False) -> list:
+    rng = np.random.default_rng(seed)
+    rows = rng.normal(size=(count, dimensions)) * (rng.random((count, dimensions)) < 0.1)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc if tz else None)
+    # Gleiche Zeitstempel ergeben Zeitdifferenzen von 0
+    seconds = np.cumsum(rng.choice([0, 0, 20, 60, 600], size=count))
+    vectors = []
+    for row, offset in zip(rows, seconds):
+        weights = {f"m{k}": 1.0 for k in range(rng.integers(0, 4))}
+        timestamp = start + timedelta(seconds=int(offset))
+        if sparse:
+            vectors.append(cosd.SparseCoSDVector.from_dense(row, timestamp, weights))
+        else:
+            vectors.append(cosd.CoSDVector(row, timestamp, weights))
+    return vectors
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 9, 57, 400])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_stacked_metrics_match_per_vector_path(count: int, sparse: bool) -> None:
+    vectors = make_vectors(count, 40, count, sparse, tz=count % 2 == 1)
+    expected = legacy_drift_metrics(vectors)
+    timelines = expected.pop('timelines')
+    assert_close(drift_metrics.calculate_all_drift_metrics(vectors), expected)
+    assert_close(drift_metrics.calculate_density(vectors).density_timeline, timelines['density'])
+    assert_close(drift_metrics.calculate_variability(vectors).variability_timeline, timelines['variability'])
+    assert_close(drift_metrics.calculate_rise_rate(vectors).rise_timeline, timelines['rise_rate'])
+
+    # Matrix-Eingabe mit Zeitstempeln und Marker-Anzahlen liefert dasselbe
+    matrix = np.array([vec.dimensions for vec in vectors])
+    assert_close(drift_metrics.calculate_all_drift_metrics(
+        matrix, [vec.timestamp for vec in vectors], [len(vec.marker_weights) for vec in vectors]
+    ), expected)
+
+
+def test_stacked_metrics_on_constant_and_zero_vectors() -> None:
+    start = datetime(2024, 1, 1)
+    for row in (np.zeros(12), np.full(12, 0.5)):
+        vectors = [cosd.CoSDVector(row.copy(), start + timedelta(minutes=i)) for i in range(6)]
+        expected = legacy_drift_metrics(vectors)
+        del expected['timelines']
+        assert_close(drift_metrics.calculate_all_drift_metrics(vectors), expected)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import analyzer, assert_close, conversation, cosd, write_markers  # noqa: E402
+
+from _python.cost_vector_math import (  # noqa: E402
+    ResonanceChains, calculate_resonance_band, calculate_resonance_coupling
+)
+
+
+def legacy_resonance(vectors: list, threshold: float, lookahead: int = 4) -> list[dict]:
+    """Paarweise Schleife mit calculate_resonance_coupling (ursprüngliche Implementierung)."""
+    patterns = []
+    for i in range(len(vectors)):
+        for j in range(i + 1, min(i + lookahead + 1, len(vectors))):
+            coupling = calculate_resonance_coupling(vectors[i], vectors[j], threshold)
+            if coupling['is_strongly_coupled']:
+                patterns.append({
+                    'type': 'strong_resonance',
+                    'indices': [i, j],
+                    'time_delta': (vectors[j].timestamp - vectors[i].timestamp).total_seconds(),
+                    'coupling_strength': coupling['coupling_strength'],
+                    'phase_alignment': coupling['phase_alignment'],
+                    'resonance_factor': coupling['resonance_factor']
+                })
+    return patterns
+
+
+def legacy_chains(patterns: list[dict], vector_count: int) -> list[dict]:
+    """Breitensuche über die Adjazenzliste (ursprüngliches _identify_resonance_chains)."""
+    connections = defaultdict(set)
+    for pattern in patterns:
+        i, j = pattern['indices']
+        connections[i].add(j)
+        connections[j].add(i)
+    chains, visited = [], set()
+    for start in range(vector_count):
+        if start in visited or start not in connections:
+            continue
+        chain, queue = set(), [start]
+        while queue:
+            current = queue.pop(0)
+            if current in visited:
+                continue
+            visited.add(current)
+            chain.add(current)
+            queue.extend(neighbor for neighbor in connections[current] if neighbor not in visited)
+        if len(chain) >= 3:
+            chains.append({
+                'type': 'resonance_chain',
+                'indices': sorted(chain),
+                'chain_length': len(chain),
+                'density': len([p for p in patterns if all(idx in chain for idx in p['indices'])])
+                / (len(chain) * (len(chain) - 1) / 2)
+            })
+    return chains
+
+
+@pytest.mark.parametrize("lookahead", [1, 4, 7])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_resonance_band_matches_pairwise_coupling(tmp_path: Path, lookahead: int, sparse: bool) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    texts, timestamps = conversation(names, 60, seed=lookahead)
+    vectors = analyzer(tmp_path / "markers.yaml", names, sparse_vectors=sparse).analyze_drift(
+        texts, timestamps
+    ).drift_vectors
+    # Leere Vektoren (Texte ohne Marker) ergeben wie in der Schleife NaN und keine Kopplung
+    assert any(vector.magnitude == 0 for vector in vectors)
+
+    band = calculate_resonance_band(vectors, lookahead, 0.7)
+    pairs = [(i, j) for i in range(len(vectors)) for j in range(i + 1, min(i + lookahead + 1, len(vectors)))]
+    assert list(zip(band['i'].tolist(), band['j'].tolist())) == pairs
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for pair, (i, j) in enumerate(pairs):
+            coupling = calculate_resonance_coupling(vectors[i], vectors[j], 0.7)
+            for key, value in coupling.items():
+                assert_close(band[key][pair].item(), value, f"{key}[{i}, {j}]")
+
+
+def test_band_on_short_and_empty_sequences() -> None:
+    start = datetime(2024, 1, 1)
+    vectors = [cosd.CoSDVector(np.array([1.0, float(i)]), start + timedelta(minutes=i)) for i in range(3)]
+    for count in range(4):
+        band = calculate_resonance_band(vectors[:count], 4, 0.7)
+        assert len(band['i']) == count * (count - 1) // 2
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_analyzer_resonance_matches_legacy_loop(tmp_path: Path, sparse: bool) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    texts, timestamps = conversation(names, 150)
+    cosd_analyzer = analyzer(tmp_path / "markers.yaml", names, sparse_vectors=sparse)
+    result = cosd_analyzer.analyze_drift(texts, timestamps)
+
+    strong = [p for p in result.resonance_patterns if p['type'] == 'strong_resonance']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        expected = legacy_resonance(result.drift_vectors, cosd_analyzer.config['resonance_threshold'])
+    assert strong
+    assert_close(strong, expected)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_union_find_chains_match_breadth_first_search(seed: int) -> None:
+    rng = random.Random(seed)
+    count = 300
+    edges = {(i, i + rng.randint(1, 6)) for i in range(count - 6) if rng.random() < 0.35}
+    edges |= {tuple(sorted(rng.sample(range(count), 2))) for _ in range(20)}
+    patterns = [{'indices': [i, j]} for i, j in sorted(edges, key=lambda edge: rng.random())]
+
+    chains = ResonanceChains()
+    for position, pattern in enumerate(patterns):
+        chains.add_edge(*pattern['indices'])
+        if position == len(patterns) // 2:
+            # Export/Import mitten im Strom ändert nichts
+            chains = ResonanceChains.from_dict(json.loads(json.dumps(chains.to_dict())))
+    expected = legacy_chains(patterns, count)
+    assert expected
+    assert_close(chains.chains(), expected)
+    assert chains.max_component_size == max(len(members) for members in chains.members.values())
+    assert_close(chains.chains(min_length=5), [chain for chain in expected if chain['chain_length'] >= 5])
+
+
+def test_analyzer_chains_match_legacy_search(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml", markers=12)
+    texts, timestamps = conversation(names, 200, seed=2)
+    result = analyzer(tmp_path / "markers.yaml", names).analyze_drift(texts, timestamps)
+
+    strong = [p for p in result.resonance_patterns if p['type'] == 'strong_resonance']
+    chains = [p for p in result.resonance_patterns if p['type'] == 'resonance_chain']
+    assert chains
+    assert_close(chains, legacy_chains(strong, len(texts)))
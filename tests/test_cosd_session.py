@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import analyzer, assert_close, conversation, write_markers  # noqa: E402
+
+from _python.drift_session import SESSION_STATE_VERSION  # noqa: E402
+
+
+def stream(cosd_analyzer, texts: list, timestamps: list, resume_at: tuple[int, ...] = ()) -> dict:
+    """Streamt die Nachrichten und setzt die Session an resume_at aus dem exportierten JSON-Zustand fort."""
+    session = cosd_analyzer.open_session(session_id="gespräch")
+    for position, (text, timestamp) in enumerate(zip(texts, timestamps)):
+        if position in resume_at:
+            state = json.loads(json.dumps(session.to_dict()))
+            session = cosd_analyzer.open_session(state=state)
+        session.append(text, timestamp)
+    snapshot = session.snapshot()
+    del snapshot['timestamp']
+    return snapshot
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_resumed_session_matches_full_analysis(tmp_path: Path, sparse: bool) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    texts, timestamps = conversation(names, 200)
+    cosd_analyzer = analyzer(tmp_path / "markers.yaml", names, sparse_vectors=sparse)
+
+    uninterrupted = stream(cosd_analyzer, texts, timestamps)
+    assert_close(stream(cosd_analyzer, texts, timestamps, resume_at=(1, 2, 57, 199)), uninterrupted)
+
+    # Kennzahlen, die die Session exakt wie die Batch-Analyse fortschreibt
+    full = cosd_analyzer.analyze_drift(texts, timestamps)
+    for key in ('average_velocity', 'acceleration', 'total_distance'):
+        assert uninterrupted['drift_velocity'][key] == pytest.approx(full.drift_velocity[key]), key
+    for key in ('path_length', 'curvature', 'stability_zones'):
+        assert_close(uninterrupted['drift_path'][key], full.drift_path[key], key)
+    for key in ('average_rise_rate', 'peak_rise_rate', 'rise_trend'):
+        assert uninterrupted['drift_metrics']['rise_rate'][key] == pytest.approx(full.drift_metrics['rise_rate'][key])
+
+    # Die Session meldet Paare beim späteren Vektor, also nach (j, i) geordnet
+    strong = sorted(
+        (p for p in full.resonance_patterns if p['type'] == 'strong_resonance'),
+        key=lambda p: p['indices'][::-1]
+    )
+    assert uninterrupted['resonance']['strong_resonance_count'] == len(strong)
+    assert_close(uninterrupted['resonance']['recent_patterns'], strong[-100:])
+    assert_close(
+        uninterrupted['resonance']['chains'],
+        [p for p in full.resonance_patterns if p['type'] == 'resonance_chain']
+    )
+
+
+def test_session_state_version_is_checked(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    cosd_analyzer = analyzer(tmp_path / "markers.yaml", names)
+    state = cosd_analyzer.open_session().to_dict()
+    assert state['version'] == SESSION_STATE_VERSION == 1
+
+    with pytest.raises(ValueError):
+        cosd_analyzer.open_session(state={**state, 'version': SESSION_STATE_VERSION + 1})
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import cosd  # noqa: E402
+
+
+def samples(text: str) -> dict[str, float]:
+    """Metrik-Zeilen ohne Kommentare als {Name mit Labels: Wert}."""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def test_histogram_buckets_and_counters_are_cumulative() -> None:
+    metrics = cosd.StageMetrics()
+    metrics.record({"stage_timings_ms": {"vectorize": 3.0, "resonance": 40.0}, "counters": {"vectors_built": 5}})
+    metrics.record({"stage_timings_ms": {"vectorize": 30.0}, "counters": {"vectors_built": 2, "pairs": 4}})
+    metrics.record(error=True)
+
+    values = samples(metrics.to_prometheus())
+    bucket = 'cosd_stage_duration_seconds_bucket{{stage="vectorize",le="{}"}}'.format
+    assert [values[bucket(bound)] for bound in ("0.001", "0.005", "0.025", "0.05", "10.0", "+Inf")] == [0, 1, 1, 2, 2, 2]
+    counts = [values[bucket(bound)] for bound in metrics.BUCKETS]
+    assert counts == sorted(counts)
+    assert values['cosd_stage_duration_seconds_count{stage="vectorize"}'] == 2
+    assert values['cosd_stage_duration_seconds_sum{stage="vectorize"}'] == 0.033
+    assert values['cosd_stage_duration_seconds_bucket{stage="resonance",le="0.025"}'] == 0
+    assert values['cosd_stage_duration_seconds_bucket{stage="resonance",le="+Inf"}'] == 1
+
+    assert values['cosd_pipeline_events_total{event="vectors_built"}'] == 7
+    assert values['cosd_pipeline_events_total{event="pairs"}'] == 4
+    # Fehlgeschlagene Analysen zählen nicht als abgeschlossen
+    assert (values["cosd_analyses_total"], values["cosd_analysis_errors_total"]) == (2, 1)
+
+
+def test_profile_sums_repeated_stages_and_counts() -> None:
+    profile = cosd.StageProfile()
+    for _ in range(2):
+        with profile.stage("vectorize"):
+            profile.count("vectors_built", 3)
+
+    data = profile.to_dict()
+    assert list(data["stage_timings_ms"]) == ["vectorize"]
+    assert 0 <= data["stage_timings_ms"]["vectorize"] <= profile.total_ms
+    assert data["counters"] == {"vectors_built": 6}
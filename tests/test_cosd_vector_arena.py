@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import analyzer, conversation, cosd, write_markers  # noqa: E402
+
+from _python.cost_vector_math import VectorOperations  # noqa: E402
+
+
+def test_arena_views_are_slotted() -> None:
+    arena = cosd.VectorArena(4, "float32", capacity=1)
+    view = arena.append(cosd.CoSDVector(np.array([3.0, 4.0, 0.0, 0.0]), datetime(2024, 1, 1), {"a": 1.0}))
+
+    assert not hasattr(view, "__dict__")
+    with pytest.raises(AttributeError):
+        view.extra = 1
+    assert view.timestamp == datetime(2024, 1, 1) and view.marker_weights == {"a": 1.0}
+    # Eine Sicht lässt sich erneut anhängen (kopiert die Zeile)
+    copy = arena.append(view)
+    assert copy.row == 1 and np.array_equal(copy.dimensions, view.dimensions)
+
+
+def test_arena_views_match_dense_vectors() -> None:
+    rng = np.random.default_rng(5)
+    dense = [cosd.CoSDVector(rng.normal(size=16), datetime(2024, 1, 1)) for _ in range(20)]
+    arena = cosd.VectorArena(16, "float64")
+    views = arena.extend(dense)
+
+    for i in range(len(dense) - 1):
+        for op in (VectorOperations.cosine_similarity, VectorOperations.euclidean_distance,
+                   VectorOperations.manhattan_distance):
+            assert op(views[i], views[i + 1]) == pytest.approx(op(dense[i], dense[i + 1]))
+        assert views[i].dot_product(dense[i + 1]) == pytest.approx(dense[i].dot_product(dense[i + 1]))
+        assert views[i].magnitude == pytest.approx(dense[i].magnitude)
+
+    normalized = views[0].normalize()
+    assert isinstance(normalized, cosd.CoSDVector)
+    assert normalized.dimensions == pytest.approx(dense[0].normalize().dimensions)
+    assert views[0].normalize(in_place=True) is views[0]
+    assert arena.matrix()[0] == pytest.approx(normalized.dimensions)
+
+
+def test_compact_analysis_uses_arena_views(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    texts, timestamps = conversation(names, 60)
+    wide = analyzer(tmp_path / "markers.yaml", names).analyze_drift(texts, timestamps)
+    compact = analyzer(tmp_path / "markers.yaml", names, vector_dtype="float32").analyze_drift(texts, timestamps)
+
+    assert all(isinstance(vector, cosd.ArenaCoSDVector) for vector in compact.drift_vectors)
+    for view, vector in zip(compact.drift_vectors, wide.drift_vectors):
+        assert view.dimensions == pytest.approx(vector.dimensions, rel=1e-6, abs=1e-7)
+    assert compact.drift_velocity["total_distance"] == pytest.approx(wide.drift_velocity["total_distance"], rel=1e-5)
+    json.dumps(compact.to_dict(), default=str)
+
+
+def test_raw_arrays_need_a_timestamp() -> None:
+    arena = cosd.VectorArena(3, "float32", capacity=1)
+    with pytest.raises(ValueError):
+        arena.append(np.ones(3))
+    assert len(arena.matrix()) == 0
+
+    view = arena.append(np.ones(3), datetime(2024, 1, 1))
+    assert view.row == 0 and view.timestamp == datetime(2024, 1, 1)
+    sparse = cosd.SparseCoSDVector.from_dense(np.array([0.0, 2.0, 0.0]), datetime(2024, 1, 1))
+    assert sparse.dot_product(view) == pytest.approx(2.0)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import analyzer, cosd, write_markers  # noqa: E402
+
+from _python.vector_cache import vector_cache_key  # noqa: E402
+
+MORNING, EVENING = datetime(2024, 1, 1, 8), datetime(2024, 1, 1, 20)
+
+
+def vectors() -> list:
+    dense = cosd.CoSDVector(np.array([3.0, 0.0, 4.0, 0.0]), MORNING, {"a": 1.0}, {"quelle": "dicht"})
+    sparse = cosd.SparseCoSDVector.from_dense(dense.dimensions, MORNING, {"a": 1.0}, {"quelle": "dünn"})
+    return [dense, sparse]
+
+
+@pytest.mark.parametrize("vector", vectors(), ids=["dense", "sparse"])
+def test_hits_are_independent_of_each_other_and_the_entry(vector) -> None:
+    cache = cosd.VectorCache()
+    cache.put("k", vector)
+    # Spätere Änderungen am abgelegten Vektor erreichen den Cache nicht
+    vector.marker_weights["a"] = 9.0
+
+    morning, evening = cache.get("k", MORNING), cache.get("k", EVENING)
+    assert (morning.timestamp, evening.timestamp) == (MORNING, EVENING)
+    morning.marker_weights["b"] = 2.0
+    morning.metadata["quelle"] = "geändert"
+    with pytest.raises(ValueError):
+        morning.dimensions[0] = 1.0
+
+    again = cache.get("k", EVENING)
+    for hit in (evening, again):
+        assert hit.marker_weights == {"a": 1.0}
+        assert hit.metadata["quelle"] in ("dicht", "dünn")
+        assert hit.dimensions.tolist() == [3.0, 0.0, 4.0, 0.0]
+    assert cache.stats()["hits"] == 3
+
+
+@pytest.mark.parametrize("vector", vectors(), ids=["dense", "sparse"])
+def test_in_place_normalize_on_a_hit_leaves_the_cache_untouched(vector) -> None:
+    cache = cosd.VectorCache()
+    cache.put("k", vector)
+
+    hit = cache.get("k", MORNING)
+    normalized = hit.normalize(in_place=True)
+    assert normalized is not hit
+    assert normalized.dimensions == pytest.approx([0.6, 0.0, 0.8, 0.0])
+    assert hit.dimensions.tolist() == [3.0, 0.0, 4.0, 0.0]
+    assert cache.get("k", EVENING).dimensions.tolist() == [3.0, 0.0, 4.0, 0.0]
+
+
+def test_repeated_text_keeps_its_own_timestamps(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml", markers=5, tokens=50)
+    cosd_analyzer = analyzer(tmp_path / "markers.yaml", names)
+    text = f"{names[0]} {names[1]}"
+
+    first = cosd_analyzer.analyze_drift([text, text], [MORNING, EVENING])
+    second = cosd_analyzer.analyze_drift([text], [EVENING])
+    assert [vector.timestamp for vector in first.drift_vectors] == [MORNING, EVENING]
+    assert second.drift_vectors[0].timestamp == EVENING
+    assert np.array_equal(first.drift_vectors[0].dimensions, second.drift_vectors[0].dimensions)
+    assert cosd_analyzer.vector_cache.stats()["hits"] == 2
+
+
+def test_disk_tier_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "vectors.sqlite")
+    dense, sparse = vectors()
+    writer = cosd.VectorCache(disk_path=path)
+    writer.put(vector_cache_key("dicht"), dense)
+    writer.put(vector_cache_key("dünn"), sparse)
+
+    reader = cosd.VectorCache(disk_path=path)
+    for text, vector in (("dicht", dense), ("dünn", sparse)):
+        hit = reader.get(vector_cache_key(text), EVENING)
+        assert type(hit) is type(vector)
+        assert np.array_equal(hit.dimensions, vector.dimensions)
+        assert (hit.marker_weights, hit.metadata, hit.timestamp) == (vector.marker_weights, vector.metadata, EVENING)
+    assert reader.get(vector_cache_key("fehlt"), EVENING) is None
+    reader.get(vector_cache_key("dicht"), EVENING)
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["hits"], stats["misses"]) == (2, 1, 1)
+
+
+def test_disk_tier_is_trimmed_to_the_newest_entries(tmp_path: Path) -> None:
+    path = str(tmp_path / "vectors.sqlite")
+    cache = cosd.VectorCache(max_entries=0, disk_path=path, disk_max_entries=10)
+    vector = vectors()[0]
+    for i in range(1000):
+        cache.put(f"k{i}", vector)
+
+    reader = cosd.VectorCache(disk_path=path)
+    assert reader.get("k989", MORNING) is None
+    assert reader.get("k990", MORNING) is not None
+    assert reader.get("k999", MORNING) is not None
+
+
+def test_lru_and_byte_limit_evict_the_oldest_entries() -> None:
+    vector = vectors()[0]  # 4 float64-Werte = 32 Bytes
+    cache = cosd.VectorCache(max_entries=2)
+    cache.put("a", vector)
+    cache.put("b", vector)
+    cache.get("a", MORNING)
+    cache.put("c", vector)
+    assert cache.get("b", MORNING) is None
+    assert cache.get("a", MORNING) is not None and cache.get("c", MORNING) is not None
+
+    cache = cosd.VectorCache(max_bytes=70)
+    for key in "abc":
+        cache.put(key, vector)
+    assert len(cache) == 2 and cache.stats()["bytes"] == 64
+    assert cache.get("a", MORNING) is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import cosd  # noqa: E402
+
+from _python.cost_vector_math import VectorOperations  # noqa: E402
+
+DIMENSIONS = 800
+START = datetime(2024, 1, 1)
+
+
+def clustered(count: int, seed: int, topics: int = 30) -> list:
+    """Dünnbesetzte Vektoren um zufällige Themen (je 25 Tokens) plus Rauschen."""
+    rng = np.random.default_rng(seed)
+    themes = np.random.default_rng(0).choice(DIMENSIONS, (topics, 25))
+    vectors = []
+    for i in range(count):
+        tokens = np.concatenate((rng.choice(themes[rng.integers(topics)], 12), rng.choice(DIMENSIONS, 3)))
+        dense = np.zeros(DIMENSIONS)
+        np.add.at(dense, tokens, rng.uniform(0.5, 1.5, len(tokens)))
+        vectors.append(cosd.SparseCoSDVector.from_dense(dense, START + timedelta(minutes=i)))
+    return vectors
+
+
+def build(vectors: list, **options) -> cosd.CoSDVectorIndex:
+    index = cosd.CoSDVectorIndex(DIMENSIONS, train_threshold=500, **options)
+    for start in range(0, len(vectors), 100):
+        index.add_many(vectors[start:start + 100], conversation_id=f"g{start // 400}")
+    return index
+
+
+def test_approximate_search_recalls_the_exact_neighbours() -> None:
+    index = build(clustered(2000, seed=1))
+    assert index.centroids is not None
+
+    found = total = 0
+    for query in clustered(40, seed=2):
+        exact = {hit["id"] for hit in index.search(query, k=10, exact=True)}
+        approximate = index.search(query, k=10)
+        assert [hit["similarity"] for hit in approximate] == sorted(
+            (hit["similarity"] for hit in approximate), reverse=True
+        )
+        found += len(exact & {hit["id"] for hit in approximate})
+        total += len(exact)
+    assert found / total >= 0.9
+
+
+def test_exact_search_matches_brute_force() -> None:
+    vectors = clustered(300, seed=3)
+    index = build(vectors)
+    query = clustered(1, seed=4)[0]
+
+    similarity = VectorOperations.cosine_similarity
+    expected = sorted(range(len(vectors)), key=lambda i: (-similarity(query, vectors[i]), i))[:5]
+    hits = index.search(query, k=5, exact=True)
+    assert [hit["id"] for hit in hits] == expected
+    for hit in hits:
+        assert hit["similarity"] == pytest.approx(similarity(query, vectors[hit["id"]]), abs=1e-5)
+        assert hit["timestamp"] == (START + timedelta(minutes=hit["id"])).isoformat()
+
+
+def test_search_within_a_conversation() -> None:
+    vectors = clustered(1200, seed=5)
+    # exact_limit=0 erzwingt auch pro Gespräch die Suche über die Listen
+    index = build(vectors, exact_limit=0)
+
+    for query in clustered(10, seed=6):
+        exact = index.search(query, k=8, conversation_id="g1", exact=True)
+        approximate = index.search(query, k=8, conversation_id="g1")
+        assert all(hit["conversation_id"] == "g1" for hit in exact + approximate)
+        assert all(400 <= hit["id"] < 800 for hit in exact)
+        assert [hit["position"] for hit in exact] == [hit["id"] - 400 for hit in exact]
+        assert {hit["id"] for hit in approximate} <= {hit["id"] for hit in index.search(
+            query, k=400, conversation_id="g1", exact=True)}
+    assert index.search(vectors[0], conversation_id="unbekannt") == []
+
+
+def test_save_load_add_save_round_trip(tmp_path: Path) -> None:
+    vectors = clustered(900, seed=7)
+    index = build(vectors[:800])
+    index.save(tmp_path / "index")
+    queries = clustered(5, seed=8)
+
+    loaded = cosd.CoSDVectorIndex.load(tmp_path / "index", mmap=True)
+    assert isinstance(loaded._values.view, np.memmap)
+    assert len(loaded) == 800 and loaded.conversations == index.conversations
+    for query in queries:
+        assert loaded.search(query, k=10) == index.search(query, k=10)
+
+    ids = loaded.add_many(vectors[800:850], conversation_id="g1")
+    ids += loaded.add_many(vectors[850:], conversation_id="neu")
+    assert ids == list(range(800, 900))
+    loaded.save()
+    assert len(list((tmp_path / "index").glob("segment-*"))) == 1
+
+    reloaded = cosd.CoSDVectorIndex.load(tmp_path / "index", mmap=False)
+    assert len(reloaded) == 900
+    for query in queries + vectors[845:855]:
+        assert reloaded.search(query, k=10) == loaded.search(query, k=10)
+        assert reloaded.search(query, k=10, exact=True) == loaded.search(query, k=10, exact=True)
+    hit, = reloaded.search(vectors[899], k=1, conversation_id="neu")
+    assert (hit["id"], hit["position"]) == (899, 49)
+    assert hit["similarity"] == pytest.approx(1.0, abs=1e-5)
+    # Position im vorhandenen Gespräch wird fortgesetzt
+    assert reloaded.search(vectors[800], k=1, conversation_id="g1")[0]["position"] == 400
+
+
+def test_open_rejects_a_different_dimension_count(tmp_path: Path) -> None:
+    created = cosd.CoSDVectorIndex.open(tmp_path / "index", DIMENSIONS)
+    assert len(created) == 0
+    created.add_many(clustered(3, seed=9))
+    created.save()
+
+    assert len(cosd.CoSDVectorIndex.open(tmp_path / "index", DIMENSIONS)) == 3
+    with pytest.raises(ValueError):
+        cosd.CoSDVectorIndex.open(tmp_path / "index", DIMENSIONS + 1)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cosd_package import CATEGORY, analyzer, assert_close, conversation, cosd, write_markers  # noqa: E402
+
+from _python.cost_vector_math import VectorOperations  # noqa: E402
+from _python.semantic_marker_interface import MarkerVectorizer  # noqa: E402
+
+
+def test_sparse_vectors_match_dense_vectors(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml", markers=60, tokens=2000)
+    vectorizer = MarkerVectorizer(str(tmp_path / "markers.yaml"))
+    rng = random.Random(3)
+    # Unbekannte Marker werden in beiden Modi übersprungen
+    active = [[(CATEGORY, rng.choice(names)) for _ in range(rng.randint(0, 6))] + [("Unbekannt", "x")]
+              for _ in range(80)]
+    dense = [vectorizer.vectorize_text_with_markers("text", markers) for markers in active]
+    sparse = [vectorizer.vectorize_text_with_markers("text", markers, sparse=True) for markers in active]
+
+    for d, s in zip(dense, sparse):
+        assert isinstance(s, cosd.SparseCoSDVector) and not isinstance(d, cosd.SparseCoSDVector)
+        assert np.allclose(s.dimensions, d.dimensions, rtol=1e-12, atol=1e-15)
+        assert s.marker_weights == d.marker_weights and s.metadata == d.metadata
+        assert s.magnitude == pytest.approx(d.magnitude)
+        assert s.normalize().dimensions == pytest.approx(d.normalize().dimensions)
+
+    for i in range(len(active) - 1):
+        for op in (VectorOperations.cosine_similarity, VectorOperations.euclidean_distance,
+                   VectorOperations.manhattan_distance):
+            expected = op(dense[i], dense[i + 1])
+            for pair in ((sparse[i], sparse[i + 1]), (dense[i], sparse[i + 1]), (sparse[i], dense[i + 1])):
+                assert op(*pair) == pytest.approx(expected, abs=1e-12), op.__name__
+        assert sparse[i].dot_product(dense[i + 1]) == pytest.approx(dense[i].dot_product(dense[i + 1]))
+
+    marker = vectorizer.vectorize_marker(CATEGORY, names[0], sparse=True)
+    assert np.array_equal(marker.dimensions, vectorizer.vectorize_marker(CATEGORY, names[0]).dimensions)
+    roundtrip = cosd.SparseCoSDVector.from_dense(dense[1].dimensions, datetime(2024, 1, 1))
+    assert np.array_equal(roundtrip.dimensions, dense[1].dimensions)
+
+
+def test_sparse_analysis_matches_dense_analysis(tmp_path: Path) -> None:
+    names = write_markers(tmp_path / "markers.yaml")
+    texts, timestamps = conversation(names, 120)
+    dense = analyzer(tmp_path / "markers.yaml", names).analyze_drift(texts, timestamps)
+    sparse = analyzer(tmp_path / "markers.yaml", names, sparse_vectors=True).analyze_drift(texts, timestamps)
+
+    assert all(isinstance(vector, cosd.SparseCoSDVector) for vector in sparse.drift_vectors)
+    for field in ("drift_vectors", "drift_velocity", "drift_path", "resonance_patterns",
+                  "emergent_clusters", "risk_assessment", "drift_metrics"):
+        assert_close(getattr(sparse, field), getattr(dense, field), field)
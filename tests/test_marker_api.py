@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from cosd_package import analyzer, cosd, write_markers  # noqa: E402
+
+# marker_api importiert das CoSD-Paket unter seinem installierten Namen
+sys.modules.setdefault("cosd", cosd)
+
+import marker_api  # noqa: E402
+from marker_matcher import MarkerMatcher  # noqa: E402
+from marker_reload import MarkerReloader  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+# write_markers benennt die Marker m0, m1, ...
+TEXTS = ["m0 m1", "m2", "m0"]
+
+
+@pytest.fixture()  # type: ignore[misc]
+def api(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Any:
+    names = write_markers(tmp_path / "markers.yaml", markers=5, tokens=50)
+    monkeypatch.setattr(marker_api, "cosd_analyzer", analyzer(tmp_path / "markers.yaml", names))
+    monkeypatch.setattr(marker_api, "cosd_metrics", cosd.StageMetrics())
+    return marker_api.app.test_client()
+
+
+def test_metrics_and_profiling_are_off_by_default(api: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(marker_api, "COSD_METRICS_ENDPOINT", False)
+    monkeypatch.setattr(marker_api, "COSD_PROFILING", False)
+
+    assert api.get("/metrics").status_code == 404
+    for query, body in (("?profile=1", {}), ("", {"profile": True})):
+        response = api.post(f"/api/cosd/analyze{query}", json={"texts": TEXTS, **body})
+        assert response.status_code == 403
+        assert "cprofile" not in response.get_json()
+    # Abgewiesene Anfragen erreichen die Analyse nicht
+    assert "cosd_analyses_total 0" in marker_api.cosd_metrics.to_prometheus()
+
+
+def test_metrics_and_profiling_when_enabled(api: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(marker_api, "COSD_METRICS_ENDPOINT", True)
+    monkeypatch.setattr(marker_api, "COSD_PROFILING", True)
+
+    response = api.post("/api/cosd/analyze?profile=1", json={"texts": TEXTS})
+    assert response.status_code == 200
+    assert "top_cumulative" in response.get_json()["cprofile"]
+    assert api.post("/api/cosd/analyze", json={"texts": TEXTS}).status_code == 200
+
+    metrics = api.get("/metrics")
+    assert metrics.status_code == 200 and metrics.mimetype == "text/plain"
+    body = metrics.get_data(as_text=True)
+    assert "cosd_analyses_total 2" in body.splitlines()
+    assert 'cosd_vector_cache_lookups_total{outcome="hits"}' in body
+
+
+@pytest.fixture()  # type: ignore[misc]
+def batch_api(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Any:
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump({"markers": [
+        {"marker": "ABBRUCH", "beispiele": ["Ich bin raus"], "kategorie": "PATTERN"},
+    ]}, allow_unicode=True), encoding="utf-8")
+    reloader = MarkerReloader(MarkerMatcher(str(marker_file)))
+    monkeypatch.setattr(marker_api, "reloader", reloader)
+    monkeypatch.setattr(marker_api, "result_cache", ResultCache(100))
+    yield marker_api.app.test_client()
+    reloader.matcher.close_pool()
+
+
+def ndjson(response: Any) -> list[dict[str, Any]]:
+    assert response.status_code == 200 and response.mimetype == marker_api.NDJSON_MIMETYPE
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_ndjson_batch_streams_one_line_per_input_in_order(batch_api: Any) -> None:
+    body = "\n".join([
+        json.dumps("Ich bin raus"), json.dumps({"text": "alles gut"}), "{kein json", "",
+        json.dumps({"id": 4}), json.dumps("Ich bin raus, gute Nacht"),
+    ]) + "\n"
+    lines = ndjson(batch_api.post("/analyze_batch?workers=1", data=body, content_type="application/x-ndjson"))
+
+    *results, summary = lines
+    assert summary == {"status": "success", "total_analyzed": 5}
+    assert [line["index"] for line in results] == [0, 1, 2, 3, 4]
+    assert [line.get("text_preview") for line in results] == [
+        "Ich bin raus", "alles gut", None, None, "Ich bin raus, gute Nacht"]
+    # Fehlerhafte Zeilen werden an ihrer Position gemeldet (Zeilennummer der Eingabe)
+    assert results[2] == {"error": "Zeile 3: kein gültiges JSON", "status": "error", "index": 2}
+    assert results[3] == {"error": "Zeile 5: kein Text gefunden", "status": "error", "index": 3}
+    assert [[m["marker"] for m in line["gefundene_marker"]] for line in (results[0], results[1], results[4])] == [
+        ["ABBRUCH"], [], ["ABBRUCH"]]
+
+
+def test_json_batch_streams_when_ndjson_is_accepted(batch_api: Any) -> None:
+    texts = ["Ich bin raus", "alles gut", "Ich bin raus"]
+    plain = batch_api.post("/analyze_batch", json={"texts": texts})
+    assert plain.mimetype == "application/json"
+
+    streamed = ndjson(batch_api.post("/analyze_batch", json={"texts": texts},
+                                     headers={"Accept": marker_api.NDJSON_MIMETYPE}))
+    assert streamed[-1] == {"status": "success", "total_analyzed": 3}
+    assert [line["text_preview"] for line in streamed[:-1]] == texts
+    assert [line["index"] for line in streamed[:-1]] == [0, 1, 2]
+
+    # Ungültige Konfiguration wird vor dem Streamen abgewiesen
+    rejected = batch_api.post("/analyze_batch?workers=0", data='"Ich bin raus"\n', content_type="application/x-ndjson")
+    assert rejected.status_code == 400 and rejected.get_json()["status"] == "error"
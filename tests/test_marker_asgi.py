@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from marker_asgi import MarkerASGIApp  # noqa: E402
+from marker_matcher import MarkerMatcher  # noqa: E402
+
+
+MARKERS = {
+    "markers": [
+        {
+            "marker": "ABBRUCH",
+            "beschreibung": "Gesprächsabbruch",
+            "beispiele": ["Ich bin raus", "gute Nacht"],
+            "kategorie": "PATTERN",
+            "risk_score": 2,
+        },
+    ]
+}
+
+
+@pytest.fixture()  # type: ignore[misc]
+def marker_file(tmp_path: Path) -> str:
+    path = tmp_path / "markers.yaml"
+    path.write_text(yaml.safe_dump(MARKERS, allow_unicode=True), encoding="utf-8")
+    return str(path)
+
+
+async def request(app: MarkerASGIApp, method: str, path: str, body: bytes = b"") -> tuple[int, Any]:
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return messages.pop(0)
+
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+def test_concurrent_requests_are_batched(marker_file: str) -> None:
+    async def scenario() -> None:
+        app = MarkerASGIApp(lambda: MarkerMatcher(marker_file), workers=1, max_delay_ms=20)
+        await app.startup()
+        try:
+            body = json.dumps({"text": "Ich bin raus, gute Nacht."}).encode()
+            responses = await asyncio.gather(*[request(app, "POST", "/analyze", body) for _ in range(10)])
+            _, stats = await request(app, "GET", "/batcher_stats")
+        finally:
+            await app.shutdown()
+
+        for status, payload in responses:
+            assert status == 200
+            assert payload["status"] == "success"
+            assert payload["gefundene_marker"][0]["marker"] == "ABBRUCH"
+        assert stats["requests"] == 10
+        assert stats["batches"] < 10
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_and_bad_body_is_400(marker_file: str) -> None:
+    async def scenario() -> None:
+        app = MarkerASGIApp(lambda: MarkerMatcher(marker_file), workers=1, queue_size=1)
+        await app.startup()
+        try:
+            body = json.dumps({"text": "gute Nacht"}).encode()
+            responses = await asyncio.gather(*[request(app, "POST", "/analyze", body) for _ in range(20)])
+            bad_status, _ = await request(app, "POST", "/analyze", b"{kein json")
+        finally:
+            await app.shutdown()
+
+        statuses = [status for status, _ in responses]
+        assert 200 in statuses
+        assert 429 in statuses
+        assert bad_status == 400
+
+    asyncio.run(scenario())
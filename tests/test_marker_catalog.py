@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from marker_catalog import MarkerCatalog  # noqa: E402
+from marker_matcher import MarkerMatcher  # noqa: E402
+
+
+MARKERS = {
+    "markers": [
+        {"marker": "ZWEIFEL", "beispiele": ["vielleicht", "mal sehen"], "kategorie": "EMOTION"},
+        {"marker": "ABBRUCH", "beispiele": ["Ich bin raus"], "kategorie": "PATTERN", "risk_score": 3},
+    ]
+}
+
+
+def make_catalog(tmp_path: Path) -> MarkerCatalog:
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump(MARKERS, allow_unicode=True), encoding="utf-8")
+    return MarkerCatalog(MarkerMatcher(str(marker_file)))
+
+
+def test_marker_list_is_precomputed_and_paged(tmp_path: Path) -> None:
+    catalog = make_catalog(tmp_path)
+
+    body, etag = catalog.markers_page()
+    assert body is catalog.markers_body and etag == catalog.markers_etag
+    assert [m["name"] for m in json.loads(body)["markers"]] == ["ABBRUCH", "ZWEIFEL"]
+
+    page, page_etag = catalog.markers_page(offset=1, limit=1, fields=["name", "beispiele_count"])
+    assert json.loads(page) == {
+        "status": "success", "markers": [{"name": "ZWEIFEL", "beispiele_count": 2}],
+        "total": 2, "offset": 1, "limit": 1,
+    }
+    assert page_etag != etag
+    assert catalog.markers_page(offset=1, limit=1, fields=["name", "beispiele_count"])[0] is page
+
+
+def test_statistics_response_splices_runtime_sections(tmp_path: Path) -> None:
+    catalog = make_catalog(tmp_path)
+
+    body, etag = catalog.statistics_response({"reload": {"reloads": 0}})
+    payload = json.loads(body)
+    assert list(payload) == ["reload", "statistics", "status"]
+    assert payload["statistics"]["categories"] == {"EMOTION": 1, "PATTERN": 1}
+    assert payload["statistics"]["marker_set_version"] == catalog.marker_set_version
+    assert catalog.statistics_response({"reload": {"reloads": 1}})[1] != etag
+    assert catalog.marker_detail("FEHLT") is None
+    assert json.loads(catalog.marker_detail("ABBRUCH")[0])["marker"]["risk_score"] == 3
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+from typing import Iterator
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from marker_index import ExampleAutomaton  # noqa: E402
+from marker_matcher import MarkerMatcher  # noqa: E402
+
+
+MARKERS = {
+    "markers": [
+        {
+            "marker": "ABBRUCH",
+            "beschreibung": "Gesprächsabbruch",
+            "beispiele": ["Ich bin raus", "ich bin raus", "", "gute Nacht"],
+            "kategorie": "PATTERN",
+            "risk_score": 2,
+        },
+        {
+            "marker": "GASLIGHTING",
+            "beschreibung": "Realitätsverzerrung",
+            "beispiele": ["Das hast du dir nur eingebildet"],
+            "kategorie": "PATTERN",
+        },
+    ]
+}
+
+
+@pytest.fixture()  # type: ignore[misc]
+def matcher(tmp_path: Path) -> MarkerMatcher:
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump(MARKERS, allow_unicode=True), encoding="utf-8")
+    return MarkerMatcher(str(marker_file))
+
+
+def test_automaton_finds_every_occurrence() -> None:
+    automaton = ExampleAutomaton(["he", "she", "hers", "his"])
+    spans = automaton.find_all("ushers and she")
+    assert spans[automaton.pattern_id("she")] == [(1, 4), (11, 14)]
+    assert spans[automaton.pattern_id("he")] == [(2, 4), (12, 14)]
+    assert spans[automaton.pattern_id("hers")] == [(2, 6)]
+    assert automaton.pattern_id("his") not in spans
+
+
+def test_automaton_first_occurrence_matches_find() -> None:
+    patterns = ["ab", "b", "abc", "c", ""]
+    text = "xxabcabc"
+    automaton = ExampleAutomaton(patterns)
+    first = automaton.first_occurrences(text)
+    for pattern in patterns:
+        assert first[automaton.pattern_id(pattern)] == text.find(pattern)
+
+
+def test_exact_matches_keep_example_order_and_spans(matcher: MarkerMatcher) -> None:
+    text = "Das hast du dir nur eingebildet. ICH BIN RAUS, gute Nacht."
+    result = matcher.analyze_text(text)
+    found = [(m.marker_name, m.matched_text, m.position) for m in result.gefundene_marker]
+    assert found == [
+        ("ABBRUCH", "ICH BIN RAUS", (33, 45)),
+        ("ABBRUCH", "ICH BIN RAUS", (33, 45)),
+        ("ABBRUCH", "gute Nacht", (47, 57)),
+        ("GASLIGHTING", "Das hast du dir nur eingebildet", (0, 31)),
+    ]
+    assert result.total_risk_score == 7
+    assert result.categories_found == {"PATTERN": 4}
+
+
+def test_semantic_patterns_compiled_once_and_errors_reported(tmp_path: Path) -> None:
+    data = {
+        "markers": [
+            {
+                "marker": "DRUCK",
+                "beispiele": [],
+                "semantic_patterns": {
+                    "patterns": [
+                        {"pattern": r"\bimmer\b"},
+                        {"pattern": r"(\w+) \1"},
+                        {"pattern": "[kaputt"},
+                    ]
+                },
+            },
+            {
+                "marker": "SCHULD",
+                "beispiele": [],
+                "semantic_patterns": {"patterns": [{"pattern": r"wegen (dir|dich)"}]},
+            },
+        ]
+    }
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump(data), encoding="utf-8")
+    matcher = MarkerMatcher(str(marker_file))
+
+    table = matcher.semantic_patterns
+    assert len(table) == 3
+    assert [(marker, pattern) for marker, pattern, _ in table.errors] == [("DRUCK", "[kaputt")]
+    assert table.group_count == 1  # die Rückreferenz bleibt ungebündelt
+
+    result = matcher.analyze_text("Immer wegen DIR, immer immer")
+    found = [(m.marker_name, m.matched_text, m.pattern_type) for m in result.gefundene_marker]
+    assert found == [
+        ("DRUCK", "Immer", "semantic"),
+        ("DRUCK", "immer", "semantic"),
+        ("DRUCK", "immer", "semantic"),
+        ("DRUCK", "immer immer", "semantic"),
+        ("SCHULD", "wegen DIR", "semantic"),
+    ]
+
+
+def test_fuzzy_index_only_scores_examples_with_shared_tokens(matcher: MarkerMatcher) -> None:
+    result = matcher.analyze_text("Ob das du dir nur eingebildet hast?")
+    found = [(m.marker_name, m.pattern_type, m.confidence_score) for m in result.gefundene_marker]
+    assert found == [("GASLIGHTING", "fuzzy", 0.7)]
+
+    present = matcher._example_automaton.first_occurrences("ich bin müde")
+    candidates = matcher._fuzzy_index.candidates(present)
+    gaslighting = matcher._example_automaton.pattern_id("das hast du dir nur eingebildet")
+    assert gaslighting not in candidates
+
+
+def test_parallel_batch_preserves_order_and_isolates_errors(matcher: MarkerMatcher) -> None:
+    texts = ["ich bin raus", None, "nichts hier", "Das hast du dir nur eingebildet"] * 5
+    try:
+        sequential = matcher.analyze_batch(texts, return_exceptions=True)
+        parallel = matcher.analyze_batch(texts, workers=2, chunk_size=3, return_exceptions=True)
+    finally:
+        matcher.close_pool()
+
+    def summary(result: object) -> object:
+        if isinstance(result, Exception):
+            return type(result).__name__
+        return [(m.marker_name, m.position) for m in result.gefundene_marker]  # type: ignore[attr-defined]
+
+    assert [summary(r) for r in parallel] == [summary(r) for r in sequential]
+    assert summary(parallel[1]) == "TypeError"
+
+
+def test_parallel_batch_reads_generators_only_a_bounded_window_ahead(matcher: MarkerMatcher) -> None:
+    consumed = []
+
+    def texts() -> Iterator[str]:
+        for i in range(200):
+            consumed.append(i)
+            yield f"text {i} ich bin raus"
+
+    try:
+        batch = matcher.iter_batch(texts(), workers=2, chunk_size=5)
+        first = next(batch)
+        assert first.gefundene_marker[0].marker_name == "ABBRUCH"
+        assert len(consumed) <= 2 * 2 * 5 + 5
+        assert len(list(batch)) == 199
+    finally:
+        matcher.close_pool()
+
+
+def test_concurrent_batches_with_different_workers_share_one_fixed_pool(tmp_path: Path) -> None:
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump(MARKERS, allow_unicode=True), encoding="utf-8")
+    matcher = MarkerMatcher(str(marker_file), pool_workers=2)
+    texts = [f"{i}: ich bin raus" for i in range(60)]
+    pools = []
+
+    def run(workers: int) -> list[int]:
+        results = matcher.analyze_batch(texts, workers=workers, chunk_size=4)
+        pools.append(matcher._pool)
+        return [len(result.gefundene_marker) for result in results]  # type: ignore[union-attr]
+
+    expected = [len(result.gefundene_marker) for result in matcher.analyze_batch(texts)]  # type: ignore[union-attr]
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(executor.map(run, [2, 3, 2, 5]))
+        assert expected[0] > 0 and counts == [expected] * 4
+        assert pools[0] is not None and all(pool is pools[0] for pool in pools)
+        assert pools[0]._processes == 2
+    finally:
+        matcher.close_pool()
+
+
+def test_snapshot_is_reused_and_rebuilt_when_sources_change(tmp_path: Path) -> None:
+    marker_file = tmp_path / "markers.yaml"
+    marker_file.write_text(yaml.safe_dump(MARKERS, allow_unicode=True), encoding="utf-8")
+    snapshot = tmp_path / "markers.yaml.snapshot"
+
+    first = MarkerMatcher(str(marker_file))
+    assert snapshot.exists()
+    cached = MarkerMatcher(str(marker_file))
+    assert cached.marker_set_version == first.marker_set_version
+    assert cached.analyze_text("gute Nacht").total_risk_score == 2
+
+    changed = dict(MARKERS, markers=MARKERS["markers"][:1])
+    marker_file.write_text(yaml.safe_dump(changed, allow_unicode=True), encoding="utf-8")
+    rebuilt = MarkerMatcher(str(marker_file))
+    assert rebuilt.marker_set_version != first.marker_set_version
+    assert list(rebuilt.markers) == ["ABBRUCH"]
+
+    snapshot.write_bytes(b"kaputt")
+    assert list(MarkerMatcher(str(marker_file)).markers) == ["ABBRUCH"]
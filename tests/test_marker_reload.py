@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from marker_matcher import MarkerMatcher  # noqa: E402
+from marker_reload import MarkerReloader  # noqa: E402
+
+
+MARKERS = {
+    "markers": [
+        {
+            "marker": "ABBRUCH",
+            "beispiele": ["Ich bin raus"],
+            "kategorie": "PATTERN",
+        },
+        {
+            "marker": "DRUCK",
+            "beispiele": [],
+            "semantic_patterns": {"patterns": [{"pattern": r"\bimmer\b"}]},
+        },
+    ]
+}
+
+
+def write_markers(path: Path, data: dict) -> None:
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+
+def test_reload_swaps_after_stable_change_and_reuses_unchanged_patterns(tmp_path: Path) -> None:
+    marker_file = tmp_path / "markers.yaml"
+    write_markers(marker_file, MARKERS)
+    swapped = []
+    reloader = MarkerReloader(MarkerMatcher(str(marker_file)), on_swap=swapped.append)
+    old = reloader.matcher
+
+    os.utime(marker_file, ns=(1, 1))
+    assert reloader.check() is None
+
+    changed = {"markers": [dict(MARKERS["markers"][0], beispiele=["gute Nacht"]), MARKERS["markers"][1],
+                           {"marker": "NEU", "beispiele": ["schon wieder"]}]}
+    write_markers(marker_file, changed)
+    with reloader.lease() as leased:
+        assert reloader.check() is None  # erst nach einem stabilen Intervall
+        report = reloader.check()
+        assert leased is old
+        assert leased.analyze_text("Ich bin raus").gefundene_marker
+
+    assert report is not None and report["status"] == "success"
+    assert (report["added"], report["changed"], report["removed"]) == (["NEU"], ["ABBRUCH"], [])
+    assert swapped == [reloader.matcher]
+    new = reloader.matcher
+    assert new.marker_set_version != old.marker_set_version
+    assert [m.marker_name for m in new.analyze_text("gute Nacht, schon wieder").gefundene_marker] == ["ABBRUCH", "NEU"]
+    assert new.semantic_patterns.by_marker["DRUCK"][0].regex is old.semantic_patterns.by_marker["DRUCK"][0].regex
+
+
+def test_failed_reload_keeps_current_matcher(tmp_path: Path) -> None:
+    marker_file = tmp_path / "markers.yaml"
+    write_markers(marker_file, MARKERS)
+    reloader = MarkerReloader(MarkerMatcher(str(marker_file)))
+    current = reloader.matcher
+
+    marker_file.write_text("markers: [kaputt", encoding="utf-8")
+    report = reloader.reload()
+
+    assert report["status"] == "error"
+    assert reloader.matcher is current
+    assert reloader.stats()["failed_reloads"] == 1
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "MARSAPv2"))
+
+from result_cache import ResultCache  # noqa: E402
+
+
+def test_entries_are_scoped_to_the_marker_set_version() -> None:
+    cache = ResultCache(max_entries=2)
+    cache.invalidate("v1")
+    cache.put("Ich bin raus", "v1", {"total_risk_score": 2, "timestamp": "alt"})
+
+    hit = cache.get("Ich bin raus", "v1")
+    assert hit is not None and hit["total_risk_score"] == 2
+    assert hit["timestamp"] != "alt"
+    assert cache.get("ich bin raus", "v1") is None
+
+    # Eine andere Version trifft nicht, verwirft aber auch nichts
+    assert cache.get("Ich bin raus", "v2") is None
+    assert len(cache) == 1
+    assert cache.get("Ich bin raus", None) is None
+
+    cache.invalidate("v2")
+    assert len(cache) == 0
+    # Nachzügler mit dem alten Marker-Satz werden nicht mehr abgelegt
+    cache.put("Ich bin raus", "v1", {"total_risk_score": 2})
+    assert len(cache) == 0
+    cache.invalidate("v2")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+    assert stats["marker_set_version"] == "v2"
+
+
+def test_disk_tier_is_shared_and_pruned_on_invalidation(tmp_path: Path) -> None:
+    path = str(tmp_path / "results.sqlite")
+    ResultCache(disk_path=path).put("gute Nacht", "v1", {"risk_level": "green"})
+
+    other = ResultCache(disk_path=path)
+    assert other.get("gute Nacht", "v1")["risk_level"] == "green"  # type: ignore[index]
+    assert other.stats()["disk_hits"] == 1
+
+    assert other.get("gute Nacht", "v2") is None
+    assert ResultCache(disk_path=path).get("gute Nacht", "v1") is not None
+    other.invalidate("v2")
+    assert ResultCache(disk_path=path).get("gute Nacht", "v1") is None
+
+
+def test_disk_tier_is_trimmed_to_the_newest_entries(tmp_path: Path) -> None:
+    path = str(tmp_path / "results.sqlite")
+    cache = ResultCache(disk_path=path, disk_max_entries=10)
+    for i in range(1000):
+        cache.put(f"Text {i}", "v1", {"index": i})
+
+    reader = ResultCache(disk_path=path)
+    assert reader.get("Text 989", "v1") is None
+    assert reader.get("Text 990", "v1")["index"] == 990  # type: ignore[index]
+    assert reader.get("Text 999", "v1") is not None
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pipeline_package import load  # noqa: E402
+
+scoring_engine = load("scoring", "scoring_engine")
+score_models = load("scoring", "score_models")
+marker_models = load("matcher", "marker_models")
+chunk_models = load("chunker", "chunk_models")
+ScoringEngine = scoring_engine.ScoringEngine
+MarkerMatch, MarkerCategory, MarkerSeverity = (
+    marker_models.MarkerMatch, marker_models.MarkerCategory, marker_models.MarkerSeverity
+)
+TextChunk, Speaker, ChunkType = chunk_models.TextChunk, chunk_models.Speaker, chunk_models.ChunkType
+
+
+def make(n_chunks: int, n_matches: int, seed: int, duplicate_ids: bool = False) -> tuple[list, list]:
+    rng = random.Random(seed)
+    speakers = [Speaker(id="s1", name="Anna"), Speaker(id="s2", name="Ben"), None]
+    start = datetime(2023, 1, 1)
+    chunks = []
+    for i in range(n_chunks):
+        chunk_id = f"c{rng.randrange(n_chunks // 2)}" if duplicate_ids and rng.random() < 0.2 else f"c{i}"
+        chunks.append(TextChunk(
+            id=chunk_id, type=ChunkType.MESSAGE, text=" ".join(["wort"] * rng.randint(0, 40)),
+            speaker=rng.choice(speakers), start_pos=0, end_pos=1,
+            timestamp=start + timedelta(minutes=17 * i) if rng.random() < 0.9 else None,
+        ))
+    matches = []
+    for _ in range(n_matches):
+        # Marker-spezifische Gewichte aus den Metadaten, teils fehlend
+        metadata = {"weight": rng.choice([0.5, 1.0, 1.3, 2.0])} if rng.random() < 0.5 else {}
+        matches.append(MarkerMatch(
+            marker_id="m", marker_name=f"M{rng.randrange(30)}", category=rng.choice(list(MarkerCategory)),
+            severity=rng.choice(list(MarkerSeverity)), text="t", context="c", position=0,
+            chunk_id=f"c{rng.randrange(int(n_chunks * 1.1))}", confidence=rng.random(), metadata=metadata,
+        ))
+    return chunks, matches
+
+
+def dump(result: Any, contributions: bool = True) -> tuple:
+    chunk_scores = [
+        (score.chunk_id, score.model_id, score.raw_score, score.normalized_score, score.confidence,
+         score.timestamp, score.metadata, score.contributing_markers if contributions else None)
+        for score in result.chunk_scores
+    ]
+    return (
+        chunk_scores,
+        {key: value.model_dump() for key, value in result.aggregated_scores.items()},
+        {speaker: {key: value.model_dump() for key, value in scores.items()}
+         for speaker, scores in result.speaker_scores.items()},
+        result.timeline, result.alerts, result.summary,
+    )
+
+
+def test_vectorized_scores_match_the_loop_path() -> None:
+    engine = ScoringEngine()
+    for seed in range(4):
+        chunks, matches = make(120, 400, seed, duplicate_ids=seed % 2 == 1)
+        loop = engine.calculate_scores(chunks, matches)
+        vectorized = engine.calculate_scores(chunks, matches, vectorized=True, include_contributions=True)
+        assert dump(vectorized) == dump(loop), seed
+
+        without_contributions = engine.calculate_scores(chunks, matches, vectorized=True)
+        assert dump(without_contributions, contributions=False) == dump(loop, contributions=False)
+        assert not any(score.contributing_markers for score in without_contributions.chunk_scores)
+
+
+def test_vectorized_scores_honour_custom_weights_and_model_selection() -> None:
+    engine = ScoringEngine()
+    engine.add_custom_model(score_models.ScoringModel(
+        id="custom", name="Custom", type=score_models.ScoreType.TRUST_LEVEL, description="Test",
+        category_weights={MarkerCategory.MANIPULATION: 4.0, MarkerCategory.EMOTIONAL_ABUSE: -1.5},
+        severity_multipliers={MarkerSeverity.LOW: 0.1, MarkerSeverity.CRITICAL: 7.0},
+        inverse_scale=True, normalization_factor=10.0,
+    ))
+    chunks, matches = make(60, 250, 11)
+    for models in (None, ["custom"]):
+        loop = engine.calculate_scores(chunks, matches, models=models)
+        vectorized = engine.calculate_scores(chunks, matches, models=models, vectorized=True,
+                                             include_contributions=True)
+        assert dump(vectorized) == dump(loop)
+    assert {score.model_id for score in loop.chunk_scores} == {"custom"}
+
+
+def test_vectorized_scores_match_on_empty_input() -> None:
+    engine = ScoringEngine()
+    assert dump(engine.calculate_scores([], [], vectorized=True)) == dump(engine.calculate_scores([], []))
+
+    chunks, _ = make(20, 0, 1)
+    assert dump(engine.calculate_scores(chunks, [], vectorized=True, include_contributions=True)) == \
+        dump(engine.calculate_scores(chunks, []))
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import datetime
+import io
+from pathlib import Path
+import random
+import sys
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pipeline_package import load  # noqa: E402
+
+text_chunker = load("chunker", "text_chunker")
+chunk_models = load("chunker", "chunk_models")
+TextChunker = text_chunker.TextChunker
+ChunkingConfig = chunk_models.ChunkingConfig
+
+
+def export(n: int, fmt: str, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    lines = ["Export gestartet", ""]
+    for i in range(n):
+        speaker = rng.choice(["Anna", "Ben", "Carl"])
+        hours, minutes = divmod(i * 7 + rng.choice([0, 0, 200]), 60)
+        words = " ".join(rng.choice("ich du wir ja nein".split()) for _ in range(rng.randint(1, 30)))
+        if fmt == "whatsapp":
+            lines.append(f"{1 + (hours // 24) % 28:02d}.03.23, {hours % 24:02d}:{minutes:02d} - {speaker}: {i} {words}")
+        elif fmt == "telegram":
+            lines.append(f"[{1 + (hours // 24) % 28:02d}.03.2023 {hours % 24:02d}:{minutes:02d}] {speaker}: {i} {words}")
+        else:
+            lines.append(f"{speaker}: {i} {words}")
+        if rng.random() < 0.1:
+            lines.append("  Folgezeile ohne Sprecher")
+    return "\n".join(lines) + "\n"
+
+
+def strptime_any(timestamp_str: str) -> datetime | None:
+    for fmt in TextChunker.TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(timestamp_str.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def key(chunk: Any) -> tuple:
+    return (chunk.text, chunk.type, chunk.speaker and chunk.speaker.name, chunk.timestamp,
+            chunk.start_pos, chunk.end_pos, chunk.metadata)
+
+
+def test_chunk_stream_yields_the_same_chunks_as_chunk_text() -> None:
+    config = ChunkingConfig(max_chunk_size=400)
+    for fmt in ("whatsapp", "telegram", "generic"):
+        text = export(600, fmt)
+        expected = TextChunker(config).chunk_text(text).chunks
+        streamed = list(TextChunker(config).chunk_stream(io.StringIO(text)))
+
+        assert len(expected) > 10
+        assert [key(chunk) for chunk in streamed] == [key(chunk) for chunk in expected], fmt
+        assert streamed[0].previous_chunk_id is None and streamed[-1].next_chunk_id is None
+        assert all(a.next_chunk_id == b.id and b.previous_chunk_id == a.id for a, b in zip(streamed, streamed[1:]))
+
+
+def test_chunk_stream_falls_back_to_one_chunk_when_no_line_matches() -> None:
+    text = "Kein Chat hier\nnur zwei Zeilen\n"
+    expected = TextChunker().chunk_text(text, format_hint="whatsapp").chunks
+    streamed = list(TextChunker().chunk_stream(io.StringIO(text), format_hint="whatsapp"))
+
+    assert len(expected) == 1
+    assert [key(chunk) for chunk in streamed] == [key(chunk) for chunk in expected]
+
+
+def test_chunk_stream_splits_plain_text_into_contiguous_paragraphs() -> None:
+    text = "abc def\n" * 40
+    chunks = list(TextChunker(ChunkingConfig(max_chunk_size=50, normalize_whitespace=False)).chunk_stream(io.StringIO(text)))
+
+    assert len(chunks) > 1 and all(len(chunk.text) <= 50 for chunk in chunks)
+    assert "".join(chunk.text for chunk in chunks) == text
+    assert [chunk.start_pos for chunk in chunks[1:]] == [chunk.end_pos for chunk in chunks[:-1]]
+
+
+def test_learned_timestamp_format_matches_full_parsing() -> None:
+    rng = random.Random(7)
+    templates = [
+        "{d}.{m}.{Y} {H}:{M}", "{d}.{m}.{Y} {H}:{M}:{S}", "{d}/{m}/{Y} {H}:{M}", "{m}/{d}/{Y} {H}:{M}",
+        "{d}.{m}.{y}, {H}:{M}", "{d}/{m}/{y}, {H}:{M}", "{Y}-{m}-{d} {H}:{M}:{S}",
+    ]
+    stamps = ["12/25/2023 10:00", "05/06/2023 10:00", "31.02.2023 10:00", "00.01.2023 10:00",
+              "1.2.2023 24:00", "1.2.2023  7:05", "kein Datum"]
+    for template in templates:
+        for _ in range(150):
+            stamps.append(template.format(
+                d=rng.choice(["1", "07", "12", "13", "29", "31"]), m=rng.choice(["1", "02", "06", "12", "13"]),
+                Y=rng.choice(["1999", "2023"]), y=rng.choice(["68", "69", "23"]),
+                H=rng.choice(["0", "09", "23"]), M=rng.choice(["5", "59"]), S=rng.choice(["00", "59"]),
+            ))
+    # Erst blockweise pro Format (wie in einem Export), dann gemischt
+    stamps += rng.sample(stamps, len(stamps))
+
+    chunker = TextChunker()
+    assert [chunker._parse_timestamp(stamp) for stamp in stamps] == [strptime_any(stamp) for stamp in stamps]
+    assert chunker._timestamp_format is not None
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pipeline_package import load  # noqa: E402
+
+time_series_aggregator = load("aggregation", "time_series_aggregator")
+aggregation_models = load("aggregation", "aggregation_models")
+score_models = load("scoring", "score_models")
+marker_models = load("matcher", "marker_models")
+TimeSeriesAggregator = time_series_aggregator.TimeSeriesAggregator
+AggregationConfig, AggregationPeriod = aggregation_models.AggregationConfig, aggregation_models.AggregationPeriod
+ChunkScore, ScoreType = score_models.ChunkScore, score_models.ScoreType
+MarkerMatch, MarkerCategory, MarkerSeverity = (
+    marker_models.MarkerMatch, marker_models.MarkerCategory, marker_models.MarkerSeverity
+)
+
+PERIODS = [
+    (AggregationPeriod.HOURLY, timedelta(minutes=13)),
+    (AggregationPeriod.DAILY, timedelta(hours=7)),
+    (AggregationPeriod.CUSTOM, timedelta(hours=5)),
+    (AggregationPeriod.MONTHLY, timedelta(days=4)),
+    (AggregationPeriod.QUARTERLY, timedelta(days=11)),
+]
+
+
+def make(n: int, step: timedelta, seed: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    start = datetime(2023, 11, 28, 22, 30)
+    types = [ScoreType.MANIPULATION_INDEX, ScoreType.RELATIONSHIP_HEALTH, ScoreType.CONFLICT_LEVEL]
+    scores, matches = [], []
+    for i in range(n):
+        # Lücken und Zeitstempel genau auf Fenstergrenzen; jede Serie beginnt bei start
+        timestamp = start + step * rng.choice([i, i, i // 2 * 2]) if rng.random() < 0.9 else None
+        score_type = rng.choice(types)
+        if i < len(types):
+            timestamp, score_type = start, types[i]
+        scores.append(ChunkScore(
+            chunk_id=f"c{i}", model_id=score_type.value, score_type=score_type,
+            raw_score=0.0, normalized_score=rng.uniform(1, 10), confidence=rng.random(), timestamp=timestamp,
+        ))
+        matches.append(MarkerMatch(
+            marker_id="m", marker_name="M", category=rng.choice(list(MarkerCategory)),
+            severity=MarkerSeverity.LOW, text="t", context="c", chunk_id=f"c{i}", position=0,
+            confidence=0.5, timestamp=timestamp,
+        ))
+    return scores, matches
+
+
+def reference_scores(aggregator: TimeSeriesAggregator, scores: list, period: AggregationPeriod) -> dict:
+    """Filtert die Scores für jedes Fenster einzeln (ursprüngliche Schleife)."""
+    by_type = defaultdict(list)
+    for score in scores:
+        if score.timestamp:
+            by_type[score.score_type.value].append(score)
+    series = {}
+    for score_type, typed in by_type.items():
+        typed = sorted(typed, key=lambda s: s.timestamp)
+        points = []
+        for start, end in aggregator._create_time_windows(typed[0].timestamp, typed[-1].timestamp, period):
+            window = [s for s in typed if start <= s.timestamp < end]
+            if not window and not aggregator.config.include_zero_periods:
+                continue
+            values = [s.normalized_score for s in window]
+            if window:
+                point_values = {
+                    "mean": np.mean(values), "min": min(values), "max": max(values),
+                    "std": np.std(values) if len(values) > 1 else 0, "median": np.median(values),
+                }
+                counts = {"chunk_count": len(window), "confidence_avg": np.mean([s.confidence for s in window])}
+            else:
+                point_values = {"mean": 0, "min": 0, "max": 0, "std": 0, "median": 0}
+                counts = {"chunk_count": 0}
+            points.append((start, end, point_values, counts))
+        series[f"scores_{score_type}"] = points
+    return series
+
+
+def reference_markers(aggregator: TimeSeriesAggregator, matches: list, period: AggregationPeriod) -> dict:
+    timed = sorted((m for m in matches if m.timestamp), key=lambda m: m.timestamp)
+    totals, categories = [], defaultdict(list)
+    for start, end in aggregator._create_time_windows(timed[0].timestamp, timed[-1].timestamp, period):
+        window = [m for m in timed if start <= m.timestamp < end]
+        counts = {"total": len(window)}
+        for match in window:
+            counts[match.category.value] = counts.get(match.category.value, 0) + 1
+        totals.append((start, end, {"marker_count": len(window)}, counts))
+        for category in MarkerCategory:
+            count = counts.get(category.value, 0)
+            categories[f"markers_{category.value}"].append((start, end, {"count": count}, {category.value: count}))
+    return {"markers_total": totals, **categories}
+
+
+def dump(series: dict) -> dict:
+    return {
+        name: [(p.period_start, p.period_end, p.values, p.counts) for p in ts.data_points]
+        for name, ts in series.items()
+    }
+
+
+@pytest.mark.parametrize("period,step", PERIODS)
+@pytest.mark.parametrize("include_zero_periods", [True, False])
+def test_columnar_bucketing_matches_per_window_filtering(period, step, include_zero_periods) -> None:
+    aggregator = TimeSeriesAggregator(AggregationConfig(
+        custom_period_hours=6, include_zero_periods=include_zero_periods
+    ))
+    for seed in range(3):
+        scores, matches = make(300, step, seed)
+
+        columnar = dump(aggregator._aggregate_scores(scores, period))
+        reference = reference_scores(aggregator, scores, period)
+        assert columnar.keys() == reference.keys()
+        for name, points in reference.items():
+            assert len(columnar[name]) == len(points), (name, seed)
+            for got, expected in zip(columnar[name], points):
+                assert got[:2] == expected[:2]
+                assert got[2] == pytest.approx(expected[2])
+                assert got[3] == pytest.approx(expected[3])
+
+        columnar = dump(aggregator._aggregate_markers(matches, period))
+        reference = reference_markers(aggregator, matches, period)
+        assert columnar == reference, seed
+        # Kategorie-Reihenfolge der Gesamt-Counts wie beim ersten Auftreten
+        for got, expected in zip(columnar["markers_total"], reference["markers_total"]):
+            assert list(got[3]) == list(expected[3])
+
+
+def test_lagged_correlations_shift_by_periods_across_missing_windows() -> None:
+    rng = random.Random(7)
+    start = datetime(2023, 3, 1, 9)
+    days = [day for day in range(40) if day not in (5, 6, 17, 30)]
+    values = {day: rng.uniform(1, 10) for day in days}
+    # Konfliktniveau folgt dem Manipulationsindex mit einem Tag Verzögerung
+    scores = [
+        ChunkScore(chunk_id=f"{score_type.value}{day}", model_id=score_type.value, score_type=score_type,
+                   raw_score=0.0, normalized_score=value, timestamp=start + timedelta(days=day + shift))
+        for day, value in values.items()
+        for score_type, shift in ((ScoreType.MANIPULATION_INDEX, 0), (ScoreType.CONFLICT_LEVEL, 1))
+    ]
+    aggregator = TimeSeriesAggregator(AggregationConfig(include_zero_periods=False, correlation_max_lag=3))
+    comparison, = aggregator.aggregate_data(scores, [], AggregationPeriod.DAILY).comparisons
+
+    names = [series.series_id for series in comparison.series]
+    frame = pd.DataFrame({
+        series.series_id: pd.Series({p.period_start: p.values["mean"] for p in series.data_points})
+        for series in comparison.series
+    }).reindex(pd.date_range(start, start + timedelta(days=40), freq="D"))
+    for lag in (1, 2, 3):
+        for i, first in enumerate(names):
+            for j, second in enumerate(names):
+                expected = frame[first].corr(frame[second].shift(-lag))
+                assert comparison.lagged_correlations[lag][i][j] == pytest.approx(expected)
+                assert comparison.lagged_correlations[-lag][j][i] == pytest.approx(expected)
+
+    lead = names.index("scores_manipulation_index"), names.index("scores_conflict_level")
+    assert comparison.lagged_correlations[1][lead[0]][lead[1]] == pytest.approx(1.0)
+    expected = frame["scores_manipulation_index"].corr(frame["scores_conflict_level"])
+    assert comparison.correlation_matrix[lead[0]][lead[1]] == pytest.approx(expected)